@@ -12,12 +12,16 @@ from .commands import (
     cmd_add_private_withdrawal,
     cmd_audit,
     cmd_config_show,
+    cmd_db_aggregates,
+    cmd_db_analyze,
     cmd_delete_expense,
     cmd_delete_income,
     cmd_delete_private_transfer,
+    cmd_duplicates_scan,
     cmd_export,
     cmd_import,
     cmd_incomplete_list,
+    cmd_ingest_watch,
     cmd_init,
     cmd_list_categories,
     cmd_list_expenses,
@@ -32,12 +36,14 @@ from .commands import (
     cmd_receipt_check,
     cmd_receipt_open,
     cmd_setup,
+    cmd_suggest,
     cmd_summary,
     cmd_update_expense,
     cmd_update_income,
     cmd_update_private_transfer,
 )
 from .constants import DEFAULT_DB_PATH, DEFAULT_EXPORT_DIR
+from .services.duplicates import DEFAULT_DATE_WINDOW_DAYS, DEFAULT_MIN_SCORE
 
 
 def load_plugins(subparsers: argparse._SubParsersAction) -> None:
@@ -98,21 +104,127 @@ def main() -> None:
     )
     import_parser.add_argument(
         "--file",
-        help="Pfad zur Importdatei (csv|jsonl), '-' für stdin",
+        help="Pfad zur Importdatei (csv|jsonl|camt053|mt940), '-' für stdin",
     )
     import_parser.add_argument(
-        "--format", choices=["csv", "jsonl"], help="Importformat"
+        "--dir",
+        help="Importiert alle passenden Dateien eines Verzeichnisses (statt --file)",
     )
     import_parser.add_argument(
-        "--dry-run", action="store_true", help="Nur prüfen, nichts speichern"
+        "--glob",
+        help="Dateimuster für --dir (default: *.csv*, *.jsonl*, *.xml*, *.sta*)",
+    )
+    import_parser.add_argument(
+        "--commit-per-file",
+        action="store_true",
+        help="Mit --dir: jede fehlerfreie Datei einzeln committen",
+    )
+    import_parser.add_argument(
+        "--format", choices=["csv", "jsonl", "camt053", "mt940"], help="Importformat"
+    )
+    import_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Nur prüfen, nichts speichern (zählt neue/Duplikate/ungültige Zeilen)",
+    )
+    import_parser.add_argument(
+        "--report",
+        help="Mit --dry-run: Klassifikation je Zeile als CSV in diese Datei schreiben",
+    )
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Zeilen pro Schreibblock (default: 500)",
+    )
+    import_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Prozesse für Parsen/Normalisieren großer Dateien (default: 1); "
+            "mit --dir: Anzahl Leser-Threads (default: bis zu 4)"
+        ),
+    )
+    import_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Blockweise committen und nach Abbruch am letzten Checkpoint fortsetzen",
+    )
+    import_parser.add_argument(
+        "--single-pass",
+        action="store_true",
+        help="Prüfen und Schreiben in einem Durchlauf (SAVEPOINT je Block)",
+    )
+    import_parser.add_argument(
+        "--atomic",
+        action="store_true",
+        help="Mit --single-pass: beim ersten Fehler den gesamten Import verwerfen",
+    )
+    import_parser.add_argument(
+        "--bloom",
+        action="store_true",
+        help="Duplikatprüfung über Bloom-Filter (wird neben der DB gespeichert)",
+    )
+    import_parser.add_argument(
+        "--suggest",
+        action="store_true",
+        help="Fehlende Kategorien aus der Buchungshistorie ergänzen (siehe euer suggest)",
     )
     import_parser.add_argument(
         "--schema",
         action="store_true",
         help="Zeigt Import-Schema, Beispiele und Alias-Keys",
     )
+    import_parser.add_argument(
+        "--show-mapping",
+        action="store_true",
+        help="Zeigt die aus dem Dateikopf aufgelöste Spaltenzuordnung (ohne Import)",
+    )
     import_parser.set_defaults(func=cmd_import)
 
+    # --- ingest ---
+    ingest_parser = subparsers.add_parser(
+        "ingest", help="Eingangsverzeichnis laufend importieren"
+    )
+    ingest_subparsers = ingest_parser.add_subparsers(dest="action", required=True)
+    ingest_watch_parser = ingest_subparsers.add_parser(
+        "watch", help="Importiert neue/geänderte Dateien eines Verzeichnisses (Dauerlauf)"
+    )
+    ingest_watch_parser.add_argument("dir", help="Eingangsverzeichnis")
+    ingest_watch_parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl", "camt053", "mt940"],
+        default="csv",
+        help="Importformat (default: csv)",
+    )
+    ingest_watch_parser.add_argument(
+        "--glob", help="Dateimuster (default: passend zum Format, z.B. *.csv*)"
+    )
+    ingest_watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Sekunden zwischen zwei Durchläufen (default: 5)",
+    )
+    ingest_watch_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Zeilen pro Schreibblock (default: 500)",
+    )
+    ingest_watch_parser.add_argument(
+        "--suggest",
+        action="store_true",
+        help="Fehlende Kategorien aus der Buchungshistorie ergänzen (siehe euer suggest)",
+    )
+    ingest_watch_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Nur einen Durchlauf ausführen (z.B. für cron), ohne Wartezeit für neue Dateien",
+    )
+    ingest_watch_parser.set_defaults(func=cmd_ingest_watch)
+
     # --- add ---
     add_parser = subparsers.add_parser("add", help="Fügt Transaktion hinzu")
     add_subparsers = add_parser.add_subparsers(dest="type", required=True)
@@ -153,6 +265,10 @@ def main() -> None:
         action="store_true",
         help="Reverse-Charge: berechnet 19%% USt automatisch",
     )
+    add_expense_parser.add_argument(
+        "--idempotency-key",
+        help="Eindeutiger Schlüssel je Vorgang; Wiederholungen liefern die Originalbuchung",
+    )
     add_expense_parser.set_defaults(func=cmd_add_expense)
 
     # add income
@@ -182,6 +298,10 @@ def main() -> None:
     add_income_parser.add_argument(
         "--vat", type=float, help="Umsatzsteuer-Betrag (für Regelb.)"
     )
+    add_income_parser.add_argument(
+        "--idempotency-key",
+        help="Eindeutiger Schlüssel je Vorgang; Wiederholungen liefern die Originalbuchung",
+    )
     add_income_parser.set_defaults(func=cmd_add_income)
 
     # add private-deposit
@@ -498,6 +618,25 @@ def main() -> None:
     )
     query_parser.set_defaults(func=cmd_query)
 
+    # --- db ---
+    db_parser = subparsers.add_parser("db", help="Datenbank-Wartung")
+    db_subparsers = db_parser.add_subparsers(dest="action", required=True)
+    db_analyze_parser = db_subparsers.add_parser(
+        "analyze",
+        help="Planer-Statistiken aktualisieren (ANALYZE) und Index-Nutzung prüfen",
+    )
+    db_analyze_parser.set_defaults(func=cmd_db_analyze)
+    db_aggregates_parser = db_subparsers.add_parser(
+        "aggregates",
+        help="Summentabelle (agg_period_category) prüfen oder neu aufbauen",
+    )
+    db_aggregates_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Summentabelle vor der Prüfung vollständig aus den Buchungen neu aufbauen",
+    )
+    db_aggregates_parser.set_defaults(func=cmd_db_aggregates)
+
     # --- audit ---
     audit_parser = subparsers.add_parser("audit", help="Zeigt Änderungshistorie")
     audit_parser.add_argument("id", type=int, help="Datensatz-ID")
@@ -567,6 +706,58 @@ def main() -> None:
     )
     incomplete_list_parser.set_defaults(func=cmd_incomplete_list)
 
+    # --- duplicates ---
+    duplicates_parser = subparsers.add_parser(
+        "duplicates", help="Unscharfe Duplikatsuche"
+    )
+    duplicates_subparsers = duplicates_parser.add_subparsers(
+        dest="action", required=True
+    )
+    duplicates_scan_parser = duplicates_subparsers.add_parser(
+        "scan", help="Sucht ähnliche Buchungen mit gleichem Betrag"
+    )
+    duplicates_scan_parser.add_argument(
+        "--type", choices=["expense", "income"], help="Typ filtern"
+    )
+    duplicates_scan_parser.add_argument("--year", type=int, help="Jahr filtern")
+    duplicates_scan_parser.add_argument(
+        "--window",
+        type=int,
+        default=DEFAULT_DATE_WINDOW_DAYS,
+        help=f"Datumsfenster in Tagen (default: {DEFAULT_DATE_WINDOW_DAYS})",
+    )
+    duplicates_scan_parser.add_argument(
+        "--min-score",
+        type=float,
+        default=DEFAULT_MIN_SCORE,
+        help=f"Mindest-Score 0..1 (default: {DEFAULT_MIN_SCORE})",
+    )
+    duplicates_scan_parser.add_argument(
+        "--limit", type=int, default=25, help="Max. Zeilen in der Tabelle (default: 25)"
+    )
+    duplicates_scan_parser.add_argument(
+        "--format", choices=["table", "csv"], default="table"
+    )
+    duplicates_scan_parser.set_defaults(func=cmd_duplicates_scan)
+
+    # --- suggest ---
+    suggest_parser = subparsers.add_parser(
+        "suggest", help="Kategorie-Vorschlag aus der Buchungshistorie"
+    )
+    suggest_parser.add_argument("party", nargs="?", help="Lieferant bzw. Quelle")
+    suggest_parser.add_argument(
+        "--type", choices=["expense", "income"], default="expense", help="Typ (default: expense)"
+    )
+    suggest_parser.add_argument(
+        "--limit", type=int, default=5, help="Max. Vorschläge (default: 5)"
+    )
+    suggest_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Vorschlagsmodell vollständig aus allen Buchungen neu aufbauen",
+    )
+    suggest_parser.set_defaults(func=cmd_suggest)
+
     load_plugins(subparsers)
     args = parser.parse_args()
     args.func(args)
@@ -6,10 +6,13 @@ from .add import (
 )
 from .audit import cmd_audit
 from .config import cmd_config_show
+from .database import cmd_db_aggregates, cmd_db_analyze
 from .delete import cmd_delete_expense, cmd_delete_income, cmd_delete_private_transfer
+from .duplicates import cmd_duplicates_scan
 from .export import cmd_export
 from .import_data import cmd_import
 from .incomplete import cmd_incomplete_list
+from .ingest import cmd_ingest_watch
 from .init import cmd_init
 from .list import (
     cmd_list_categories,
@@ -25,6 +28,7 @@ from .query import cmd_query
 from .reconcile import cmd_reconcile_private
 from .receipt import cmd_receipt_check, cmd_receipt_open
 from .setup import cmd_setup
+from .suggest import cmd_suggest
 from .summary import cmd_summary
 from .update import cmd_update_expense, cmd_update_income, cmd_update_private_transfer
 
@@ -35,12 +39,16 @@ __all__ = [
     "cmd_add_private_withdrawal",
     "cmd_audit",
     "cmd_config_show",
+    "cmd_db_aggregates",
+    "cmd_db_analyze",
     "cmd_delete_expense",
     "cmd_delete_income",
     "cmd_delete_private_transfer",
+    "cmd_duplicates_scan",
     "cmd_export",
     "cmd_import",
     "cmd_incomplete_list",
+    "cmd_ingest_watch",
     "cmd_init",
     "cmd_list_categories",
     "cmd_list_expenses",
@@ -55,6 +63,7 @@ __all__ = [
     "cmd_receipt_check",
     "cmd_receipt_open",
     "cmd_setup",
+    "cmd_suggest",
     "cmd_summary",
     "cmd_update_expense",
     "cmd_update_income",
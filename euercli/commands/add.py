@@ -3,20 +3,22 @@ from pathlib import Path
 
 from ..config import (
     get_audit_user,
+    get_category_rules,
     get_ledger_accounts,
     get_private_accounts,
     load_config,
     warn_missing_receipt,
 )
-from ..db import get_db_connection
 from ..importers import get_tax_config
 from ..services.categories import get_category_list, get_ledger_accounts_for_category
+from ..services.category_rules import compile_category_rules
 from ..services.errors import ValidationError
-from ..services.expenses import create_expense
-from ..services.income import create_income
+from ..services.expenses import create_expense, get_expense_detail
+from ..services.idempotency import find_idempotent_record, validate_idempotency_key
+from ..services.income import create_income, get_income_detail
 from ..services.private_transfers import create_private_transfer
 from ..utils import format_amount
-from .helpers import warn_unusual_date_order
+from .helpers import open_database, warn_unusual_date_order
 
 
 def _print_category_error_with_ledger_hint(conn, booking_type: str, ledger_accounts) -> None:
@@ -34,16 +36,47 @@ def _print_category_error_with_ledger_hint(conn, booking_type: str, ledger_accou
     )
 
 
+def _replay_idempotent(conn, booking_type: str, idempotency_key: str | None) -> bool:
+    """Gibt bei bekanntem Idempotency-Key die Originalbuchung aus (ohne erneute Prüfung)."""
+    if not idempotency_key:
+        return False
+    try:
+        record_id = find_idempotent_record(
+            conn, booking_type, validate_idempotency_key(idempotency_key)
+        )
+    except ValidationError as exc:
+        print(f"Fehler: {exc.message}", file=sys.stderr)
+        conn.close()
+        sys.exit(1)
+    if record_id is None:
+        return False
+    if booking_type == "expense":
+        expense = get_expense_detail(conn, record_id)
+        label, party, amount = "Ausgabe", expense.vendor, expense.amount_eur
+    else:
+        income = get_income_detail(conn, record_id)
+        label, party, amount = "Einnahme", income.source, income.amount_eur
+    print(
+        f"{label} #{record_id} bereits angelegt (Idempotency-Key): "
+        f"{party} {format_amount(amount)} EUR"
+    )
+    return True
+
+
 def cmd_add_expense(args):
     """Fügt eine Ausgabe hinzu."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
+    if _replay_idempotent(conn, "expense", args.idempotency_key):
+        conn.close()
+        return
     config = load_config()
     audit_user = get_audit_user(config)
     private_accounts = get_private_accounts(config)
     tax_mode = get_tax_config(config)
     try:
         ledger_accounts = get_ledger_accounts(config)
+        category_rules = compile_category_rules(get_category_rules(config))
     except ValidationError as exc:
         print(f"Fehler: {exc.message}", file=sys.stderr)
         conn.close()
@@ -55,7 +88,12 @@ def cmd_add_expense(args):
             file=sys.stderr,
         )
 
-    if not args.category and not args.ledger_account and ledger_accounts:
+    if (
+        not args.category
+        and not args.ledger_account
+        and ledger_accounts
+        and not category_rules.match("expense", args.vendor, args.amount, args.account)
+    ):
         _print_category_error_with_ledger_hint(conn, "expense", ledger_accounts)
         conn.close()
         sys.exit(1)
@@ -80,6 +118,8 @@ def cmd_add_expense(args):
             private_accounts=private_accounts,
             tax_mode=tax_mode,
             audit_user=audit_user,
+            category_rules=category_rules,
+            idempotency_key=args.idempotency_key,
         )
     except ValidationError as exc:
         if exc.code == "category_not_found" and args.category:
@@ -131,18 +171,27 @@ def cmd_add_expense(args):
 def cmd_add_income(args):
     """Fügt eine Einnahme hinzu."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
+    if _replay_idempotent(conn, "income", args.idempotency_key):
+        conn.close()
+        return
     config = load_config()
     audit_user = get_audit_user(config)
     tax_mode = get_tax_config(config)
     try:
         ledger_accounts = get_ledger_accounts(config)
+        category_rules = compile_category_rules(get_category_rules(config))
     except ValidationError as exc:
         print(f"Fehler: {exc.message}", file=sys.stderr)
         conn.close()
         sys.exit(1)
 
-    if not args.category and not args.ledger_account and ledger_accounts:
+    if (
+        not args.category
+        and not args.ledger_account
+        and ledger_accounts
+        and not category_rules.match("income", args.source, args.amount)
+    ):
         _print_category_error_with_ledger_hint(conn, "income", ledger_accounts)
         conn.close()
         sys.exit(1)
@@ -163,6 +212,8 @@ def cmd_add_income(args):
             vat=args.vat,
             tax_mode=tax_mode,
             audit_user=audit_user,
+            category_rules=category_rules,
+            idempotency_key=args.idempotency_key,
         )
     except ValidationError as exc:
         if exc.code == "category_not_found" and args.category:
@@ -203,7 +254,7 @@ def cmd_add_income(args):
 
 def _cmd_add_private_transfer(args, *, transfer_type: str) -> None:
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
 
@@ -1,12 +1,12 @@
 from pathlib import Path
 
-from ..db import get_db_connection
+from .helpers import open_database
 
 
 def cmd_audit(args):
     """Zeigt Audit-Log für einen Datensatz."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path, check_schema=False)
 
     table = args.table
 
@@ -0,0 +1,168 @@
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from ..schema import SUPERSEDED_INDEXES
+from ..services.aggregates import check_period_aggregates, rebuild_period_aggregates
+from ..services.private_transfers import PRIVATE_TRANSFER_TOTALS_SQL
+from ..services.utils import period_bounds
+from ..utils import cents_to_eur
+from .helpers import open_database
+from .summary import CATEGORY_TOTALS_SQL, SKIPPED_BOOKINGS_SQL, VAT_TOTALS_SQL
+
+# Abfrageform des Exports (Jahresbereich, sortiert nach Buchungsdatum)
+_EXPORT_SQL = """SELECT e.*, c.name FROM {table} e
+   LEFT JOIN categories c ON e.category_id = c.id
+   WHERE e.booking_date >= ? AND e.booking_date < ?
+   ORDER BY e.booking_date, e.id"""
+
+# Erwarteter Zugriff bei WITHOUT-ROWID-Tabellen wie agg_period_category
+PRIMARY_KEY = "PRIMARY KEY"
+
+
+def plan_checks(year: int) -> list[tuple[str, str, tuple, str]]:
+    """Geprüfte Abfrageformen: (Bezeichnung, Abfrage, Parameter, erwarteter Index)."""
+    bounds = period_bounds(year)
+    return [
+        ("summary: Ausgaben nach Kategorie", CATEGORY_TOTALS_SQL, (year, "expense"), PRIMARY_KEY),
+        ("summary: Einnahmen nach Kategorie", CATEGORY_TOTALS_SQL, (year, "income"), PRIMARY_KEY),
+        ("summary: Vorsteuer/USt", VAT_TOTALS_SQL, (year, "expense"), PRIMARY_KEY),
+        (
+            "summary: Ausgaben ohne Wertstellung",
+            SKIPPED_BOOKINGS_SQL.format(table="expenses"),
+            bounds,
+            "idx_expenses_dates",
+        ),
+        (
+            "summary: Einnahmen ohne Wertstellung",
+            SKIPPED_BOOKINGS_SQL.format(table="income"),
+            bounds,
+            "idx_income_dates",
+        ),
+        (
+            "private-summary: Einlagen/Entnahmen",
+            PRIVATE_TRANSFER_TOTALS_SQL,
+            bounds,
+            "idx_private_transfers_summary",
+        ),
+        (
+            "export: Ausgaben",
+            _EXPORT_SQL.format(table="expenses"),
+            bounds,
+            "idx_expenses_booking_date",
+        ),
+        (
+            "export: Einnahmen",
+            _EXPORT_SQL.format(table="income"),
+            bounds,
+            "idx_income_booking_date",
+        ),
+    ]
+
+
+def _plan_details(conn, sql: str, params: tuple) -> list[str]:
+    return [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def describe_plan(details: list[str], index_name: str) -> tuple[bool, str]:
+    """Bewertet einen Abfrageplan: (erwarteter Index genutzt, Kurzbeschreibung)."""
+    for detail in details:
+        if index_name == PRIMARY_KEY and " USING PRIMARY KEY " in f"{detail} ":
+            return True, "Primärschlüssel (abdeckend)"
+        if f"COVERING INDEX {index_name} " in f"{detail} ":
+            return True, f"{index_name} (abdeckend)"
+        if f"INDEX {index_name} " in f"{detail} ":
+            return True, f"{index_name} (mit Tabellenzugriff)"
+    access = [detail for detail in details if detail.startswith(("SCAN", "SEARCH"))]
+    return False, "; ".join(access)
+
+
+def cmd_db_analyze(args):
+    """Aktualisiert die Planer-Statistiken und prüft die Abfragepläne."""
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"Fehler: Datenbank nicht gefunden: {db_path}", file=sys.stderr)
+        sys.exit(1)
+    conn = open_database(db_path, check_schema=False)
+    try:
+        existing = {
+            row["name"]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        conn.execute("ANALYZE")
+        conn.commit()
+        stats = conn.execute("SELECT COUNT(*) AS cnt FROM sqlite_stat1").fetchone()["cnt"]
+        print(f"ANALYZE ausgeführt ({stats} Einträge in sqlite_stat1).")
+
+        print()
+        print("Abfragepläne:")
+        problems = 0
+        for label, sql, params, index_name in plan_checks(datetime.now().year):
+            if index_name == PRIMARY_KEY or index_name in existing:
+                used, text = describe_plan(_plan_details(conn, sql, params), index_name)
+                status = "OK" if used else "WARN"
+            else:
+                used, status, text = False, "FEHLT", f"{index_name} nicht vorhanden"
+            problems += not used
+            print(f"  {status:<6} {label:<38} {text}")
+    except sqlite3.OperationalError as exc:
+        print(f"Fehler: {exc}. Bitte zuerst 'euer init' ausführen.", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    leftover = sorted(existing & set(SUPERSEDED_INDEXES))
+    if problems or leftover:
+        print()
+        print("Hinweis: Indizes per 'euer init' anlegen bzw. bereinigen.")
+        if leftover:
+            print(f"  Abgelöste Indizes noch vorhanden: {', '.join(leftover)}")
+
+
+def cmd_db_aggregates(args):
+    """Prüft die Summentabelle agg_period_category gegen die Buchungen."""
+    db_path = Path(args.db)
+    # Ohne --rebuild wird nur gelesen: read-only Verbindung
+    try:
+        conn = open_database(db_path, read_only=not args.rebuild, check_schema=False)
+    except sqlite3.OperationalError as exc:
+        print(f"Fehler: Datenbank konnte nicht geöffnet werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.rebuild:
+            entries = rebuild_period_aggregates(conn)
+            conn.commit()
+            print(f"Summentabelle neu aufgebaut: {entries} Einträge.")
+        mismatches = check_period_aggregates(conn)
+    except sqlite3.OperationalError:
+        print(
+            "Fehler: Summentabelle fehlt. Bitte zuerst 'euer init' ausführen.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    if not mismatches:
+        print("Summentabelle konsistent.")
+        return
+
+    print(f"Summentabelle weicht ab: {len(mismatches)} Schlüssel (gespeichert − berechnet)")
+    print(
+        f"  {'Monat':<8} {'Typ':<8} {'Kat.-ID':>7} {'Betrag':>12} {'VorSt':>10} "
+        f"{'USt':>10} {'Anzahl':>7}"
+    )
+    for mismatch in mismatches[:25]:
+        print(
+            f"  {mismatch.year:04d}-{mismatch.month:02d} {mismatch.type:<8} "
+            f"{mismatch.category_id:>7} {cents_to_eur(mismatch.amount_cents_diff):>12.2f} "
+            f"{cents_to_eur(mismatch.vat_input_cents_diff):>10.2f} "
+            f"{cents_to_eur(mismatch.vat_output_cents_diff):>10.2f} "
+            f"{mismatch.row_count_diff:>7}"
+        )
+    if len(mismatches) > 25:
+        print(f"  ... {len(mismatches) - 25} weitere")
+    print("→ Neu aufbauen mit 'euer db aggregates --rebuild'.")
+    sys.exit(1)
@@ -2,7 +2,6 @@ import sys
 from pathlib import Path
 
 from ..config import get_audit_user, load_config
-from ..db import get_db_connection
 from ..services.errors import RecordNotFoundError
 from ..services.expenses import delete_expense, get_expense_detail
 from ..services.income import delete_income, get_income_detail
@@ -10,12 +9,13 @@ from ..services.private_transfers import (
     delete_private_transfer,
     get_private_transfer_by_id,
 )
+from .helpers import open_database
 
 
 def cmd_delete_expense(args):
     """Löscht eine Ausgabe."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
 
@@ -55,7 +55,7 @@ def cmd_delete_expense(args):
 def cmd_delete_income(args):
     """Löscht eine Einnahme."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
 
@@ -95,7 +95,7 @@ def cmd_delete_income(args):
 def cmd_delete_private_transfer(args):
     """Löscht einen Privatvorgang."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
 
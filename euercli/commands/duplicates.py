@@ -0,0 +1,95 @@
+import csv
+import sqlite3
+import sys
+from pathlib import Path
+
+from ..services.duplicates import find_fuzzy_duplicates
+from ..services.errors import ValidationError
+from .helpers import open_database
+
+
+def cmd_duplicates_scan(args):
+    """Sucht unscharfe Duplikate (gleicher Betrag, nahes Datum, ähnliche Partei)."""
+    db_path = Path(args.db)
+    # Die Suche liest nur: read-only Verbindung
+    try:
+        conn = open_database(db_path, read_only=True)
+    except sqlite3.OperationalError as exc:
+        print(f"Fehler: Datenbank konnte nicht geöffnet werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    tables = {"expense": "expenses", "income": "income"}
+    candidates = []
+    try:
+        for record_type, table_name in tables.items():
+            if args.type not in (None, record_type):
+                continue
+            candidates.extend(
+                find_fuzzy_duplicates(
+                    conn,
+                    table_name,
+                    date_window_days=args.window,
+                    min_score=args.min_score,
+                    year=args.year,
+                )
+            )
+    except ValidationError as exc:
+        print(f"Fehler: {exc.message}", file=sys.stderr)
+        conn.close()
+        sys.exit(1)
+    conn.close()
+    candidates.sort(key=lambda c: (-c.score, c.day_diff, c.type, c.first_id))
+
+    if args.format == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(
+            [
+                "Score",
+                "Typ",
+                "ID 1",
+                "ID 2",
+                "Datum 1",
+                "Datum 2",
+                "Partei 1",
+                "Partei 2",
+                "EUR",
+                "Tage",
+            ]
+        )
+        for c in candidates:
+            writer.writerow(
+                [
+                    f"{c.score:.3f}",
+                    c.type,
+                    c.first_id,
+                    c.second_id,
+                    c.first_date,
+                    c.second_date,
+                    c.first_party,
+                    c.second_party,
+                    f"{c.amount_eur:.2f}",
+                    c.day_diff,
+                ]
+            )
+        return
+
+    if not candidates:
+        print("Keine Duplikat-Kandidaten gefunden.")
+        return
+
+    limit = max(args.limit, 0)
+    print(
+        f"{'Score':>6} {'Typ':<8} {'ID 1':>6} {'ID 2':>6} {'Datum 1':<11} {'Datum 2':<11} {'Partei 1':<18} {'Partei 2':<18} {'EUR':>10}"
+    )
+    print("-" * 102)
+    for c in candidates[:limit]:
+        print(
+            f"{c.score:>6.2f} {c.type:<8} {c.first_id:>6} {c.second_id:>6} {c.first_date:<11} {c.second_date:<11} {c.first_party[:18]:<18} {c.second_party[:18]:<18} {c.amount_eur:>10.2f}"
+        )
+    if len(candidates) > limit:
+        print(f"  ... {len(candidates) - limit} weitere")
+    print()
+    print(f"{len(candidates)} Kandidatenpaar(e) gefunden.")
+    print(
+        "Hinweis: Echte Duplikate bitte per `euer delete expense|income <ID>` entfernen."
+    )
@@ -4,8 +4,9 @@ from pathlib import Path
 
 from ..config import get_export_dir, get_ledger_accounts, load_config
 from ..constants import DEFAULT_EXPORT_DIR
-from ..db import get_db_connection
 from ..services.errors import ValidationError
+from ..services.utils import period_bounds
+from .helpers import open_database
 
 # Optional: openpyxl für XLSX-Export
 try:
@@ -19,7 +20,7 @@ except ImportError:
 def cmd_export(args):
     """Exportiert Daten als CSV oder XLSX."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
 
     config = load_config()
     config_export_dir = get_export_dir(config)
@@ -46,17 +47,17 @@ def cmd_export(args):
     year = args.year
 
     if year is not None:
-        year_filter = "WHERE strftime('%Y', COALESCE(e.payment_date, e.invoice_date)) = ?"
-        year_params = (str(year),)
-        income_filter = "WHERE strftime('%Y', COALESCE(i.payment_date, i.invoice_date)) = ?"
-        income_params = (str(year),)
-        private_filter = "WHERE strftime('%Y', p.date) = ?"
-        private_params = (str(year),)
+        year_filter = "WHERE e.booking_date >= ? AND e.booking_date < ?"
+        year_params = period_bounds(year)
+        income_filter = "WHERE i.booking_date >= ? AND i.booking_date < ?"
+        income_params = period_bounds(year)
+        private_filter = "WHERE p.date >= ? AND p.date < ?"
+        private_params = period_bounds(year)
         sacheinlagen_filter = (
             "WHERE e.is_private_paid = 1 "
-            "AND strftime('%Y', COALESCE(e.payment_date, e.invoice_date)) = ?"
+            "AND e.booking_date >= ? AND e.booking_date < ?"
         )
-        sacheinlagen_params = (str(year),)
+        sacheinlagen_params = period_bounds(year)
     else:
         year_filter = ""
         year_params = ()
@@ -91,7 +92,7 @@ def cmd_export(args):
            FROM expenses e
            LEFT JOIN categories c ON e.category_id = c.id
            {year_filter}
-           ORDER BY COALESCE(e.payment_date, e.invoice_date), e.id""",
+           ORDER BY e.booking_date, e.id""",
         year_params,
     ).fetchall()
 
@@ -103,7 +104,7 @@ def cmd_export(args):
            FROM income i
            LEFT JOIN categories c ON i.category_id = c.id
            {income_filter}
-           ORDER BY COALESCE(i.payment_date, i.invoice_date), i.id""",
+           ORDER BY i.booking_date, i.id""",
         income_params,
     ).fetchall()
 
@@ -127,7 +128,7 @@ def cmd_export(args):
                FROM expenses e
                LEFT JOIN categories c ON e.category_id = c.id
                {sacheinlagen_filter}
-               ORDER BY COALESCE(e.payment_date, e.invoice_date), e.id""",
+               ORDER BY e.booking_date, e.id""",
             sacheinlagen_params,
         ).fetchall()
     else:
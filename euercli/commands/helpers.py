@@ -1,4 +1,18 @@
+import sqlite3
 import sys
+import tomllib
+from functools import cache
+from pathlib import Path
+
+from ..config import get_database_profile, load_config
+from ..db import (
+    DATABASE_PROFILES,
+    DEFAULT_DATABASE_PROFILE,
+    DatabaseProfile,
+    find_schema_gaps,
+    get_db_connection,
+)
+from ..services.errors import ValidationError
 
 
 def warn_unusual_date_order(
@@ -11,3 +25,40 @@ def warn_unusual_date_order(
             "Warnung: Wertstellungsdatum liegt vor Rechnungsdatum. Bitte prüfen.",
             file=sys.stderr,
         )
+
+
+@cache
+def configured_database_profile() -> DatabaseProfile:
+    """Performance-Profil aus `[database]` der Config (einmal je Aufruf gelesen).
+
+    Bei ungültiger Config wird einmal gewarnt und `safe` verwendet.
+    """
+    try:
+        return get_database_profile(load_config())
+    except (ValidationError, tomllib.TOMLDecodeError) as exc:
+        message = getattr(exc, "message", str(exc))
+        print(f"Warnung: {message} Verwende Profil '{DEFAULT_DATABASE_PROFILE}'.", file=sys.stderr)
+        return DATABASE_PROFILES[DEFAULT_DATABASE_PROFILE]
+
+
+def open_database(
+    db_path: Path, read_only: bool = False, check_schema: bool = True
+) -> sqlite3.Connection:
+    """Öffnet die Datenbank eines Befehls mit dem konfigurierten Profil.
+
+    Mit `check_schema` bricht der Befehl ab, solange `euer init` noch Tabellen
+    oder Spalten ergänzen muss, statt später mit einem SQL-Fehler zu enden.
+    """
+    conn = get_db_connection(
+        db_path, read_only=read_only, profile=configured_database_profile()
+    )
+    gaps = find_schema_gaps(conn) if check_schema else []
+    if gaps:
+        conn.close()
+        print(
+            f"Fehler: Datenbank nicht aktuell ({', '.join(gaps)}). "
+            "Bitte zuerst 'euer init' ausführen.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return conn
@@ -1,30 +1,80 @@
-import json
+import csv
+import sqlite3
 import sys
+from collections.abc import Iterator
+from contextlib import suppress
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from ..config import get_audit_user, get_ledger_accounts, get_private_accounts, load_config
-from ..db import get_category_id, get_db_connection
-from ..importers import get_tax_config, iter_import_rows, normalize_import_row
+from ..config import (
+    get_audit_user,
+    get_bulk_database_profile,
+    get_category_rules,
+    get_ledger_accounts,
+    get_private_accounts,
+    load_config,
+)
+from ..db import database_profile, get_category_id, savepoint
+from ..importers import (
+    BANK_STATEMENT_READERS,
+    IMPORT_READ_ERRORS,
+    ImportCursor,
+    ImportFormats,
+    compile_header_plan,
+    get_missing_import_fields,
+    get_tax_config,
+    iter_import_files,
+    iter_import_rows,
+    iter_import_rows_from,
+    iter_normalized_rows,
+    iter_normalized_rows_parallel,
+    spool_stdin,
+)
+from ..services.category_rules import CategoryRuleMatcher, compile_category_rules
 from ..services.duplicates import DuplicateAction
 from ..services.errors import ValidationError
-from ..services.expenses import create_expense
-from ..services.income import create_income
+from ..services.expenses import create_expenses_bulk
+from ..services.hash_filter import (
+    HashBloomFilter,
+    bloom_filter_path,
+    grow_hash_bloom_filter,
+    load_hash_bloom_filter,
+    save_hash_bloom_filter,
+)
+from ..services.import_journal import (
+    checkpoint_import_journal,
+    complete_import_journal,
+    get_import_journal,
+    start_import_journal,
+)
+from ..services.import_preview import preview_import
+from ..services.income import create_income_bulk
+from ..services.models import (
+    ImportJournal,
+    ImportPreview,
+    ImportPreviewRow,
+    LedgerAccount,
+)
+from ..services.suggestions import CategorySuggester, load_category_suggester
+from ..utils import compute_file_fingerprint, iter_batches
+from .helpers import open_database
 
 
 def print_import_schema() -> None:
     """Gibt Schema, Beispiele und Alias-Keys für den Import aus."""
-    print("Import-Schema (CSV/JSONL)")
+    print("Import-Schema (CSV/JSONL/CAMT.053/MT940)")
     print()
     print("Pflichtfelder:")
     print("  - type: expense|income (oder aus Vorzeichen von amount_eur abgeleitet)")
     print("  - payment_date oder invoice_date: YYYY-MM-DD (mindestens eins)")
+    print("    (auch TT.MM.JJJJ, TT.MM.JJ, JJJJMMTT und ISO mit Uhrzeit; wird zu YYYY-MM-DD)")
     print("  - party: Lieferant/Quelle")
     print("  - amount_eur: Betrag in EUR (Ausgaben negativ, Einnahmen positiv)")
     print()
     print("Optionale Felder:")
     print(
         "  category, account, ledger_account, foreign_amount, receipt_name, notes, rc, "
-        "private_paid, vat_input, vat_output"
+        "private_paid, vat_input, vat_output, idempotency_key"
     )
     print()
     print("Minimaler JSONL-Datensatz (Ausgabe):")
@@ -54,6 +104,11 @@ def print_import_schema() -> None:
     print("  payment_date: payment_date, date, Datum, Wertstellung")
     print("  invoice_date: invoice_date, Rechnungsdatum")
     print()
+    print("Kontoauszüge (--format camt053|mt940):")
+    print("  - Felder werden direkt aus dem Auszug übernommen (Datum = Wertstellung,")
+    print("    party = Gegenpartei, notes = Verwendungszweck, account = IBAN/Konto).")
+    print("  - Kategorie ist dort nie gesetzt und wird später vervollständigt.")
+    print()
     print("Hinweis:")
     print("  - CSV-Exporte von 'euer export' können direkt re-importiert werden.")
     print("  - Kategorien mit '(NN)' werden automatisch bereinigt.")
@@ -63,171 +118,809 @@ def print_import_schema() -> None:
     print("    `euer incomplete list` angezeigt.")
 
 
-def cmd_import(args):
-    """Bulk-Import von Transaktionen."""
-    if args.schema:
-        print_import_schema()
-        return
+DEFAULT_BATCH_SIZE = 500
+
+# Standard-Dateimuster für --dir (inkl. komprimierter Varianten wie .csv.gz)
+DEFAULT_DIR_GLOBS = {
+    "csv": "*.csv*",
+    "jsonl": "*.jsonl*",
+    "camt053": "*.xml*",
+    "mt940": "*.sta*",
+}
+
+
+@dataclass
+class ImportContext:
+    """Gemeinsame Einstellungen und Caches für einen Importlauf."""
+
+    ledger_accounts: list[LedgerAccount]
+    private_accounts: list[str]
+    audit_user: str
+    tax_mode: str
+    batch_size: int = DEFAULT_BATCH_SIZE
+    workers: int = 1
+    known_categories: dict[tuple[str, str], bool] = field(default_factory=dict)
+    category_rules: CategoryRuleMatcher | None = None
+    # Optional (--suggest): Kategorien aus der Buchungshistorie
+    category_suggester: CategorySuggester | None = None
+    # Optional (--bloom): Bloom-Filter je Tabelle für die Duplikatprüfung
+    bloom_filters: dict[str, HashBloomFilter] = field(default_factory=dict)
+
+
+def build_import_context(
+    config: dict, *, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1
+) -> ImportContext:
+    """Baut den Import-Kontext aus der Konfiguration (ValidationError bei Fehlern)."""
+    return ImportContext(
+        ledger_accounts=get_ledger_accounts(config),
+        private_accounts=get_private_accounts(config),
+        audit_user=get_audit_user(config),
+        tax_mode=get_tax_config(config),
+        batch_size=batch_size,
+        workers=workers,
+        category_rules=compile_category_rules(get_category_rules(config)),
+    )
+
+
+def _known_category_name(conn, context: ImportContext, name: object, row_type: str) -> str | None:
+    """Gibt den Kategorienamen zurück, wenn er existiert (Ergebnis wird gecacht)."""
+    if not name:
+        return None
+    key = (str(name).lower(), row_type)
+    if key not in context.known_categories:
+        context.known_categories[key] = get_category_id(conn, str(name), row_type) is not None
+    return str(name) if context.known_categories[key] else None
+
+
+def _to_service_row(conn, context: ImportContext, normalized: dict) -> dict:
+    """Übersetzt eine normalisierte Importzeile in Service-Keyword-Argumente."""
+    payment_date = normalized["payment_date"]
+    invoice_date = normalized["invoice_date"]
+    ledger_account = normalized["ledger_account"]
+    foreign_amount = normalized["foreign_amount"]
+    receipt_name = normalized["receipt_name"]
+    notes = normalized["notes"]
+    row = {
+        "payment_date": str(payment_date) if payment_date is not None else None,
+        "invoice_date": str(invoice_date) if invoice_date is not None else None,
+        "category_name": _known_category_name(
+            conn, context, normalized["category"], normalized["type"]
+        ),
+        "amount_eur": float(normalized["amount_eur"]),
+        "ledger_account_key": str(ledger_account) if ledger_account is not None else None,
+        "foreign_amount": str(foreign_amount) if foreign_amount is not None else None,
+        "receipt_name": str(receipt_name) if receipt_name is not None else None,
+        "notes": str(notes) if notes is not None else None,
+        "vat_output": normalized["vat_output"],
+    }
+    if normalized["type"] == "expense":
+        account = normalized["account"]
+        row.update(
+            vendor=str(normalized["party"]),
+            account=str(account) if account is not None else None,
+            is_rc=bool(normalized["rc"]),
+            vat_input=normalized["vat_input"],
+            private_paid=bool(normalized["private_paid"]),
+        )
+    else:
+        row["source"] = str(normalized["party"])
+    idempotency_key = normalized.get("idempotency_key")
+    if idempotency_key is not None:
+        row["idempotency_key"] = str(idempotency_key)
+    return row
+
+
+def _write_import_batch(conn, context: ImportContext, batch: list[dict]) -> tuple[int, int, int]:
+    """Schreibt einen Block geprüfter Importzeilen über die Bulk-Services.
+
+    Returns:
+        (angelegte Ausgaben, angelegte Einnahmen, Duplikate)
+    """
+    expense_rows = []
+    income_rows = []
+    for normalized in batch:
+        service_row = _to_service_row(conn, context, normalized)
+        if normalized["type"] == "expense":
+            expense_rows.append(service_row)
+        else:
+            income_rows.append(service_row)
+
+    expenses = create_expenses_bulk(
+        conn,
+        expense_rows,
+        ledger_accounts=context.ledger_accounts,
+        private_accounts=context.private_accounts,
+        tax_mode=context.tax_mode,
+        audit_user=context.audit_user,
+        on_duplicate=DuplicateAction.SKIP,
+        chunk_size=context.batch_size,
+        auto_commit=False,
+        bloom_filter=context.bloom_filters.get("expenses"),
+        category_rules=context.category_rules,
+        category_suggester=context.category_suggester,
+    )
+    income = create_income_bulk(
+        conn,
+        income_rows,
+        ledger_accounts=context.ledger_accounts,
+        tax_mode=context.tax_mode,
+        audit_user=context.audit_user,
+        on_duplicate=DuplicateAction.SKIP,
+        chunk_size=context.batch_size,
+        auto_commit=False,
+        bloom_filter=context.bloom_filters.get("income"),
+        category_rules=context.category_rules,
+        category_suggester=context.category_suggester,
+    )
+    for table_name, bloom in context.bloom_filters.items():
+        context.bloom_filters[table_name] = grow_hash_bloom_filter(conn, table_name, bloom)
+    # Wiederholte Idempotency-Keys zählen wie Duplikate als übersprungen
+    skipped = expenses.duplicates + income.duplicates + expenses.replayed + income.replayed
+    return expenses.inserted, income.inserted, skipped
+
+
+def _iter_source_rows(
+    source_path: str,
+    fmt: str,
+    context: ImportContext,
+    cursor: ImportCursor | None = None,
+    formats: ImportFormats | None = None,
+) -> Iterator[tuple[int, dict]]:
+    """Liefert (Zeilennummer, normalisierte Zeile).
 
-    if not args.file or not args.format:
+    Mit `cursor` wird ab dessen Position gelesen und die Position mitgeführt
+    (fortsetzbarer Import); `formats` setzt dabei die erkannten Formate fort
+    und lernt weiter. Bei `workers > 1` wird parallel geparst.
+    """
+    if cursor is not None:
+        formats = formats or ImportFormats()
+        return iter_normalized_rows(
+            iter_import_rows_from(source_path, fmt, cursor),
+            start=cursor.row_index + 1,
+            amounts=formats.amounts,
+            dates=formats.dates,
+        )
+    if context.workers > 1:
+        return iter_normalized_rows_parallel(source_path, fmt, context.workers)
+    return iter_normalized_rows(iter_import_rows(source_path, fmt))
+
+
+def _open_import_journal(conn, args, source_path: str) -> ImportJournal | None:
+    """Lädt den Checkpoint zur Importdatei oder legt einen neuen an.
+
+    Returns:
+        Journal-Eintrag oder None, wenn die Datei bereits vollständig importiert ist.
+    """
+    fingerprint = compute_file_fingerprint(source_path)
+    try:
+        journal = get_import_journal(conn, fingerprint)
+        conn.execute("SELECT formats FROM import_journal LIMIT 0")
+    except sqlite3.OperationalError:
         print(
-            "Fehler: --file und --format sind erforderlich (oder --schema).",
+            "Fehler: Import-Journal fehlt oder ist veraltet. "
+            "Bitte zuerst 'euer init' ausführen.",
             file=sys.stderr,
         )
         sys.exit(1)
 
-    db_path = Path(args.db)
-    conn = get_db_connection(db_path)
-    config = load_config()
-    audit_user = get_audit_user(config)
-    private_accounts = get_private_accounts(config)
-    tax_mode = get_tax_config(config)
-    try:
-        ledger_accounts = get_ledger_accounts(config)
-    except ValidationError as exc:
-        conn.close()
-        print(f"Fehler: {exc.message}", file=sys.stderr)
-        sys.exit(1)
+    if journal and journal.status == "completed":
+        print(
+            f"Datei wurde bereits vollständig importiert ({journal.rows_done} Zeilen, "
+            f"Journal #{journal.id})."
+        )
+        return None
+    if journal and journal.format == args.format:
+        return journal
+
+    journal = start_import_journal(
+        conn,
+        fingerprint=fingerprint,
+        fmt=args.format,
+        file_name=None if args.file == "-" else Path(args.file).name,
+    )
+    conn.commit()
+    return journal
+
+
+@dataclass
+class ImportStats:
+    """Zähler eines Importlaufs (für den Abschlussbericht)."""
+
+    total: int = 0
+    inserted_expenses: int = 0
+    inserted_income: int = 0
+    duplicates: int = 0
+    rejected: list[str] = field(default_factory=list)
+
+    def add_batch(self, inserted_expenses: int, inserted_income: int, duplicates: int) -> None:
+        self.inserted_expenses += inserted_expenses
+        self.inserted_income += inserted_income
+        self.duplicates += duplicates
+
+
+def _print_missing_fields(errors: list[tuple[int, list[str]]]) -> None:
+    print("Fehler: Import abgebrochen. Pflichtfelder fehlen:", file=sys.stderr)
+    for row_idx, fields in errors:
+        fields_str = ", ".join(fields)
+        print(f"  Zeile {row_idx}: {fields_str}", file=sys.stderr)
+
+
+def _resume_point(journal: ImportJournal | None) -> tuple[ImportCursor | None, ImportFormats]:
+    """Frischer Cursor und die gespeicherten Formate des Checkpoints (je Durchlauf)."""
+    if journal is None:
+        return None, ImportFormats()
+    return (
+        ImportCursor(journal.byte_offset, journal.rows_done),
+        ImportFormats.from_dict(journal.formats),
+    )
+
 
+def _checkpoint(conn, journal, cursor, formats, batch_result) -> ImportJournal | None:
+    if journal is None:
+        return None
+    batch_expenses, batch_income, batch_duplicates = batch_result
+    journal = checkpoint_import_journal(
+        conn,
+        journal,
+        rows_done=cursor.row_index,
+        byte_offset=cursor.byte_offset,
+        inserted_expenses=batch_expenses,
+        inserted_income=batch_income,
+        duplicates=batch_duplicates,
+        formats=formats.to_dict(),
+    )
+    conn.commit()
+    return journal
+
+
+def _load_bloom_filters(conn, db_path: Path, context: ImportContext) -> None:
+    """Lädt (oder baut) die Bloom-Filter für Ausgaben und Einnahmen."""
+    for table_name in ("expenses", "income"):
+        bloom, loaded = load_hash_bloom_filter(
+            conn, table_name, bloom_filter_path(db_path, table_name)
+        )
+        context.bloom_filters[table_name] = bloom
+        print(
+            f"Bloom-Filter {table_name}: {'geladen' if loaded else 'neu aufgebaut'} "
+            f"({bloom.count} Hashes)"
+        )
+
+
+def _load_category_suggester(conn, context: ImportContext) -> None:
+    """Lädt das Vorschlagsmodell für fehlende Kategorien (--suggest)."""
     try:
-        rows = iter_import_rows(args.file, args.format)
-    except (OSError, json.JSONDecodeError) as exc:
+        context.category_suggester = load_category_suggester(
+            conn, ledger_accounts=context.ledger_accounts
+        )
+    except sqlite3.OperationalError:
         conn.close()
-        print(f"Fehler: Importdatei konnte nicht gelesen werden: {exc}", file=sys.stderr)
+        print(
+            "Fehler: Vorschlagsmodell fehlt. Bitte zuerst 'euer init' ausführen.",
+            file=sys.stderr,
+        )
         sys.exit(1)
+    print(f"Kategorie-Vorschläge: {len(context.category_suggester)} Partei(en) im Modell")
 
-    total = 0
-    inserted_expenses = 0
-    inserted_income = 0
-    duplicates = 0
 
-    normalized_rows: list[dict] = []
-    errors: list[tuple[int, list[str]]] = []
+def _save_bloom_filters(conn, db_path: Path, context: ImportContext) -> None:
+    """Speichert die Filter nach dem Commit und gibt ihre Statistik aus."""
+    for table_name, bloom in context.bloom_filters.items():
+        try:
+            save_hash_bloom_filter(conn, table_name, bloom, bloom_filter_path(db_path, table_name))
+        except OSError as exc:
+            print(f"Warnung: Bloom-Filter nicht gespeichert: {exc}", file=sys.stderr)
+        print(
+            f"  Bloom-Filter {table_name}: {bloom.size_bytes / 1024:.1f} KiB, "
+            f"k={bloom.hash_count}, erwartete Fehlerrate {bloom.expected_error_rate:.2%}, "
+            f"{bloom.skipped} von {bloom.lookups} Prüfungen ohne DB-Abfrage, "
+            f"{bloom.false_positives} Fehlalarme"
+        )
+
 
-    for idx, row in enumerate(rows, start=1):
-        total += 1
-        normalized = normalize_import_row(row)
-        missing_fields = []
-        if not normalized["type"]:
-            missing_fields.append("type")
-        if not normalized["payment_date"] and not normalized["invoice_date"]:
-            missing_fields.append("payment_date|invoice_date")
-        if normalized["amount_eur"] is None:
-            missing_fields.append("amount_eur")
-        if not normalized["party"]:
-            missing_fields.append("party")
+def _run_two_pass(
+    conn, args, source_path: str, context: ImportContext, journal, stats
+) -> ImportJournal | None:
+    """Erst alle Zeilen prüfen, dann schreiben (Standard)."""
+    errors: list[tuple[int, list[str]]] = []
+    for idx, normalized in _iter_source_rows(
+        source_path, args.format, context, *_resume_point(journal)
+    ):
+        stats.total += 1
+        missing_fields = get_missing_import_fields(normalized)
         if missing_fields:
             errors.append((idx, missing_fields))
-        else:
-            resolved_category_name = normalized["category"]
-            if resolved_category_name:
-                cat_id = get_category_id(
-                    conn,
-                    str(resolved_category_name),
-                    normalized["type"],
-                )
-                if not cat_id:
-                    resolved_category_name = None
-            normalized["_resolved_category_name"] = resolved_category_name
-        normalized_rows.append(normalized)
 
     if errors:
-        print("Fehler: Import abgebrochen. Pflichtfelder fehlen:", file=sys.stderr)
-        for row_idx, fields in errors:
-            fields_str = ", ".join(fields)
-            print(f"  Zeile {row_idx}: {fields_str}", file=sys.stderr)
-        conn.close()
+        _print_missing_fields(errors)
         sys.exit(1)
 
-    try:
-        for normalized in normalized_rows:
-            row_type = normalized["type"]
-            payment_date = normalized["payment_date"]
-            invoice_date = normalized["invoice_date"]
-            party = normalized["party"]
-            category_name = normalized["_resolved_category_name"]
-            amount = normalized["amount_eur"]
-            account = normalized["account"]
-            ledger_account = normalized["ledger_account"]
-            foreign_amount = normalized["foreign_amount"]
-            receipt_name = normalized["receipt_name"]
-            notes = normalized["notes"]
-            rc = normalized["rc"]
-            private_paid = normalized["private_paid"]
-            vat_input = normalized["vat_input"]
-            vat_output = normalized["vat_output"]
-
-            if row_type == "expense":
-                created = create_expense(
-                    conn,
-                    payment_date=str(payment_date) if payment_date is not None else None,
-                    invoice_date=str(invoice_date) if invoice_date is not None else None,
-                    vendor=str(party),
-                    category_name=str(category_name) if category_name is not None else None,
-                    amount_eur=float(amount),
-                    account=str(account) if account is not None else None,
-                    ledger_account_key=(
-                        str(ledger_account) if ledger_account is not None else None
-                    ),
-                    ledger_accounts=ledger_accounts,
-                    foreign_amount=str(foreign_amount) if foreign_amount is not None else None,
-                    receipt_name=str(receipt_name) if receipt_name is not None else None,
-                    notes=str(notes) if notes is not None else None,
-                    is_rc=bool(rc),
-                    vat_input=vat_input,
-                    vat_output=vat_output,
-                    private_paid=bool(private_paid),
-                    private_accounts=private_accounts,
-                    audit_user=audit_user,
-                    tax_mode=tax_mode,
-                    on_duplicate=DuplicateAction.SKIP,
-                    auto_commit=False,
-                )
-                if created is None:
-                    duplicates += 1
-                    continue
-                inserted_expenses += 1
-            else:
-                created = create_income(
+    # Bei --resume wird jeder Block zusammen mit seinem Checkpoint committet
+    cursor, formats = _resume_point(journal)
+    normalized_rows = (
+        normalized
+        for _, normalized in _iter_source_rows(
+            source_path, args.format, context, cursor, formats
+        )
+    )
+    for batch in iter_batches(normalized_rows, context.batch_size):
+        batch_result = _write_import_batch(conn, context, batch)
+        stats.add_batch(*batch_result)
+        journal = _checkpoint(conn, journal, cursor, formats, batch_result)
+    return journal
+
+
+def _run_single_pass(
+    conn, args, source_path: str, context: ImportContext, journal, stats
+) -> ImportJournal | None:
+    """Prüft und schreibt jeden Block in einem Durchlauf, je Block ein SAVEPOINT.
+
+    Zeilen mit fehlenden Pflichtfeldern werden übersprungen, Blöcke mit
+    Fehlern beim Schreiben bis zu ihrem Savepoint zurückgerollt; beides wird
+    gemeldet. Mit `--atomic` bricht der erste Fehler den ganzen Import ab
+    (die äußere Transaktion wird zurückgerollt).
+    """
+    cursor, formats = _resume_point(journal)
+    rows = _iter_source_rows(source_path, args.format, context, cursor, formats)
+    for batch in iter_batches(rows, context.batch_size):
+        stats.total += len(batch)
+        errors = [
+            (idx, missing_fields)
+            for idx, normalized in batch
+            if (missing_fields := get_missing_import_fields(normalized))
+        ]
+        if errors and args.atomic:
+            conn.rollback()
+            _print_missing_fields(errors)
+            sys.exit(1)
+        stats.rejected.extend(
+            f"Zeile {idx}: Pflichtfelder fehlen: {', '.join(fields)}" for idx, fields in errors
+        )
+        invalid_rows = {idx for idx, _ in errors}
+
+        try:
+            with savepoint(conn, "import_batch"):
+                batch_result = _write_import_batch(
                     conn,
-                    payment_date=str(payment_date) if payment_date is not None else None,
-                    invoice_date=str(invoice_date) if invoice_date is not None else None,
-                    source=str(party),
-                    category_name=str(category_name) if category_name is not None else None,
-                    amount_eur=float(amount),
-                    ledger_account_key=(
-                        str(ledger_account) if ledger_account is not None else None
-                    ),
-                    ledger_accounts=ledger_accounts,
-                    foreign_amount=str(foreign_amount) if foreign_amount is not None else None,
-                    receipt_name=str(receipt_name) if receipt_name is not None else None,
-                    notes=str(notes) if notes is not None else None,
-                    vat_output=vat_output,
-                    audit_user=audit_user,
-                    tax_mode=tax_mode,
-                    on_duplicate=DuplicateAction.SKIP,
-                    auto_commit=False,
+                    context,
+                    [normalized for idx, normalized in batch if idx not in invalid_rows],
                 )
-                if created is None:
-                    duplicates += 1
-                    continue
-                inserted_income += 1
+        except ValidationError as exc:
+            if args.atomic:
+                raise
+            stats.rejected.append(f"Zeilen {batch[0][0]}-{batch[-1][0]}: {exc.message}")
+            journal = _checkpoint(conn, journal, cursor, formats, (0, 0, 0))
+            continue
+        stats.add_batch(*batch_result)
+        journal = _checkpoint(conn, journal, cursor, formats, batch_result)
+    return journal
+
+
+def _run_import(conn, args, source_path: str, context: ImportContext) -> None:
+    journal = None
+    resumed_rows = 0
+    if args.resume:
+        journal = _open_import_journal(conn, args, source_path)
+        if journal is None:
+            return
+        resumed_rows = journal.rows_done
+
+    stats = ImportStats()
+    run = _run_single_pass if args.single_pass else _run_two_pass
+    try:
+        journal = run(conn, args, source_path, context, journal, stats)
     except ValidationError as exc:
         conn.rollback()
-        conn.close()
         print(f"Fehler: {exc.message}", file=sys.stderr)
+        if journal is not None:
+            journal = get_import_journal(conn, journal.fingerprint)
+            print(
+                f"  {journal.rows_done} Zeilen sind gespeichert; "
+                "Fortsetzen mit --resume.",
+                file=sys.stderr,
+            )
+        sys.exit(1)
+    except IMPORT_READ_ERRORS as exc:
+        conn.rollback()
+        print(f"Fehler: Importdatei konnte nicht gelesen werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    if journal is not None:
+        journal = complete_import_journal(conn, journal)
+        stats.total = journal.rows_done
+        stats.inserted_expenses = journal.inserted_expenses
+        stats.inserted_income = journal.inserted_income
+        stats.duplicates = journal.duplicates
+
+    conn.commit()
+
+    print("Import abgeschlossen")
+    if resumed_rows:
+        print(f"  Fortgesetzt ab Zeile {resumed_rows + 1}")
+    print(f"  Zeilen gesamt: {stats.total}")
+    print(f"  Ausgaben angelegt: {stats.inserted_expenses}")
+    print(f"  Einnahmen angelegt: {stats.inserted_income}")
+    print(f"  Duplikate übersprungen: {stats.duplicates}")
+    _save_bloom_filters(conn, Path(args.db), context)
+    if stats.rejected:
+        print(f"  Verworfen: {len(stats.rejected)} Fehler (siehe stderr)")
+        print("Fehler: Folgende Zeilen wurden nicht importiert:", file=sys.stderr)
+        for message in stats.rejected:
+            print(f"  {message}", file=sys.stderr)
         sys.exit(1)
 
+
+PREVIEW_STATUS_LABELS = {"new": "neu", "duplicate": "Duplikat", "invalid": "ungültig"}
+
+
+def _iter_preview_rows(
+    conn, args, source_path: str, context: ImportContext, preview: ImportPreview
+) -> Iterator[tuple[int, str, dict]]:
+    """Liefert prüfbare Zeilen für die Vorschau; fehlende Pflichtfelder → ungültig."""
+    for idx, normalized in _iter_source_rows(source_path, args.format, context):
+        missing_fields = get_missing_import_fields(normalized)
+        if missing_fields:
+            preview.rows.append(
+                ImportPreviewRow(
+                    idx,
+                    normalized["type"],
+                    "invalid",
+                    reason=f"Pflichtfelder fehlen: {', '.join(missing_fields)}",
+                )
+            )
+            continue
+        yield idx, normalized["type"], _to_service_row(conn, context, normalized)
+
+
+def _write_preview_report(path: str, preview: ImportPreview) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Zeile", "Typ", "Status", "Hash", "Bestehende ID", "Grund"])
+        for row in preview.rows:
+            writer.writerow(
+                [
+                    row.row_index,
+                    row.type or "",
+                    row.status,
+                    row.hash.hex() if row.hash else "",
+                    row.existing_id if row.existing_id is not None else "",
+                    row.reason or "",
+                ]
+            )
+
+
+def _run_preview(conn, args, source_path: str, context: ImportContext) -> None:
+    """Dry-Run: klassifiziert alle Zeilen über eine read-only Verbindung."""
+    preview = ImportPreview()
+    try:
+        preview_import(
+            conn,
+            _iter_preview_rows(conn, args, source_path, context, preview),
+            ledger_accounts=context.ledger_accounts,
+            private_accounts=context.private_accounts,
+            tax_mode=context.tax_mode,
+            preview=preview,
+            category_rules=context.category_rules,
+            category_suggester=context.category_suggester,
+        )
+    except IMPORT_READ_ERRORS as exc:
+        print(f"Fehler: Importdatei konnte nicht gelesen werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.report:
+        _write_preview_report(args.report, preview)
+
+    print("Import-Vorschau (Dry-Run: keine Änderungen gespeichert)")
+    print(f"  Zeilen gesamt: {preview.total}")
+    print(
+        f"  Neu: {preview.new_expenses + preview.new_income} "
+        f"(Ausgaben: {preview.new_expenses}, Einnahmen: {preview.new_income})"
+    )
+    print(f"  Duplikate: {preview.duplicates}")
+    print(f"  Ungültig: {preview.invalid}")
+    if args.report:
+        print(f"  Bericht je Zeile: {args.report}")
+
+    flagged = [row for row in preview.rows if row.status != "new"]
+    if not flagged:
+        return
+    print("  Auffällige Zeilen:")
+    for row in flagged[:25]:
+        label = PREVIEW_STATUS_LABELS[row.status]
+        if row.existing_id is not None:
+            detail = f" (ID {row.existing_id})"
+        elif row.reason:
+            detail = f" – {row.reason}"
+        else:
+            detail = ""
+        print(f"    Zeile {row.row_index}: {label}{detail}")
+    if len(flagged) > 25:
+        print(f"    ... {len(flagged) - 25} weitere Zeile(n)")
+
+
+def write_file_batches(
+    conn, context: ImportContext, batches: Iterator[list[tuple[int, dict]]], stats: ImportStats
+) -> None:
+    """Schreibt alle Blöcke einer Datei in einem SAVEPOINT (Alles-oder-nichts je Datei).
+
+    Die Blöcke werden immer vollständig gelesen (auch nach einem Fehler), damit
+    alle fehlenden Pflichtfelder gemeldet werden und der Leser-Thread frei wird.
+    """
+    try:
+        _write_file_batches(conn, context, batches, stats)
+    except Exception:
+        # z.B. gesperrte Datenbank: Rest verwerfen, sonst blockiert der Leser
+        _discard_batches(batches)
+        raise
+
+
+def _discard_batches(batches: Iterator[list[tuple[int, dict]]]) -> None:
+    """Liest verbleibende Blöcke ungenutzt; Lesefehler sind dann bedeutungslos."""
+    with suppress(*IMPORT_READ_ERRORS, ValueError):
+        for _ in batches:
+            pass
+
+
+def _write_file_batches(
+    conn, context: ImportContext, batches: Iterator[list[tuple[int, dict]]], stats: ImportStats
+) -> None:
+    errors: list[tuple[int, list[str]]] = []
+    write_error: ValidationError | None = None
+    with savepoint(conn, "import_file"):
+        for batch in batches:
+            stats.total += len(batch)
+            errors.extend(
+                (idx, missing_fields)
+                for idx, normalized in batch
+                if (missing_fields := get_missing_import_fields(normalized))
+            )
+            if errors or write_error:
+                continue
+            try:
+                stats.add_batch(
+                    *_write_import_batch(conn, context, [normalized for _, normalized in batch])
+                )
+            except ValidationError as exc:
+                write_error = exc
+        if errors:
+            shown = "; ".join(f"Zeile {idx}: {', '.join(fields)}" for idx, fields in errors[:10])
+            if len(errors) > 10:
+                shown += f"; … ({len(errors) - 10} weitere)"
+            raise ValidationError(
+                f"Pflichtfelder fehlen: {shown}",
+                code="missing_fields",
+                details={"rows": errors},
+            )
+        if write_error:
+            raise write_error
+
+
+def _run_directory_import(conn, args, paths: list[Path], context: ImportContext) -> None:
+    """Importiert mehrere Dateien: parallele Leser, ein serieller Schreiber.
+
+    Jede Datei wird in einem eigenen SAVEPOINT geschrieben. Standardmäßig
+    werden alle Dateien gemeinsam committet (ein Fehler verwirft alles), mit
+    `--commit-per-file` wird jede fehlerfreie Datei sofort committet.
+    """
+    readers = context.workers if context.workers > 1 else min(4, len(paths))
+    totals = ImportStats()
+    failed: list[str] = []
+
+    print(f"Importiere {len(paths)} Datei(en) aus {args.dir}")
+    for path, batches in iter_import_files(
+        [str(path) for path in paths],
+        args.format,
+        readers=readers,
+        batch_size=context.batch_size,
+    ):
+        name = Path(path).name
+        file_stats = ImportStats()
+        try:
+            write_file_batches(conn, context, batches, file_stats)
+        except ValidationError as exc:
+            error = exc.message
+        except IMPORT_READ_ERRORS as exc:
+            error = f"Importdatei konnte nicht gelesen werden: {exc}"
+        else:
+            error = None
+
+        totals.total += file_stats.total
+        if error:
+            failed.append(name)
+            print(f"  {name}: FEHLER – {error}")
+            if not args.commit_per_file:
+                conn.rollback()
+                print(
+                    "Fehler: Import abgebrochen, keine Änderungen gespeichert.",
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+            continue
+
+        totals.add_batch(
+            file_stats.inserted_expenses, file_stats.inserted_income, file_stats.duplicates
+        )
+        print(
+            f"  {name}: {file_stats.total} Zeilen, "
+            f"{file_stats.inserted_expenses} Ausgaben, "
+            f"{file_stats.inserted_income} Einnahmen, "
+            f"{file_stats.duplicates} Duplikate"
+        )
+        if args.commit_per_file and not args.dry_run:
+            conn.commit()
+
     if args.dry_run:
         conn.rollback()
     else:
         conn.commit()
-    conn.close()
 
     print("Import abgeschlossen")
-    print(f"  Zeilen gesamt: {total}")
-    print(f"  Ausgaben angelegt: {inserted_expenses}")
-    print(f"  Einnahmen angelegt: {inserted_income}")
-    print(f"  Duplikate übersprungen: {duplicates}")
+    print(f"  Dateien: {len(paths) - len(failed)} von {len(paths)} importiert")
+    print(f"  Zeilen gesamt: {totals.total}")
+    print(f"  Ausgaben angelegt: {totals.inserted_expenses}")
+    print(f"  Einnahmen angelegt: {totals.inserted_income}")
+    print(f"  Duplikate übersprungen: {totals.duplicates}")
     if args.dry_run:
         print("  Dry-Run: keine Änderungen gespeichert")
+    else:
+        _save_bloom_filters(conn, Path(args.db), context)
+    if failed:
+        print(
+            f"Fehler: {len(failed)} Datei(en) nicht importiert: {', '.join(failed)}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def _print_header_plan(path: str, fmt: str) -> None:
+    """Gibt die aufgelöste Spaltenzuordnung der Importdatei aus."""
+    try:
+        first_row = next(iter_import_rows(path, fmt), None)
+    except IMPORT_READ_ERRORS as exc:
+        print(f"Fehler: Importdatei konnte nicht gelesen werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+    if first_row is None:
+        print("Keine Datenzeilen gefunden.")
+        return
+    print("Spaltenzuordnung (Feld ← Quellspalte):")
+    for line in compile_header_plan(first_row.keys()).describe():
+        print(f"  {line}")
+
+
+def cmd_import(args):
+    """Bulk-Import von Transaktionen.
+
+    Lesen, Normalisieren, Prüfen und Schreiben sind als Generator-Kette
+    aufgebaut; es wird nie die ganze Datei im Speicher gehalten. Die Quelle
+    wird zweimal gestreamt (Prüfung, dann Schreiben), damit bei fehlenden
+    Pflichtfeldern weiterhin nichts geschrieben wird. Geschrieben wird
+    blockweise über die Bulk-Services.
+
+    Mit `--workers N` läuft das Parsen/Normalisieren in einem Prozess-Pool;
+    geschrieben wird weiterhin nur vom Hauptprozess in Dateireihenfolge.
+
+    Mit `--resume` wird jeder Block zusammen mit einem Checkpoint im
+    Import-Journal committet; ein erneuter Aufruf setzt nach dem letzten
+    Checkpoint fort (per Seek, ohne die bereits importierten Zeilen erneut zu
+    lesen).
+
+    `--single-pass` prüft und schreibt jeden Block in einem Durchlauf in einem
+    eigenen SAVEPOINT; fehlerhafte Zeilen/Blöcke werden verworfen und gemeldet.
+    `--atomic` rollt stattdessen beim ersten Fehler den ganzen Import zurück.
+
+    `--dry-run` schreibt nichts: Über eine read-only Verbindung wird jede Zeile
+    als neu, Duplikat oder ungültig klassifiziert (ein Hash-Abgleich per Join).
+
+    `--dir PATH [--glob MUSTER]` importiert alle passenden Dateien eines
+    Verzeichnisses in einem Prozess: Threads lesen parallel, geschrieben wird
+    seriell über eine Verbindung.
+
+    `--bloom` prüft Hashes zuerst gegen einen Bloom-Filter je Tabelle; nur
+    mögliche Treffer werden in der DB gesucht. Der Filter wird neben der DB
+    gespeichert und beim nächsten Lauf wiederverwendet, solange sich die
+    Tabelle nicht verändert hat.
+    """
+    if args.schema:
+        print_import_schema()
+        return
+
+    if not (args.file or args.dir) or not args.format:
+        print(
+            "Fehler: --file (oder --dir) und --format sind erforderlich (oder --schema).",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    if args.file and args.dir:
+        print("Fehler: --file und --dir schließen sich aus.", file=sys.stderr)
+        sys.exit(1)
+    if args.dir and (args.show_mapping or args.resume or args.single_pass):
+        print(
+            "Fehler: --dir ist nicht mit --show-mapping, --resume oder --single-pass "
+            "kombinierbar.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    if args.show_mapping:
+        _print_header_plan(args.file, args.format)
+        return
+
+    if args.batch_size < 1:
+        print("Fehler: --batch-size muss mindestens 1 sein.", file=sys.stderr)
+        sys.exit(1)
+    if args.workers < 1:
+        print("Fehler: --workers muss mindestens 1 sein.", file=sys.stderr)
+        sys.exit(1)
+    if args.resume and (args.dry_run or args.workers > 1 or args.atomic):
+        print(
+            "Fehler: --resume ist nicht mit --dry-run, --workers oder --atomic kombinierbar.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    parallel_parse = args.workers > 1 and not args.dir
+    if args.format in BANK_STATEMENT_READERS and (args.resume or parallel_parse):
+        print(
+            f"Fehler: --workers und --resume werden für {args.format} nicht unterstützt.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    if args.atomic and not args.single_pass:
+        print("Fehler: --atomic ist nur mit --single-pass möglich.", file=sys.stderr)
+        sys.exit(1)
+
+    paths: list[Path] = []
+    if args.dir:
+        import_dir = Path(args.dir)
+        if not import_dir.is_dir():
+            print(f"Fehler: Verzeichnis nicht gefunden: {import_dir}", file=sys.stderr)
+            sys.exit(1)
+        pattern = args.glob or DEFAULT_DIR_GLOBS[args.format]
+        paths = sorted(path for path in import_dir.glob(pattern) if path.is_file())
+        if not paths:
+            print(f"Fehler: Keine Dateien für '{pattern}' in {import_dir}.", file=sys.stderr)
+            sys.exit(1)
+
+    db_path = Path(args.db)
+    # Dry-Run (Einzeldatei) liest nur: read-only Verbindung
+    preview_only = args.dry_run and not args.dir
+    try:
+        conn = open_database(db_path, read_only=preview_only)
+    except sqlite3.OperationalError as exc:
+        print(f"Fehler: Datenbank konnte nicht geöffnet werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+    config = load_config()
+    try:
+        context = build_import_context(
+            config, batch_size=args.batch_size, workers=args.workers
+        )
+        # Schreibende Importe laufen im `bulk_profile` (falls konfiguriert)
+        bulk_profile = None if preview_only else get_bulk_database_profile(config)
+    except ValidationError as exc:
+        conn.close()
+        print(f"Fehler: {exc.message}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.bloom and not preview_only:
+        _load_bloom_filters(conn, db_path, context)
+
+    if args.suggest:
+        _load_category_suggester(conn, context)
+
+    if args.dir:
+        try:
+            with database_profile(conn, bulk_profile):
+                _run_directory_import(conn, args, paths, context)
+        finally:
+            conn.close()
+        return
+
+    # stdin lässt sich nur einmal lesen → für beide Durchläufe zwischenspeichern
+    spooled_path = spool_stdin(f".{args.format}") if args.file == "-" else None
+    source_path = spooled_path or args.file
+    run = _run_preview if preview_only else _run_import
+    try:
+        with database_profile(conn, bulk_profile):
+            run(conn, args, source_path, context)
+    finally:
+        conn.close()
+        if spooled_path:
+            Path(spooled_path).unlink(missing_ok=True)
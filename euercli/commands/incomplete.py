@@ -3,9 +3,10 @@ import sys
 from pathlib import Path
 
 from ..config import load_config
-from ..db import get_db_connection
 from ..importers import get_tax_config
+from ..services.utils import period_bounds
 from ..utils import format_missing_fields
+from .helpers import open_database
 
 
 def is_gezahlte_ust(category_name: str | None, eur_line: int | None) -> bool:
@@ -66,7 +67,7 @@ def collect_income_missing(row: dict, tax_mode: str) -> list[str]:
 def cmd_incomplete_list(args):
     """Listet unvollständige Buchungen."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     tax_mode = get_tax_config(config)
 
@@ -84,9 +85,9 @@ def cmd_incomplete_list(args):
         """
         params: list[object] = []
         if args.year:
-            query += " AND strftime('%Y', COALESCE(e.payment_date, e.invoice_date)) = ?"
-            params.append(str(args.year))
-        query += " ORDER BY COALESCE(e.payment_date, e.invoice_date) DESC, e.id DESC"
+            query += " AND e.booking_date >= ? AND e.booking_date < ?"
+            params.extend(period_bounds(args.year))
+        query += " ORDER BY e.booking_date DESC, e.id DESC"
         expenses = conn.execute(query, params).fetchall()
         for row in expenses:
             missing = collect_expense_missing(row, tax_mode)
@@ -119,9 +120,9 @@ def cmd_incomplete_list(args):
         """
         params = []
         if args.year:
-            query += " AND strftime('%Y', COALESCE(i.payment_date, i.invoice_date)) = ?"
-            params.append(str(args.year))
-        query += " ORDER BY COALESCE(i.payment_date, i.invoice_date) DESC, i.id DESC"
+            query += " AND i.booking_date >= ? AND i.booking_date < ?"
+            params.extend(period_bounds(args.year))
+        query += " ORDER BY i.booking_date DESC, i.id DESC"
         income = conn.execute(query, params).fetchall()
         for row in income:
             missing = collect_income_missing(row, tax_mode)
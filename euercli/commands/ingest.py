@@ -0,0 +1,238 @@
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+
+from ..config import get_bulk_database_profile, load_config
+from ..db import database_profile
+from ..importers import IMPORT_READ_ERRORS, iter_import_files
+from ..services.errors import ValidationError
+from ..services.ingest import load_ingest_files, record_ingest_file
+from ..services.models import IngestFile
+from ..utils import compute_file_fingerprint
+from .helpers import open_database
+from .import_data import (
+    DEFAULT_DIR_GLOBS,
+    ImportContext,
+    ImportStats,
+    _load_category_suggester,
+    build_import_context,
+    write_file_batches,
+)
+
+
+def _log(message: str, *, file=sys.stdout) -> None:
+    print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {message}", file=file, flush=True)
+
+
+def _scan_inbox(directory: Path, pattern: str) -> list[tuple[str, int, int]]:
+    """Listet passende Dateien als (Pfad, Größe, mtime_ns), sortiert nach Name.
+
+    `os.scandir` liefert Typ und (unter Linux) einen `stat`-Aufruf je Datei;
+    versteckte Dateien (z.B. `.bank.csv.part` während des Schreibens) werden
+    ignoriert.
+    """
+    found = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not fnmatch(entry.name, pattern):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            found.append((entry.path, stat.st_size, stat.st_mtime_ns))
+    found.sort()
+    return found
+
+
+def _changed_files(
+    conn,
+    directory: Path,
+    pattern: str,
+    known: dict[str, IngestFile],
+    pending: dict[str, tuple[int, int]],
+    *,
+    settle: bool,
+) -> list[IngestFile]:
+    """Ermittelt neue oder geänderte Dateien eines Durchlaufs.
+
+    Stufen: Größe/mtime gegen den Speicherstand, dann (nur bei Abweichung)
+    SHA-256 über den Inhalt. Mit `settle` wird eine Datei erst importiert,
+    wenn Größe und mtime zwei Durchläufe lang gleich geblieben sind.
+    """
+    changed = []
+    seen = set()
+    for path, size, mtime_ns in _scan_inbox(directory, pattern):
+        seen.add(path)
+        record = known.get(path)
+        if record and (record.size, record.mtime_ns) == (size, mtime_ns):
+            continue
+        if settle and pending.get(path) != (size, mtime_ns):
+            # Datei wird evtl. noch geschrieben → im nächsten Durchlauf prüfen
+            pending[path] = (size, mtime_ns)
+            continue
+        pending.pop(path, None)
+        try:
+            fingerprint = compute_file_fingerprint(path)
+        except OSError:
+            continue
+        if record and record.fingerprint == fingerprint:
+            # Nur angefasst (touch/erneut kopiert): Stempel nachziehen
+            record.size, record.mtime_ns = size, mtime_ns
+            record_ingest_file(conn, record)
+            conn.commit()
+            continue
+        changed.append(
+            IngestFile(
+                path=path, size=size, mtime_ns=mtime_ns, fingerprint=fingerprint, status="failed"
+            )
+        )
+    for path in set(pending) - seen:
+        del pending[path]
+    return changed
+
+
+def _import_changed_files(
+    conn,
+    context: ImportContext,
+    fmt: str,
+    changed: list[IngestFile],
+    known: dict[str, IngestFile],
+) -> tuple[int, int]:
+    """Importiert die Dateien über die warme Verbindung, eine Transaktion je Datei.
+
+    Buchungen und Fingerprint werden gemeinsam committet. Fehlerhafte Dateien
+    werden als `failed` vermerkt und erst nach einer Änderung erneut versucht;
+    bei gesperrter Datenbank endet der Durchlauf, die Datei und alle folgenden
+    bleiben unvermerkt und werden im nächsten Durchlauf wiederholt.
+
+    Returns:
+        (importierte Dateien, fehlgeschlagene Dateien)
+    """
+    imported = failed = 0
+    by_path = {ingest_file.path: ingest_file for ingest_file in changed}
+    files = iter_import_files(
+        list(by_path),
+        fmt,
+        readers=min(4, len(by_path)),
+        batch_size=context.batch_size,
+    )
+    # closing(): ein Abbruch gibt die Leser-Threads sofort frei
+    with closing(files):
+        for path, batches in files:
+            ingest_file = by_path[path]
+            name = Path(path).name
+            stats = ImportStats()
+            try:
+                write_file_batches(conn, context, batches, stats)
+            except ValidationError as exc:
+                error = exc.message
+            except IMPORT_READ_ERRORS as exc:
+                error = f"Importdatei konnte nicht gelesen werden: {exc}"
+            except sqlite3.OperationalError as exc:
+                conn.rollback()
+                _log(
+                    f"{name}: Datenbank nicht verfügbar ({exc}), neuer Versuch folgt",
+                    file=sys.stderr,
+                )
+                # Durchlauf abbrechen; die übrigen Dateien folgen im nächsten
+                break
+            else:
+                error = None
+
+            if error:
+                ingest_file.status = "failed"
+                ingest_file.message = error
+                failed += 1
+                _log(f"{name}: FEHLER – {error}", file=sys.stderr)
+            else:
+                ingest_file.status = "imported"
+                ingest_file.message = (
+                    f"{stats.total} Zeilen, {stats.inserted_expenses} Ausgaben, "
+                    f"{stats.inserted_income} Einnahmen, {stats.duplicates} Duplikate"
+                )
+                imported += 1
+                _log(f"{name}: {ingest_file.message}")
+            record_ingest_file(conn, ingest_file)
+            conn.commit()
+            known[path] = ingest_file
+    return imported, failed
+
+
+def cmd_ingest_watch(args):
+    """Überwacht ein Eingangsverzeichnis und importiert neue/geänderte Dateien."""
+    directory = Path(args.dir).resolve()
+    if not directory.is_dir():
+        print(f"Fehler: Verzeichnis nicht gefunden: {args.dir}", file=sys.stderr)
+        sys.exit(1)
+    if args.interval <= 0:
+        print("Fehler: --interval muss größer als 0 sein.", file=sys.stderr)
+        sys.exit(1)
+    pattern = args.glob or DEFAULT_DIR_GLOBS[args.format]
+
+    # Eine Verbindung und ein Import-Kontext für die gesamte Laufzeit
+    try:
+        conn = open_database(Path(args.db))
+    except sqlite3.OperationalError as exc:
+        print(f"Fehler: Datenbank konnte nicht geöffnet werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        config = load_config()
+        context = build_import_context(config, batch_size=args.batch_size)
+        bulk_profile = get_bulk_database_profile(config)
+        known = load_ingest_files(conn, str(directory))
+    except ValidationError as exc:
+        conn.close()
+        print(f"Fehler: {exc.message}", file=sys.stderr)
+        sys.exit(1)
+    except sqlite3.OperationalError:
+        conn.close()
+        print(
+            "Fehler: Eingangstabelle fehlt. Bitte zuerst 'euer init' ausführen.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    if args.suggest:
+        _load_category_suggester(conn, context)
+
+    pending: dict[str, tuple[int, int]] = {}
+    imported = failed = 0
+    if not args.once:
+        print(
+            f"Überwache {directory} ({pattern}, alle {args.interval:g} s, "
+            f"{len(known)} bekannte Datei(en)). Beenden mit Strg+C.",
+            flush=True,
+        )
+    try:
+        while True:
+            changed = _changed_files(
+                conn, directory, pattern, known, pending, settle=not args.once
+            )
+            if changed:
+                with database_profile(conn, bulk_profile):
+                    done, errors = _import_changed_files(
+                        conn, context, args.format, changed, known
+                    )
+                imported += done
+                failed += errors
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        conn.close()
+
+    if imported or failed:
+        print(f"Eingang: {imported} Datei(en) importiert, {failed} fehlgeschlagen")
+    else:
+        print("Eingang: keine neuen oder geänderten Dateien")
+    if args.once and failed:
+        sys.exit(1)
@@ -1,10 +1,59 @@
+import sys
 import uuid
 from pathlib import Path
 
 from ..config import get_export_dir, load_config
 from ..constants import DEFAULT_EXPORT_DIR
-from ..db import get_db_connection
-from ..schema import SCHEMA, SEED_CATEGORIES
+from ..db import log_audit, row_to_dict
+from ..importers import ImportDateNormalizer, is_iso_date
+from ..schema import (
+    AGGREGATE_TRIGGER_TABLES,
+    BOOKING_DATE_INDEXES,
+    CATEGORY_SUGGESTION_TRIGGERS,
+    CENTS_SQL,
+    COVERING_INDEXES,
+    PERIOD_AGGREGATE_TRIGGERS,
+    SCHEMA,
+    SEED_CATEGORIES,
+    SUGGESTION_TRIGGER_TABLES,
+    SUPERSEDED_INDEXES,
+)
+from ..services.aggregates import rebuild_period_aggregates
+from ..services.suggestions import rebuild_category_suggestions
+from ..services.utils import hash_date
+from ..utils import compute_hash, hash_to_digest
+from .helpers import open_database
+
+_HASH_TABLES = ("expenses", "income", "private_transfers")
+
+_BOOKING_DATE_COLUMNS = (("booking_date", "TEXT", "COALESCE(payment_date, invoice_date)"),)
+
+# Früher angelegt, aber nie gelesen (Jahresfilter laufen über booking_date)
+_OBSOLETE_GENERATED_COLUMNS = {"expenses": ("booking_year",), "income": ("booking_year",)}
+
+
+def _cents_column(column: str) -> tuple[str, str, str]:
+    name = column.removesuffix("_eur")
+    return f"{name}_cents", "INTEGER", CENTS_SQL.format(column=column)
+
+
+# Spalten wie in SCHEMA
+_GENERATED_COLUMNS = {
+    "expenses": (
+        *_BOOKING_DATE_COLUMNS,
+        _cents_column("amount_eur"),
+        _cents_column("vat_input"),
+        _cents_column("vat_output"),
+    ),
+    "income": (
+        *_BOOKING_DATE_COLUMNS,
+        _cents_column("amount_eur"),
+        _cents_column("vat_output"),
+    ),
+    "private_transfers": (_cents_column("amount_eur"),),
+}
+
+_ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
 
 
 def _get_table_columns(conn, table_name: str) -> dict[str, dict]:
@@ -45,7 +94,11 @@ def _migrate_expenses_dates(conn) -> None:
             private_classification TEXT NOT NULL DEFAULT 'none'
                 CHECK(private_classification IN ('none', 'account_rule', 'category_rule', 'manual')),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            hash TEXT UNIQUE NOT NULL,
+            booking_date TEXT GENERATED ALWAYS AS (COALESCE(payment_date, invoice_date)) VIRTUAL,
+            amount_cents INTEGER GENERATED ALWAYS AS (CAST(round(amount_eur * 100) AS INTEGER)) VIRTUAL,
+            vat_input_cents INTEGER GENERATED ALWAYS AS (CAST(round(vat_input * 100) AS INTEGER)) VIRTUAL,
+            vat_output_cents INTEGER GENERATED ALWAYS AS (CAST(round(vat_output * 100) AS INTEGER)) VIRTUAL,
+            hash BLOB UNIQUE NOT NULL,
             CHECK(invoice_date IS NOT NULL OR payment_date IS NOT NULL)
         )
         """
@@ -67,9 +120,6 @@ def _migrate_expenses_dates(conn) -> None:
         """
     )
     conn.execute("DROP TABLE expenses_old")
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_expenses_payment_date ON expenses(payment_date)"
-    )
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses(category_id)"
     )
@@ -99,7 +149,10 @@ def _migrate_income_dates(conn) -> None:
             notes TEXT,
             vat_output REAL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            hash TEXT UNIQUE NOT NULL,
+            booking_date TEXT GENERATED ALWAYS AS (COALESCE(payment_date, invoice_date)) VIRTUAL,
+            amount_cents INTEGER GENERATED ALWAYS AS (CAST(round(amount_eur * 100) AS INTEGER)) VIRTUAL,
+            vat_output_cents INTEGER GENERATED ALWAYS AS (CAST(round(vat_output * 100) AS INTEGER)) VIRTUAL,
+            hash BLOB UNIQUE NOT NULL,
             CHECK(invoice_date IS NOT NULL OR payment_date IS NOT NULL)
         )
         """
@@ -118,7 +171,6 @@ def _migrate_income_dates(conn) -> None:
         """
     )
     conn.execute("DROP TABLE income_old")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_income_payment_date ON income(payment_date)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_income_category ON income(category_id)")
 
 
@@ -161,6 +213,135 @@ def ensure_payment_invoice_columns(conn) -> None:
     conn.commit()
 
 
+def _migrate_private_transfers_table(conn) -> None:
+    conn.execute("ALTER TABLE private_transfers RENAME TO private_transfers_old")
+    conn.execute(
+        """
+        CREATE TABLE private_transfers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            uuid TEXT UNIQUE NOT NULL,
+            date DATE NOT NULL,
+            type TEXT NOT NULL CHECK(type IN ('deposit', 'withdrawal')),
+            amount_eur REAL NOT NULL CHECK(amount_eur > 0),
+            description TEXT NOT NULL,
+            notes TEXT,
+            related_expense_id INTEGER REFERENCES expenses(id) ON DELETE SET NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            amount_cents INTEGER GENERATED ALWAYS AS (CAST(round(amount_eur * 100) AS INTEGER)) VIRTUAL,
+            hash BLOB UNIQUE NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO private_transfers (
+            id, uuid, date, type, amount_eur, description, notes, related_expense_id,
+            created_at, hash
+        )
+        SELECT
+            id, uuid, date, type, amount_eur, description, notes, related_expense_id,
+            created_at, hash
+        FROM private_transfers_old
+        """
+    )
+    conn.execute("DROP TABLE private_transfers_old")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_private_transfers_type ON private_transfers(type)"
+    )
+    conn.execute(
+        """CREATE INDEX IF NOT EXISTS idx_private_transfers_related_expense
+           ON private_transfers(related_expense_id)"""
+    )
+
+
+def ensure_binary_hash_columns(conn) -> None:
+    """Stellt `hash` von 64 Zeichen Hex (TEXT) auf 16 Bytes BLOB um.
+
+    Tabellen mit TEXT-Spalte werden neu angelegt, vorhandene Hex-Hashes in
+    das Binärformat umgerechnet (identisch zu `compute_hash()`). Würden zwei
+    bestehende Hashes nach dem Kürzen zusammenfallen, wird abgebrochen, ohne
+    etwas zu ändern.
+    """
+    rebuild = [
+        table_name
+        for table_name in _HASH_TABLES
+        if _get_table_columns(conn, table_name)["hash"]["type"].upper() != "BLOB"
+    ]
+    convert = [
+        table_name
+        for table_name in _HASH_TABLES
+        if conn.execute(
+            f"SELECT 1 FROM {table_name} WHERE typeof(hash) != 'blob' LIMIT 1"
+        ).fetchone()
+    ]
+    if not rebuild and not convert:
+        return
+
+    conn.create_function("euer_hash_digest", 1, hash_to_digest, deterministic=True)
+    for table_name in convert:
+        collision = conn.execute(
+            f"""SELECT COUNT(*) AS cnt FROM {table_name}
+                GROUP BY euer_hash_digest(hash) HAVING COUNT(*) > 1 LIMIT 1"""
+        ).fetchone()
+        if collision:
+            raise ValueError(
+                f"Hash-Migration für '{table_name}' nicht möglich: "
+                "gekürzte Hashes wären nicht mehr eindeutig."
+            )
+
+    migrations = {
+        "expenses": _migrate_expenses_dates,
+        "income": _migrate_income_dates,
+        "private_transfers": _migrate_private_transfers_table,
+    }
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for table_name in rebuild:
+            migrations[table_name](conn)
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+    for table_name in _HASH_TABLES:
+        conn.execute(
+            f"""UPDATE {table_name} SET hash = euer_hash_digest(hash)
+                WHERE typeof(hash) != 'blob'"""
+        )
+    conn.commit()
+
+
+def ensure_generated_columns(conn) -> None:
+    """Ergänzt fehlende generierte Spalten (`booking_date`, `*_cents`) samt Index
+    und entfernt nicht mehr genutzte.
+
+    `ALTER TABLE` kann nur VIRTUAL-Spalten anlegen; der Wert wird beim Lesen
+    berechnet und liegt über den Index trotzdem vorberechnet vor. Generierte
+    Spalten sind nur über `PRAGMA table_xinfo` sichtbar.
+    """
+    for table_name, generated in _GENERATED_COLUMNS.items():
+        columns = {
+            row["name"]
+            for row in conn.execute(f"PRAGMA table_xinfo({table_name})").fetchall()
+        }
+        for column, column_type, expression in generated:
+            if column not in columns:
+                conn.execute(
+                    f"""ALTER TABLE {table_name} ADD COLUMN {column} {column_type}
+                        GENERATED ALWAYS AS ({expression}) VIRTUAL"""
+                )
+        for column in _OBSOLETE_GENERATED_COLUMNS.get(table_name, ()):
+            if column in columns:
+                conn.execute(f"ALTER TABLE {table_name} DROP COLUMN {column}")
+    conn.executescript(BOOKING_DATE_INDEXES)
+    conn.commit()
+
+
+def ensure_covering_indexes(conn) -> None:
+    """Legt die abdeckenden Summen-Indizes an und entfernt abgelöste Einzelindizes."""
+    conn.executescript(COVERING_INDEXES)
+    for index_name in SUPERSEDED_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    conn.commit()
+
+
 def ensure_expenses_private_columns(conn) -> None:
     """Ergänzt fehlende private-Spalten in bestehenden Datenbanken."""
     columns = {
@@ -195,6 +376,107 @@ def ensure_ledger_account_columns(conn) -> None:
         conn.execute("ALTER TABLE income ADD COLUMN ledger_account TEXT")
 
 
+def ensure_import_journal_columns(conn) -> None:
+    """Ergänzt die Formatspalte im Import-Journal bestehender Datenbanken."""
+    columns = {
+        row["name"]
+        for row in conn.execute("PRAGMA table_info(import_journal)").fetchall()
+    }
+    if "formats" not in columns:
+        conn.execute("ALTER TABLE import_journal ADD COLUMN formats TEXT")
+
+
+def ensure_iso_dates(conn) -> None:
+    """Stellt gespeicherte Datumswerte wie "19.03.2025" auf YYYY-MM-DD um.
+
+    Ältere Importe haben Daten unverändert übernommen; `strftime()`-Filter
+    (Jahr/Monat) übersehen solche Zeilen. Der Duplikat-Hash hängt am Datum und
+    wird neu berechnet. Zeilen mit nicht erkennbarem Datum oder einem Hash, den
+    bereits eine andere Buchung hat, bleiben unverändert.
+    """
+    changed = skipped = 0
+    dates = ImportDateNormalizer()
+    for table_name, party_column in (("expenses", "vendor"), ("income", "source")):
+        rows = conn.execute(
+            f"""SELECT * FROM {table_name}
+                WHERE (payment_date != '' AND payment_date NOT GLOB '{_ISO_DATE_GLOB}')
+                   OR (invoice_date != '' AND invoice_date NOT GLOB '{_ISO_DATE_GLOB}')"""
+        ).fetchall()
+        for row in rows:
+            payment_date = dates.normalize("payment_date", row["payment_date"])
+            invoice_date = dates.normalize("invoice_date", row["invoice_date"])
+            if not all(not value or is_iso_date(value) for value in (payment_date, invoice_date)):
+                skipped += 1
+                continue
+            tx_hash = compute_hash(
+                hash_date(payment_date, invoice_date),
+                row[party_column],
+                row["amount_eur"],
+                row["receipt_name"] or "",
+            )
+            conflict = conn.execute(
+                f"SELECT 1 FROM {table_name} WHERE hash = ? AND id != ?",
+                (tx_hash, row["id"]),
+            ).fetchone()
+            if conflict:
+                skipped += 1
+                continue
+            conn.execute(
+                f"""UPDATE {table_name}
+                    SET payment_date = ?, invoice_date = ?, hash = ? WHERE id = ?""",
+                (payment_date, invoice_date, tx_hash, row["id"]),
+            )
+            old_data = row_to_dict(row)
+            log_audit(
+                conn,
+                table_name,
+                row["id"],
+                "MIGRATE",
+                record_uuid=row["uuid"],
+                old_data=old_data,
+                new_data={
+                    **old_data,
+                    "payment_date": payment_date,
+                    "invoice_date": invoice_date,
+                    "hash": tx_hash.hex(),
+                },
+            )
+            changed += 1
+    if changed:
+        conn.commit()
+        print(f"  {changed} Datumswert(e) auf YYYY-MM-DD umgestellt")
+    if skipped:
+        print(
+            f"  {skipped} Buchung(en) mit nicht umstellbarem Datum – "
+            "bitte per 'euer update' korrigieren"
+        )
+
+
+def _drop_derived_triggers(conn) -> None:
+    # Tabellen-Migrationen benennen expenses/income um; Trigger auf Spalten, die
+    # es in alten Schemata noch nicht gibt, würden das RENAME scheitern lassen.
+    for table_name, _, _ in SUGGESTION_TRIGGER_TABLES:
+        for action in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_suggestions_{action}")
+    for table_name, _, _ in AGGREGATE_TRIGGER_TABLES:
+        for action in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_agg_{action}")
+
+
+def ensure_category_suggestions(conn) -> None:
+    """Legt die Vorschlags-Trigger (neu) an und baut das Modell aus dem Bestand auf."""
+    conn.executescript(CATEGORY_SUGGESTION_TRIGGERS)
+    rebuild_category_suggestions(conn)
+    conn.commit()
+
+
+def ensure_period_aggregates(conn) -> None:
+    """Legt die Summen-Trigger (neu) an und baut agg_period_category aus dem Bestand auf."""
+    conn.executescript(PERIOD_AGGREGATE_TRIGGERS)
+    rebuild_period_aggregates(conn)
+    conn.commit()
+
+
 def ensure_seed_categories(conn) -> None:
     """Ergänzt fehlende Seed-Kategorien und korrigiert EÜR-Zeilen in bestehenden DBs."""
     # Fix: "Umsatzsteuerpflichtige Betriebseinnahmen" war fälschlich auf Zeile 14 (→ 15)
@@ -227,11 +509,24 @@ def cmd_init(args):
 
     print(f"Initialisiere Datenbank: {db_path}")
 
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path, check_schema=False)
     conn.executescript(SCHEMA)
+    _drop_derived_triggers(conn)
     ensure_payment_invoice_columns(conn)
     ensure_expenses_private_columns(conn)
     ensure_ledger_account_columns(conn)
+    ensure_import_journal_columns(conn)
+    try:
+        ensure_binary_hash_columns(conn)
+    except ValueError as exc:
+        conn.close()
+        print(f"Fehler: {exc}", file=sys.stderr)
+        sys.exit(1)
+    ensure_generated_columns(conn)
+    ensure_covering_indexes(conn)
+    ensure_iso_dates(conn)
+    ensure_category_suggestions(conn)
+    ensure_period_aggregates(conn)
 
     # Kategorien seeden (nur wenn leer) oder fehlende ergänzen
     existing = conn.execute("SELECT COUNT(*) as cnt FROM categories").fetchone()["cnt"]
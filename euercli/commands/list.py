@@ -4,12 +4,13 @@ from datetime import datetime
 from pathlib import Path
 
 from ..config import get_ledger_accounts, load_config
-from ..db import get_db_connection
 from ..services.categories import get_category_list
 from ..services.errors import ValidationError
 from ..services.expenses import list_expenses
 from ..services.income import list_income
 from ..services.private_transfers import get_private_transfer_list, get_private_paid_expenses
+from ..utils import cents_to_eur, to_cents
+from .helpers import open_database
 
 
 def infer_booking_status(
@@ -47,7 +48,7 @@ def format_category_label(category_name: str | None, category_eur_line: int | No
 def cmd_list_expenses(args):
     """Listet Ausgaben."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
 
     year = args.year or datetime.now().year
 
@@ -167,9 +168,9 @@ def cmd_list_expenses(args):
             )
             print("-" * 140)
 
-        total = 0.0
-        vat_out_total = 0.0
-        vat_in_total = 0.0
+        total = 0
+        vat_out_total = 0
+        vat_in_total = 0
         for r in rows:
             cat_str = format_category_label(r.category_name, r.category_eur_line)
             status = infer_booking_status(r.payment_date, r.invoice_date, r.receipt_name)
@@ -196,9 +197,9 @@ def cmd_list_expenses(args):
                     )
                 )
                 if r.vat_output:
-                    vat_out_total += r.vat_output
+                    vat_out_total += to_cents(r.vat_output)
                 if r.vat_input:
-                    vat_in_total += r.vat_input
+                    vat_in_total += to_cents(r.vat_input)
             elif full_view:
                 print(
                     row_fmt.format(
@@ -223,14 +224,14 @@ def cmd_list_expenses(args):
                     f"{r.id:<5} {(r.payment_date or ''):<12} {(r.invoice_date or ''):<12} {r.vendor[:18]:<18} {cat_str[:20]:<20} {r.amount_eur:>10.2f} {status[:35]:<35} {rc_str:<3} {vout_str:>8} {vin_str:>8}"
                 )
                 if r.vat_output:
-                    vat_out_total += r.vat_output
+                    vat_out_total += to_cents(r.vat_output)
                 if r.vat_input:
-                    vat_in_total += r.vat_input
+                    vat_in_total += to_cents(r.vat_input)
             else:
                 print(
                     f"{r.id:<5} {(r.payment_date or ''):<12} {(r.invoice_date or ''):<12} {r.vendor[:20]:<20} {cat_str[:24]:<24} {r.amount_eur:>10.2f} {status[:35]:<35} {(r.account or ''):<12}"
                 )
-            total += r.amount_eur
+            total += to_cents(r.amount_eur)
         if full_view:
             print("-" * len(header))
         else:
@@ -243,15 +244,15 @@ def cmd_list_expenses(args):
                     invoice="",
                     vendor="",
                     category="",
-                    amount=f"{total:.2f}",
+                    amount=f"{cents_to_eur(total):.2f}",
                     account="",
                     receipt="",
                     foreign="",
                     notes="",
                     status="",
                     rc="",
-                    vout=f"{vat_out_total:.2f}",
-                    vin=f"{vat_in_total:.2f}",
+                    vout=f"{cents_to_eur(vat_out_total):.2f}",
+                    vin=f"{cents_to_eur(vat_in_total):.2f}",
                 )
             )
         elif full_view:
@@ -262,7 +263,7 @@ def cmd_list_expenses(args):
                     invoice="",
                     vendor="",
                     category="",
-                    amount=f"{total:.2f}",
+                    amount=f"{cents_to_eur(total):.2f}",
                     account="",
                     receipt="",
                     foreign="",
@@ -272,16 +273,16 @@ def cmd_list_expenses(args):
             )
         elif has_vat:
             print(
-                f"{'GESAMT':<90} {total:>10.2f} {'':<39} {vat_out_total:>8.2f} {vat_in_total:>8.2f}"
+                f"{'GESAMT':<90} {cents_to_eur(total):>10.2f} {'':<39} {cents_to_eur(vat_out_total):>8.2f} {cents_to_eur(vat_in_total):>8.2f}"
             )
         else:
-            print(f"{'GESAMT':<76} {total:>10.2f}")
+            print(f"{'GESAMT':<76} {cents_to_eur(total):>10.2f}")
 
 
 def cmd_list_income(args):
     """Listet Einnahmen."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
 
     year = args.year or datetime.now().year
 
@@ -367,8 +368,8 @@ def cmd_list_income(args):
         print(header)
         print("-" * len(header))
 
-        total = 0.0
-        vat_out_total = 0.0
+        total = 0
+        vat_out_total = 0
 
         for r in rows:
             cat_str = format_category_label(r.category_name, r.category_eur_line)
@@ -403,8 +404,8 @@ def cmd_list_income(args):
                     )
                 )
             if r.vat_output:
-                vat_out_total += r.vat_output
-            total += r.amount_eur
+                vat_out_total += to_cents(r.vat_output)
+            total += to_cents(r.amount_eur)
         print("-" * len(header))
         if full_view:
             print(
@@ -414,9 +415,9 @@ def cmd_list_income(args):
                     invoice="",
                     source="",
                     category="",
-                    amount=f"{total:.2f}",
+                    amount=f"{cents_to_eur(total):.2f}",
                     status="",
-                    vat=f"{vat_out_total:.2f}",
+                    vat=f"{cents_to_eur(vat_out_total):.2f}",
                     notes="",
                 )
             )
@@ -428,9 +429,9 @@ def cmd_list_income(args):
                     invoice="",
                     source="",
                     category="",
-                    amount=f"{total:.2f}",
+                    amount=f"{cents_to_eur(total):.2f}",
                     status="",
-                    vat=f"{vat_out_total:.2f}",
+                    vat=f"{cents_to_eur(vat_out_total):.2f}",
                 )
             )
 
@@ -438,7 +439,7 @@ def cmd_list_income(args):
 def cmd_list_categories(args):
     """Listet alle Kategorien."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
 
     rows = get_category_list(conn, args.type)
     conn.close()
@@ -464,7 +465,7 @@ def cmd_list_ledger_accounts(args):
         return
 
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     categories = get_category_list(conn)
     conn.close()
 
@@ -528,7 +529,7 @@ def cmd_list_ledger_accounts(args):
 def cmd_list_private_deposits(args):
     """Listet Privateinlagen (direkt + Sacheinlagen)."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     year = args.year or datetime.now().year
 
     transfers = get_private_transfer_list(conn, transfer_type="deposit", year=year)
@@ -575,13 +576,13 @@ def cmd_list_private_deposits(args):
     )
     print("-" * 98)
 
-    total = 0.0
+    total = 0
     for row in transfers:
         print(
             f"{row.id:<5} {row.date:<12} {row.description[:30]:<30} {row.amount_eur:>10.2f} "
             f"{'Direktbuchung':<20} {'direct':<12}"
         )
-        total += row.amount_eur
+        total += to_cents(row.amount_eur)
 
     for row in private_paid_expenses:
         amount = abs(row.amount_eur)
@@ -590,16 +591,16 @@ def cmd_list_private_deposits(args):
             f"{'--':<5} {row.date:<12} {row.vendor[:30]:<30} {amount:>10.2f} "
             f"{source:<20} {row.private_classification:<12}"
         )
-        total += amount
+        total += to_cents(amount)
 
     print("-" * 98)
-    print(f"{'GESAMT':<62} {total:>10.2f}")
+    print(f"{'GESAMT':<62} {cents_to_eur(total):>10.2f}")
 
 
 def cmd_list_private_withdrawals(args):
     """Listet Privatentnahmen."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     year = args.year or datetime.now().year
     transfers = get_private_transfer_list(conn, transfer_type="withdrawal", year=year)
     conn.close()
@@ -619,18 +620,18 @@ def cmd_list_private_withdrawals(args):
     print("=" * 60)
     print(f"{'ID':<5} {'Datum':<12} {'Beschreibung':<40} {'EUR':>10}")
     print("-" * 72)
-    total = 0.0
+    total = 0
     for row in transfers:
         print(f"{row.id:<5} {row.date:<12} {row.description[:40]:<40} {row.amount_eur:>10.2f}")
-        total += row.amount_eur
+        total += to_cents(row.amount_eur)
     print("-" * 72)
-    print(f"{'GESAMT':<59} {total:>10.2f}")
+    print(f"{'GESAMT':<59} {cents_to_eur(total):>10.2f}")
 
 
 def cmd_list_private_transfers(args):
     """Listet Privateinlagen und Privatentnahmen."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     year = args.year or datetime.now().year
     deposits = get_private_transfer_list(conn, transfer_type="deposit", year=year)
     withdrawals = get_private_transfer_list(conn, transfer_type="withdrawal", year=year)
@@ -666,10 +667,10 @@ def cmd_list_private_transfers(args):
             )
         return
 
-    deposits_total = sum(row.amount_eur for row in deposits) + sum(
-        abs(row.amount_eur) for row in private_paid_expenses
+    deposits_total = sum(to_cents(row.amount_eur) for row in deposits) + sum(
+        abs(to_cents(row.amount_eur)) for row in private_paid_expenses
     )
-    withdrawals_total = sum(row.amount_eur for row in withdrawals)
+    withdrawals_total = sum(to_cents(row.amount_eur) for row in withdrawals)
 
     print(f"Privateinlagen & Privatentnahmen {year}")
     print("=" * 50)
@@ -687,7 +688,7 @@ def cmd_list_private_transfers(args):
             f"{'--':<5} {row.date:<12} {row.vendor[:30]:<30} {abs(row.amount_eur):>10.2f} {f'Ausgabe #{row.id}':<20}"
         )
     print("-" * 85)
-    print(f"{'SUMME':<49} {deposits_total:>10.2f} EUR")
+    print(f"{'SUMME':<49} {cents_to_eur(deposits_total):>10.2f} EUR")
     print()
 
     print("Privatentnahmen (Geld/Werte <- Geschäft):")
@@ -698,4 +699,4 @@ def cmd_list_private_transfers(args):
             f"{row.id:<5} {row.date:<12} {row.description[:30]:<30} {row.amount_eur:>10.2f} {'Direktbuchung':<20}"
         )
     print("-" * 85)
-    print(f"{'SUMME':<49} {withdrawals_total:>10.2f} EUR")
+    print(f"{'SUMME':<49} {cents_to_eur(withdrawals_total):>10.2f} EUR")
@@ -1,7 +1,7 @@
 from pathlib import Path
 
-from ..db import get_db_connection
 from ..services.private_transfers import get_private_summary
+from .helpers import open_database
 
 
 def print_private_summary(conn, year: int) -> None:
@@ -54,7 +54,7 @@ def print_private_summary(conn, year: int) -> None:
 def cmd_private_summary(args):
     """Zeigt ELSTER-relevante Privatvorgänge für ein Jahr."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     try:
         print_private_summary(conn, args.year)
     finally:
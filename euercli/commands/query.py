@@ -81,7 +81,12 @@ def cmd_query(args):
         if columns:
             writer.writerow(columns)
         for row in cursor.fetchall():
-            writer.writerow([row[col] for col in columns])
+            writer.writerow(
+                [
+                    row[col].hex() if isinstance(row[col], bytes) else row[col]
+                    for col in columns
+                ]
+            )
     except sqlite3.Error as exc:
         print(f"Fehler: SQL-Query fehlgeschlagen: {exc}", file=sys.stderr)
         sys.exit(1)
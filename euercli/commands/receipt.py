@@ -6,7 +6,8 @@ from datetime import datetime
 from pathlib import Path
 
 from ..config import load_config, resolve_receipt_path
-from ..db import get_db_connection
+from ..services.utils import period_bounds
+from .helpers import open_database
 
 
 def cmd_receipt_check(args):
@@ -20,7 +21,7 @@ def cmd_receipt_check(args):
         sys.exit(1)
 
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
 
     year = args.year or datetime.now().year
     print(f"Beleg-Prüfung {year}")
@@ -35,9 +36,9 @@ def cmd_receipt_check(args):
         expenses = conn.execute(
             """SELECT e.id, e.payment_date, e.invoice_date, e.vendor, e.receipt_name
                FROM expenses e
-               WHERE strftime('%Y', COALESCE(e.payment_date, e.invoice_date)) = ?
-               ORDER BY COALESCE(e.payment_date, e.invoice_date), e.id""",
-            (str(year),),
+               WHERE e.booking_date >= ? AND e.booking_date < ?
+               ORDER BY e.booking_date, e.id""",
+            period_bounds(year),
         ).fetchall()
 
         missing_expenses = []
@@ -73,9 +74,9 @@ def cmd_receipt_check(args):
         income = conn.execute(
             """SELECT i.id, i.payment_date, i.invoice_date, i.source, i.receipt_name
                FROM income i
-               WHERE strftime('%Y', COALESCE(i.payment_date, i.invoice_date)) = ?
-               ORDER BY COALESCE(i.payment_date, i.invoice_date), i.id""",
-            (str(year),),
+               WHERE i.booking_date >= ? AND i.booking_date < ?
+               ORDER BY i.booking_date, i.id""",
+            period_bounds(year),
         ).fetchall()
 
         missing_income = []
@@ -142,7 +143,7 @@ def cmd_receipt_open(args):
         sys.exit(1)
 
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
 
     table = args.table
     if table == "expenses":
@@ -1,8 +1,17 @@
+import sys
 from pathlib import Path
 
-from ..config import get_audit_user, get_private_accounts, load_config
-from ..db import get_db_connection, log_audit, row_to_dict
+from ..config import (
+    get_audit_user,
+    get_bulk_database_profile,
+    get_private_accounts,
+    load_config,
+)
+from ..db import database_profile, log_audit, row_to_dict
+from ..services.errors import ValidationError
 from ..services.private_classification import classify_expense_private_paid
+from ..services.utils import period_bounds
+from .helpers import open_database
 
 
 def _reconcile_private_expenses(
@@ -16,9 +25,9 @@ def _reconcile_private_expenses(
     query = "SELECT * FROM expenses WHERE 1=1"
     params: list[object] = []
     if year is not None:
-        query += " AND strftime('%Y', COALESCE(payment_date, invoice_date)) = ?"
-        params.append(str(year))
-    query += " ORDER BY COALESCE(payment_date, invoice_date) ASC, id ASC"
+        query += " AND booking_date >= ? AND booking_date < ?"
+        params.extend(period_bounds(year))
+    query += " ORDER BY booking_date ASC, id ASC"
 
     category_rows = conn.execute(
         "SELECT id, name FROM categories WHERE type = 'expense'"
@@ -98,19 +107,27 @@ def _reconcile_private_expenses(
 def cmd_reconcile_private(args):
     """Reklassifiziert persistierte Sacheinlagen auf Basis der aktuellen Config."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
     private_accounts = get_private_accounts(config)
 
     try:
-        checked, changed, skipped_manual, changes = _reconcile_private_expenses(
-            conn,
-            private_accounts=private_accounts,
-            audit_user=audit_user,
-            year=args.year,
-            dry_run=bool(args.dry_run),
-        )
+        bulk_profile = get_bulk_database_profile(config)
+    except ValidationError as exc:
+        conn.close()
+        print(f"Fehler: {exc.message}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        with database_profile(conn, bulk_profile):
+            checked, changed, skipped_manual, changes = _reconcile_private_expenses(
+                conn,
+                private_accounts=private_accounts,
+                audit_user=audit_user,
+                year=args.year,
+                dry_run=bool(args.dry_run),
+            )
     finally:
         conn.close()
 
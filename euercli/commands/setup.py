@@ -16,9 +16,9 @@ from ..config import (
     save_config,
 )
 from ..constants import CONFIG_PATH, DEFAULT_EXPORT_DIR
-from ..db import get_db_connection
 from ..services.categories import get_category_list
 from ..services.errors import ValidationError
+from .helpers import open_database
 
 
 def _ordered_config(config: dict) -> dict:
@@ -44,7 +44,7 @@ def _prompt_yes_no(label: str, default: bool = False) -> bool:
 
 
 def _prompt_ledger_accounts(db_path: str) -> list[dict]:
-    conn = get_db_connection(Path(db_path))
+    conn = open_database(Path(db_path), check_schema=False)
     categories = get_category_list(conn)
     conn.close()
 
@@ -0,0 +1,59 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+from ..services.errors import ValidationError
+from ..services.suggestions import (
+    get_category_suggestions,
+    rebuild_category_suggestions,
+)
+from .helpers import open_database
+
+
+def cmd_suggest(args):
+    """Schlägt Kategorie/Buchungskonto einer Partei aus der Buchungshistorie vor."""
+    if not args.party and not args.rebuild:
+        print("Fehler: Partei oder --rebuild angeben.", file=sys.stderr)
+        sys.exit(1)
+
+    db_path = Path(args.db)
+    # Ohne --rebuild wird nur gelesen: read-only Verbindung
+    try:
+        conn = open_database(db_path, read_only=not args.rebuild)
+    except sqlite3.OperationalError as exc:
+        print(f"Fehler: Datenbank konnte nicht geöffnet werden: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.rebuild:
+            entries = rebuild_category_suggestions(conn)
+            conn.commit()
+            print(f"Vorschlagsmodell neu aufgebaut: {entries} Einträge.")
+        if not args.party:
+            return
+        suggestions = get_category_suggestions(conn, args.type, args.party, limit=args.limit)
+    except sqlite3.OperationalError:
+        print(
+            "Fehler: Vorschlagsmodell fehlt. Bitte zuerst 'euer init' ausführen.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except ValidationError as exc:
+        print(f"Fehler: {exc.message}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    type_label = "Ausgaben" if args.type == "expense" else "Einnahmen"
+    if not suggestions:
+        print(f"Keine Vorschläge für '{args.party}' ({type_label}).")
+        return
+
+    print(f"Vorschläge für '{args.party}' ({type_label}):")
+    print(f"{'Anteil':>7} {'Anzahl':>7}  {'Kategorie':<40} {'Buchungskonto':<20}")
+    print("-" * 78)
+    for suggestion in suggestions:
+        print(
+            f"{suggestion.share:>7.0%} {suggestion.count:>7}  "
+            f"{suggestion.category_name[:40]:<40} {suggestion.ledger_account or '':<20}"
+        )
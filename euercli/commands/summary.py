@@ -1,42 +1,87 @@
+import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
 
 from ..config import load_config
-from ..db import get_db_connection
 from ..importers import get_tax_config
+from ..services.aggregates import period_aggregates_missing
 from ..services.private_transfers import get_private_summary
+from ..services.utils import period_bounds
+from ..utils import cents_to_eur
+from .helpers import open_database
 
 ENTERTAINMENT_CATEGORY = "Bewirtungsaufwendungen"
-ENTERTAINMENT_DEDUCTIBLE_RATE = 0.7
+ENTERTAINMENT_DEDUCTIBLE_PERCENT = 70
+
+# Summen exakt in ganzen Cent, EUR erst bei der Ausgabe. Kategorien und
+# Steuern kommen aus agg_period_category (per Trigger gepflegt, wenige Zeilen
+# je Jahr; Parameter: Jahr, Typ). Ausgelassene Buchungen zählt SKIPPED_BOOKINGS_SQL
+# über idx_*_dates (Parameter: Jahresbereich aus `period_bounds()`).
+SKIPPED_BOOKINGS_SQL = """SELECT COUNT(*) as cnt FROM {table}
+   WHERE payment_date IS NULL
+     AND invoice_date IS NOT NULL
+     AND invoice_date >= ? AND invoice_date < ?"""
+
+CATEGORY_TOTALS_SQL = """SELECT c.name, c.eur_line, SUM(a.amount_cents) as total
+   FROM agg_period_category a
+   LEFT JOIN categories c ON a.category_id = c.id
+   WHERE a.year = ? AND a.type = ?
+   GROUP BY a.category_id
+   ORDER BY c.eur_line, c.name"""
+
+VAT_TOTALS_SQL = """SELECT SUM(vat_input_cents) as sum_input, SUM(vat_output_cents) as sum_output
+   FROM agg_period_category
+   WHERE year = ? AND type = ?"""
+
+
+def _percent_of(cents: int, percent: int) -> int:
+    """Prozentualer Anteil in ganzen Cent (kaufmännisch gerundet)."""
+    share = (abs(cents) * percent + 50) // 100
+    return -share if cents < 0 else share
 
 
 def cmd_summary(args):
     """Zeigt Kategorie-Zusammenfassung."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
+    try:
+        _print_summary(conn, args)
+    except sqlite3.OperationalError:
+        print(
+            "Fehler: Summentabelle fehlt. Bitte zuerst 'euer init' ausführen.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+def _print_summary(conn, args) -> None:
     config = load_config()
     tax_mode = get_tax_config(config)
 
     year = args.year or datetime.now().year
 
+    # Leere Summentabelle trotz Buchungen: nicht als 0,00 EUR ausgeben
+    if period_aggregates_missing(conn, year):
+        print(
+            f"Fehler: Summentabelle enthält keine Werte für {year}, obwohl Buchungen "
+            "vorliegen. Neu aufbauen mit 'euer db aggregates --rebuild'.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
     print(f"EÜR-Zusammenfassung {year}")
     print("=" * 50)
     print()
 
     # Hinweis auf ausgelassene Buchungen ohne Wertstellungsdatum
     skipped_expenses = conn.execute(
-        """SELECT COUNT(*) as cnt FROM expenses
-           WHERE payment_date IS NULL
-             AND invoice_date IS NOT NULL
-             AND strftime('%Y', invoice_date) = ?""",
-        (str(year),),
+        SKIPPED_BOOKINGS_SQL.format(table="expenses"), period_bounds(year)
     ).fetchone()["cnt"]
     skipped_income = conn.execute(
-        """SELECT COUNT(*) as cnt FROM income
-           WHERE payment_date IS NULL
-             AND invoice_date IS NOT NULL
-             AND strftime('%Y', invoice_date) = ?""",
-        (str(year),),
+        SKIPPED_BOOKINGS_SQL.format(table="income"), period_bounds(year)
     ).fetchone()["cnt"]
     skipped_total = skipped_expenses + skipped_income
     if skipped_total > 0:
@@ -50,45 +95,36 @@ def cmd_summary(args):
         print()
 
     # Ausgaben nach Kategorie
-    expenses = conn.execute(
-        """SELECT c.name, c.eur_line, SUM(e.amount_eur) as total
-           FROM expenses e
-           LEFT JOIN categories c ON e.category_id = c.id
-           WHERE e.payment_date IS NOT NULL
-             AND strftime('%Y', e.payment_date) = ?
-           GROUP BY c.id
-           ORDER BY c.eur_line, c.name""",
-        (str(year),),
-    ).fetchall()
+    expenses = conn.execute(CATEGORY_TOTALS_SQL, (year, "expense")).fetchall()
 
     print("Ausgaben nach Kategorie:")
-    expense_total = 0.0
-    bewirtung_total = 0.0
+    expense_total = 0
+    bewirtung_total = 0
     for r in expenses:
-        raw_total = r["total"] or 0.0
+        raw_total = r["total"] or 0
         display_total = raw_total
         if r["name"] == ENTERTAINMENT_CATEGORY:
             bewirtung_total += raw_total
-            display_total = raw_total * ENTERTAINMENT_DEDUCTIBLE_RATE
+            display_total = _percent_of(raw_total, ENTERTAINMENT_DEDUCTIBLE_PERCENT)
         if r["name"]:
             cat = f"{r['name']} ({r['eur_line']})" if r["eur_line"] else r["name"]
         else:
             cat = "Ohne Kategorie"
-        print(f"  {cat:<40} {display_total:>12.2f} EUR")
+        print(f"  {cat:<40} {cents_to_eur(display_total):>12.2f} EUR")
         expense_total += display_total
     print("  " + "-" * 54)
-    print(f"  {'GESAMT Ausgaben':<40} {expense_total:>12.2f} EUR")
+    print(f"  {'GESAMT Ausgaben':<40} {cents_to_eur(expense_total):>12.2f} EUR")
     print()
 
-    if bewirtung_total != 0.0:
-        deductible = bewirtung_total * ENTERTAINMENT_DEDUCTIBLE_RATE
+    if bewirtung_total != 0:
+        deductible = _percent_of(bewirtung_total, ENTERTAINMENT_DEDUCTIBLE_PERCENT)
         non_deductible = bewirtung_total - deductible
         print("Bewirtungsaufwendungen (70/30):")
-        print(f"  {'Gesamtbetrag (100%)':<40} {abs(bewirtung_total):>12.2f} EUR")
-        print(f"  {'Abziehbar (70%, Aufwand)':<40} {abs(deductible):>12.2f} EUR")
+        print(f"  {'Gesamtbetrag (100%)':<40} {cents_to_eur(abs(bewirtung_total)):>12.2f} EUR")
+        print(f"  {'Abziehbar (70%, Aufwand)':<40} {cents_to_eur(abs(deductible)):>12.2f} EUR")
         print(
             f"  {'Nicht abziehbar (30%, ELSTER)':<40} "
-            f"{abs(non_deductible):>12.2f} EUR"
+            f"{cents_to_eur(abs(non_deductible)):>12.2f} EUR"
         )
         print()
 
@@ -96,28 +132,16 @@ def cmd_summary(args):
 
     # Ausgaben: Vorsteuer (Input) und RC USt (Output)
     # Beachte: vat_output ist nun der korrekte Spaltenname (alt: vat_amount)
-    vat_stats_expenses = conn.execute(
-        """SELECT SUM(vat_input) as sum_input, SUM(vat_output) as sum_output
-           FROM expenses
-           WHERE payment_date IS NOT NULL
-             AND strftime('%Y', payment_date) = ?""",
-        (str(year),),
-    ).fetchone()
+    vat_stats_expenses = conn.execute(VAT_TOTALS_SQL, (year, "expense")).fetchone()
 
-    exp_vat_input = vat_stats_expenses["sum_input"] or 0.0
-    exp_vat_output = vat_stats_expenses["sum_output"] or 0.0
+    exp_vat_input = vat_stats_expenses["sum_input"] or 0
+    exp_vat_output = vat_stats_expenses["sum_output"] or 0
 
     # Einnahmen: USt (Output)
     # income hat nun auch vat_output
-    vat_stats_income = conn.execute(
-        """SELECT SUM(vat_output) as sum_output
-           FROM income
-           WHERE payment_date IS NOT NULL
-             AND strftime('%Y', payment_date) = ?""",
-        (str(year),),
-    ).fetchone()
+    vat_stats_income = conn.execute(VAT_TOTALS_SQL, (year, "income")).fetchone()
 
-    inc_vat_output = vat_stats_income["sum_output"] or 0.0
+    inc_vat_output = vat_stats_income["sum_output"] or 0
 
     total_vat_input = exp_vat_input
     total_vat_output = exp_vat_output + inc_vat_output
@@ -127,52 +151,46 @@ def cmd_summary(args):
         if total_vat_output != 0:
             print("Umsatzsteuer (Kleinunternehmer):")
             print(
-                f"  {'USt aus Reverse-Charge (Schuld)':<40} {total_vat_output:>12.2f} EUR"
+                f"  {'USt aus Reverse-Charge (Schuld)':<40} "
+                f"{cents_to_eur(total_vat_output):>12.2f} EUR"
             )
             print()
     else:
         # Regelbesteuerung
         print("Umsatzsteuer-Voranmeldung (Berechnung):")
         print(
-            f"  {'Umsatzsteuer (aus Einnahmen + RC)':<40} {total_vat_output:>12.2f} EUR"
+            f"  {'Umsatzsteuer (aus Einnahmen + RC)':<40} "
+            f"{cents_to_eur(total_vat_output):>12.2f} EUR"
         )
         print(
-            f"  {'Abziehbare Vorsteuer (aus Ausgaben)':<40} {-total_vat_input:>12.2f} EUR"
+            f"  {'Abziehbare Vorsteuer (aus Ausgaben)':<40} "
+            f"{cents_to_eur(-total_vat_input):>12.2f} EUR"
         )
         print("  " + "-" * 54)
         label = "ZAHLLAST" if vat_payment >= 0 else "ERSTATTUNG"
-        print(f"  {label:<40} {vat_payment:>12.2f} EUR")
+        print(f"  {label:<40} {cents_to_eur(vat_payment):>12.2f} EUR")
         print()
 
     # Einnahmen nach Kategorie
-    income = conn.execute(
-        """SELECT c.name, c.eur_line, SUM(i.amount_eur) as total
-           FROM income i
-           LEFT JOIN categories c ON i.category_id = c.id
-           WHERE i.payment_date IS NOT NULL
-             AND strftime('%Y', i.payment_date) = ?
-           GROUP BY c.id
-           ORDER BY c.eur_line, c.name""",
-        (str(year),),
-    ).fetchall()
+    income = conn.execute(CATEGORY_TOTALS_SQL, (year, "income")).fetchall()
 
     print("Einnahmen nach Kategorie:")
-    income_total = 0.0
+    income_total = 0
     for r in income:
         if r["name"]:
             cat = f"{r['name']} ({r['eur_line']})" if r["eur_line"] else r["name"]
         else:
             cat = "Ohne Kategorie"
-        print(f"  {cat:<40} {r['total']:>12.2f} EUR")
+        print(f"  {cat:<40} {cents_to_eur(r['total']):>12.2f} EUR")
         income_total += r["total"]
     print("  " + "-" * 54)
-    print(f"  {'GESAMT Einnahmen':<40} {income_total:>12.2f} EUR")
+    print(f"  {'GESAMT Einnahmen':<40} {cents_to_eur(income_total):>12.2f} EUR")
     print()
 
     print("  " + "=" * 54)
     result = income_total + expense_total  # expense_total ist negativ
     label = "GEWINN" if result >= 0 else "VERLUST"
-    print(f"  {label:<40} {result:>12.2f} EUR")
+    print(f"  {label:<40} {cents_to_eur(result):>12.2f} EUR")
 
     if args.include_private:
         summary = get_private_summary(conn, year=year)
@@ -186,5 +204,3 @@ def cmd_summary(args):
             f"  {'Privatentnahmen (Zeile 121)':<40} "
             f"{summary['withdrawals_total']:>12.2f} EUR"
         )
-
-    conn.close()
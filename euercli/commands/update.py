@@ -8,19 +8,18 @@ from ..config import (
     load_config,
     warn_missing_receipt,
 )
-from ..db import get_db_connection
 from ..importers import get_tax_config
 from ..services.errors import RecordNotFoundError, ValidationError
 from ..services.expenses import update_expense
 from ..services.income import update_income
 from ..services.private_transfers import UNSET, update_private_transfer
-from .helpers import warn_unusual_date_order
+from .helpers import open_database, warn_unusual_date_order
 
 
 def cmd_update_expense(args):
     """Aktualisiert eine Ausgabe."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
     private_accounts = get_private_accounts(config)
@@ -83,7 +82,7 @@ def cmd_update_expense(args):
 def cmd_update_income(args):
     """Aktualisiert eine Einnahme."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
     tax_mode = get_tax_config(config)
@@ -141,7 +140,7 @@ def cmd_update_income(args):
 def cmd_update_private_transfer(args):
     """Aktualisiert einen Privatvorgang."""
     db_path = Path(args.db)
-    conn = get_db_connection(db_path)
+    conn = open_database(db_path)
     config = load_config()
     audit_user = get_audit_user(config)
     related_expense_id: int | None | object = UNSET
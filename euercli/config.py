@@ -1,10 +1,20 @@
+import re
 import sys
 import tomllib
+from dataclasses import replace
 from pathlib import Path
 
 from .constants import CONFIG_PATH, DEFAULT_USER
+from .db import (
+    DATABASE_PROFILES,
+    DEFAULT_DATABASE_PROFILE,
+    JOURNAL_MODES,
+    SYNCHRONOUS_LEVELS,
+    TEMP_STORES,
+    DatabaseProfile,
+)
 from .services.errors import ValidationError
-from .services.models import LedgerAccount
+from .services.models import CategoryRule, LedgerAccount
 
 VALID_TAX_MODES = {"small_business", "standard"}
 
@@ -246,6 +256,189 @@ def get_ledger_accounts(config: dict) -> list[LedgerAccount]:
     return result
 
 
+_PROFILE_CHOICES = {
+    "journal_mode": JOURNAL_MODES,
+    "synchronous": SYNCHRONOUS_LEVELS,
+    "temp_store": TEMP_STORES,
+}
+_PROFILE_INTEGERS = ("cache_size", "mmap_size", "busy_timeout")
+
+
+def _database_section(config: dict) -> dict:
+    section = config.get("database", {})
+    if not isinstance(section, dict):
+        raise ValidationError(
+            "Ungültige Config: '[database]' muss eine Tabelle sein.",
+            code="invalid_database_config",
+        )
+    return section
+
+
+def _parse_database_profile(name: str, entry: object, base: DatabaseProfile) -> DatabaseProfile:
+    if not isinstance(entry, dict):
+        raise ValidationError(
+            f"Ungültiges Datenbankprofil '{name}': erwartete Tabelle.",
+            code="invalid_database_profile",
+            details={"profile": name},
+        )
+    values: dict[str, object] = {}
+    for key, value in entry.items():
+        if key in _PROFILE_CHOICES:
+            text = str(value).strip().upper()
+            if text not in _PROFILE_CHOICES[key]:
+                raise ValidationError(
+                    f"Datenbankprofil '{name}': ungültiger Wert für {key}: {value} "
+                    f"(erlaubt: {', '.join(_PROFILE_CHOICES[key])}).",
+                    code="invalid_database_profile",
+                    details={"profile": name, "key": key, "value": value},
+                )
+            values[key] = text
+        elif key in _PROFILE_INTEGERS:
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValidationError(
+                    f"Datenbankprofil '{name}': {key} muss eine Ganzzahl sein.",
+                    code="invalid_database_profile",
+                    details={"profile": name, "key": key, "value": value},
+                )
+            values[key] = value
+        else:
+            raise ValidationError(
+                f"Datenbankprofil '{name}': unbekannte Einstellung '{key}'.",
+                code="invalid_database_profile",
+                details={"profile": name, "key": key},
+            )
+    return replace(base, name=name, **values)
+
+
+def get_database_profile(config: dict, name: str | None = None) -> DatabaseProfile:
+    """Liefert ein Performance-Profil für SQLite-Verbindungen (`[database]`).
+
+    Ohne `name` gilt `[database] profile` (Standard: `safe`). Eingebaute Profile
+    (`safe`, `fast`, `bulk`) lassen sich unter `[database.profiles.<name>]`
+    teilweise überschreiben; dort können auch eigene Profile stehen.
+    """
+    section = _database_section(config)
+    name = str(name or section.get("profile") or DEFAULT_DATABASE_PROFILE).strip().lower()
+    custom = section.get("profiles", {})
+    if not isinstance(custom, dict):
+        raise ValidationError(
+            "Ungültige Config: '[database.profiles]' muss eine Tabelle sein.",
+            code="invalid_database_config",
+        )
+    base = DATABASE_PROFILES.get(name)
+    if name in custom:
+        return _parse_database_profile(name, custom[name], base or DatabaseProfile(name=name))
+    if base is None:
+        known = sorted(set(DATABASE_PROFILES) | set(custom))
+        raise ValidationError(
+            f"Unbekanntes Datenbankprofil '{name}' (verfügbar: {', '.join(known)}).",
+            code="unknown_database_profile",
+            details={"profile": name},
+        )
+    return base
+
+
+def get_bulk_database_profile(config: dict) -> DatabaseProfile | None:
+    """Profil für Massenimporte und Reconcile (`[database] bulk_profile`), sonst None."""
+    name = _database_section(config).get("bulk_profile")
+    if not name:
+        return None
+    return get_database_profile(config, str(name))
+
+
+def _optional_rule_text(entry: dict, key: str) -> str | None:
+    value = entry.get(key)
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def get_category_rules(config: dict) -> list[CategoryRule]:
+    """Lädt die Regeln zur automatischen Kategorisierung (`[[category_rules]]`)."""
+    raw_rules = config.get("category_rules")
+    if not raw_rules:
+        return []
+    if not isinstance(raw_rules, list):
+        raise ValidationError(
+            "Ungültige Config: 'category_rules' muss eine Liste von Tabellen sein.",
+            code="invalid_category_rules",
+        )
+
+    result: list[CategoryRule] = []
+    for index, entry in enumerate(raw_rules, start=1):
+        if not isinstance(entry, dict):
+            raise ValidationError(
+                f"Ungültige Regel #{index}: erwartete Tabelle.",
+                code="invalid_category_rule",
+                details={"index": index},
+            )
+
+        rule_type = str(entry.get("type", "expense")).strip().lower()
+        if rule_type not in ("expense", "income"):
+            raise ValidationError(
+                f"Ungültige Regel #{index}: type muss 'expense' oder 'income' sein.",
+                code="invalid_category_rule",
+                details={"index": index, "field": "type"},
+            )
+
+        rule = CategoryRule(
+            type=rule_type,
+            category=_optional_rule_text(entry, "category"),
+            ledger_account=_optional_rule_text(entry, "ledger_account"),
+            vendor=_optional_rule_text(entry, "vendor"),
+            vendor_regex=_optional_rule_text(entry, "vendor_regex"),
+            account=_optional_rule_text(entry, "account"),
+        )
+        if not rule.category and not rule.ledger_account:
+            raise ValidationError(
+                f"Ungültige Regel #{index}: category oder ledger_account erforderlich.",
+                code="category_rule_missing_target",
+                details={"index": index},
+            )
+
+        for key in ("amount_min", "amount_max"):
+            value = entry.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValidationError(
+                    f"Ungültige Regel #{index}: {key} muss eine Zahl sein.",
+                    code="invalid_category_rule",
+                    details={"index": index, "field": key},
+                )
+            setattr(rule, key, float(value))
+
+        conditions = (
+            rule.vendor,
+            rule.vendor_regex,
+            rule.account,
+            rule.amount_min,
+            rule.amount_max,
+        )
+        if all(condition is None for condition in conditions):
+            raise ValidationError(
+                f"Ungültige Regel #{index}: mindestens eine Bedingung erforderlich "
+                "(vendor, vendor_regex, account, amount_min, amount_max).",
+                code="category_rule_missing_condition",
+                details={"index": index},
+            )
+
+        if rule.vendor_regex:
+            try:
+                re.compile(rule.vendor_regex)
+            except re.error as exc:
+                raise ValidationError(
+                    f"Ungültige Regel #{index}: vendor_regex '{rule.vendor_regex}' ({exc}).",
+                    code="invalid_category_rule",
+                    details={"index": index, "field": "vendor_regex"},
+                ) from exc
+
+        result.append(rule)
+
+    return result
+
+
 def resolve_receipt_path(
     receipt_name: str,
     date: str | None,  # YYYY-MM-DD
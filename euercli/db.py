@@ -1,27 +1,181 @@
 import json
 import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Optional
 
 from .constants import DEFAULT_USER
 
 
-def get_db_connection(db_path: Path) -> sqlite3.Connection:
-    """Erstellt eine Datenbankverbindung mit Row-Factory."""
-    conn = sqlite3.connect(db_path)
+@dataclass
+class DatabaseProfile:
+    """PRAGMA-Einstellungen einer Verbindung (None = unverändert lassen)."""
+
+    name: str
+    journal_mode: str | None = None
+    synchronous: str | None = None
+    cache_size: int | None = None
+    mmap_size: int | None = None
+    temp_store: str | None = None
+    busy_timeout: int | None = None
+
+
+# Eingebaute Profile; `[database.profiles.<name>]` in der Config kann sie
+# überschreiben oder eigene ergänzen. None = SQLite-Standard beibehalten.
+DATABASE_PROFILES = {
+    "safe": DatabaseProfile(name="safe", synchronous="FULL", busy_timeout=5000),
+    "fast": DatabaseProfile(
+        name="fast",
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-65536,
+        mmap_size=256 * 1024 * 1024,
+        temp_store="MEMORY",
+        busy_timeout=5000,
+    ),
+    # Nur für wiederholbare Massenimporte: ohne fsync kann ein Stromausfall
+    # die letzten Transaktionen kosten. Ohne WAL wird OFF auf NORMAL
+    # angehoben, da im Rollback-Journal sonst die Datei beschädigt werden kann
+    "bulk": DatabaseProfile(
+        name="bulk",
+        journal_mode="WAL",
+        synchronous="OFF",
+        cache_size=-262144,
+        mmap_size=1024 * 1024 * 1024,
+        temp_store="MEMORY",
+        busy_timeout=30000,
+    ),
+}
+DEFAULT_DATABASE_PROFILE = "safe"
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+
+
+def _uses_wal(conn: sqlite3.Connection) -> bool:
+    return str(conn.execute("PRAGMA journal_mode").fetchone()[0]).lower() == "wal"
+
+
+def apply_database_profile(
+    conn: sqlite3.Connection, profile: DatabaseProfile, *, read_only: bool = False
+) -> None:
+    """Setzt die PRAGMAs eines Profils (Werte sind per Config-Validierung geprüft).
+
+    `journal_mode` wird bei read-only Verbindungen übergangen, `synchronous`
+    innerhalb einer offenen Transaktion (SQLite erlaubt dort keinen Wechsel).
+    `synchronous = OFF` gilt nur im WAL-Modus, sonst wird NORMAL gesetzt.
+    """
+    if profile.journal_mode and not read_only:
+        conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+    if profile.synchronous and not conn.in_transaction:
+        synchronous = profile.synchronous
+        if synchronous == "OFF" and not _uses_wal(conn):
+            synchronous = "NORMAL"
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+    if profile.cache_size is not None:
+        conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    if profile.mmap_size is not None:
+        conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    if profile.temp_store:
+        conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+    if profile.busy_timeout is not None:
+        conn.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout)}")
+
+
+def read_database_profile(conn: sqlite3.Connection) -> DatabaseProfile:
+    """Liest die aktuell wirksamen PRAGMA-Werte einer Verbindung."""
+
+    def pragma(name: str) -> object:
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    return DatabaseProfile(
+        name="current",
+        journal_mode=str(pragma("journal_mode")).upper(),
+        synchronous=SYNCHRONOUS_LEVELS[int(pragma("synchronous"))],
+        cache_size=int(pragma("cache_size")),
+        mmap_size=int(pragma("mmap_size")),
+        temp_store=TEMP_STORES[int(pragma("temp_store"))],
+        busy_timeout=int(pragma("busy_timeout")),
+    )
+
+
+def get_db_connection(
+    db_path: Path,
+    read_only: bool = False,
+    profile: DatabaseProfile | None = None,
+) -> sqlite3.Connection:
+    """Erstellt eine Datenbankverbindung mit Row-Factory.
+
+    Mit `read_only=True` wird die Datei im SQLite-Modus `ro` geöffnet;
+    Schreibversuche schlagen dann fehl (TEMP-Tabellen bleiben möglich).
+    Ohne `profile` gilt `safe`; Befehle übergeben das Profil aus der Config
+    (`commands.helpers.open_database`).
+    """
+    if read_only:
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
+    apply_database_profile(
+        conn, profile or DATABASE_PROFILES[DEFAULT_DATABASE_PROFILE], read_only=read_only
+    )
     return conn
 
 
+@contextmanager
+def database_profile(
+    conn: sqlite3.Connection, profile: DatabaseProfile | None
+) -> Iterator[None]:
+    """Wechselt für die Dauer eines Blocks auf ein anderes Profil (z.B. `bulk`).
+
+    `journal_mode` bleibt unverändert, da ein Wechsel dauerhaft in der Datei
+    gespeichert würde; `synchronous = OFF` greift daher nur, wenn die Datenbank
+    bereits im WAL-Modus ist (sonst NORMAL). Der Block sollte außerhalb einer Transaktion beginnen
+    und selbst committen; danach gelten wieder die vorherigen Werte.
+    Ohne `profile` passiert nichts.
+    """
+    if profile is None:
+        yield
+        return
+    previous = replace(read_database_profile(conn), journal_mode=None)
+    apply_database_profile(conn, replace(profile, journal_mode=None))
+    try:
+        yield
+    finally:
+        apply_database_profile(conn, previous)
+
+
+@contextmanager
+def savepoint(conn: sqlite3.Connection, name: str) -> Iterator[None]:
+    """Führt einen Block in einem SAVEPOINT aus.
+
+    Bei einer Exception wird nur bis zum Savepoint zurückgerollt; die
+    umgebende Transaktion bleibt offen. Ohne laufende Transaktion wird vorher
+    eine begonnen, damit RELEASE nicht selbst committet.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except BaseException:
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
+        raise
+    conn.execute(f"RELEASE {name}")
+
+
 def log_audit(
     conn: sqlite3.Connection,
     table_name: str,
     record_id: int,
     action: str,
     record_uuid: str | None = None,
-    old_data: Optional[dict] = None,
-    new_data: Optional[dict] = None,
+    old_data: dict | None = None,
+    new_data: dict | None = None,
     user: str = DEFAULT_USER,
 ) -> None:
     """Schreibt einen Audit-Log-Eintrag.
@@ -44,9 +198,39 @@ def log_audit(
     )
 
 
+def log_audit_many(
+    conn: sqlite3.Connection,
+    table_name: str,
+    action: str,
+    entries: Iterable[tuple[int, str | None, dict | None, dict | None]],
+    user: str = DEFAULT_USER,
+) -> None:
+    """Schreibt mehrere Audit-Log-Einträge mit einem executemany.
+
+    Args:
+        entries: Tupel aus (record_id, record_uuid, old_data, new_data)
+    """
+    conn.executemany(
+        """INSERT INTO audit_log (table_name, record_id, record_uuid, action, old_data, new_data, user)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (
+            (
+                table_name,
+                record_id,
+                record_uuid,
+                action,
+                json.dumps(old_data, ensure_ascii=False) if old_data else None,
+                json.dumps(new_data, ensure_ascii=False) if new_data else None,
+                user,
+            )
+            for record_id, record_uuid, old_data, new_data in entries
+        ),
+    )
+
+
 def get_category_id(
     conn: sqlite3.Connection, name: str, cat_type: str
-) -> Optional[int]:
+) -> int | None:
     """Sucht Kategorie-ID nach Name (case-insensitive)."""
     row = conn.execute(
         "SELECT id FROM categories WHERE LOWER(name) = LOWER(?) AND type = ?",
@@ -67,6 +251,68 @@ def get_category_name_with_line(conn: sqlite3.Connection, category_id: int) -> s
     return row["name"]
 
 
+# Aus Datum/Beträgen abgeleitet (siehe SCHEMA); nicht Teil von Audit-Snapshots
+GENERATED_COLUMNS = frozenset(
+    {
+        "booking_date",
+        "amount_cents",
+        "vat_input_cents",
+        "vat_output_cents",
+    }
+)
+
+
+# Von `euer init` angelegte Tabellen (Bezeichnung für Fehlermeldungen)
+REQUIRED_TABLES = {
+    "categories": "Tabelle categories",
+    "expenses": "Tabelle expenses",
+    "income": "Tabelle income",
+    "private_transfers": "Tabelle private_transfers",
+    "agg_period_category": "Summentabelle",
+}
+
+
+# Von `euer init` ergänzte generierte Spalten, auf die Filter und Summen zugreifen
+REQUIRED_COLUMNS = {
+    "expenses": ("booking_date", "amount_cents", "vat_input_cents", "vat_output_cents"),
+    "income": ("booking_date", "amount_cents", "vat_output_cents"),
+    "private_transfers": ("amount_cents",),
+}
+
+
+def find_schema_gaps(conn: sqlite3.Connection) -> list[str]:
+    """Listet fehlende Strukturen, die erst `euer init` anlegt (leer = aktuell)."""
+    tables = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    gaps = [f"{label} fehlt" for name, label in REQUIRED_TABLES.items() if name not in tables]
+    for table_name, required in REQUIRED_COLUMNS.items():
+        if table_name not in tables:
+            continue
+        # Generierte Spalten sind nur über table_xinfo sichtbar
+        columns = {
+            row[1]: str(row[2]).upper()
+            for row in conn.execute(f"PRAGMA table_xinfo({table_name})")
+        }
+        gaps.extend(
+            f"Spalte {table_name}.{column} fehlt" for column in required if column not in columns
+        )
+        # Hex-Hashes (TEXT) neben 16-Byte-BLOBs würden die Duplikatprüfung
+        # aushebeln; TEXT sortiert vor BLOB, die Abfrage nutzt den UNIQUE-Index
+        if columns.get("hash") != "BLOB" or conn.execute(
+            f"SELECT 1 FROM {table_name} WHERE hash >= '' AND hash < x'' LIMIT 1"
+        ).fetchone():
+            gaps.append(f"Spalte {table_name}.hash noch im Textformat")
+    return gaps
+
+
 def row_to_dict(row: sqlite3.Row) -> dict:
-    """Konvertiert sqlite3.Row zu dict."""
-    return dict(row)
+    """Konvertiert sqlite3.Row zu dict (BLOB-Werte wie der Hash als Hex).
+
+    Generierte Spalten (`GENERATED_COLUMNS`) werden ausgelassen.
+    """
+    return {
+        key: value.hex() if isinstance(value, bytes) else value
+        for key, value in dict(row).items()
+        if key not in GENERATED_COLUMNS
+    }
@@ -1,8 +1,31 @@
+import bz2
 import csv
+import gzip
+import io
 import json
+import lzma
+import os
+import queue
+import re
+import shutil
 import sys
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+from xml.etree import ElementTree
 
-from .utils import parse_amount, parse_bool
+from .utils import (
+    AmbiguousAmountError,
+    AmountParser,
+    iter_batches,
+    parse_amount,
+    parse_bool,
+)
 
 
 def get_row_value(row: dict, *keys: str) -> object | None:
@@ -67,107 +90,1053 @@ def get_tax_config(config: dict) -> str:
     return config.get("tax", {}).get("mode", "small_business")
 
 
-def normalize_import_row(row: dict) -> dict:
-    """Normalisiert Importzeile auf kanonische Keys."""
-    raw_type = get_row_value(row, "type", "kind", "direction", "Typ")
-    amount_value = get_row_value(
-        row, "amount_eur", "amount", "EUR", "Betrag", "Betrag in EUR"
-    )
-    amount = parse_amount(amount_value)
+def _checked_iso(text: str) -> str | None:
+    try:
+        # Rückgabe über isoformat(): liefert immer YYYY-MM-DD (auch bei "2026-W03-1")
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        return None
+
+
+def _parse_iso_date(text: str) -> str | None:
+    """YYYY-MM-DD, optional mit Uhrzeit ("2025-03-19T10:00:00", "2025-03-19 10:00")."""
+    if len(text) < 10 or text[4] != "-" or text[7] != "-":
+        return None
+    if len(text) > 10 and text[10] not in "T ":
+        return None
+    return _checked_iso(text[:10])
+
+
+def _parse_german_date(text: str) -> str | None:
+    """TT.MM.JJJJ, auch ohne führende Nullen, zweistelliges Jahr oder mit Uhrzeit."""
+    if len(text) == 10 and text[2] == "." and text[5] == ".":
+        return _checked_iso(f"{text[6:10]}-{text[3:5]}-{text[:2]}")
+    day, _, rest = text.partition(" ")[0].partition(".")
+    month, _, year = rest.partition(".")
+    if not (day.isdigit() and month.isdigit() and year.isdigit()):
+        return None
+    if len(year) == 2:
+        year = f"20{year}"
+    if len(day) > 2 or len(month) > 2 or len(year) != 4:
+        return None
+    return _checked_iso(f"{year}-{month:0>2}-{day:0>2}")
+
+
+def _parse_compact_date(text: str) -> str | None:
+    """JJJJMMTT (z.B. aus Bank-Exporten)."""
+    if len(text) != 8 or not text.isdigit():
+        return None
+    return _checked_iso(f"{text[:4]}-{text[4:6]}-{text[6:]}")
+
+
+_DATE_PARSERS = (_parse_iso_date, _parse_german_date, _parse_compact_date)
+# Namen der Formate für Import-Checkpoints
+_DATE_FORMAT_NAMES = {
+    _parse_iso_date: "iso",
+    _parse_german_date: "de",
+    _parse_compact_date: "compact",
+}
+_DATE_PARSERS_BY_NAME = {name: parser for parser, name in _DATE_FORMAT_NAMES.items()}
+
+
+def is_iso_date(value: object) -> bool:
+    """Prüft, ob ein Wert bereits ein gültiges Datum im Format YYYY-MM-DD ist."""
+    return isinstance(value, str) and len(value) == 10 and _checked_iso(value) == value
+
+
+class ImportDateNormalizer:
+    """Wandelt Datumswerte einer Importdatei in ISO-Daten (YYYY-MM-DD) um.
+
+    Je Spalte wird das zuletzt erkannte Format gemerkt und zuerst probiert;
+    da eine Datei praktisch immer ein einheitliches Format hat, bleibt es pro
+    Wert bei einem String-Slice und einer Kalenderprüfung. Nicht erkannte
+    Werte werden unverändert zurückgegeben und von
+    `get_missing_import_fields()` als ungültig gemeldet. `formats` (Spalte →
+    Formatname) setzt die Formate eines früheren Laufs fort.
+    """
+
+    def __init__(self, formats: dict[str, str] | None = None) -> None:
+        self._guesses: dict[str, object] = {
+            column: _DATE_PARSERS_BY_NAME[name]
+            for column, name in (formats or {}).items()
+            if name in _DATE_PARSERS_BY_NAME
+        }
+
+    @property
+    def formats(self) -> dict[str, str]:
+        """Zuletzt erkanntes Format je Spalte ("iso", "de", "compact")."""
+        return {column: _DATE_FORMAT_NAMES[parser] for column, parser in self._guesses.items()}
+
+    def normalize(self, column: str, value: object) -> object | None:
+        if value is None:
+            return None
+        text = str(value).strip()
+        guess = self._guesses.get(column)
+        if guess is not None:
+            result = guess(text)
+            if result is not None:
+                return result
+        for parser in _DATE_PARSERS:
+            if parser is guess:
+                continue
+            result = parser(text)
+            if result is not None:
+                self._guesses[column] = parser
+                return result
+        return value
+
 
-    row_type = parse_import_type(raw_type)
-    if not row_type and amount is not None:
-        if amount < 0:
-            row_type = "expense"
-        elif amount > 0:
-            row_type = "income"
+# Für Einzelwerte außerhalb eines Imports; das erkannte Format bleibt gemerkt
+_DATE_NORMALIZER = ImportDateNormalizer()
 
-    category_value = get_row_value(row, "category", "category_name", "Kategorie")
 
-    payment_date = get_row_value(
-        row,
+def normalize_import_date(value: object) -> object | None:
+    """Normalisiert einen einzelnen Datumswert (siehe `ImportDateNormalizer`)."""
+    return _DATE_NORMALIZER.normalize("date", value)
+
+
+IMPORT_FIELD_ALIASES: dict[str, tuple[str, ...]] = {
+    "type": ("type", "kind", "direction", "Typ"),
+    "amount_eur": ("amount_eur", "amount", "EUR", "Betrag", "Betrag in EUR"),
+    "category": ("category", "category_name", "Kategorie"),
+    "payment_date": (
         "payment_date",
         "value_date",
         "date",
         "Datum",
         "Wertstellung",
         "Wertstellungsdatum",
+    ),
+    "invoice_date": ("invoice_date", "Rechnungsdatum", "Rechnung", "invoice"),
+    "party": (
+        "party",
+        "vendor",
+        "source",
+        "counterparty",
+        "Lieferant",
+        "Quelle",
+        "Partei",
+    ),
+    "account": ("account", "Konto"),
+    "ledger_account": ("ledger_account", "ledger", "Buchungskonto", "konto"),
+    "foreign_amount": ("foreign_amount", "foreign", "Fremdwährung", "Fremdwaehrung"),
+    "receipt_name": ("receipt_name", "receipt", "Belegname", "Beleg"),
+    "notes": ("notes", "Bemerkung", "Notiz"),
+    "rc": ("rc", "is_rc", "RC"),
+    "private_paid": ("private_paid", "Privat bezahlt"),
+    "vat_input": ("vat_input", "Vorsteuer", "USt-VA"),
+    "vat_output": ("vat_output", "Umsatzsteuer"),
+    "idempotency_key": ("idempotency_key", "Idempotency-Key"),
+}
+
+
+@dataclass(frozen=True)
+class ImportHeaderPlan:
+    """Aufgelöste Spaltenzuordnung eines Dateikopfs (kanonisches Feld → Quellspalten).
+
+    Je Feld sind nur die tatsächlich vorhandenen Quellspalten in Alias-Reihenfolge
+    hinterlegt; pro Zeile sind damit nur noch direkte Lookups nötig.
+    """
+
+    columns: dict[str, tuple[str, ...]]
+    unmapped: tuple[str, ...] = ()
+
+    def describe(self) -> list[str]:
+        """Gibt die Zuordnung als lesbare Zeilen zurück (Debugging)."""
+        lines = []
+        for field_name in IMPORT_FIELD_ALIASES:
+            sources = self.columns.get(field_name, ())
+            mapped = ", ".join(repr(source) for source in sources) if sources else "-"
+            lines.append(f"{field_name:<15} ← {mapped}")
+        if self.unmapped:
+            lines.append("Nicht zugeordnet: " + ", ".join(repr(c) for c in self.unmapped))
+        return lines
+
+
+def compile_header_plan(fieldnames: Iterable[object]) -> ImportHeaderPlan:
+    """Löst einen Dateikopf einmalig in eine Spaltenzuordnung auf.
+
+    Berücksichtigt wie `get_row_value()` auch BOM-präfixierte Spaltennamen.
+    """
+    available = [name for name in fieldnames if isinstance(name, str)]
+    available_set = set(available)
+    used: set[str] = set()
+    columns: dict[str, tuple[str, ...]] = {}
+    for field_name, aliases in IMPORT_FIELD_ALIASES.items():
+        sources = []
+        for alias in aliases:
+            for candidate in (alias, f"\ufeff{alias}"):
+                if candidate in available_set and candidate not in sources:
+                    sources.append(candidate)
+        if sources:
+            columns[field_name] = tuple(sources)
+            used.update(sources)
+    unmapped = tuple(name for name in available if name not in used)
+    return ImportHeaderPlan(columns=columns, unmapped=unmapped)
+
+
+def _plan_value(row: dict, sources: tuple[str, ...]) -> object | None:
+    for source in sources:
+        value = row.get(source)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                continue
+        return value
+    return None
+
+
+_AMOUNT_FIELDS = ("amount_eur", "vat_input", "vat_output")
+
+
+def new_amount_parsers(
+    number_formats: dict[str, Iterable[str]] | None = None,
+) -> dict[str, AmountParser]:
+    """Je Betragsspalte ein eigener Parser (das Zahlenformat gilt pro Spalte).
+
+    `number_formats` (Spalte → erkannte Formate) setzt einen früheren Lauf fort.
+    """
+    number_formats = number_formats or {}
+    return {
+        field_name: AmountParser(
+            [name for name in number_formats.get(field_name, ()) if name in ("de", "en")]
+        )
+        for field_name in _AMOUNT_FIELDS
+    }
+
+
+def _parse_import_amount(parser: AmountParser, value: object) -> float | str | None:
+    try:
+        return parser.parse(value)
+    except AmbiguousAmountError:
+        # Unverändert lassen; get_missing_import_fields() meldet den Wert
+        return str(value)
+
+
+def _type_from_amount(amount: float) -> str | None:
+    # Ohne Typspalte: Vorzeichen entscheidet
+    if amount < 0:
+        return "expense"
+    if amount > 0:
+        return "income"
+    return None
+
+
+def normalize_import_row(
+    row: dict,
+    plan: ImportHeaderPlan | None = None,
+    dates: ImportDateNormalizer | None = None,
+    amounts: dict[str, AmountParser] | None = None,
+) -> dict:
+    """Normalisiert Importzeile auf kanonische Keys.
+
+    Ohne `plan` wird die Zuordnung aus den Keys der Zeile abgeleitet; für ganze
+    Dateien sollte der Plan einmal mit `compile_header_plan()` erzeugt werden.
+    Ebenso sollten `dates` und `amounts` (`new_amount_parsers()`) je Datei
+    wiederverwendet werden, damit Datums- und Zahlenformat nur einmal erkannt
+    werden.
+    """
+    if plan is None:
+        plan = compile_header_plan(row.keys())
+    if dates is None:
+        dates = ImportDateNormalizer()
+    if amounts is None:
+        amounts = new_amount_parsers()
+    columns = plan.columns
+    empty: tuple[str, ...] = ()
+
+    amount = _parse_import_amount(
+        amounts["amount_eur"], _plan_value(row, columns.get("amount_eur", empty))
     )
-    invoice_date = get_row_value(
-        row,
-        "invoice_date",
-        "Rechnungsdatum",
-        "Rechnung",
-        "invoice",
+
+    row_type = parse_import_type(_plan_value(row, columns.get("type", empty)))
+    if not row_type and isinstance(amount, float):
+        row_type = _type_from_amount(amount)
+
+    payment_date = dates.normalize(
+        "payment_date", _plan_value(row, columns.get("payment_date", empty))
     )
 
     return {
         "type": row_type,
         "date": payment_date,
         "payment_date": payment_date,
-        "invoice_date": invoice_date,
-        "party": get_row_value(
-            row,
-            "party",
-            "vendor",
-            "source",
-            "counterparty",
-            "Lieferant",
-            "Quelle",
-            "Partei",
-        ),
-        "category": normalize_category_name(category_value),
-        "amount_eur": amount,
-        "account": get_row_value(row, "account", "Konto"),
-        "ledger_account": get_row_value(
-            row,
-            "ledger_account",
-            "ledger",
-            "Buchungskonto",
-            "konto",
-        ),
-        "foreign_amount": get_row_value(
-            row, "foreign_amount", "foreign", "Fremdwährung", "Fremdwaehrung"
+        "invoice_date": dates.normalize(
+            "invoice_date", _plan_value(row, columns.get("invoice_date", empty))
         ),
-        "receipt_name": get_row_value(
-            row, "receipt_name", "receipt", "Belegname", "Beleg"
+        "party": _plan_value(row, columns.get("party", empty)),
+        "category": normalize_category_name(
+            _plan_value(row, columns.get("category", empty))
         ),
-        "notes": get_row_value(row, "notes", "Bemerkung", "Notiz"),
-        "rc": parse_bool(get_row_value(row, "rc", "is_rc", "RC")),
-        "private_paid": parse_bool(
-            get_row_value(row, "private_paid", "Privat bezahlt")
+        "amount_eur": amount,
+        "account": _plan_value(row, columns.get("account", empty)),
+        "ledger_account": _plan_value(row, columns.get("ledger_account", empty)),
+        "foreign_amount": _plan_value(row, columns.get("foreign_amount", empty)),
+        "receipt_name": _plan_value(row, columns.get("receipt_name", empty)),
+        "notes": _plan_value(row, columns.get("notes", empty)),
+        "rc": parse_bool(_plan_value(row, columns.get("rc", empty))),
+        "private_paid": parse_bool(_plan_value(row, columns.get("private_paid", empty))),
+        "vat_input": _parse_import_amount(
+            amounts["vat_input"], _plan_value(row, columns.get("vat_input", empty))
         ),
-        "vat_input": parse_amount(
-            get_row_value(row, "vat_input", "Vorsteuer", "USt-VA")
+        "vat_output": _parse_import_amount(
+            amounts["vat_output"], _plan_value(row, columns.get("vat_output", empty))
         ),
-        "vat_output": parse_amount(get_row_value(row, "vat_output", "Umsatzsteuer")),
+        "idempotency_key": _plan_value(row, columns.get("idempotency_key", empty)),
         "raw_data": row,
     }
 
 
-def iter_import_rows(path: str, fmt: str) -> list[dict]:
-    """Lädt Importdaten aus Datei oder stdin."""
-    rows: list[dict] = []
+def get_missing_import_fields(normalized: dict) -> list[str]:
+    """Gibt die fehlenden Pflichtfelder einer normalisierten Importzeile zurück."""
+    missing_fields = []
+    if not normalized["type"]:
+        missing_fields.append("type")
+    if not normalized["payment_date"] and not normalized["invoice_date"]:
+        missing_fields.append("payment_date|invoice_date")
+    for field_name in ("payment_date", "invoice_date"):
+        value = normalized[field_name]
+        if value and not is_iso_date(value):
+            missing_fields.append(f"{field_name} (ungültiges Datum: {value})")
+    for field_name in _AMOUNT_FIELDS:
+        value = normalized[field_name]
+        if isinstance(value, str):
+            missing_fields.append(f"{field_name} (mehrdeutiger Betrag: {value})")
+    if normalized["amount_eur"] is None:
+        missing_fields.append("amount_eur")
+    if not normalized["party"]:
+        missing_fields.append("party")
+    return missing_fields
+
+
+@dataclass
+class ImportFormats:
+    """Erkannte Datums- und Zahlenformate einer Importdatei.
+
+    Ein fortgesetzter Import (`--resume`) lädt sie aus dem Checkpoint, damit
+    er dieselben Werte speichert wie ein ununterbrochener Lauf.
+    """
+
+    dates: ImportDateNormalizer = field(default_factory=ImportDateNormalizer)
+    amounts: dict[str, AmountParser] = field(default_factory=new_amount_parsers)
+
+    def to_dict(self) -> dict:
+        return {
+            "dates": self.dates.formats,
+            "amounts": {
+                field_name: list(parser.learned_formats)
+                for field_name, parser in self.amounts.items()
+                if parser.learned_formats
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "ImportFormats":
+        data = data or {}
+        return cls(
+            dates=ImportDateNormalizer(data.get("dates")),
+            amounts=new_amount_parsers(data.get("amounts")),
+        )
+
+
+def iter_normalized_rows(
+    rows: Iterable[dict],
+    start: int = 1,
+    amounts: dict[str, AmountParser] | None = None,
+    dates: ImportDateNormalizer | None = None,
+) -> Iterator[tuple[int, dict]]:
+    """Normalisiert Importzeilen als Generator (Zeilennummer ab `start`).
+
+    Die Spaltenzuordnung wird nur neu aufgelöst, wenn sich die Keys ändern
+    (bei CSV also genau einmal pro Datei); erkanntes Datums- und Zahlenformat
+    gelten ebenfalls für die ganze Datei.
+    """
+    plan: ImportHeaderPlan | None = None
+    plan_keys = None
+    if dates is None:
+        dates = ImportDateNormalizer()
+    if amounts is None:
+        amounts = new_amount_parsers()
+    for idx, row in enumerate(rows, start=start):
+        if plan is None or row.keys() != plan_keys:
+            plan = compile_header_plan(row.keys())
+            plan_keys = row.keys()
+        yield idx, normalize_import_row(row, plan, dates, amounts)
+
+
+def _iter_stream_rows(stream, fmt: str) -> Iterator[dict]:
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        yield json.loads(line)
+
+
+_COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+_COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+_DECOMPRESSORS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+def _compression_from_magic(head: bytes) -> str | None:
+    for magic, compression in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def detect_compression(path: str) -> str | None:
+    """Erkennt gzip/bz2/xz anhand der Dateiendung oder der Magic Bytes.
+
+    Returns:
+        'gzip', 'bz2', 'xz' oder None (unkomprimiert)
+    """
+    compression = _COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if compression:
+        return compression
+    with open(path, "rb") as f:
+        return _compression_from_magic(f.read(6))
+
+
+def open_import_source(path: str):
+    """Öffnet eine Importquelle binär und entpackt sie bei Bedarf beim Lesen.
+
+    `path == "-"` liest von stdin; die Kompression wird dort über die Magic
+    Bytes erkannt. Es entstehen keine temporären entpackten Dateien.
+    """
     if path == "-":
-        stream = sys.stdin
-        if fmt == "csv":
-            reader = csv.DictReader(stream)
-            rows.extend(reader)
-        else:
-            for line in stream:
-                if not line.strip():
-                    continue
-                rows.append(json.loads(line))
-        return rows
-
-    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
-    with open(path, "r", encoding=encoding) as f:
-        if fmt == "csv":
-            reader = csv.DictReader(f)
-            rows.extend(reader)
-        else:
-            for line in f:
+        stream = sys.stdin.buffer
+        compression = _compression_from_magic(stream.peek(6)[:6])
+        if compression is None:
+            return stream
+        return _DECOMPRESSORS[compression](stream, "rb")
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, "rb")
+    return _DECOMPRESSORS[compression](path, "rb")
+
+
+def _import_encoding(fmt: str) -> str:
+    return "utf-8-sig" if fmt == "csv" else "utf-8"
+
+
+class ImportFormatError(ValueError):
+    """Strukturfehler in einer Importdatei (z.B. ungültige MT940-Zeile)."""
+
+
+# Fehler, die beim Lesen einer Importquelle auftreten können
+IMPORT_READ_ERRORS = (
+    OSError,
+    UnicodeDecodeError,
+    csv.Error,
+    json.JSONDecodeError,
+    ElementTree.ParseError,
+    ImportFormatError,
+)
+
+
+def _canonical_row(**values: object) -> dict:
+    """Erzeugt eine Zeile im Format von `normalize_import_row()` (ohne raw_data)."""
+    row: dict = dict.fromkeys(IMPORT_FIELD_ALIASES)
+    row.update(rc=False, private_paid=False)
+    row.update(values)
+    row["date"] = row["payment_date"]
+    return row
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _child(elem: ElementTree.Element | None, *path: str) -> ElementTree.Element | None:
+    """Sucht einen Kindpfad unabhängig vom CAMT-Namespace (camt.053.001.02 bis .08)."""
+    for name in path:
+        if elem is None:
+            return None
+        elem = next((c for c in elem if _local_name(c.tag) == name), None)
+    return elem
+
+
+def _child_text(elem: ElementTree.Element | None, *path: str) -> str | None:
+    found = _child(elem, *path)
+    if found is None or found.text is None:
+        return None
+    return found.text.strip() or None
+
+
+def _children(elem: ElementTree.Element | None, name: str) -> list[ElementTree.Element]:
+    if elem is None:
+        return []
+    return [c for c in elem if _local_name(c.tag) == name]
+
+
+def _camt_date(elem: ElementTree.Element | None, name: str) -> str | None:
+    value = _child_text(elem, name, "Dt") or _child_text(elem, name, "DtTm")
+    return value[:10] if value else None
+
+
+def _camt_party(tx: ElementTree.Element | None, is_debit: bool) -> str | None:
+    # Bei Lastschriften ist die Gegenpartei der Zahlungsempfänger, sonst der Zahler.
+    role = "Cdtr" if is_debit else "Dbtr"
+    return (
+        _child_text(tx, "RltdPties", role, "Nm")
+        or _child_text(tx, "RltdPties", role, "Pty", "Nm")
+        or _child_text(tx, "RltdPties", f"Ultmt{role}", "Nm")
+    )
+
+
+def _camt_tx_amount(tx: ElementTree.Element) -> ElementTree.Element | None:
+    amount = _child(tx, "Amt")
+    if amount is None:
+        amount = _child(tx, "AmtDtls", "TxAmt", "Amt")
+    return amount
+
+
+def _camt_entry_rows(entry: ElementTree.Element, account: str | None) -> Iterator[dict]:
+    status = _child_text(entry, "Sts") or _child_text(entry, "Sts", "Cd")
+    if status and status != "BOOK":
+        return  # vorgemerkte Umsätze nicht importieren
+
+    is_debit = _child_text(entry, "CdtDbtInd") == "DBIT"
+    if _child_text(entry, "RvslInd") == "true":
+        is_debit = not is_debit
+    payment_date = _camt_date(entry, "ValDt") or _camt_date(entry, "BookgDt")
+    entry_info = _child_text(entry, "AddtlNtryInf")
+
+    transactions = [
+        tx for details in _children(entry, "NtryDtls") for tx in _children(details, "TxDtls")
+    ]
+    # Sammelbuchungen nur aufteilen, wenn jede Einzeltransaktion einen Betrag hat
+    tx_amounts = [_camt_tx_amount(tx) for tx in transactions]
+    if len(transactions) > 1 and all(amount is not None for amount in tx_amounts):
+        parts = list(zip(transactions, tx_amounts))
+    else:
+        parts = [(transactions[0] if transactions else None, _child(entry, "Amt"))]
+
+    for tx, amount_elem in parts:
+        amount = parse_amount(amount_elem.text if amount_elem is not None else None)
+        currency = amount_elem.get("Ccy", "EUR") if amount_elem is not None else "EUR"
+        foreign_amount = None
+        if currency != "EUR" and amount is not None:
+            foreign_amount = f"{amount:.2f} {currency}"
+            amount = None
+        if amount is not None and is_debit:
+            amount = -amount
+        remittance = " ".join(
+            (u.text or "").strip() for u in _children(_child(tx, "RmtInf"), "Ustrd")
+        ).strip()
+        notes = remittance or entry_info
+        yield _canonical_row(
+            type="expense" if is_debit else "income",
+            payment_date=payment_date,
+            party=_camt_party(tx, is_debit) or entry_info,
+            amount_eur=amount,
+            account=account,
+            foreign_amount=foreign_amount,
+            notes=notes,
+        )
+
+
+def iter_camt053_rows(stream) -> Iterator[dict]:
+    """Liest Buchungen aus einem CAMT.053-Kontoauszug (XML) als Stream.
+
+    Verwendet `iterparse`; jeder `<Ntry>` wird nach der Verarbeitung aus dem
+    Baum entfernt, der Speicherbedarf bleibt auch bei sehr großen Auszügen
+    konstant. Liefert Zeilen mit den kanonischen Importfeldern.
+    """
+    statement: ElementTree.Element | None = None
+    account: str | None = None
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        name = _local_name(elem.tag)
+        if event == "start":
+            if name in {"Stmt", "Rpt"}:
+                statement = elem
+                account = None
+            continue
+        if name == "Acct" and statement is not None and account is None:
+            account = _child_text(elem, "Id", "IBAN") or _child_text(elem, "Id", "Othr", "Id")
+        elif name == "Ntry":
+            yield from _camt_entry_rows(elem, account)
+            elem.clear()
+            if statement is not None:
+                statement.remove(elem)
+        elif name in {"Stmt", "Rpt"}:
+            elem.clear()
+            statement = None
+
+
+_MT940_TAG = re.compile(r"^:(\d{2}[A-Z]?):(.*)$")
+_MT940_STATEMENT_LINE = re.compile(
+    r"^(?P<value_date>\d{6})(?P<entry_date>\d{4})?(?P<mark>R?[CD])(?P<funds>[A-Z])?"
+    r"(?P<amount>\d+,\d{0,2})(?P<rest>.*)$"
+)
+_MT940_SUBFIELD = re.compile(r"\?(\d{2})")
+
+
+def _mt940_date(value: str) -> str:
+    year = int(value[:2])
+    return f"{2000 + year if year < 80 else 1900 + year}-{value[2:4]}-{value[4:6]}"
+
+
+def _mt940_details(text: str) -> tuple[str | None, str | None]:
+    """Zerlegt ein :86:-Feld in (Name, Verwendungszweck).
+
+    Unterstützt das strukturierte deutsche Format (GVC + ?-Unterfelder); sonst
+    wird der Text als Verwendungszweck übernommen.
+    """
+    if not re.match(r"^\d{3}\?", text):
+        return None, text.strip() or None
+    parts = _MT940_SUBFIELD.split(text[3:])
+    fields: dict[int, str] = {}
+    for code, value in zip(parts[1::2], parts[2::2]):
+        fields[int(code)] = fields.get(int(code), "") + value
+    name = "".join(fields.get(code, "") for code in (32, 33)).strip()
+    purpose = "".join(
+        fields.get(code, "") for code in [*range(20, 30), *range(60, 64)]
+    ).strip()
+    return name or fields.get(0, "").strip() or None, purpose or None
+
+
+def _iter_mt940_fields(stream) -> Iterator[tuple[str, str]]:
+    """Liefert (Tag, Inhalt) inkl. Folgezeilen; Kodierung UTF-8, sonst Latin-1."""
+    tag: str | None = None
+    lines: list[str] = []
+    separator = ""
+    for raw in stream:
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            line = raw.decode("latin-1")
+        line = line.rstrip("\r\n")
+        match = _MT940_TAG.match(line)
+        if match or line.strip() == "-":
+            if tag is not None:
+                yield tag, separator.join(lines)
+            tag = None
+            if match:
+                tag, lines = match.group(1), [match.group(2)]
+                # :86: ist fest umgebrochen → Folgezeilen direkt anhängen
+                separator = "" if tag == "86" else "\n"
+            continue
+        if tag is not None:
+            lines.append(line)
+    if tag is not None:
+        yield tag, separator.join(lines)
+
+
+def iter_mt940_rows(stream) -> Iterator[dict]:
+    """Liest Buchungen aus einem MT940-Kontoauszug (SWIFT) als Stream.
+
+    Jede `:61:`-Umsatzzeile ergibt eine Zeile mit den kanonischen
+    Importfeldern; das folgende `:86:`-Feld liefert Name und Verwendungszweck.
+    """
+    account: str | None = None
+    pending: dict | None = None
+    for tag, value in _iter_mt940_fields(stream):
+        if tag == "25":
+            account = value.strip()
+        elif tag == "61":
+            if pending is not None:
+                yield pending
+            match = _MT940_STATEMENT_LINE.match(value.split("\n", 1)[0])
+            if not match:
+                raise ImportFormatError(f"MT940: ungültige :61:-Zeile: {value!r}")
+            # RC = Storno einer Gutschrift (Belastung), RD = Storno einer Lastschrift
+            is_debit = match.group("mark") in {"D", "RC"}
+            amount = parse_amount(match.group("amount"))
+            pending = _canonical_row(
+                type="expense" if is_debit else "income",
+                payment_date=_mt940_date(match.group("value_date")),
+                amount_eur=-amount if is_debit else amount,
+                account=account,
+            )
+        elif tag == "86" and pending is not None:
+            name, purpose = _mt940_details(value)
+            pending["party"] = name or purpose
+            pending["notes"] = purpose
+            yield pending
+            pending = None
+    if pending is not None:
+        yield pending
+
+
+# Bankformate lesen binär (eigene Kodierungs-/XML-Erkennung)
+BANK_STATEMENT_READERS = {
+    "camt053": iter_camt053_rows,
+    "mt940": iter_mt940_rows,
+}
+
+
+def iter_import_rows(path: str, fmt: str) -> Iterator[dict]:
+    """Liest Importdaten zeilenweise aus Datei oder stdin.
+
+    Die Zeilen werden als Generator geliefert, damit der Speicherbedarf
+    unabhängig von der Dateigröße konstant bleibt. Komprimierte Quellen
+    (gzip/bz2/xz) werden dabei transparent entpackt. `camt053` und `mt940`
+    liefern bereits kanonische Feldnamen.
+    """
+    if fmt in BANK_STATEMENT_READERS:
+        f = open_import_source(path)
+        rows = BANK_STATEMENT_READERS[fmt](f)
+    else:
+        f = io.TextIOWrapper(open_import_source(path), encoding=_import_encoding(fmt))
+        rows = _iter_stream_rows(f, fmt)
+    try:
+        yield from rows
+    finally:
+        if path != "-":
+            f.close()
+        elif isinstance(f, io.TextIOWrapper):
+            f.detach()  # stdin selbst offen lassen
+
+
+DEFAULT_CHUNK_ROWS = 2000
+DEFAULT_CHUNK_BYTES = 1 << 20
+
+
+def _iter_jsonl_byte_ranges(path: str, chunk_bytes: int) -> Iterator[tuple[int, int]]:
+    """Teilt eine JSONL-Datei in Byte-Bereiche, die jeweils an Zeilenenden enden."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = f.tell()
+            yield start, end
+            start = end
+
+
+# Betragswert, dessen Zahlenformat der Hauptprozess auswertet:
+# (Zeile im Block, Betragsfeld, Rohwert)
+_AmountEvent = tuple[int, str, str]
+
+
+def _normalize_row_block(rows: list[dict]) -> tuple[list[dict], list[_AmountEvent]]:
+    """Normalisiert einen Block ohne Vorwissen über das Zahlenformat.
+
+    Die Worker lösen mehrdeutige Beträge nicht selbst auf (Parser mit
+    `learn=False`), sondern melden sie zusammen mit dem ersten eindeutigen Wert
+    je Format und Spalte. `_resolve_block_amounts()` wertet das im Hauptprozess
+    in Dateireihenfolge aus; das Ergebnis ist damit identisch zum sequentiellen
+    Import, unabhängig von Blockgrenzen und `--workers`.
+    """
+    amounts = {field_name: AmountParser(learn=False) for field_name in _AMOUNT_FIELDS}
+    dates = ImportDateNormalizer()
+    plan: ImportHeaderPlan | None = None
+    plan_keys = None
+    normalized_rows: list[dict] = []
+    events: list[_AmountEvent] = []
+    seen: set[tuple[str, str]] = set()
+    for idx, row in enumerate(rows):
+        if plan is None or row.keys() != plan_keys:
+            plan = compile_header_plan(row.keys())
+            plan_keys = row.keys()
+        normalized = normalize_import_row(row, plan, dates, amounts)
+        normalized_rows.append(normalized)
+        for field_name in _AMOUNT_FIELDS:
+            if isinstance(normalized[field_name], str):
+                events.append((idx, field_name, normalized[field_name]))
+                continue
+            value = _plan_value(row, plan.columns.get(field_name, ()))
+            number_format = AmountParser.classify(value)
+            if number_format and (field_name, number_format) not in seen:
+                seen.add((field_name, number_format))
+                events.append((idx, field_name, value))
+    return normalized_rows, events
+
+
+def _resolve_block_amounts(
+    rows: list[dict], events: list[_AmountEvent], amounts: dict[str, AmountParser]
+) -> None:
+    """Wendet die Betragsereignisse eines Blocks auf die Parser der Datei an.
+
+    Eindeutige Werte lernen das Format, mehrdeutige werden mit dem bis dahin
+    erkannten Format geparst (wie in `normalize_import_row()` inkl. Typ aus
+    dem Vorzeichen).
+    """
+    for idx, field_name, value in events:
+        parser = amounts[field_name]
+        if AmountParser.classify(value) is not None:
+            parser.observe((value,))
+            continue
+        amount = _parse_import_amount(parser, value)
+        if not isinstance(amount, float):
+            continue
+        row = rows[idx]
+        row[field_name] = amount
+        if field_name == "amount_eur" and not row["type"]:
+            row["type"] = _type_from_amount(amount)
+
+
+def _normalize_jsonl_lines(lines: Iterable[bytes]) -> tuple[list[dict], list[_AmountEvent]]:
+    """Worker: parst und normalisiert einen Block roher JSONL-Zeilen."""
+    return _normalize_row_block(
+        [json.loads(line.decode("utf-8")) for line in lines if line.strip()]
+    )
+
+
+def _normalize_jsonl_range(
+    path: str, start: int, end: int
+) -> tuple[list[dict], list[_AmountEvent]]:
+    """Worker: liest und normalisiert die JSONL-Zeilen eines Byte-Bereichs."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _normalize_jsonl_lines(data.split(b"\n"))
+
+
+def _csv_record_to_row(fieldnames: list[str], record: list[str]) -> dict:
+    # Gleiche Semantik wie csv.DictReader (restkey/restval = None)
+    row = dict(zip(fieldnames, record))
+    if len(record) > len(fieldnames):
+        row[None] = record[len(fieldnames):]
+    elif len(record) < len(fieldnames):
+        for key in fieldnames[len(record):]:
+            row[key] = None
+    return row
+
+
+def _normalize_csv_records(
+    fieldnames: list[str], records: list[list[str]]
+) -> tuple[list[dict], list[_AmountEvent]]:
+    """Worker: normalisiert einen Block roher CSV-Datensätze."""
+    return _normalize_row_block([_csv_record_to_row(fieldnames, record) for record in records])
+
+
+def _iter_chunk_tasks(path: str, fmt: str, chunk_rows: int, chunk_bytes: int):
+    """Erzeugt Worker-Aufgaben: Byte-Bereiche (JSONL) bzw. Datensatzblöcke (CSV).
+
+    CSV wird im Hauptprozess nur in Datensätze zerlegt (Felder dürfen
+    Zeilenumbrüche enthalten, Byte-Grenzen sind daher nicht sicher).
+    Komprimierte JSONL-Dateien erlauben keinen wahlfreien Zugriff und werden
+    ebenfalls im Hauptprozess entpackt und als Zeilenblöcke verteilt.
+    """
+    if fmt == "jsonl" and detect_compression(path) is None:
+        for start, end in _iter_jsonl_byte_ranges(path, chunk_bytes):
+            yield _normalize_jsonl_range, (path, start, end)
+        return
+
+    if fmt == "jsonl":
+        with open_import_source(path) as f:
+            while lines := list(islice(f, chunk_rows)):
+                yield _normalize_jsonl_lines, (lines,)
+        return
+
+    with io.TextIOWrapper(open_import_source(path), encoding=_import_encoding(fmt)) as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return
+        records = (record for record in reader if record)
+        while batch := list(islice(records, chunk_rows)):
+            yield _normalize_csv_records, (fieldnames, batch)
+
+
+def iter_normalized_rows_parallel(
+    path: str,
+    fmt: str,
+    workers: int,
+    *,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Iterator[tuple[int, dict]]:
+    """Wie `iter_normalized_rows()`, aber Parsen/Normalisieren im Prozess-Pool.
+
+    Die Blöcke werden in Dateireihenfolge zurückgegeben und erst hier
+    durchnummeriert, damit Zeilennummern in Fehlermeldungen identisch zum
+    sequentiellen Import bleiben; ebenso wird das Zahlenformat der Beträge
+    hier einmal für die ganze Datei erkannt. Es sind höchstens `2 * workers` Blöcke
+    gleichzeitig unterwegs, der Speicherbedarf bleibt also begrenzt.
+    Lesefehler aus den Workern werden beim Abholen des Blocks neu ausgelöst.
+    """
+    idx = 0
+    amounts = new_amount_parsers()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for func, task_args in _iter_chunk_tasks(path, fmt, chunk_rows, chunk_bytes):
+            pending.append(pool.submit(func, *task_args))
+            if len(pending) < 2 * workers:
+                continue
+            rows, events = pending.popleft().result()
+            _resolve_block_amounts(rows, events, amounts)
+            for normalized in rows:
+                idx += 1
+                yield idx, normalized
+        while pending:
+            rows, events = pending.popleft().result()
+            _resolve_block_amounts(rows, events, amounts)
+            for normalized in rows:
+                idx += 1
+                yield idx, normalized
+    finally:
+        # Bei Abbruch (Fehler, Generator geschlossen) offene Blöcke verwerfen
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+_END_OF_FILE = object()
+_READER_FAILED = object()
+# Fehler, die ein Leser-Thread an den Konsumenten weiterreicht
+_READER_ERRORS = (*IMPORT_READ_ERRORS, AmbiguousAmountError)
+
+
+def _put_until_stopped(q: queue.Queue, item: object, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_file_batches(
+    path: str, fmt: str, batch_size: int, q: queue.Queue, stop: threading.Event
+) -> None:
+    """Leser-Thread: normalisiert eine Datei und legt Blöcke in die Queue.
+
+    Erwartete Lesefehler reicht die Queue an den Konsumenten weiter; bei jedem
+    anderen Fehler holt der Konsument ihn samt Traceback aus dem Future.
+    """
+    try:
+        rows = iter_normalized_rows(iter_import_rows(path, fmt))
+        for batch in iter_batches(rows, batch_size):
+            if not _put_until_stopped(q, batch, stop):
+                return
+    except _READER_ERRORS as exc:
+        _put_until_stopped(q, exc, stop)
+        return
+    except BaseException:
+        _put_until_stopped(q, _READER_FAILED, stop)
+        raise
+    _put_until_stopped(q, _END_OF_FILE, stop)
+
+
+def _drain_file_queue(q: queue.Queue, future: Future) -> Iterator[list[tuple[int, dict]]]:
+    while True:
+        item = q.get()
+        if item is _END_OF_FILE:
+            return
+        if item is _READER_FAILED:
+            future.result()  # löst den Fehler des Leser-Threads erneut aus
+        if isinstance(item, _READER_ERRORS):
+            raise item
+        yield item
+
+
+def iter_import_files(
+    paths: Iterable[str],
+    fmt: str,
+    *,
+    readers: int,
+    batch_size: int,
+    queue_batches: int = 4,
+) -> Iterator[tuple[str, Iterator[list[tuple[int, dict]]]]]:
+    """Liest mehrere Importdateien gleichzeitig in einem Thread-Pool.
+
+    Liefert je Datei (in Eingabereihenfolge) den Pfad und einen Iterator über
+    Blöcke von (Zeilennummer, normalisierte Zeile). Jede Datei hat eine
+    begrenzte Queue (`queue_batches` Blöcke), der Speicher bleibt also
+    begrenzt; der Konsument ist der einzige Schreiber. Lesefehler werden beim
+    Iterieren der jeweiligen Datei ausgelöst.
+    """
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="euer-import")
+    try:
+        queues = []
+        for path in paths:
+            q: queue.Queue = queue.Queue(maxsize=queue_batches)
+            future = pool.submit(_read_file_batches, path, fmt, batch_size, q, stop)
+            queues.append((path, q, future))
+        for path, q, future in queues:
+            yield path, _drain_file_queue(q, future)
+    finally:
+        # Wartende Leser freigeben, falls der Konsument vorzeitig abbricht
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+@dataclass
+class ImportCursor:
+    """Leseposition hinter der zuletzt gelieferten Importzeile (für Checkpoints)."""
+
+    byte_offset: int = 0
+    row_index: int = 0
+
+
+class _OffsetLines:
+    """Liest Zeilen binär und zählt die verbrauchten Bytes mit."""
+
+    def __init__(self, f, encoding: str) -> None:
+        self.f = f
+        self.encoding = encoding
+        self.offset = f.tell()
+
+    def __iter__(self) -> "_OffsetLines":
+        return self
+
+    def __next__(self) -> str:
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode(self.encoding)
+
+
+def iter_import_rows_from(path: str, fmt: str, cursor: ImportCursor) -> Iterator[dict]:
+    """Liest Importzeilen ab `cursor.byte_offset` und führt den Cursor mit.
+
+    Nach jeder gelieferten Zeile zeigt `cursor` auf das Ende dieser Zeile, so
+    dass ein Import später per Seek genau dort fortgesetzt werden kann. Bei
+    CSV wird der Dateikopf immer vom Dateianfang gelesen. Offsets beziehen
+    sich bei komprimierten Dateien auf den entpackten Datenstrom.
+    """
+    with open_import_source(path) as f:
+        if fmt == "jsonl":
+            f.seek(cursor.byte_offset)
+            lines = _OffsetLines(f, "utf-8")
+            for line in lines:
                 if not line.strip():
+                    cursor.byte_offset = lines.offset
                     continue
-                rows.append(json.loads(line))
-    return rows
+                row = json.loads(line)
+                cursor.byte_offset = lines.offset
+                cursor.row_index += 1
+                yield row
+            return
+
+        lines = _OffsetLines(f, "utf-8-sig")
+        reader = csv.reader(lines)
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return
+        if cursor.byte_offset > lines.offset:
+            f.seek(cursor.byte_offset)
+            lines.offset = cursor.byte_offset
+        for record in reader:
+            if not record:
+                continue
+            cursor.byte_offset = lines.offset
+            cursor.row_index += 1
+            yield _csv_record_to_row(fieldnames, record)
+
+
+def spool_stdin(suffix: str = "") -> str:
+    """Schreibt stdin in eine temporäre Datei und gibt deren Pfad zurück.
+
+    Wird benötigt, wenn eine Importquelle mehrfach gelesen werden muss.
+    Der Aufrufer ist für das Löschen der Datei verantwortlich.
+    Die Bytes werden unverändert übernommen; komprimierte Eingaben bleiben
+    also komprimiert und werden beim Lesen über die Magic Bytes erkannt.
+    """
+    with tempfile.NamedTemporaryFile("wb", suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(sys.stdin.buffer, tmp)
+    return tmp.name
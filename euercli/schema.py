@@ -29,11 +29,14 @@ CREATE TABLE IF NOT EXISTS expenses (
     private_classification TEXT NOT NULL DEFAULT 'none'
         CHECK(private_classification IN ('none', 'account_rule', 'category_rule', 'manual')),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    hash TEXT UNIQUE NOT NULL,
+    booking_date TEXT GENERATED ALWAYS AS (COALESCE(payment_date, invoice_date)) VIRTUAL,
+    amount_cents INTEGER GENERATED ALWAYS AS (CAST(round(amount_eur * 100) AS INTEGER)) VIRTUAL,
+    vat_input_cents INTEGER GENERATED ALWAYS AS (CAST(round(vat_input * 100) AS INTEGER)) VIRTUAL,
+    vat_output_cents INTEGER GENERATED ALWAYS AS (CAST(round(vat_output * 100) AS INTEGER)) VIRTUAL,
+    hash BLOB UNIQUE NOT NULL,
     CHECK(invoice_date IS NOT NULL OR payment_date IS NOT NULL)
 );
 
-CREATE INDEX IF NOT EXISTS idx_expenses_payment_date ON expenses(payment_date);
 CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses(category_id);
 CREATE INDEX IF NOT EXISTS idx_expenses_vendor ON expenses(vendor);
 
@@ -51,11 +54,13 @@ CREATE TABLE IF NOT EXISTS income (
     notes TEXT,
     vat_output REAL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    hash TEXT UNIQUE NOT NULL,
+    booking_date TEXT GENERATED ALWAYS AS (COALESCE(payment_date, invoice_date)) VIRTUAL,
+    amount_cents INTEGER GENERATED ALWAYS AS (CAST(round(amount_eur * 100) AS INTEGER)) VIRTUAL,
+    vat_output_cents INTEGER GENERATED ALWAYS AS (CAST(round(vat_output * 100) AS INTEGER)) VIRTUAL,
+    hash BLOB UNIQUE NOT NULL,
     CHECK(invoice_date IS NOT NULL OR payment_date IS NOT NULL)
 );
 
-CREATE INDEX IF NOT EXISTS idx_income_payment_date ON income(payment_date);
 CREATE INDEX IF NOT EXISTS idx_income_category ON income(category_id);
 
 CREATE TABLE IF NOT EXISTS private_transfers (
@@ -68,10 +73,10 @@ CREATE TABLE IF NOT EXISTS private_transfers (
     notes TEXT,
     related_expense_id INTEGER REFERENCES expenses(id) ON DELETE SET NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    hash TEXT UNIQUE NOT NULL
+    amount_cents INTEGER GENERATED ALWAYS AS (CAST(round(amount_eur * 100) AS INTEGER)) VIRTUAL,
+    hash BLOB UNIQUE NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_private_transfers_date ON private_transfers(date);
 CREATE INDEX IF NOT EXISTS idx_private_transfers_type ON private_transfers(type);
 CREATE INDEX IF NOT EXISTS idx_private_transfers_related_expense ON private_transfers(related_expense_id);
 
@@ -89,8 +94,274 @@ CREATE TABLE IF NOT EXISTS audit_log (
 
 CREATE INDEX IF NOT EXISTS idx_audit_table_record ON audit_log(table_name, record_id);
 CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);
+
+CREATE TABLE IF NOT EXISTS import_journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint TEXT UNIQUE NOT NULL,
+    file_name TEXT,
+    format TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running' CHECK(status IN ('running', 'completed')),
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    byte_offset INTEGER NOT NULL DEFAULT 0,
+    last_batch INTEGER NOT NULL DEFAULT 0,
+    inserted_expenses INTEGER NOT NULL DEFAULT 0,
+    inserted_income INTEGER NOT NULL DEFAULT 0,
+    duplicates INTEGER NOT NULL DEFAULT 0,
+    formats TEXT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    record_type TEXT NOT NULL CHECK(record_type IN ('expense', 'income')),
+    record_id INTEGER NOT NULL,
+    created_at INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created ON idempotency_keys(created_at);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_record ON idempotency_keys(record_type, record_id);
+
+CREATE TABLE IF NOT EXISTS ingest_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL CHECK(status IN ('imported', 'failed')),
+    message TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS category_suggestions (
+    type TEXT NOT NULL CHECK(type IN ('expense', 'income')),
+    party_key TEXT NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    ledger_account TEXT NOT NULL DEFAULT '',
+    count INTEGER NOT NULL,
+    PRIMARY KEY (type, party_key, category_id, ledger_account)
+) WITHOUT ROWID;
 """
 
+# Indizes auf den generierten Buchungsdatum-Spalten; getrennt von SCHEMA, da
+# `euer init` die Spalten in älteren Datenbanken erst danach ergänzt
+BOOKING_DATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_expenses_booking_date ON expenses(booking_date);
+CREATE INDEX IF NOT EXISTS idx_income_booking_date ON income(booking_date);
+"""
+
+# Betrag in ganzen Cent (kaufmännisch gerundet); Vorlage für die `*_cents`-Spalten
+CENTS_SQL = "CAST(round({column} * 100) AS INTEGER)"
+
+# Abdeckende Indizes für die Abfragen, die nicht aus agg_period_category lesen:
+# Buchungen ohne Wertstellung (`euer summary`) und die Privat-Übersicht. Beträge
+# stehen als Rohspalten im Index: SQLite erkennt Indizes über generierte
+# VIRTUAL-Spalten nicht als abdeckend, die Abfragen rechnen daher mit
+# `CENTS_SQL` statt `amount_cents`.
+COVERING_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_expenses_dates ON expenses(payment_date, invoice_date);
+CREATE INDEX IF NOT EXISTS idx_income_dates ON income(payment_date, invoice_date);
+CREATE INDEX IF NOT EXISTS idx_private_transfers_summary
+    ON private_transfers(date, type, amount_eur);
+"""
+
+# Abgelöste Indizes: Einzelspalten-Indizes, die ein abdeckender Index (gleiches
+# Präfix) ersetzt, und die breiten Summen-Indizes aus der Zeit vor
+# agg_period_category – sie kosteten nur noch Schreibzeit
+SUPERSEDED_INDEXES = (
+    "idx_expenses_payment_date",
+    "idx_income_payment_date",
+    "idx_private_transfers_date",
+    "idx_expenses_summary",
+    "idx_income_summary",
+)
+
+# Hält category_suggestions (Häufigkeit Partei → Kategorie/Buchungskonto)
+# bei jedem INSERT/UPDATE/DELETE aktuell. party_key = lower(trim(Partei)),
+# siehe `suggestion_party_key()`.
+_SUGGESTION_TRIGGER_TEMPLATE = """
+CREATE TRIGGER IF NOT EXISTS trg_{table}_suggestions_insert
+AFTER INSERT ON {table} WHEN NEW.category_id IS NOT NULL
+BEGIN
+    INSERT INTO category_suggestions (type, party_key, category_id, ledger_account, count)
+    VALUES (
+        '{type}', lower(trim(NEW.{party})), NEW.category_id, COALESCE(NEW.ledger_account, ''), 1
+    )
+    ON CONFLICT (type, party_key, category_id, ledger_account)
+    DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{table}_suggestions_delete
+AFTER DELETE ON {table} WHEN OLD.category_id IS NOT NULL
+BEGIN
+    UPDATE category_suggestions SET count = count - 1
+    WHERE type = '{type}' AND party_key = lower(trim(OLD.{party}))
+        AND category_id = OLD.category_id
+        AND ledger_account = COALESCE(OLD.ledger_account, '');
+    DELETE FROM category_suggestions
+    WHERE type = '{type}' AND party_key = lower(trim(OLD.{party})) AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{table}_suggestions_update
+AFTER UPDATE OF {party}, category_id, ledger_account ON {table}
+WHEN OLD.{party} IS NOT NEW.{party}
+    OR OLD.category_id IS NOT NEW.category_id
+    OR OLD.ledger_account IS NOT NEW.ledger_account
+BEGIN
+    UPDATE category_suggestions SET count = count - 1
+    WHERE type = '{type}' AND party_key = lower(trim(OLD.{party}))
+        AND category_id = OLD.category_id
+        AND ledger_account = COALESCE(OLD.ledger_account, '');
+    DELETE FROM category_suggestions
+    WHERE type = '{type}' AND party_key = lower(trim(OLD.{party})) AND count <= 0;
+    INSERT INTO category_suggestions (type, party_key, category_id, ledger_account, count)
+    SELECT '{type}', lower(trim(NEW.{party})), NEW.category_id,
+        COALESCE(NEW.ledger_account, ''), 1
+    WHERE NEW.category_id IS NOT NULL
+    ON CONFLICT (type, party_key, category_id, ledger_account)
+    DO UPDATE SET count = count + 1;
+END;
+"""
+
+SUGGESTION_TRIGGER_TABLES = (("expenses", "expense", "vendor"), ("income", "income", "source"))
+
+CATEGORY_SUGGESTION_TRIGGERS = "".join(
+    _SUGGESTION_TRIGGER_TEMPLATE.format(table=table, type=record_type, party=party)
+    for table, record_type, party in SUGGESTION_TRIGGER_TABLES
+)
+
+SCHEMA += CATEGORY_SUGGESTION_TRIGGERS
+
+# Jahres-/Monatssummen je Kategorie für `euer summary` (Zuflussprinzip: nur
+# Buchungen mit payment_date). Beträge in ganzen Cent, category_id 0 = ohne
+# Kategorie. Gepflegt per Trigger, Neuaufbau: `rebuild_period_aggregates()`.
+SCHEMA += """
+CREATE TABLE IF NOT EXISTS agg_period_category (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    type TEXT NOT NULL CHECK(type IN ('expense', 'income')),
+    category_id INTEGER NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    vat_input_cents INTEGER NOT NULL,
+    vat_output_cents INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (year, type, month, category_id)
+) WITHOUT ROWID;
+"""
+
+
+# Schlüssel: Jahr/Monat aus payment_date (YYYY-MM-DD), category_id 0 = ohne
+# Kategorie. {old_vat_input}/{new_vat_input} sind bei income 0.
+_AGGREGATE_TRIGGER_TEMPLATE = """
+CREATE TRIGGER IF NOT EXISTS trg_{table}_agg_insert
+AFTER INSERT ON {table} WHEN NEW.payment_date IS NOT NULL
+BEGIN
+    INSERT INTO agg_period_category (
+        year, month, type, category_id,
+        amount_cents, vat_input_cents, vat_output_cents, row_count
+    )
+    VALUES (
+        CAST(substr(NEW.payment_date, 1, 4) AS INTEGER),
+        CAST(substr(NEW.payment_date, 6, 2) AS INTEGER),
+        '{type}', COALESCE(NEW.category_id, 0),
+        CAST(round(NEW.amount_eur * 100) AS INTEGER),
+        {new_vat_input},
+        COALESCE(CAST(round(NEW.vat_output * 100) AS INTEGER), 0),
+        1
+    )
+    ON CONFLICT (year, type, month, category_id) DO UPDATE SET
+        amount_cents = amount_cents + excluded.amount_cents,
+        vat_input_cents = vat_input_cents + excluded.vat_input_cents,
+        vat_output_cents = vat_output_cents + excluded.vat_output_cents,
+        row_count = row_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{table}_agg_delete
+AFTER DELETE ON {table} WHEN OLD.payment_date IS NOT NULL
+BEGIN
+    UPDATE agg_period_category SET
+        amount_cents = amount_cents - CAST(round(OLD.amount_eur * 100) AS INTEGER),
+        vat_input_cents = vat_input_cents - {old_vat_input},
+        vat_output_cents = vat_output_cents
+            - COALESCE(CAST(round(OLD.vat_output * 100) AS INTEGER), 0),
+        row_count = row_count - 1
+    WHERE year = CAST(substr(OLD.payment_date, 1, 4) AS INTEGER)
+        AND month = CAST(substr(OLD.payment_date, 6, 2) AS INTEGER)
+        AND type = '{type}' AND category_id = COALESCE(OLD.category_id, 0);
+    DELETE FROM agg_period_category
+    WHERE year = CAST(substr(OLD.payment_date, 1, 4) AS INTEGER)
+        AND month = CAST(substr(OLD.payment_date, 6, 2) AS INTEGER)
+        AND type = '{type}' AND row_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{table}_agg_update
+AFTER UPDATE OF {columns} ON {table}
+WHEN {changed}
+BEGIN
+    UPDATE agg_period_category SET
+        amount_cents = amount_cents - CAST(round(OLD.amount_eur * 100) AS INTEGER),
+        vat_input_cents = vat_input_cents - {old_vat_input},
+        vat_output_cents = vat_output_cents
+            - COALESCE(CAST(round(OLD.vat_output * 100) AS INTEGER), 0),
+        row_count = row_count - 1
+    WHERE year = CAST(substr(OLD.payment_date, 1, 4) AS INTEGER)
+        AND month = CAST(substr(OLD.payment_date, 6, 2) AS INTEGER)
+        AND type = '{type}' AND category_id = COALESCE(OLD.category_id, 0);
+    DELETE FROM agg_period_category
+    WHERE year = CAST(substr(OLD.payment_date, 1, 4) AS INTEGER)
+        AND month = CAST(substr(OLD.payment_date, 6, 2) AS INTEGER)
+        AND type = '{type}' AND row_count <= 0;
+    INSERT INTO agg_period_category (
+        year, month, type, category_id,
+        amount_cents, vat_input_cents, vat_output_cents, row_count
+    )
+    SELECT
+        CAST(substr(NEW.payment_date, 1, 4) AS INTEGER),
+        CAST(substr(NEW.payment_date, 6, 2) AS INTEGER),
+        '{type}', COALESCE(NEW.category_id, 0),
+        CAST(round(NEW.amount_eur * 100) AS INTEGER),
+        {new_vat_input},
+        COALESCE(CAST(round(NEW.vat_output * 100) AS INTEGER), 0),
+        1
+    WHERE NEW.payment_date IS NOT NULL
+    ON CONFLICT (year, type, month, category_id) DO UPDATE SET
+        amount_cents = amount_cents + excluded.amount_cents,
+        vat_input_cents = vat_input_cents + excluded.vat_input_cents,
+        vat_output_cents = vat_output_cents + excluded.vat_output_cents,
+        row_count = row_count + 1;
+END;
+"""
+
+# (Tabelle, Typ, Spalten, die in die Summen eingehen)
+AGGREGATE_TRIGGER_TABLES = (
+    (
+        "expenses",
+        "expense",
+        ("payment_date", "category_id", "amount_eur", "vat_input", "vat_output"),
+    ),
+    ("income", "income", ("payment_date", "category_id", "amount_eur", "vat_output")),
+)
+
+
+def _vat_input_cents(row: str, columns: tuple[str, ...]) -> str:
+    if "vat_input" not in columns:
+        return "0"
+    return f"COALESCE(CAST(round({row}.vat_input * 100) AS INTEGER), 0)"
+
+
+PERIOD_AGGREGATE_TRIGGERS = "".join(
+    _AGGREGATE_TRIGGER_TEMPLATE.format(
+        table=table,
+        type=record_type,
+        columns=", ".join(columns),
+        changed="\n    OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in columns),
+        old_vat_input=_vat_input_cents("OLD", columns),
+        new_vat_input=_vat_input_cents("NEW", columns),
+    )
+    for table, record_type, columns in AGGREGATE_TRIGGER_TABLES
+)
+
+SCHEMA += PERIOD_AGGREGATE_TRIGGERS
+
 SEED_CATEGORIES = [
     # EÜR-Zeilen folgen den ELSTER-Positionen; diese Liste ist die maßgebliche Quelle.
     ("Waren, Rohstoffe und Hilfsstoffe", 27, "expense"),
@@ -3,6 +3,7 @@ from .duplicates import DuplicateAction
 from .errors import EuerError, RecordNotFoundError, ValidationError
 from .expenses import (
     create_expense,
+    create_expenses_bulk,
     delete_expense,
     get_expense_detail,
     list_expenses,
@@ -10,14 +11,16 @@ from .expenses import (
 )
 from .income import (
     create_income,
+    create_income_bulk,
     delete_income,
     get_income_detail,
     list_income,
     update_income,
 )
-from .models import Category, Expense, Income
+from .models import BulkInsertResult, Category, Expense, Income
 
 __all__ = [
+    "BulkInsertResult",
     "Category",
     "Expense",
     "Income",
@@ -28,11 +31,13 @@ __all__ = [
     "get_category_list",
     "get_category_by_name",
     "create_expense",
+    "create_expenses_bulk",
     "list_expenses",
     "get_expense_detail",
     "update_expense",
     "delete_expense",
     "create_income",
+    "create_income_bulk",
     "list_income",
     "get_income_detail",
     "update_income",
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sqlite3
+
+from ..schema import CENTS_SQL
+from .models import PeriodAggregateMismatch
+from .utils import period_bounds
+
+# Summen je (Jahr, Monat, Typ, Kategorie) direkt aus den Buchungen, wie sie
+# die Trigger in agg_period_category fortschreiben (nur für Neuaufbau und
+# Prüfung; liest die Tabellen vollständig).
+_AGGREGATE_SOURCE_SQL = f"""
+    SELECT CAST(substr(payment_date, 1, 4) AS INTEGER) AS year,
+           CAST(substr(payment_date, 6, 2) AS INTEGER) AS month,
+           'expense' AS type, COALESCE(category_id, 0) AS category_id,
+           SUM({CENTS_SQL.format(column="amount_eur")}) AS amount_cents,
+           COALESCE(SUM({CENTS_SQL.format(column="vat_input")}), 0) AS vat_input_cents,
+           COALESCE(SUM({CENTS_SQL.format(column="vat_output")}), 0) AS vat_output_cents,
+           COUNT(*) AS row_count
+    FROM expenses WHERE payment_date IS NOT NULL
+    GROUP BY 1, 2, 4
+    UNION ALL
+    SELECT CAST(substr(payment_date, 1, 4) AS INTEGER),
+           CAST(substr(payment_date, 6, 2) AS INTEGER),
+           'income', COALESCE(category_id, 0),
+           SUM({CENTS_SQL.format(column="amount_eur")}),
+           0,
+           COALESCE(SUM({CENTS_SQL.format(column="vat_output")}), 0),
+           COUNT(*)
+    FROM income WHERE payment_date IS NOT NULL
+    GROUP BY 1, 2, 4
+"""
+
+
+def rebuild_period_aggregates(conn: sqlite3.Connection) -> int:
+    """Baut agg_period_category vollständig aus `expenses` und `income` neu.
+
+    Im Normalbetrieb pflegen Trigger die Tabelle inkrementell; der Neuaufbau
+    ist für Migrationen und als Reparatur gedacht. Committet nicht.
+
+    Returns:
+        Anzahl der Einträge in agg_period_category.
+    """
+    conn.execute("DELETE FROM agg_period_category")
+    conn.execute(
+        f"""INSERT INTO agg_period_category (
+                year, month, type, category_id,
+                amount_cents, vat_input_cents, vat_output_cents, row_count
+            )
+            {_AGGREGATE_SOURCE_SQL}"""
+    )
+    return conn.execute("SELECT COUNT(*) FROM agg_period_category").fetchone()[0]
+
+
+def period_aggregates_missing(conn: sqlite3.Connection, year: int) -> bool:
+    """True, wenn agg_period_category für `year` leer ist, es aber Buchungen gibt.
+
+    Nur Buchungen mit `payment_date` zählen (wie in den Triggern); die Prüfung
+    liest über idx_expenses_dates/idx_income_dates.
+    """
+    start, end = period_bounds(year)
+    row = conn.execute(
+        """SELECT NOT EXISTS (SELECT 1 FROM agg_period_category WHERE year = ?)
+                  AND (EXISTS (SELECT 1 FROM expenses
+                               WHERE payment_date >= ? AND payment_date < ?)
+                       OR EXISTS (SELECT 1 FROM income
+                                  WHERE payment_date >= ? AND payment_date < ?))""",
+        (year, start, end, start, end),
+    ).fetchone()
+    return bool(row[0])
+
+
+def check_period_aggregates(conn: sqlite3.Connection) -> list[PeriodAggregateMismatch]:
+    """Vergleicht agg_period_category mit einer Neuberechnung aus den Buchungen.
+
+    Returns:
+        Abweichungen (gespeichert − berechnet) je Schlüssel; leer, wenn konsistent.
+    """
+    rows = conn.execute(
+        f"""SELECT year, month, type, category_id,
+                   SUM(amount_cents) AS amount_cents,
+                   SUM(vat_input_cents) AS vat_input_cents,
+                   SUM(vat_output_cents) AS vat_output_cents,
+                   SUM(row_count) AS row_count
+            FROM (
+                SELECT year, month, type, category_id, amount_cents,
+                       vat_input_cents, vat_output_cents, row_count
+                FROM agg_period_category
+                UNION ALL
+                SELECT year, month, type, category_id, -amount_cents,
+                       -vat_input_cents, -vat_output_cents, -row_count
+                FROM ({_AGGREGATE_SOURCE_SQL})
+            )
+            GROUP BY year, month, type, category_id
+            HAVING SUM(amount_cents) != 0 OR SUM(vat_input_cents) != 0
+                OR SUM(vat_output_cents) != 0 OR SUM(row_count) != 0
+            ORDER BY year, month, type, category_id"""
+    ).fetchall()
+    return [
+        PeriodAggregateMismatch(
+            year=row["year"],
+            month=row["month"],
+            type=row["type"],
+            category_id=row["category_id"],
+            amount_cents_diff=row["amount_cents"],
+            vat_input_cents_diff=row["vat_input_cents"],
+            vat_output_cents_diff=row["vat_output_cents"],
+            row_count_diff=row["row_count"],
+        )
+        for row in rows
+    ]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from collections.abc import Sequence
+from functools import lru_cache
+
+from .models import CategoryRule
+
+RULE_TYPES = ("expense", "income")
+
+
+class _SubstringAutomaton:
+    """Aho-Corasick-Automat: findet alle Muster in einem Durchlauf über den Text."""
+
+    def __init__(self, patterns: Sequence[tuple[str, int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+        for pattern, rule_index in patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (rule_index,)
+
+        # Fehlerkanten per Breitensuche; Ausgaben der Fehlerzustände übernehmen
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> set[int]:
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class CategoryRuleMatcher:
+    """Kompilierter Regelsatz für die automatische Kategorisierung.
+
+    Alle Teilstring-Bedingungen auf die Partei landen in einem
+    Aho-Corasick-Automaten, alle Regex-Bedingungen je Typ in einem
+    kombinierten Regex als Vorfilter. Pro Buchung wird die Partei damit einmal
+    durchlaufen; nur die so gefundenen Kandidaten (plus Regeln ohne
+    Partei-Bedingung) werden auf Betrag und Zahlungskonto geprüft. Es gewinnt
+    die erste passende Regel in Config-Reihenfolge.
+    """
+
+    def __init__(self, rules: Sequence[CategoryRule]) -> None:
+        self.rules = list(rules)
+        self._automata: dict[str, _SubstringAutomaton] = {}
+        self._regexes: dict[str, list[tuple[int, re.Pattern[str]]]] = {}
+        self._prefilters: dict[str, re.Pattern[str]] = {}
+        self._unconditional: dict[str, tuple[int, ...]] = {}
+        for rule_type in RULE_TYPES:
+            indexed = [
+                (index, rule) for index, rule in enumerate(self.rules) if rule.type == rule_type
+            ]
+            self._automata[rule_type] = _SubstringAutomaton(
+                [(rule.vendor.lower(), index) for index, rule in indexed if rule.vendor]
+            )
+            regexes = [
+                (index, re.compile(rule.vendor_regex, re.IGNORECASE))
+                for index, rule in indexed
+                if rule.vendor_regex
+            ]
+            self._regexes[rule_type] = regexes
+            # Gruppen/Rückverweise würden sich in der Alternation verschieben
+            if regexes and all(pattern.groups == 0 for _, pattern in regexes):
+                try:
+                    self._prefilters[rule_type] = re.compile(
+                        "|".join(f"(?:{pattern.pattern})" for _, pattern in regexes),
+                        re.IGNORECASE,
+                    )
+                except re.error:
+                    # z.B. Inline-Flags mitten im Muster: ohne Vorfilter prüfen
+                    pass
+            self._unconditional[rule_type] = tuple(
+                index for index, rule in indexed if not rule.vendor and not rule.vendor_regex
+            )
+        # Wiederkehrende Parteien (typisch bei Importen) nur einmal auswerten
+        self._candidates = lru_cache(maxsize=4096)(self._find_candidates)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def _find_candidates(self, rule_type: str, party: str) -> tuple[int, ...]:
+        substring_hits = self._automata[rule_type].find(party.lower())
+        regex_hits: set[int] = set()
+        prefilter = self._prefilters.get(rule_type)
+        if prefilter is None or prefilter.search(party):
+            regex_hits = {
+                index for index, pattern in self._regexes[rule_type] if pattern.search(party)
+            }
+        # Regeln mit Teilstring und Regex müssen beide Bedingungen erfüllen
+        candidates = [
+            index
+            for index in substring_hits | regex_hits
+            if (not self.rules[index].vendor or index in substring_hits)
+            and (not self.rules[index].vendor_regex or index in regex_hits)
+        ]
+        return tuple(sorted((*candidates, *self._unconditional[rule_type])))
+
+    def match(
+        self,
+        rule_type: str,
+        party: str,
+        amount_eur: float,
+        account: str | None = None,
+    ) -> CategoryRule | None:
+        """Liefert die erste passende Regel oder None."""
+        if not self.rules:
+            return None
+        normalized_account = account.strip().lower() if account else None
+        for index in self._candidates(rule_type, party or ""):
+            rule = self.rules[index]
+            if rule.amount_min is not None and amount_eur < rule.amount_min:
+                continue
+            if rule.amount_max is not None and amount_eur > rule.amount_max:
+                continue
+            if rule.account is not None and rule.account.strip().lower() != normalized_account:
+                continue
+            return rule
+        return None
+
+
+def compile_category_rules(rules: Sequence[CategoryRule]) -> CategoryRuleMatcher:
+    """Kompiliert die (per `get_category_rules()` geprüften) Regeln einmalig."""
+    return CategoryRuleMatcher(rules)
@@ -1,6 +1,46 @@
 from __future__ import annotations
 
+import re
+import sqlite3
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date
+from difflib import SequenceMatcher
 from enum import Enum
+from itertools import groupby
+
+from ..utils import cents_to_eur
+from .errors import ValidationError
+from .hash_filter import HashBloomFilter
+from .models import DuplicateCandidate
+from .utils import period_bounds
+
+_HASH_TABLES = {"expenses", "income", "private_transfers"}
+
+# Partei-Spalte je Tabelle für die unscharfe Duplikatsuche
+_FUZZY_TABLES = {"expenses": ("vendor", "expense"), "income": ("source", "income")}
+
+# Rechtsform- und Füllwörter, die beim Namensvergleich ignoriert werden
+_PARTY_STOPWORDS = {
+    "ag",
+    "co",
+    "com",
+    "de",
+    "ek",
+    "gbr",
+    "gmbh",
+    "inc",
+    "kg",
+    "llc",
+    "ltd",
+    "mbh",
+    "online",
+    "se",
+    "ug",
+}
+
+DEFAULT_DATE_WINDOW_DAYS = 3
+DEFAULT_MIN_SCORE = 0.6
 
 
 class DuplicateAction(str, Enum):
@@ -8,3 +48,203 @@ class DuplicateAction(str, Enum):
 
     RAISE = "raise"
     SKIP = "skip"
+
+
+def find_existing_hashes(
+    conn: sqlite3.Connection,
+    table_name: str,
+    hashes: Iterable[bytes],
+) -> dict[bytes, int]:
+    """Ermittelt mit einem Join, welche Hashes in der Tabelle bereits existieren.
+
+    Die Hashes werden in eine TEMP-Tabelle geladen und in einer Abfrage gegen
+    den UNIQUE-Index der Zieltabelle gejoint (statt einer Abfrage je Hash).
+
+    Returns:
+        Mapping hash → ID des vorhandenen Datensatzes
+    """
+    if table_name not in _HASH_TABLES:
+        raise ValueError(f"Unbekannte Tabelle: {table_name}")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS dedup_hashes (hash BLOB PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.dedup_hashes")
+    conn.executemany(
+        "INSERT OR IGNORE INTO temp.dedup_hashes (hash) VALUES (?)",
+        ((tx_hash,) for tx_hash in hashes),
+    )
+    rows = conn.execute(
+        f"""SELECT t.hash, t.id
+            FROM temp.dedup_hashes h
+            JOIN {table_name} t ON t.hash = h.hash"""
+    ).fetchall()
+    conn.execute("DELETE FROM temp.dedup_hashes")
+    return {row["hash"]: row["id"] for row in rows}
+
+
+def split_duplicates(
+    conn: sqlite3.Connection,
+    table_name: str,
+    records: Sequence,
+    on_duplicate: DuplicateAction,
+    bloom_filter: HashBloomFilter | None = None,
+) -> tuple[list, list[bool]]:
+    """Trennt neue Datensätze von Duplikaten (in der DB oder innerhalb des Blocks).
+
+    Bestehende Hashes werden per `find_existing_hashes()` gesucht, Duplikate
+    innerhalb des Blocks im Speicher erkannt. Bei `DuplicateAction.RAISE` wird
+    beim ersten Duplikat ein `ValidationError` ausgelöst.
+
+    Mit `bloom_filter` werden nur Hashes, die der Filter als "vielleicht
+    vorhanden" meldet, in der DB gesucht; die Hashes neuer Datensätze werden
+    anschließend in den Filter übernommen.
+
+    Returns:
+        (neue Datensätze, Duplikat-Flag je Eingabedatensatz)
+    """
+    if bloom_filter is None:
+        candidates = records
+    else:
+        candidates = [record for record in records if record.hash in bloom_filter]
+        bloom_filter.lookups += len(records)
+        bloom_filter.skipped += len(records) - len(candidates)
+    existing = (
+        find_existing_hashes(conn, table_name, (record.hash for record in candidates))
+        if candidates
+        else {}
+    )
+    if bloom_filter is not None:
+        bloom_filter.false_positives += sum(
+            1 for record in candidates if record.hash not in existing
+        )
+    new_records = []
+    duplicate_flags: list[bool] = []
+    seen_hashes: set[bytes] = set()
+    for record in records:
+        if record.hash in existing or record.hash in seen_hashes:
+            if on_duplicate == DuplicateAction.RAISE:
+                existing_id = existing.get(record.hash)
+                raise ValidationError(
+                    f"Duplikat erkannt (ID {existing_id})"
+                    if existing_id is not None
+                    else "Duplikat innerhalb der Importdaten erkannt",
+                    code="duplicate",
+                    details={"existing_id": existing_id},
+                )
+            duplicate_flags.append(True)
+            continue
+        seen_hashes.add(record.hash)
+        new_records.append(record)
+        duplicate_flags.append(False)
+    if bloom_filter is not None:
+        for record in new_records:
+            bloom_filter.add(record.hash)
+    return new_records, duplicate_flags
+
+
+def normalize_party(name: str | None) -> tuple[str, ...]:
+    """Zerlegt einen Partei-Namen in normalisierte Tokens (ohne Rechtsformen)."""
+    tokens = re.findall(r"[0-9a-zäöüß]+", (name or "").lower())
+    significant = tuple(token for token in tokens if token not in _PARTY_STOPWORDS)
+    return significant or tuple(tokens)
+
+
+def party_similarity(first: tuple[str, ...], second: tuple[str, ...]) -> float:
+    """Ähnlichkeit zweier normalisierter Namen zwischen 0 und 1."""
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    if set(first) <= set(second) or set(second) <= set(first):
+        return 0.9
+    return SequenceMatcher(None, " ".join(first), " ".join(second)).ratio()
+
+
+def _iter_scan_rows(
+    conn: sqlite3.Connection, table_name: str, party_column: str, year: int | None
+) -> Iterator[tuple]:
+    query = f"""
+        SELECT id, booking_date, {party_column} AS party, receipt_name, amount_cents
+        FROM {table_name}
+        WHERE booking_date IS NOT NULL
+    """
+    params: list[object] = []
+    if year:
+        query += " AND booking_date >= ? AND booking_date < ?"
+        params.extend(period_bounds(year))
+    query += " ORDER BY amount_cents, booking_date, id"
+    for row in conn.execute(query, params):
+        try:
+            day = date.fromisoformat(row["booking_date"]).toordinal()
+        except ValueError:
+            continue
+        yield (
+            row["amount_cents"],
+            day,
+            row["id"],
+            row["booking_date"],
+            row["party"] or "",
+            row["receipt_name"] or "",
+            normalize_party(row["party"]),
+        )
+
+
+def find_fuzzy_duplicates(
+    conn: sqlite3.Connection,
+    table_name: str,
+    *,
+    date_window_days: int = DEFAULT_DATE_WINDOW_DAYS,
+    min_score: float = DEFAULT_MIN_SCORE,
+    year: int | None = None,
+) -> list[DuplicateCandidate]:
+    """Findet Buchungspaare, die vermutlich dieselbe Transaktion beschreiben.
+
+    Die Buchungen werden nach Betrag und Datum sortiert gelesen. Verglichen
+    wird nur innerhalb eines Betragsblocks (gleicher Betrag in Cent) und dort
+    nur mit den Vorgängern im Datumsfenster, sodass nie alle Paare gebildet
+    werden. Der Score kombiniert Namensähnlichkeit und Datumsabstand;
+    identische Belegnamen erhöhen ihn.
+
+    Returns:
+        Kandidatenpaare, absteigend nach Score sortiert
+    """
+    if table_name not in _FUZZY_TABLES:
+        raise ValueError(f"Unbekannte Tabelle: {table_name}")
+    if date_window_days < 0:
+        raise ValidationError(
+            "Datumsfenster darf nicht negativ sein",
+            code="invalid_window",
+            details={"date_window_days": date_window_days},
+        )
+    party_column, record_type = _FUZZY_TABLES[table_name]
+    candidates: list[DuplicateCandidate] = []
+    rows = _iter_scan_rows(conn, table_name, party_column, year)
+    for amount_cents, block in groupby(rows, key=lambda row: row[0]):
+        window: deque = deque()
+        for row in block:
+            _, day, row_id, booking_date, party, receipt, tokens = row
+            while window and day - window[0][1] > date_window_days:
+                window.popleft()
+            for other in window:
+                day_diff = day - other[1]
+                score = 0.7 * party_similarity(tokens, other[6])
+                score += 0.3 * (1 - day_diff / (date_window_days + 1))
+                if receipt and receipt == other[5]:
+                    score = min(1.0, score + 0.1)
+                if score < min_score:
+                    continue
+                candidates.append(
+                    DuplicateCandidate(
+                        type=record_type,
+                        first_id=other[2],
+                        second_id=row_id,
+                        first_date=other[3],
+                        second_date=booking_date,
+                        first_party=other[4],
+                        second_party=party,
+                        amount_eur=cents_to_eur(amount_cents),
+                        day_diff=day_diff,
+                        score=round(score, 3),
+                    )
+                )
+            window.append(row)
+    candidates.sort(key=lambda c: (-c.score, c.day_diff, c.first_id, c.second_id))
+    return candidates
@@ -2,15 +2,32 @@ from __future__ import annotations
 
 import sqlite3
 import uuid
+from collections.abc import Iterable
 
-from ..db import log_audit, row_to_dict
-from ..utils import compute_hash
+from ..db import log_audit, log_audit_many, row_to_dict
+from ..utils import compute_hash, iter_batches
 from .categories import get_category_by_name, resolve_ledger_account
-from .duplicates import DuplicateAction
+from .category_rules import CategoryRuleMatcher
+from .duplicates import DuplicateAction, split_duplicates
 from .errors import RecordNotFoundError, ValidationError
-from .models import Expense, LedgerAccount
+from .hash_filter import HashBloomFilter
+from .idempotency import (
+    find_idempotent_record,
+    forget_idempotency_keys,
+    remember_idempotency_keys,
+    split_idempotent_rows,
+    validate_idempotency_key,
+)
+from .models import BulkInsertResult, Expense, LedgerAccount
 from .private_classification import classify_expense_private_paid
-from .utils import get_optional, hash_date, resolve_dates
+from .suggestions import CategorySuggester
+from .utils import (
+    fetch_ids_by_uuid,
+    get_optional,
+    hash_date,
+    period_bounds,
+    resolve_dates,
+)
 
 
 def row_to_expense(row: sqlite3.Row) -> Expense:
@@ -145,7 +162,57 @@ def _resolve_expense_category(
     return category_id, resolved_category_name, resolved_ledger_account_key
 
 
-def create_expense(
+_EXPENSE_INSERT_SQL = """INSERT INTO expenses
+   (uuid, receipt_name, payment_date, invoice_date, vendor, category_id, amount_eur, account,
+    ledger_account, foreign_amount, notes, is_rc, vat_input, vat_output,
+    is_private_paid, private_classification, hash)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _expense_insert_params(expense: Expense) -> tuple:
+    return (
+        expense.uuid,
+        expense.receipt_name,
+        expense.payment_date,
+        expense.invoice_date,
+        expense.vendor,
+        expense.category_id,
+        expense.amount_eur,
+        expense.account,
+        expense.ledger_account,
+        expense.foreign_amount,
+        expense.notes,
+        1 if expense.is_rc else 0,
+        expense.vat_input,
+        expense.vat_output,
+        1 if expense.is_private_paid else 0,
+        expense.private_classification,
+        expense.hash,
+    )
+
+
+def _expense_audit_data(expense: Expense) -> dict:
+    return {
+        "uuid": expense.uuid,
+        "receipt_name": expense.receipt_name,
+        "payment_date": expense.payment_date,
+        "invoice_date": expense.invoice_date,
+        "vendor": expense.vendor,
+        "category_id": expense.category_id,
+        "amount_eur": expense.amount_eur,
+        "account": expense.account,
+        "ledger_account": expense.ledger_account,
+        "foreign_amount": expense.foreign_amount,
+        "notes": expense.notes,
+        "is_rc": 1 if expense.is_rc else 0,
+        "vat_input": expense.vat_input,
+        "vat_output": expense.vat_output,
+        "is_private_paid": 1 if expense.is_private_paid else 0,
+        "private_classification": expense.private_classification,
+    }
+
+
+def _build_expense(
     conn: sqlite3.Connection,
     *,
     vendor: str,
@@ -167,23 +234,47 @@ def create_expense(
     private_paid: bool = False,
     private_accounts: list[str] | None = None,
     tax_mode: str = "small_business",
-    audit_user: str = "default",
     skip_vat_auto: bool = False,
-    on_duplicate: DuplicateAction = DuplicateAction.RAISE,
-    auto_commit: bool = True,
-) -> Expense | None:
+    category_cache: dict | None = None,
+    category_rules: CategoryRuleMatcher | None = None,
+    category_suggester: CategorySuggester | None = None,
+) -> Expense:
+    """Validiert Eingaben und baut den noch nicht gespeicherten Datensatz (id=None)."""
     resolved_payment_date, resolved_invoice_date = resolve_dates(
         payment_date=payment_date,
         invoice_date=invoice_date,
         legacy_date=date,
     )
 
-    category_id, resolved_category_name, resolved_ledger_account_key = _resolve_expense_category(
-        conn,
-        category_name=category_name,
-        ledger_account_key=ledger_account_key,
-        ledger_accounts=ledger_accounts,
+    if category_rules and not category_name and ledger_account_key is None:
+        rule = category_rules.match("expense", vendor, amount_eur, account)
+        if rule is not None:
+            category_name = rule.category
+            ledger_account_key = rule.ledger_account
+
+    if category_suggester and not category_name and ledger_account_key is None:
+        suggestion = category_suggester.suggest("expense", vendor)
+        if suggestion is not None and suggestion.ledger_account:
+            ledger_account_key = suggestion.ledger_account
+        elif suggestion is not None:
+            category_name = suggestion.category_name
+
+    cache_key = (
+        category_name.lower() if category_name else None,
+        ledger_account_key.lower() if ledger_account_key is not None else None,
     )
+    if category_cache is not None and cache_key in category_cache:
+        resolved_category = category_cache[cache_key]
+    else:
+        resolved_category = _resolve_expense_category(
+            conn,
+            category_name=category_name,
+            ledger_account_key=ledger_account_key,
+            ledger_accounts=ledger_accounts,
+        )
+        if category_cache is not None:
+            category_cache[cache_key] = resolved_category
+    category_id, resolved_category_name, resolved_ledger_account_key = resolved_category
 
     resolved_vat_input, resolved_vat_output = _resolve_create_vat(
         tax_mode=tax_mode,
@@ -201,20 +292,7 @@ def create_expense(
         amount_eur,
         receipt_name or "",
     )
-    existing = conn.execute(
-        "SELECT id FROM expenses WHERE hash = ?",
-        (tx_hash,),
-    ).fetchone()
-    if existing:
-        if on_duplicate == DuplicateAction.SKIP:
-            return None
-        raise ValidationError(
-            f"Duplikat erkannt (ID {existing['id']})",
-            code="duplicate",
-            details={"existing_id": existing["id"]},
-        )
 
-    record_uuid = str(uuid.uuid4())
     is_private_paid, private_classification = classify_expense_private_paid(
         account=account,
         category_name=resolved_category_name,
@@ -222,69 +300,9 @@ def create_expense(
         manual_override=private_paid,
     )
 
-    cursor = conn.execute(
-        """INSERT INTO expenses
-           (uuid, receipt_name, payment_date, invoice_date, vendor, category_id, amount_eur, account,
-            ledger_account, foreign_amount, notes, is_rc, vat_input, vat_output,
-            is_private_paid, private_classification, hash)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            record_uuid,
-            receipt_name,
-            resolved_payment_date,
-            resolved_invoice_date,
-            vendor,
-            category_id,
-            amount_eur,
-            account,
-            resolved_ledger_account_key,
-            foreign_amount,
-            notes,
-            1 if is_rc else 0,
-            resolved_vat_input,
-            resolved_vat_output,
-            1 if is_private_paid else 0,
-            private_classification,
-            tx_hash,
-        ),
-    )
-    record_id = cursor.lastrowid
-    assert record_id is not None
-
-    new_data = {
-        "uuid": record_uuid,
-        "receipt_name": receipt_name,
-        "payment_date": resolved_payment_date,
-        "invoice_date": resolved_invoice_date,
-        "vendor": vendor,
-        "category_id": category_id,
-        "amount_eur": amount_eur,
-        "account": account,
-        "ledger_account": resolved_ledger_account_key,
-        "foreign_amount": foreign_amount,
-        "notes": notes,
-        "is_rc": 1 if is_rc else 0,
-        "vat_input": resolved_vat_input,
-        "vat_output": resolved_vat_output,
-        "is_private_paid": 1 if is_private_paid else 0,
-        "private_classification": private_classification,
-    }
-    log_audit(
-        conn,
-        "expenses",
-        record_id,
-        "INSERT",
-        record_uuid=record_uuid,
-        new_data=new_data,
-        user=audit_user,
-    )
-
-    if auto_commit:
-        conn.commit()
-
     return Expense(
-        id=record_id,
-        uuid=record_uuid,
+        id=None,
+        uuid=str(uuid.uuid4()),
         payment_date=resolved_payment_date,
         invoice_date=resolved_invoice_date,
         vendor=vendor,
@@ -305,6 +323,197 @@ def create_expense(
     )
 
 
+def create_expense(
+    conn: sqlite3.Connection,
+    *,
+    vendor: str,
+    amount_eur: float,
+    payment_date: str | None = None,
+    invoice_date: str | None = None,
+    date: str | None = None,
+    category_name: str | None = None,
+    ledger_account_key: str | None = None,
+    ledger_accounts: list[LedgerAccount] | None = None,
+    account: str | None = None,
+    foreign_amount: str | None = None,
+    receipt_name: str | None = None,
+    notes: str | None = None,
+    is_rc: bool = False,
+    vat: float | None = None,
+    vat_input: float | None = None,
+    vat_output: float | None = None,
+    private_paid: bool = False,
+    private_accounts: list[str] | None = None,
+    tax_mode: str = "small_business",
+    audit_user: str = "default",
+    skip_vat_auto: bool = False,
+    on_duplicate: DuplicateAction = DuplicateAction.RAISE,
+    auto_commit: bool = True,
+    category_rules: CategoryRuleMatcher | None = None,
+    idempotency_key: str | None = None,
+) -> Expense | None:
+    if idempotency_key is not None:
+        idempotency_key = validate_idempotency_key(idempotency_key)
+        # Wiederholter Aufruf: Originalbuchung ohne Validierung/Steuerlogik liefern
+        existing_id = find_idempotent_record(conn, "expense", idempotency_key)
+        if existing_id is not None:
+            return get_expense_detail(conn, existing_id)
+
+    expense = _build_expense(
+        conn,
+        vendor=vendor,
+        amount_eur=amount_eur,
+        payment_date=payment_date,
+        invoice_date=invoice_date,
+        date=date,
+        category_name=category_name,
+        ledger_account_key=ledger_account_key,
+        ledger_accounts=ledger_accounts,
+        account=account,
+        foreign_amount=foreign_amount,
+        receipt_name=receipt_name,
+        notes=notes,
+        is_rc=is_rc,
+        vat=vat,
+        vat_input=vat_input,
+        vat_output=vat_output,
+        private_paid=private_paid,
+        private_accounts=private_accounts,
+        tax_mode=tax_mode,
+        skip_vat_auto=skip_vat_auto,
+        category_rules=category_rules,
+    )
+
+    existing = conn.execute(
+        "SELECT id FROM expenses WHERE hash = ?",
+        (expense.hash,),
+    ).fetchone()
+    if existing:
+        if on_duplicate == DuplicateAction.SKIP:
+            return None
+        raise ValidationError(
+            f"Duplikat erkannt (ID {existing['id']})",
+            code="duplicate",
+            details={"existing_id": existing["id"]},
+        )
+
+    cursor = conn.execute(_EXPENSE_INSERT_SQL, _expense_insert_params(expense))
+    record_id = cursor.lastrowid
+    assert record_id is not None
+    expense.id = record_id
+
+    log_audit(
+        conn,
+        "expenses",
+        record_id,
+        "INSERT",
+        record_uuid=expense.uuid,
+        new_data=_expense_audit_data(expense),
+        user=audit_user,
+    )
+
+    if idempotency_key is not None:
+        remember_idempotency_keys(conn, "expense", [(idempotency_key, record_id)])
+
+    if auto_commit:
+        conn.commit()
+
+    return expense
+
+
+def create_expenses_bulk(
+    conn: sqlite3.Connection,
+    rows: Iterable[dict],
+    *,
+    ledger_accounts: list[LedgerAccount] | None = None,
+    private_accounts: list[str] | None = None,
+    tax_mode: str = "small_business",
+    audit_user: str = "default",
+    on_duplicate: DuplicateAction = DuplicateAction.SKIP,
+    chunk_size: int = 500,
+    auto_commit: bool = True,
+    bloom_filter: HashBloomFilter | None = None,
+    category_rules: CategoryRuleMatcher | None = None,
+    category_suggester: CategorySuggester | None = None,
+) -> BulkInsertResult:
+    """Legt viele bereits geprüfte Ausgaben blockweise an.
+
+    Jede Zeile ist ein Dict mit den Keyword-Argumenten von `create_expense()`
+    (z.B. `vendor`, `amount_eur`, `payment_date`, `category_name`). Validierung,
+    Steuerlogik, Klassifikation und Hash sind identisch zu `create_expense()`;
+    Buchungen und Audit-Einträge werden aber je Block mit `executemany`
+    geschrieben.
+    Mit `bloom_filter` entfällt die Hash-Abfrage für sicher neue Zeilen
+    (siehe `split_duplicates()`).
+    Mit `category_suggester` werden fehlende Kategorien aus der
+    Buchungshistorie ergänzt (siehe `load_category_suggester()`).
+    Zeilen mit bereits verwendetem `idempotency_key` werden ohne Prüfung
+    übersprungen und in `replayed` gezählt.
+
+    Returns:
+        BulkInsertResult mit einer ID je Eingabezeile (None bei Duplikat);
+        bei wiederholtem Idempotency-Key die ID der Originalbuchung.
+    """
+    if chunk_size < 1:
+        raise ValidationError(
+            "Blockgröße muss mindestens 1 sein.",
+            code="invalid_chunk_size",
+            details={"chunk_size": chunk_size},
+        )
+
+    result = BulkInsertResult()
+    category_cache: dict = {}
+    for batch in iter_batches(rows, chunk_size):
+        batch, keys, slots = split_idempotent_rows(conn, "expense", batch)
+        records = [
+            _build_expense(
+                conn,
+                ledger_accounts=ledger_accounts,
+                private_accounts=private_accounts,
+                tax_mode=tax_mode,
+                category_cache=category_cache,
+                category_rules=category_rules,
+                category_suggester=category_suggester,
+                **row,
+            )
+            for row in batch
+        ]
+        new_records, duplicate_flags = split_duplicates(
+            conn, "expenses", records, on_duplicate, bloom_filter
+        )
+        if new_records:
+            conn.executemany(
+                _EXPENSE_INSERT_SQL,
+                (_expense_insert_params(record) for record in new_records),
+            )
+            ids_by_uuid = fetch_ids_by_uuid(conn, "expenses", [r.uuid for r in new_records])
+            for record in new_records:
+                record.id = ids_by_uuid[record.uuid]
+            log_audit_many(
+                conn,
+                "expenses",
+                "INSERT",
+                ((r.id, r.uuid, None, _expense_audit_data(r)) for r in new_records),
+                user=audit_user,
+            )
+        record_ids = [
+            None if is_duplicate else record.id
+            for record, is_duplicate in zip(records, duplicate_flags)
+        ]
+        remember_idempotency_keys(conn, "expense", zip(keys, record_ids))
+        result.inserted += len(new_records)
+        result.duplicates += sum(duplicate_flags)
+        result.replayed += len(slots) - len(records)
+        result.record_ids.extend(
+            value if kind == "record" else record_ids[value] for kind, value in slots
+        )
+
+    if auto_commit:
+        conn.commit()
+
+    return result
+
+
 def list_expenses(
     conn: sqlite3.Connection,
     *,
@@ -326,16 +535,17 @@ def list_expenses(
     params: list[object] = []
 
     if year:
-        query += " AND strftime('%Y', COALESCE(e.payment_date, e.invoice_date)) = ?"
-        params.append(str(year))
-    if month:
-        query += " AND strftime('%m', COALESCE(e.payment_date, e.invoice_date)) = ?"
+        query += " AND e.booking_date >= ? AND e.booking_date < ?"
+        params.extend(period_bounds(year, month))
+    elif month:
+        # Monat ohne Jahr: kein zusammenhängender Bereich, daher kein Indexzugriff
+        query += " AND substr(e.booking_date, 6, 2) = ?"
         params.append(f"{month:02d}")
     if category_name:
         query += " AND LOWER(c.name) = LOWER(?)"
         params.append(category_name)
 
-    query += " ORDER BY COALESCE(e.payment_date, e.invoice_date) DESC, e.id DESC"
+    query += " ORDER BY e.booking_date DESC, e.id DESC"
 
     rows = conn.execute(query, params).fetchall()
     return [row_to_expense(row) for row in rows]
@@ -638,6 +848,7 @@ def delete_expense(
     record_uuid = row["uuid"]
 
     conn.execute("DELETE FROM expenses WHERE id = ?", (record_id,))
+    forget_idempotency_keys(conn, "expense", record_id)
     log_audit(
         conn,
         "expenses",
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+import struct
+from pathlib import Path
+
+DEFAULT_BLOOM_ERROR_RATE = 0.01
+
+# Mindestkapazität, damit kleine Datenbanken nicht bei jedem Import neu bauen
+MIN_BLOOM_CAPACITY = 10_000
+
+_BLOOM_TABLES = {"expenses", "income"}
+_FILE_MAGIC = b"EUERBLM1"
+# magic, Bits, Hashfunktionen, Kapazität, Einträge, Länge des Zustandsschlüssels
+_FILE_HEADER = struct.Struct("<8sQIQQI")
+
+
+class HashBloomFilter:
+    """Bloom-Filter über Transaktions-Hashes (16-Byte-Digests aus `compute_hash()`).
+
+    `digest in filter` ist False nur für sicher unbekannte Hashes; True
+    bedeutet "vielleicht vorhanden" und erfordert die Prüfung in der DB. Die
+    Bitpositionen werden per Double Hashing direkt aus dem Digest abgeleitet,
+    da dieser bereits gleichverteilt ist.
+
+    Die Zähler `lookups`, `skipped` und `false_positives` werden von
+    `split_duplicates()` gepflegt und in der Importstatistik ausgegeben.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = DEFAULT_BLOOM_ERROR_RATE,
+        *,
+        bit_count: int | None = None,
+        hash_count: int | None = None,
+        bits: bytearray | None = None,
+        count: int = 0,
+    ) -> None:
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        if bit_count is None:
+            bit_count = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.bit_count = max(bit_count, 8)
+        if hash_count is None:
+            hash_count = round(self.bit_count / self.capacity * math.log(2))
+        self.hash_count = max(hash_count, 1)
+        self.bits = bits if bits is not None else bytearray((self.bit_count + 7) // 8)
+        self.count = count
+        self.lookups = 0
+        self.skipped = 0
+        self.false_positives = 0
+
+    def _positions(self, digest: bytes) -> range:
+        # Double Hashing: Position i = (first + i * step) mod m
+        first = int.from_bytes(digest[:8], "little") % self.bit_count
+        step = (int.from_bytes(digest[8:16], "little") | 1) % self.bit_count or 1
+        return range(first, first + self.hash_count * step, step)
+
+    def add(self, digest: bytes) -> None:
+        bits = self.bits
+        bit_count = self.bit_count
+        for position in self._positions(digest):
+            position %= bit_count
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self.bits
+        bit_count = self.bit_count
+        for position in self._positions(digest):
+            position %= bit_count
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+    @property
+    def expected_error_rate(self) -> float:
+        """Erwartete Falsch-Positiv-Rate beim aktuellen Füllstand."""
+        return (1 - math.exp(-self.hash_count * self.count / self.bit_count)) ** self.hash_count
+
+
+def bloom_filter_path(db_path: Path, table_name: str) -> Path:
+    """Pfad des gespeicherten Filters neben der Datenbank (z.B. `euer.db.expenses.bloom`)."""
+    return db_path.with_name(f"{db_path.name}.{table_name}.bloom")
+
+
+def get_bloom_state_key(conn: sqlite3.Connection, table_name: str) -> str:
+    """Zustandsschlüssel, der sich bei jeder Änderung der Tabelle ändert.
+
+    `PRAGMA data_version` gilt nur innerhalb einer Verbindung und taugt nicht
+    über Prozessgrenzen. Stattdessen werden der letzte Audit-Log-Eintrag
+    (jede Änderung über die Services), Anzahl und höchste ID der Tabelle sowie
+    die Schema-Version kombiniert.
+    """
+    if table_name not in _BLOOM_TABLES:
+        raise ValueError(f"Unbekannte Tabelle: {table_name}")
+    audit_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM audit_log").fetchone()[0]
+    row_count, max_id = conn.execute(
+        f"SELECT COUNT(*), COALESCE(MAX(id), 0) FROM {table_name}"
+    ).fetchone()
+    schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+    return f"{audit_id}:{row_count}:{max_id}:{schema_version}"
+
+
+def build_hash_bloom_filter(
+    conn: sqlite3.Connection,
+    table_name: str,
+    *,
+    error_rate: float = DEFAULT_BLOOM_ERROR_RATE,
+) -> HashBloomFilter:
+    """Baut den Filter aus allen Hashes der Tabelle (ein Scan über den Hash-Index).
+
+    Die Kapazität ist doppelt so groß wie der Bestand, damit der Import selbst
+    noch Platz hat.
+    """
+    if table_name not in _BLOOM_TABLES:
+        raise ValueError(f"Unbekannte Tabelle: {table_name}")
+    row_count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+    bloom = HashBloomFilter(max(2 * row_count, MIN_BLOOM_CAPACITY), error_rate)
+    for (digest,) in conn.execute(f"SELECT hash FROM {table_name}"):
+        bloom.add(digest)
+    return bloom
+
+
+def grow_hash_bloom_filter(
+    conn: sqlite3.Connection, table_name: str, bloom: HashBloomFilter
+) -> HashBloomFilter:
+    """Baut einen vollen Filter mit doppelter Kapazität neu (Zähler bleiben erhalten).
+
+    Gelesen wird über dieselbe Verbindung, also inklusive noch nicht
+    committeter Zeilen des laufenden Imports. Durch das Verdoppeln bleibt der
+    Aufwand über den ganzen Import linear.
+    """
+    if bloom.count < bloom.capacity:
+        return bloom
+    grown = build_hash_bloom_filter(conn, table_name, error_rate=bloom.error_rate)
+    grown.lookups = bloom.lookups
+    grown.skipped = bloom.skipped
+    grown.false_positives = bloom.false_positives
+    return grown
+
+
+def load_hash_bloom_filter(
+    conn: sqlite3.Connection,
+    table_name: str,
+    path: Path,
+    *,
+    error_rate: float = DEFAULT_BLOOM_ERROR_RATE,
+) -> tuple[HashBloomFilter, bool]:
+    """Lädt den gespeicherten Filter oder baut ihn neu.
+
+    Neu gebaut wird, wenn die Datei fehlt, unlesbar ist, der Zustandsschlüssel
+    nicht mehr zur Datenbank passt oder der Filter über seiner Kapazität liegt.
+
+    Returns:
+        (Filter, True wenn aus der Datei geladen)
+    """
+    try:
+        data = path.read_bytes()
+        magic, bit_count, hash_count, capacity, count, key_length = _FILE_HEADER.unpack_from(
+            data
+        )
+        key_end = _FILE_HEADER.size + key_length
+        key = data[_FILE_HEADER.size : key_end].decode("ascii")
+        bits = bytearray(data[key_end:])
+    except (OSError, struct.error, UnicodeDecodeError):
+        return build_hash_bloom_filter(conn, table_name, error_rate=error_rate), False
+
+    valid = (
+        magic == _FILE_MAGIC
+        and len(bits) == (bit_count + 7) // 8
+        and count < capacity
+        and key == get_bloom_state_key(conn, table_name)
+    )
+    if not valid:
+        return build_hash_bloom_filter(conn, table_name, error_rate=error_rate), False
+    bloom = HashBloomFilter(
+        capacity,
+        error_rate,
+        bit_count=bit_count,
+        hash_count=hash_count,
+        bits=bits,
+        count=count,
+    )
+    return bloom, True
+
+
+def save_hash_bloom_filter(
+    conn: sqlite3.Connection, table_name: str, bloom: HashBloomFilter, path: Path
+) -> None:
+    """Speichert den Filter mit dem aktuellen Zustandsschlüssel (nach dem Commit aufrufen)."""
+    key = get_bloom_state_key(conn, table_name).encode("ascii")
+    header = _FILE_HEADER.pack(
+        _FILE_MAGIC, bloom.bit_count, bloom.hash_count, bloom.capacity, bloom.count, len(key)
+    )
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.write_bytes(header + key + bytes(bloom.bits))
+    temp_path.replace(path)
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Iterable
+
+from .errors import ValidationError
+
+IDEMPOTENCY_RECORD_TYPES = ("expense", "income")
+
+# Agenten wiederholen innerhalb von Minuten; eine Woche deckt auch Neustarts ab
+DEFAULT_IDEMPOTENCY_TTL_SECONDS = 7 * 24 * 3600
+MAX_IDEMPOTENCY_KEY_LENGTH = 200
+
+# Platzhalter je Abfrage (unter SQLITE_MAX_VARIABLE_NUMBER älterer Versionen)
+_LOOKUP_CHUNK = 500
+
+IDEMPOTENCY_KEY_FIELD = "idempotency_key"
+
+
+def validate_idempotency_key(key: str) -> str:
+    """Prüft einen Idempotency-Key (nicht leer, max. 200 Zeichen)."""
+    key = key.strip()
+    if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise ValidationError(
+            f"Ungültiger Idempotency-Key (1–{MAX_IDEMPOTENCY_KEY_LENGTH} Zeichen).",
+            code="invalid_idempotency_key",
+            details={"key": key},
+        )
+    return key
+
+
+def _cutoff(ttl_seconds: int) -> int:
+    return int(time.time()) - ttl_seconds
+
+
+def find_idempotent_records(
+    conn: sqlite3.Connection,
+    record_type: str,
+    keys: Iterable[str],
+    *,
+    ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+) -> dict[str, int]:
+    """Liefert Key → Buchungs-ID für bereits verwendete, nicht abgelaufene Keys.
+
+    Ein Key, der zu einem anderen Buchungstyp gehört, ist ein Fehler des
+    Aufrufers (ValidationError `idempotency_key_conflict`).
+    """
+    found: dict[str, int] = {}
+    unique_keys = list(dict.fromkeys(keys))
+    cutoff = _cutoff(ttl_seconds)
+    for start in range(0, len(unique_keys), _LOOKUP_CHUNK):
+        chunk = unique_keys[start : start + _LOOKUP_CHUNK]
+        rows = conn.execute(
+            f"""SELECT key, record_type, record_id FROM idempotency_keys
+                WHERE key IN ({", ".join("?" * len(chunk))}) AND created_at >= ?""",
+            (*chunk, cutoff),
+        )
+        for row in rows:
+            if row["record_type"] != record_type:
+                raise ValidationError(
+                    f"Idempotency-Key '{row['key']}' gehört zu einer anderen Buchungsart.",
+                    code="idempotency_key_conflict",
+                    details={
+                        "key": row["key"],
+                        "record_type": row["record_type"],
+                        "record_id": row["record_id"],
+                    },
+                )
+            found[row["key"]] = row["record_id"]
+    return found
+
+
+def find_idempotent_record(
+    conn: sqlite3.Connection,
+    record_type: str,
+    key: str,
+    *,
+    ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+) -> int | None:
+    """Liefert die Buchungs-ID zu einem Key (Primärschlüssel-Zugriff) oder None."""
+    return find_idempotent_records(conn, record_type, [key], ttl_seconds=ttl_seconds).get(key)
+
+
+def purge_expired_idempotency_keys(
+    conn: sqlite3.Connection, *, ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS
+) -> int:
+    """Löscht abgelaufene Keys (Bereichsabfrage über den Zeitindex). Committet nicht."""
+    cursor = conn.execute(
+        "DELETE FROM idempotency_keys WHERE created_at < ?", (_cutoff(ttl_seconds),)
+    )
+    return cursor.rowcount
+
+
+def remember_idempotency_keys(
+    conn: sqlite3.Connection,
+    record_type: str,
+    entries: Iterable[tuple[str | None, int | None]],
+    *,
+    ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+) -> None:
+    """Speichert (Key, Buchungs-ID)-Paare; Einträge ohne Key oder ID werden übergangen.
+
+    Räumt vorher abgelaufene Keys ab, damit ein wiederverwendeter Key nach
+    Ablauf der TTL neu vergeben werden kann. Committet nicht; der Aufrufer
+    schreibt Keys und Buchungen in derselben Transaktion.
+    """
+    params = [
+        (key, record_type, record_id, int(time.time()))
+        for key, record_id in entries
+        if key and record_id is not None
+    ]
+    if not params:
+        return
+    purge_expired_idempotency_keys(conn, ttl_seconds=ttl_seconds)
+    conn.executemany(
+        """INSERT INTO idempotency_keys (key, record_type, record_id, created_at)
+           VALUES (?, ?, ?, ?)""",
+        params,
+    )
+
+
+def forget_idempotency_keys(conn: sqlite3.Connection, record_type: str, record_id: int) -> None:
+    """Entfernt die Keys einer gelöschten Buchung. Committet nicht."""
+    conn.execute(
+        "DELETE FROM idempotency_keys WHERE record_type = ? AND record_id = ?",
+        (record_type, record_id),
+    )
+
+
+def split_idempotent_rows(
+    conn: sqlite3.Connection,
+    record_type: str,
+    rows: list[dict],
+    *,
+    ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+) -> tuple[list[dict], list[str | None], list[tuple[str, int]]]:
+    """Trennt einen Block Bulk-Zeilen in neue und wiederholte Zeilen.
+
+    Wiederholte Zeilen (Key schon gespeichert oder früher im Block) werden
+    weder gebaut noch geprüft noch geschrieben.
+
+    Returns:
+        (neue Zeilen ohne Key-Feld, Key je neuer Zeile, Zuordnung je
+        Eingabezeile). Die Zuordnung ist `("new", i)` für die i-te neue
+        Zeile, `("repeat", i)` für eine Wiederholung der i-ten neuen Zeile
+        im selben Block und `("record", id)` für eine gespeicherte Buchung.
+    """
+    if not any(IDEMPOTENCY_KEY_FIELD in row for row in rows):
+        return rows, [None] * len(rows), [("new", idx) for idx in range(len(rows))]
+
+    keys = [
+        validate_idempotency_key(str(key)) if (key := row.get(IDEMPOTENCY_KEY_FIELD)) else None
+        for row in rows
+    ]
+    known = find_idempotent_records(
+        conn, record_type, [key for key in keys if key], ttl_seconds=ttl_seconds
+    )
+    fresh_rows: list[dict] = []
+    fresh_keys: list[str | None] = []
+    slots: list[tuple[str, int]] = []
+    pending: dict[str, int] = {}
+    for row, key in zip(rows, keys):
+        if key in known:
+            slots.append(("record", known[key]))
+        elif key in pending:
+            slots.append(("repeat", pending[key]))
+        else:
+            if key:
+                pending[key] = len(fresh_rows)
+            slots.append(("new", len(fresh_rows)))
+            fresh_rows.append(
+                {field: value for field, value in row.items() if field != IDEMPOTENCY_KEY_FIELD}
+            )
+            fresh_keys.append(key)
+    return fresh_rows, fresh_keys, slots
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import replace
+
+from .models import ImportJournal
+from .utils import get_optional
+
+
+def _row_to_import_journal(row: sqlite3.Row) -> ImportJournal:
+    formats = get_optional(row, "formats")
+    return ImportJournal(
+        id=row["id"],
+        fingerprint=row["fingerprint"],
+        format=row["format"],
+        file_name=get_optional(row, "file_name"),
+        status=row["status"],
+        rows_done=row["rows_done"],
+        byte_offset=row["byte_offset"],
+        last_batch=row["last_batch"],
+        inserted_expenses=row["inserted_expenses"],
+        inserted_income=row["inserted_income"],
+        duplicates=row["duplicates"],
+        formats=json.loads(formats) if formats else None,
+        updated_at=get_optional(row, "updated_at"),
+    )
+
+
+def get_import_journal(
+    conn: sqlite3.Connection, fingerprint: str
+) -> ImportJournal | None:
+    """Lädt den Journal-Eintrag zu einem Datei-Fingerprint."""
+    row = conn.execute(
+        "SELECT * FROM import_journal WHERE fingerprint = ?",
+        (fingerprint,),
+    ).fetchone()
+    return _row_to_import_journal(row) if row else None
+
+
+def start_import_journal(
+    conn: sqlite3.Connection,
+    *,
+    fingerprint: str,
+    fmt: str,
+    file_name: str | None = None,
+) -> ImportJournal:
+    """Legt einen neuen Journal-Eintrag an (oder setzt einen vorhandenen zurück).
+
+    Committet nicht; der Eintrag wird mit dem ersten Block festgeschrieben.
+    """
+    conn.execute(
+        """INSERT INTO import_journal (fingerprint, file_name, format)
+           VALUES (?, ?, ?)
+           ON CONFLICT(fingerprint) DO UPDATE SET
+               file_name = excluded.file_name,
+               format = excluded.format,
+               status = 'running',
+               rows_done = 0,
+               byte_offset = 0,
+               last_batch = 0,
+               inserted_expenses = 0,
+               inserted_income = 0,
+               duplicates = 0,
+               formats = NULL,
+               started_at = CURRENT_TIMESTAMP,
+               updated_at = CURRENT_TIMESTAMP""",
+        (fingerprint, file_name, fmt),
+    )
+    journal = get_import_journal(conn, fingerprint)
+    assert journal is not None
+    return journal
+
+
+def checkpoint_import_journal(
+    conn: sqlite3.Connection,
+    journal: ImportJournal,
+    *,
+    rows_done: int,
+    byte_offset: int,
+    inserted_expenses: int = 0,
+    inserted_income: int = 0,
+    duplicates: int = 0,
+    formats: dict | None = None,
+) -> ImportJournal:
+    """Hält den Fortschritt nach einem geschriebenen Block fest.
+
+    Die Zähler werden aufaddiert; `formats` sind die bis hierher erkannten
+    Datums- und Zahlenformate (`ImportFormats.to_dict()`). Committet nicht –
+    der Aufrufer committet den Checkpoint zusammen mit dem Block, damit beide
+    immer übereinstimmen.
+    """
+    updated = replace(
+        journal,
+        rows_done=rows_done,
+        byte_offset=byte_offset,
+        last_batch=journal.last_batch + 1,
+        inserted_expenses=journal.inserted_expenses + inserted_expenses,
+        inserted_income=journal.inserted_income + inserted_income,
+        duplicates=journal.duplicates + duplicates,
+        formats=journal.formats if formats is None else formats,
+    )
+    conn.execute(
+        """UPDATE import_journal
+           SET rows_done = ?, byte_offset = ?, last_batch = ?,
+               inserted_expenses = ?, inserted_income = ?, duplicates = ?,
+               formats = ?, updated_at = CURRENT_TIMESTAMP
+           WHERE id = ?""",
+        (
+            updated.rows_done,
+            updated.byte_offset,
+            updated.last_batch,
+            updated.inserted_expenses,
+            updated.inserted_income,
+            updated.duplicates,
+            json.dumps(updated.formats) if updated.formats is not None else None,
+            journal.id,
+        ),
+    )
+    return updated
+
+
+def complete_import_journal(
+    conn: sqlite3.Connection, journal: ImportJournal
+) -> ImportJournal:
+    """Markiert einen Import als vollständig abgeschlossen (committet nicht)."""
+    conn.execute(
+        """UPDATE import_journal
+           SET status = 'completed', updated_at = CURRENT_TIMESTAMP
+           WHERE id = ?""",
+        (journal.id,),
+    )
+    return replace(journal, status="completed")
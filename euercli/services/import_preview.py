@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable, Iterator
+
+from ..utils import iter_batches
+from .category_rules import CategoryRuleMatcher
+from .errors import ValidationError
+from .expenses import _build_expense
+from .idempotency import IDEMPOTENCY_KEY_FIELD, find_idempotent_record
+from .income import _build_income
+from .models import ImportPreview, ImportPreviewRow, LedgerAccount
+from .suggestions import CategorySuggester
+
+_PREVIEW_CHUNK_SIZE = 5000
+
+
+def preview_import(
+    conn: sqlite3.Connection,
+    rows: Iterable[tuple[int, str, dict]],
+    *,
+    ledger_accounts: list[LedgerAccount] | None = None,
+    private_accounts: list[str] | None = None,
+    tax_mode: str = "small_business",
+    preview: ImportPreview | None = None,
+    category_rules: CategoryRuleMatcher | None = None,
+    category_suggester: CategorySuggester | None = None,
+) -> ImportPreview:
+    """Klassifiziert Importzeilen als neu, Duplikat oder ungültig – ohne zu schreiben.
+
+    Jede Zeile ist ein Tupel (Zeilennummer, 'expense'|'income', Keyword-Argumente
+    wie bei den Bulk-Services). Datensätze und Hashes werden mit denselben
+    Hilfsfunktionen wie beim echten Import gebaut. Die Hashes landen in einer
+    TEMP-Tabelle und werden am Ende mit **einer** Abfrage gegen `expenses` und
+    `income` abgeglichen; die Hauptdatenbank wird nicht verändert (funktioniert
+    auch mit einer read-only Verbindung).
+
+    Bereits im Aufrufer als ungültig erkannte Zeilen können vorab in `preview`
+    eingetragen werden; die Zeilen werden am Ende nach Zeilennummer sortiert.
+    """
+    preview = preview or ImportPreview()
+    conn.execute(
+        """CREATE TEMP TABLE IF NOT EXISTS preview_hashes (
+               row_index INTEGER PRIMARY KEY,
+               table_name TEXT NOT NULL,
+               hash BLOB NOT NULL
+           )"""
+    )
+    conn.execute("DELETE FROM temp.preview_hashes")
+
+    category_caches: dict[str, dict] = {"expense": {}, "income": {}}
+    seen_hashes: set[tuple[str, bytes]] = set()
+    preview_rows: dict[int, ImportPreviewRow] = {}
+
+    def candidates() -> Iterator[tuple[int, str, bytes]]:
+        for row_index, row_type, service_row in rows:
+            try:
+                if IDEMPOTENCY_KEY_FIELD in service_row:
+                    service_row = dict(service_row)
+                    key = service_row.pop(IDEMPOTENCY_KEY_FIELD)
+                    existing_id = find_idempotent_record(conn, row_type, key) if key else None
+                    if existing_id is not None:
+                        preview.rows.append(
+                            ImportPreviewRow(
+                                row_index,
+                                row_type,
+                                "duplicate",
+                                existing_id=existing_id,
+                                reason="Idempotency-Key bereits verwendet",
+                            )
+                        )
+                        continue
+                if row_type == "expense":
+                    record = _build_expense(
+                        conn,
+                        ledger_accounts=ledger_accounts,
+                        private_accounts=private_accounts,
+                        tax_mode=tax_mode,
+                        category_cache=category_caches[row_type],
+                        category_rules=category_rules,
+                        category_suggester=category_suggester,
+                        **service_row,
+                    )
+                else:
+                    record = _build_income(
+                        conn,
+                        ledger_accounts=ledger_accounts,
+                        tax_mode=tax_mode,
+                        category_cache=category_caches[row_type],
+                        category_rules=category_rules,
+                        category_suggester=category_suggester,
+                        **service_row,
+                    )
+            except ValidationError as exc:
+                preview.rows.append(
+                    ImportPreviewRow(row_index, row_type, "invalid", reason=exc.message)
+                )
+                continue
+
+            table_name = "expenses" if row_type == "expense" else "income"
+            preview_row = ImportPreviewRow(row_index, row_type, "new", hash=record.hash)
+            preview.rows.append(preview_row)
+            if (table_name, record.hash) in seen_hashes:
+                preview_row.status = "duplicate"
+                preview_row.reason = "Duplikat innerhalb der Importdaten"
+                continue
+            seen_hashes.add((table_name, record.hash))
+            preview_rows[row_index] = preview_row
+            yield row_index, table_name, record.hash
+
+    for batch in iter_batches(candidates(), _PREVIEW_CHUNK_SIZE):
+        conn.executemany("INSERT INTO temp.preview_hashes VALUES (?, ?, ?)", batch)
+
+    existing = conn.execute(
+        """SELECT p.row_index, COALESCE(e.id, i.id) AS existing_id
+           FROM temp.preview_hashes p
+           LEFT JOIN expenses e ON p.table_name = 'expenses' AND e.hash = p.hash
+           LEFT JOIN income i ON p.table_name = 'income' AND i.hash = p.hash
+           WHERE e.id IS NOT NULL OR i.id IS NOT NULL"""
+    ).fetchall()
+    conn.execute("DELETE FROM temp.preview_hashes")
+    for row in existing:
+        preview_row = preview_rows[row["row_index"]]
+        preview_row.status = "duplicate"
+        preview_row.existing_id = row["existing_id"]
+
+    preview.rows.sort(key=lambda r: r.row_index)
+    preview.new_expenses = preview.new_income = preview.duplicates = preview.invalid = 0
+    for preview_row in preview.rows:
+        if preview_row.status == "invalid":
+            preview.invalid += 1
+        elif preview_row.status == "duplicate":
+            preview.duplicates += 1
+        elif preview_row.type == "expense":
+            preview.new_expenses += 1
+        else:
+            preview.new_income += 1
+    return preview
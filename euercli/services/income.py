@@ -2,14 +2,31 @@ from __future__ import annotations
 
 import sqlite3
 import uuid
+from collections.abc import Iterable
 
-from ..db import log_audit, row_to_dict
-from ..utils import compute_hash
+from ..db import log_audit, log_audit_many, row_to_dict
+from ..utils import compute_hash, iter_batches
 from .categories import get_category_by_name, resolve_ledger_account
-from .duplicates import DuplicateAction
+from .category_rules import CategoryRuleMatcher
+from .duplicates import DuplicateAction, split_duplicates
 from .errors import RecordNotFoundError, ValidationError
-from .models import Income, LedgerAccount
-from .utils import get_optional, hash_date, resolve_dates
+from .hash_filter import HashBloomFilter
+from .idempotency import (
+    find_idempotent_record,
+    forget_idempotency_keys,
+    remember_idempotency_keys,
+    split_idempotent_rows,
+    validate_idempotency_key,
+)
+from .models import BulkInsertResult, Income, LedgerAccount
+from .suggestions import CategorySuggester
+from .utils import (
+    fetch_ids_by_uuid,
+    get_optional,
+    hash_date,
+    period_bounds,
+    resolve_dates,
+)
 
 
 def _row_to_income(row: sqlite3.Row) -> Income:
@@ -78,7 +95,46 @@ def _resolve_income_category(
     return category_id, resolved_category_name, resolved_ledger_account_key
 
 
-def create_income(
+_INCOME_INSERT_SQL = """INSERT INTO income
+   (uuid, receipt_name, payment_date, invoice_date, source, category_id, amount_eur,
+    ledger_account, foreign_amount, notes, vat_output, hash)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _income_insert_params(income: Income) -> tuple:
+    return (
+        income.uuid,
+        income.receipt_name,
+        income.payment_date,
+        income.invoice_date,
+        income.source,
+        income.category_id,
+        income.amount_eur,
+        income.ledger_account,
+        income.foreign_amount,
+        income.notes,
+        income.vat_output,
+        income.hash,
+    )
+
+
+def _income_audit_data(income: Income) -> dict:
+    return {
+        "uuid": income.uuid,
+        "receipt_name": income.receipt_name,
+        "payment_date": income.payment_date,
+        "invoice_date": income.invoice_date,
+        "source": income.source,
+        "category_id": income.category_id,
+        "amount_eur": income.amount_eur,
+        "ledger_account": income.ledger_account,
+        "foreign_amount": income.foreign_amount,
+        "notes": income.notes,
+        "vat_output": income.vat_output,
+    }
+
+
+def _build_income(
     conn: sqlite3.Connection,
     *,
     source: str,
@@ -95,23 +151,47 @@ def create_income(
     vat: float | None = None,
     vat_output: float | None = None,
     tax_mode: str = "small_business",
-    audit_user: str = "default",
     skip_vat_auto: bool = False,
-    on_duplicate: DuplicateAction = DuplicateAction.RAISE,
-    auto_commit: bool = True,
-) -> Income | None:
+    category_cache: dict | None = None,
+    category_rules: CategoryRuleMatcher | None = None,
+    category_suggester: CategorySuggester | None = None,
+) -> Income:
+    """Validiert Eingaben und baut den noch nicht gespeicherten Datensatz (id=None)."""
     resolved_payment_date, resolved_invoice_date = resolve_dates(
         payment_date=payment_date,
         invoice_date=invoice_date,
         legacy_date=date,
     )
 
-    category_id, resolved_category_name, resolved_ledger_account_key = _resolve_income_category(
-        conn,
-        category_name=category_name,
-        ledger_account_key=ledger_account_key,
-        ledger_accounts=ledger_accounts,
+    if category_rules and not category_name and ledger_account_key is None:
+        rule = category_rules.match("income", source, amount_eur, None)
+        if rule is not None:
+            category_name = rule.category
+            ledger_account_key = rule.ledger_account
+
+    if category_suggester and not category_name and ledger_account_key is None:
+        suggestion = category_suggester.suggest("income", source)
+        if suggestion is not None and suggestion.ledger_account:
+            ledger_account_key = suggestion.ledger_account
+        elif suggestion is not None:
+            category_name = suggestion.category_name
+
+    cache_key = (
+        category_name.lower() if category_name else None,
+        ledger_account_key.lower() if ledger_account_key is not None else None,
     )
+    if category_cache is not None and cache_key in category_cache:
+        resolved_category = category_cache[cache_key]
+    else:
+        resolved_category = _resolve_income_category(
+            conn,
+            category_name=category_name,
+            ledger_account_key=ledger_account_key,
+            ledger_accounts=ledger_accounts,
+        )
+        if category_cache is not None:
+            category_cache[cache_key] = resolved_category
+    category_id, resolved_category_name, resolved_ledger_account_key = resolved_category
 
     if tax_mode not in {"small_business", "standard"}:
         raise ValidationError(
@@ -136,9 +216,79 @@ def create_income(
         amount_eur,
         receipt_name or "",
     )
+
+    return Income(
+        id=None,
+        uuid=str(uuid.uuid4()),
+        payment_date=resolved_payment_date,
+        invoice_date=resolved_invoice_date,
+        source=source,
+        amount_eur=amount_eur,
+        category_id=category_id,
+        category_name=resolved_category_name,
+        ledger_account=resolved_ledger_account_key,
+        receipt_name=receipt_name,
+        foreign_amount=foreign_amount,
+        notes=notes,
+        vat_output=resolved_vat_output,
+        hash=tx_hash,
+    )
+
+
+def create_income(
+    conn: sqlite3.Connection,
+    *,
+    source: str,
+    amount_eur: float,
+    payment_date: str | None = None,
+    invoice_date: str | None = None,
+    date: str | None = None,
+    category_name: str | None = None,
+    ledger_account_key: str | None = None,
+    ledger_accounts: list[LedgerAccount] | None = None,
+    foreign_amount: str | None = None,
+    receipt_name: str | None = None,
+    notes: str | None = None,
+    vat: float | None = None,
+    vat_output: float | None = None,
+    tax_mode: str = "small_business",
+    audit_user: str = "default",
+    skip_vat_auto: bool = False,
+    on_duplicate: DuplicateAction = DuplicateAction.RAISE,
+    auto_commit: bool = True,
+    category_rules: CategoryRuleMatcher | None = None,
+    idempotency_key: str | None = None,
+) -> Income | None:
+    if idempotency_key is not None:
+        idempotency_key = validate_idempotency_key(idempotency_key)
+        # Wiederholter Aufruf: Originalbuchung ohne Validierung/Steuerlogik liefern
+        existing_id = find_idempotent_record(conn, "income", idempotency_key)
+        if existing_id is not None:
+            return get_income_detail(conn, existing_id)
+
+    income = _build_income(
+        conn,
+        source=source,
+        amount_eur=amount_eur,
+        payment_date=payment_date,
+        invoice_date=invoice_date,
+        date=date,
+        category_name=category_name,
+        ledger_account_key=ledger_account_key,
+        ledger_accounts=ledger_accounts,
+        foreign_amount=foreign_amount,
+        receipt_name=receipt_name,
+        notes=notes,
+        vat=vat,
+        vat_output=vat_output,
+        tax_mode=tax_mode,
+        skip_vat_auto=skip_vat_auto,
+        category_rules=category_rules,
+    )
+
     existing = conn.execute(
         "SELECT id FROM income WHERE hash = ?",
-        (tx_hash,),
+        (income.hash,),
     ).fetchone()
     if existing:
         if on_duplicate == DuplicateAction.SKIP:
@@ -149,73 +299,117 @@ def create_income(
             details={"existing_id": existing["id"]},
         )
 
-    record_uuid = str(uuid.uuid4())
-
-    cursor = conn.execute(
-        """INSERT INTO income
-           (uuid, receipt_name, payment_date, invoice_date, source, category_id, amount_eur,
-            ledger_account, foreign_amount, notes, vat_output, hash)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            record_uuid,
-            receipt_name,
-            resolved_payment_date,
-            resolved_invoice_date,
-            source,
-            category_id,
-            amount_eur,
-            resolved_ledger_account_key,
-            foreign_amount,
-            notes,
-            resolved_vat_output,
-            tx_hash,
-        ),
-    )
+    cursor = conn.execute(_INCOME_INSERT_SQL, _income_insert_params(income))
     record_id = cursor.lastrowid
     assert record_id is not None
+    income.id = record_id
 
-    new_data = {
-        "uuid": record_uuid,
-        "receipt_name": receipt_name,
-        "payment_date": resolved_payment_date,
-        "invoice_date": resolved_invoice_date,
-        "source": source,
-        "category_id": category_id,
-        "amount_eur": amount_eur,
-        "ledger_account": resolved_ledger_account_key,
-        "foreign_amount": foreign_amount,
-        "notes": notes,
-        "vat_output": resolved_vat_output,
-    }
     log_audit(
         conn,
         "income",
         record_id,
         "INSERT",
-        record_uuid=record_uuid,
-        new_data=new_data,
+        record_uuid=income.uuid,
+        new_data=_income_audit_data(income),
         user=audit_user,
     )
 
+    if idempotency_key is not None:
+        remember_idempotency_keys(conn, "income", [(idempotency_key, record_id)])
+
     if auto_commit:
         conn.commit()
 
-    return Income(
-        id=record_id,
-        uuid=record_uuid,
-        payment_date=resolved_payment_date,
-        invoice_date=resolved_invoice_date,
-        source=source,
-        amount_eur=amount_eur,
-        category_id=category_id,
-        category_name=resolved_category_name,
-        ledger_account=resolved_ledger_account_key,
-        receipt_name=receipt_name,
-        foreign_amount=foreign_amount,
-        notes=notes,
-        vat_output=resolved_vat_output,
-        hash=tx_hash,
-    )
+    return income
+
+
+def create_income_bulk(
+    conn: sqlite3.Connection,
+    rows: Iterable[dict],
+    *,
+    ledger_accounts: list[LedgerAccount] | None = None,
+    tax_mode: str = "small_business",
+    audit_user: str = "default",
+    on_duplicate: DuplicateAction = DuplicateAction.SKIP,
+    chunk_size: int = 500,
+    auto_commit: bool = True,
+    bloom_filter: HashBloomFilter | None = None,
+    category_rules: CategoryRuleMatcher | None = None,
+    category_suggester: CategorySuggester | None = None,
+) -> BulkInsertResult:
+    """Legt viele bereits geprüfte Einnahmen blockweise an.
+
+    Jede Zeile ist ein Dict mit den Keyword-Argumenten von `create_income()`.
+    Ergebnis und Audit-Trail sind identisch zu Einzelaufrufen; geschrieben wird
+    je Block mit `executemany`.
+    Mit `bloom_filter` entfällt die Hash-Abfrage für sicher neue Zeilen
+    (siehe `split_duplicates()`).
+    Mit `category_suggester` werden fehlende Kategorien aus der
+    Buchungshistorie ergänzt (siehe `load_category_suggester()`).
+    Zeilen mit bereits verwendetem `idempotency_key` werden ohne Prüfung
+    übersprungen und in `replayed` gezählt.
+
+    Returns:
+        BulkInsertResult mit einer ID je Eingabezeile (None bei Duplikat);
+        bei wiederholtem Idempotency-Key die ID der Originalbuchung.
+    """
+    if chunk_size < 1:
+        raise ValidationError(
+            "Blockgröße muss mindestens 1 sein.",
+            code="invalid_chunk_size",
+            details={"chunk_size": chunk_size},
+        )
+
+    result = BulkInsertResult()
+    category_cache: dict = {}
+    for batch in iter_batches(rows, chunk_size):
+        batch, keys, slots = split_idempotent_rows(conn, "income", batch)
+        records = [
+            _build_income(
+                conn,
+                ledger_accounts=ledger_accounts,
+                tax_mode=tax_mode,
+                category_cache=category_cache,
+                category_rules=category_rules,
+                category_suggester=category_suggester,
+                **row,
+            )
+            for row in batch
+        ]
+        new_records, duplicate_flags = split_duplicates(
+            conn, "income", records, on_duplicate, bloom_filter
+        )
+        if new_records:
+            conn.executemany(
+                _INCOME_INSERT_SQL,
+                (_income_insert_params(record) for record in new_records),
+            )
+            ids_by_uuid = fetch_ids_by_uuid(conn, "income", [r.uuid for r in new_records])
+            for record in new_records:
+                record.id = ids_by_uuid[record.uuid]
+            log_audit_many(
+                conn,
+                "income",
+                "INSERT",
+                ((r.id, r.uuid, None, _income_audit_data(r)) for r in new_records),
+                user=audit_user,
+            )
+        record_ids = [
+            None if is_duplicate else record.id
+            for record, is_duplicate in zip(records, duplicate_flags)
+        ]
+        remember_idempotency_keys(conn, "income", zip(keys, record_ids))
+        result.inserted += len(new_records)
+        result.duplicates += sum(duplicate_flags)
+        result.replayed += len(slots) - len(records)
+        result.record_ids.extend(
+            value if kind == "record" else record_ids[value] for kind, value in slots
+        )
+
+    if auto_commit:
+        conn.commit()
+
+    return result
 
 
 def list_income(
@@ -237,16 +431,17 @@ def list_income(
     params: list[object] = []
 
     if year:
-        query += " AND strftime('%Y', COALESCE(i.payment_date, i.invoice_date)) = ?"
-        params.append(str(year))
-    if month:
-        query += " AND strftime('%m', COALESCE(i.payment_date, i.invoice_date)) = ?"
+        query += " AND i.booking_date >= ? AND i.booking_date < ?"
+        params.extend(period_bounds(year, month))
+    elif month:
+        # Monat ohne Jahr: kein zusammenhängender Bereich, daher kein Indexzugriff
+        query += " AND substr(i.booking_date, 6, 2) = ?"
         params.append(f"{month:02d}")
     if category_name:
         query += " AND LOWER(c.name) = LOWER(?)"
         params.append(category_name)
 
-    query += " ORDER BY COALESCE(i.payment_date, i.invoice_date) DESC, i.id DESC"
+    query += " ORDER BY i.booking_date DESC, i.id DESC"
 
     rows = conn.execute(query, params).fetchall()
     return [_row_to_income(row) for row in rows]
@@ -472,6 +667,7 @@ def delete_income(
     record_uuid = row["uuid"]
 
     conn.execute("DELETE FROM income WHERE id = ?", (record_id,))
+    forget_idempotency_keys(conn, "income", record_id)
     log_audit(
         conn,
         "income",
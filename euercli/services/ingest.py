@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+
+from .models import IngestFile
+from .utils import get_optional
+
+
+def _row_to_ingest_file(row: sqlite3.Row) -> IngestFile:
+    return IngestFile(
+        path=row["path"],
+        size=row["size"],
+        mtime_ns=row["mtime_ns"],
+        fingerprint=row["fingerprint"],
+        status=row["status"],
+        message=get_optional(row, "message"),
+        updated_at=get_optional(row, "updated_at"),
+    )
+
+
+def load_ingest_files(
+    conn: sqlite3.Connection, directory: str | None = None
+) -> dict[str, IngestFile]:
+    """Lädt die bekannten Eingangsdateien (optional nur eines Verzeichnisses).
+
+    Der Watcher hält das Ergebnis im Speicher; unveränderte Dateien kosten
+    pro Durchlauf dann nur einen Dict-Zugriff statt einer Abfrage.
+    """
+    if directory is None:
+        rows = conn.execute("SELECT * FROM ingest_files")
+    else:
+        # Präfixsuche per Bereich statt LIKE: Pfade dürfen % und _ enthalten.
+        # Die Obergrenze ist das Zeichen nach dem Trenner ("/" → "0", "\\" → "]")
+        prefix = os.path.join(os.path.normpath(directory), "")
+        rows = conn.execute(
+            "SELECT * FROM ingest_files WHERE path >= ? AND path < ?",
+            (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)),
+        )
+    return {row["path"]: _row_to_ingest_file(row) for row in rows}
+
+
+def record_ingest_file(conn: sqlite3.Connection, ingest_file: IngestFile) -> None:
+    """Speichert Fingerprint und Ergebnis einer Eingangsdatei. Committet nicht."""
+    conn.execute(
+        """INSERT INTO ingest_files (path, size, mtime_ns, fingerprint, status, message)
+           VALUES (?, ?, ?, ?, ?, ?)
+           ON CONFLICT(path) DO UPDATE SET
+               size = excluded.size,
+               mtime_ns = excluded.mtime_ns,
+               fingerprint = excluded.fingerprint,
+               status = excluded.status,
+               message = excluded.message,
+               updated_at = CURRENT_TIMESTAMP""",
+        (
+            ingest_file.path,
+            ingest_file.size,
+            ingest_file.mtime_ns,
+            ingest_file.fingerprint,
+            ingest_file.status,
+            ingest_file.message,
+        ),
+    )
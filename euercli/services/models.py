@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -41,7 +41,7 @@ class Expense:
     vat_output: float | None = None
     is_private_paid: bool = False
     private_classification: str = "none"
-    hash: str | None = None
+    hash: bytes | None = None
 
     @property
     def date(self) -> str:
@@ -65,7 +65,7 @@ class Income:
     foreign_amount: str | None = None
     notes: str | None = None
     vat_output: float | None = None
-    hash: str | None = None
+    hash: bytes | None = None
 
     @property
     def date(self) -> str:
@@ -83,4 +83,112 @@ class PrivateTransfer:
     description: str
     notes: str | None = None
     related_expense_id: int | None = None
-    hash: str | None = None
+    hash: bytes | None = None
+
+
+@dataclass
+class ImportJournal:
+    id: int | None
+    fingerprint: str
+    format: str
+    file_name: str | None = None
+    status: str = "running"
+    rows_done: int = 0
+    byte_offset: int = 0
+    last_batch: int = 0
+    inserted_expenses: int = 0
+    inserted_income: int = 0
+    duplicates: int = 0
+    formats: dict | None = None
+    updated_at: str | None = None
+
+
+@dataclass
+class IngestFile:
+    path: str
+    size: int
+    mtime_ns: int
+    fingerprint: str
+    status: str
+    message: str | None = None
+    updated_at: str | None = None
+
+
+@dataclass
+class BulkInsertResult:
+    inserted: int = 0
+    duplicates: int = 0
+    replayed: int = 0
+    record_ids: list[int | None] = field(default_factory=list)
+
+
+@dataclass
+class ImportPreviewRow:
+    row_index: int
+    type: str | None
+    status: str
+    hash: bytes | None = None
+    existing_id: int | None = None
+    reason: str | None = None
+
+
+@dataclass
+class ImportPreview:
+    new_expenses: int = 0
+    new_income: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    rows: list[ImportPreviewRow] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.rows)
+
+
+@dataclass
+class DuplicateCandidate:
+    type: str
+    first_id: int
+    second_id: int
+    first_date: str
+    second_date: str
+    first_party: str
+    second_party: str
+    amount_eur: float
+    day_diff: int
+    score: float
+
+
+@dataclass
+class CategoryRule:
+    type: str
+    category: str | None = None
+    ledger_account: str | None = None
+    vendor: str | None = None
+    vendor_regex: str | None = None
+    amount_min: float | None = None
+    amount_max: float | None = None
+    account: str | None = None
+
+
+@dataclass
+class CategorySuggestion:
+    type: str
+    party_key: str
+    category_id: int
+    category_name: str
+    ledger_account: str | None
+    count: int
+    share: float
+
+
+@dataclass
+class PeriodAggregateMismatch:
+    year: int
+    month: int
+    type: str
+    category_id: int
+    amount_cents_diff: int
+    vat_input_cents_diff: int
+    vat_output_cents_diff: int
+    row_count_diff: int
@@ -4,14 +4,24 @@ import sqlite3
 import uuid
 
 from ..db import log_audit, row_to_dict
-from ..utils import compute_hash
+from ..schema import CENTS_SQL
+from ..utils import cents_to_eur, compute_hash
 from .expenses import row_to_expense
 from .errors import RecordNotFoundError, ValidationError
 from .models import Expense, PrivateTransfer
-from .utils import get_optional
+from .utils import get_optional, period_bounds
 
 UNSET = object()
 
+# Cent-Ausdruck statt amount_cents, damit idx_private_transfers_summary
+# abdeckend bleibt (siehe COVERING_INDEXES)
+_CENTS = CENTS_SQL.format(column="amount_eur")
+PRIVATE_TRANSFER_TOTALS_SQL = f"""SELECT
+       SUM(CASE WHEN type = 'deposit' THEN {_CENTS} ELSE 0 END) AS deposits_direct,
+       SUM(CASE WHEN type = 'withdrawal' THEN {_CENTS} ELSE 0 END) AS withdrawals_total
+   FROM private_transfers
+   WHERE date >= ? AND date < ?"""
+
 
 def _row_to_private_transfer(row: sqlite3.Row) -> PrivateTransfer:
     return PrivateTransfer(
@@ -150,8 +160,8 @@ def get_private_transfer_list(
         query += " AND type = ?"
         params.append(transfer_type)
     if year:
-        query += " AND strftime('%Y', date) = ?"
-        params.append(str(year))
+        query += " AND date >= ? AND date < ?"
+        params.extend(period_bounds(year))
 
     query += " ORDER BY date DESC, id DESC"
 
@@ -350,10 +360,10 @@ def get_private_paid_expenses(
     params: list[object] = []
 
     if year:
-        query += " AND strftime('%Y', COALESCE(e.payment_date, e.invoice_date)) = ?"
-        params.append(str(year))
+        query += " AND e.booking_date >= ? AND e.booking_date < ?"
+        params.extend(period_bounds(year))
 
-    query += " ORDER BY COALESCE(e.payment_date, e.invoice_date) DESC, e.id DESC"
+    query += " ORDER BY e.booking_date DESC, e.id DESC"
 
     rows = conn.execute(query, params).fetchall()
     return [row_to_expense(row) for row in rows]
@@ -364,33 +374,28 @@ def get_private_summary(
     *,
     year: int,
 ) -> dict:
-    direct = conn.execute(
-        """SELECT
-               SUM(CASE WHEN type = 'deposit' THEN amount_eur ELSE 0 END) AS deposits_direct,
-               SUM(CASE WHEN type = 'withdrawal' THEN amount_eur ELSE 0 END) AS withdrawals_total
-           FROM private_transfers
-           WHERE strftime('%Y', date) = ?""",
-        (str(year),),
-    ).fetchone()
+    # Summen exakt in ganzen Cent, Umrechnung in EUR erst am Ende
+    direct = conn.execute(PRIVATE_TRANSFER_TOTALS_SQL, period_bounds(year)).fetchone()
 
     sacheinlagen = conn.execute(
-        """SELECT SUM(ABS(amount_eur)) AS deposits_private_paid
+        """SELECT SUM(ABS(amount_cents)) AS deposits_private_paid
            FROM expenses
            WHERE is_private_paid = 1
-             AND strftime('%Y', COALESCE(payment_date, invoice_date)) = ?""",
-        (str(year),),
+             AND booking_date >= ? AND booking_date < ?""",
+        period_bounds(year),
     ).fetchone()
 
-    deposits_direct = (direct["deposits_direct"] if direct else 0.0) or 0.0
-    withdrawals_total = (direct["withdrawals_total"] if direct else 0.0) or 0.0
+    deposits_direct = (direct["deposits_direct"] if direct else 0) or 0
+    withdrawals_total = (direct["withdrawals_total"] if direct else 0) or 0
     deposits_sacheinlagen = (
-        (sacheinlagen["deposits_private_paid"] if sacheinlagen else 0.0) or 0.0
+        (sacheinlagen["deposits_private_paid"] if sacheinlagen else 0) or 0
     )
+    deposits_total = deposits_direct + deposits_sacheinlagen
 
     return {
-        "deposits_direct": deposits_direct,
-        "deposits_private_paid": deposits_sacheinlagen,
-        "deposits_total": deposits_direct + deposits_sacheinlagen,
-        "withdrawals_total": withdrawals_total,
-        "balance": (deposits_direct + deposits_sacheinlagen) - withdrawals_total,
+        "deposits_direct": cents_to_eur(deposits_direct),
+        "deposits_private_paid": cents_to_eur(deposits_sacheinlagen),
+        "deposits_total": cents_to_eur(deposits_total),
+        "withdrawals_total": cents_to_eur(withdrawals_total),
+        "balance": cents_to_eur(deposits_total - withdrawals_total),
     }
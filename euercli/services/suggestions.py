@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import sqlite3
+import string
+
+from .errors import ValidationError
+from .models import CategorySuggestion, LedgerAccount
+
+SUGGESTION_TYPES = ("expense", "income")
+
+# Schwellen für das automatische Befüllen beim Import
+DEFAULT_MIN_COUNT = 2
+DEFAULT_MIN_SHARE = 0.8
+
+# SQLite-lower() ändert nur ASCII-Buchstaben, trim() entfernt nur Leerzeichen
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def suggestion_party_key(party: str) -> str:
+    """Schlüssel einer Partei wie in den Triggern (`lower(trim(...))`)."""
+    return party.strip(" ").translate(_ASCII_LOWER)
+
+
+def _validate_type(record_type: str) -> None:
+    if record_type not in SUGGESTION_TYPES:
+        raise ValidationError(
+            f"Unbekannter Typ: {record_type}",
+            code="invalid_suggestion_type",
+            details={"type": record_type},
+        )
+
+
+def _row_to_suggestion(row: sqlite3.Row) -> CategorySuggestion:
+    return CategorySuggestion(
+        type=row["type"],
+        party_key=row["party_key"],
+        category_id=row["category_id"],
+        category_name=row["category_name"],
+        ledger_account=row["ledger_account"] or None,
+        count=row["count"],
+        share=row["count"] / row["total"],
+    )
+
+
+_SUGGESTION_SELECT = """
+    SELECT s.type, s.party_key, s.category_id, c.name AS category_name,
+           s.ledger_account, s.count,
+           SUM(s.count) OVER (PARTITION BY s.type, s.party_key) AS total
+    FROM category_suggestions s
+    JOIN categories c ON c.id = s.category_id
+"""
+
+
+def rebuild_category_suggestions(conn: sqlite3.Connection) -> int:
+    """Baut das Vorschlagsmodell vollständig aus `expenses` und `income` neu.
+
+    Im Normalbetrieb pflegen Trigger die Tabelle inkrementell; der Neuaufbau
+    ist für Migrationen und als Reparatur gedacht. Committet nicht.
+
+    Returns:
+        Anzahl der Einträge im Modell.
+    """
+    conn.execute("DELETE FROM category_suggestions")
+    conn.execute(
+        """INSERT INTO category_suggestions
+               (type, party_key, category_id, ledger_account, count)
+           SELECT 'expense', lower(trim(vendor)), category_id,
+                  COALESCE(ledger_account, ''), COUNT(*)
+           FROM expenses WHERE category_id IS NOT NULL
+           GROUP BY 2, 3, 4"""
+    )
+    conn.execute(
+        """INSERT INTO category_suggestions
+               (type, party_key, category_id, ledger_account, count)
+           SELECT 'income', lower(trim(source)), category_id,
+                  COALESCE(ledger_account, ''), COUNT(*)
+           FROM income WHERE category_id IS NOT NULL
+           GROUP BY 2, 3, 4"""
+    )
+    return conn.execute("SELECT COUNT(*) FROM category_suggestions").fetchone()[0]
+
+
+def get_category_suggestions(
+    conn: sqlite3.Connection,
+    record_type: str,
+    party: str,
+    *,
+    limit: int = 5,
+) -> list[CategorySuggestion]:
+    """Liefert die bisherigen Kategorien einer Partei, häufigste zuerst."""
+    _validate_type(record_type)
+    rows = conn.execute(
+        _SUGGESTION_SELECT
+        + """WHERE s.type = ? AND s.party_key = ?
+             ORDER BY s.count DESC, s.category_id, s.ledger_account
+             LIMIT ?""",
+        (record_type, suggestion_party_key(party), max(limit, 0)),
+    ).fetchall()
+    return [_row_to_suggestion(row) for row in rows]
+
+
+class CategorySuggester:
+    """Vorschlagsmodell im Speicher: Partei → wahrscheinlichste Kategorie.
+
+    Hält je Typ und Partei nur den besten Eintrag, der die Schwellen erfüllt;
+    `suggest()` ist ein einzelner Dict-Zugriff. Buchungen, die während des
+    Imports angelegt werden, fließen erst beim nächsten Laden ein.
+    """
+
+    def __init__(self, suggestions: dict[tuple[str, str], CategorySuggestion]) -> None:
+        self._suggestions = suggestions
+
+    def __bool__(self) -> bool:
+        return bool(self._suggestions)
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def suggest(self, record_type: str, party: str) -> CategorySuggestion | None:
+        return self._suggestions.get((record_type, suggestion_party_key(party)))
+
+
+def load_category_suggester(
+    conn: sqlite3.Connection,
+    *,
+    ledger_accounts: list[LedgerAccount] | None = None,
+    min_count: int = DEFAULT_MIN_COUNT,
+    min_share: float = DEFAULT_MIN_SHARE,
+) -> CategorySuggester:
+    """Lädt das Vorschlagsmodell mit einer Abfrage.
+
+    Buchungskonten, die nicht mehr im Kontenrahmen stehen, werden verworfen;
+    der Vorschlag nennt dann nur die Kategorie.
+    """
+    known_keys = {account.key.lower() for account in ledger_accounts or []}
+    suggestions: dict[tuple[str, str], CategorySuggestion] = {}
+    rows = conn.execute(
+        _SUGGESTION_SELECT
+        + "ORDER BY s.type, s.party_key, s.count DESC, s.category_id, s.ledger_account"
+    )
+    for row in rows:
+        # Sortierung: der erste Eintrag je Partei ist der häufigste
+        key = (row["type"], row["party_key"])
+        if key not in suggestions:
+            suggestions[key] = _row_to_suggestion(row)
+    return CategorySuggester(
+        {
+            key: _without_unknown_ledger_account(suggestion, known_keys)
+            for key, suggestion in suggestions.items()
+            if suggestion.count >= min_count and suggestion.share >= min_share
+        }
+    )
+
+
+def _without_unknown_ledger_account(
+    suggestion: CategorySuggestion, known_keys: set[str]
+) -> CategorySuggestion:
+    if suggestion.ledger_account and suggestion.ledger_account.lower() not in known_keys:
+        suggestion.ledger_account = None
+    return suggestion
@@ -26,6 +26,41 @@ def resolve_dates(
     return resolved_payment_date, resolved_invoice_date
 
 
+def period_bounds(year: int, month: int | None = None) -> tuple[str, str]:
+    """Halboffener Datumsbereich [Beginn, Ende) eines Jahres bzw. Monats.
+
+    Für Filter wie `booking_date >= ? AND booking_date < ?`, die anders als
+    `strftime('%Y', ...) = ?` einen Index auf der Datumsspalte nutzen.
+    """
+    if month is None:
+        return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    if not 1 <= month <= 12:
+        raise ValidationError(
+            f"Ungültiger Monat: {month}",
+            code="invalid_month",
+            details={"month": month},
+        )
+    end_year, end_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{end_year:04d}-{end_month:02d}-01"
+
+
 def hash_date(payment_date: str | None, invoice_date: str | None) -> str:
     """Gibt das für die Hash-Berechnung relevante Datum zurück (payment > invoice)."""
     return payment_date or invoice_date or ""
+
+
+def fetch_ids_by_uuid(
+    conn: sqlite3.Connection, table_name: str, uuids: list[str]
+) -> dict[str, int]:
+    """Liefert die IDs frisch eingefügter Datensätze über deren UUIDs."""
+    result: dict[str, int] = {}
+    # Unter dem Standardlimit von 999 SQL-Parametern bleiben
+    for start in range(0, len(uuids), 900):
+        part = uuids[start : start + 900]
+        placeholders = ", ".join("?" for _ in part)
+        rows = conn.execute(
+            f"SELECT id, uuid FROM {table_name} WHERE uuid IN ({placeholders})",
+            part,
+        ).fetchall()
+        result.update({row["uuid"]: row["id"] for row in rows})
+    return result
@@ -1,13 +1,53 @@
 import hashlib
 import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+# Länge des gespeicherten Transaktions-Hashes (auf 128 Bit gekürztes SHA-256)
+HASH_DIGEST_SIZE = 16
 
 
 def compute_hash(
     date: str, vendor_or_source: str, amount_eur: float, receipt_name: str = ""
-) -> str:
-    """Erzeugt einen eindeutigen Hash für eine Transaktion."""
+) -> bytes:
+    """Erzeugt einen eindeutigen Hash (binär, 16 Bytes) für eine Transaktion."""
     data = f"{date}|{vendor_or_source}|{amount_eur:.2f}|{receipt_name or ''}"
-    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+    return hashlib.sha256(data.encode("utf-8")).digest()[:HASH_DIGEST_SIZE]
+
+
+def hash_to_digest(value: str | bytes) -> bytes:
+    """Wandelt einen gespeicherten Hash (alt: 64 Zeichen Hex) in das Binärformat um."""
+    if isinstance(value, bytes):
+        return value[:HASH_DIGEST_SIZE]
+    return bytes.fromhex(value)[:HASH_DIGEST_SIZE]
+
+
+def compute_file_fingerprint(path: str, chunk_size: int = 1 << 20) -> str:
+    """Erzeugt einen SHA-256-Fingerprint über den Dateiinhalt (blockweise gelesen)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[list]:
+    """Fasst einen Stream in Blöcke fester Größe zusammen (letzter Block ggf. kleiner)."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def to_cents(amount: float) -> int:
+    """Rechnet einen EUR-Betrag in ganze Cent um (wie die `*_cents`-Spalten)."""
+    cents = abs(amount) * 100
+    # Kaufmännisch runden (0,5 weg von 0), identisch zu SQLite round()
+    return int(cents + 0.5) * (-1 if amount < 0 else 1)
+
+
+def cents_to_eur(cents: int) -> float:
+    """Wandelt ganze Cent für die Ausgabe in EUR um (nur an der Ausgabekante)."""
+    return cents / 100
 
 
 def format_amount(amount: float) -> str:
@@ -63,3 +103,149 @@ def format_missing_fields(value: str | list | None) -> str:
     if isinstance(parsed, list):
         return ", ".join(str(item) for item in parsed)
     return str(parsed)
+
+
+class AmbiguousAmountError(ValueError):
+    """Betrag, dessen Zahlenformat sich nicht eindeutig bestimmen lässt (z.B. "1.234")."""
+
+    def __init__(self, value: object) -> None:
+        super().__init__(f"Mehrdeutiger Betrag: {value}")
+        self.value = value
+
+
+def _to_float(text: str) -> float | None:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _float_de(text: str) -> float:
+    # Schneller Weg für deutsche Spalten: nur ohne Tausenderpunkte eindeutig
+    if "." in text:
+        raise ValueError(text)
+    return float(text.replace(",", "."))
+
+
+# Vorkompilierte Strategie je Format; ValueError → vollständige Prüfung
+_FAST_AMOUNT_PARSERS = {"de": _float_de, "en": float}
+
+
+class AmountParser:
+    """Parst die Beträge **einer** Spalte mit einmal erkanntem Zahlenformat.
+
+    Eindeutige Werte legen das Format der Spalte fest: "1.234,56" und "-39,99"
+    sind deutsch ("de"), "1,234.56" und "39.99" international ("en"). Danach
+    wird jeder Wert zuerst mit der vorkompilierten Strategie des Formats
+    geparst (ein `float()`-Aufruf); nur wenn diese scheitert, folgt die
+    vollständige Prüfung. Werte mit genau einem Trennzeichen und drei
+    Nachkommastellen ("1.234", "1,000") sind allein nicht entscheidbar und
+    folgen dem erkannten Format. Ist noch kein Format bekannt oder enthält die
+    Spalte beide Formate, wird `AmbiguousAmountError` ausgelöst statt zu raten.
+    Mit `learn=False` bleibt das Format fest (z.B. in Import-Workern, deren
+    mehrdeutige Werte der Hauptprozess in Dateireihenfolge auflöst).
+    `number_format` nimmt auch mehrere Formate, etwa `learned_formats` aus
+    einem Import-Checkpoint.
+    """
+
+    def __init__(
+        self, number_format: str | Iterable[str] | None = None, *, learn: bool = True
+    ) -> None:
+        self._formats: set[str] = set()
+        self._fast = None
+        self._learning = True
+        if isinstance(number_format, str):
+            number_format = (number_format,)
+        for name in number_format or ():
+            self._learn(name)
+        self._learning = learn
+
+    @property
+    def number_format(self) -> str | None:
+        """Erkanntes Format ("de"/"en") oder None (unbekannt bzw. gemischt)."""
+        if len(self._formats) == 1:
+            return next(iter(self._formats))
+        return None
+
+    @property
+    def learned_formats(self) -> tuple[str, ...]:
+        """Alle bisher erkannten Formate, sortiert (auch bei gemischter Spalte)."""
+        return tuple(sorted(self._formats))
+
+    def _learn(self, number_format: str) -> None:
+        if number_format in self._formats or not self._learning:
+            return
+        self._formats.add(number_format)
+        self._fast = _FAST_AMOUNT_PARSERS.get(self.number_format)
+
+    @classmethod
+    def classify(cls, value: object) -> str | None:
+        """Format eines einzelnen Werts ("de"/"en"), None ohne Trennzeichen oder mehrdeutig."""
+        if not isinstance(value, str) or ("," not in value and "." not in value):
+            return None
+        return cls._classify(value.replace(" ", "").strip())
+
+    @staticmethod
+    def _classify(text: str) -> str | None:
+        has_comma = "," in text
+        has_dot = "." in text
+        if not has_comma and not has_dot:
+            return None
+        if has_comma and has_dot:
+            return "de" if text.rfind(",") > text.rfind(".") else "en"
+        separator = "," if has_comma else "."
+        if text.count(separator) > 1:
+            # Mehrere gleiche Trennzeichen sind Tausendertrenner
+            return "en" if has_comma else "de"
+        if len(text) - text.rfind(separator) - 1 != 3:
+            return "de" if has_comma else "en"
+        return None
+
+    def parse(self, value: object) -> float | None:
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        text = value if isinstance(value, str) else str(value)
+        if " " in text:
+            text = text.replace(" ", "")
+        fast = self._fast
+        if fast is not None:
+            try:
+                return fast(text)
+            except ValueError:
+                pass
+        text = text.strip()
+        if not text:
+            return None
+        if "," not in text and "." not in text:
+            return _to_float(text)
+
+        number_format = self._classify(text)
+        if number_format is None:
+            number_format = self.number_format
+            if number_format is None:
+                raise AmbiguousAmountError(value)
+        else:
+            self._learn(number_format)
+        if number_format == "de":
+            return _to_float(text.replace(".", "").replace(",", "."))
+        return _to_float(text.replace(",", ""))
+
+    def observe(self, values: Iterable[object]) -> None:
+        """Lernt das Format aus allen eindeutigen Werten, ohne zu parsen."""
+        for value in values:
+            number_format = self.classify(value)
+            if number_format is not None:
+                self._learn(number_format)
+
+    def parse_many(self, values: Iterable[object]) -> list[float | None]:
+        """Parst eine ganze Spalte: erst Format erkennen, dann alle Werte parsen.
+
+        Mehrdeutige Werte am Anfang werden so über spätere eindeutige Werte
+        aufgelöst; bleibt ein Wert mehrdeutig, wird `AmbiguousAmountError`
+        ausgelöst.
+        """
+        values = list(values)
+        self.observe(values)
+        return [self.parse(value) for value in values]
@@ -1,7 +1,11 @@
+import bz2
 import csv
+import gzip
+import hashlib
 import io
 import os
 import platform
+import sqlite3
 import subprocess
 import sys
 import tempfile
@@ -9,6 +13,8 @@ import tomllib
 import unittest
 from pathlib import Path
 
+from euercli.schema import SCHEMA
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CLI = [sys.executable, "-m", "euercli"]
 
@@ -328,6 +334,101 @@ category = "Laufende EDV-Kosten"
         self.assertIn("Kategorie erforderlich", result.stderr)
         self.assertIn("--ledger-account", result.stderr)
 
+    def test_category_rules_classify_add_and_import(self):
+        self.write_config(
+            """
+[[ledger_accounts]]
+key = "hosting"
+name = "Hosting & Cloud-Dienste"
+category = "Laufende EDV-Kosten"
+
+[[category_rules]]
+vendor = "hetzner"
+ledger_account = "hosting"
+
+[[category_rules]]
+vendor_regex = "^db (bahn|fernverkehr)"
+amount_min = -500
+category = "Übernachtungs- und Reisenebenkosten"
+""".strip()
+            + "\n"
+        )
+
+        self.add_expense(vendor="HETZNER ONLINE", category=None)
+        import_file = self.root / "import.csv"
+        import_file.write_text(
+            "type,date,party,amount_eur\n"
+            "expense,2026-01-20,DB Fernverkehr AG,-89.00\n"
+            "expense,2026-01-21,Hetzner,-4.90\n",
+            encoding="utf-8",
+        )
+        self.run_cli(["import", "--file", str(import_file), "--format", "csv"], check=True)
+
+        query = self.run_cli(
+            [
+                "query",
+                "SELECT vendor, ledger_account, c.name FROM expenses e "
+                "LEFT JOIN categories c ON c.id = e.category_id ORDER BY e.id",
+            ],
+            check=True,
+        )
+        rows = self.parse_csv(query.stdout)
+        self.assertEqual(
+            rows[1:],
+            [
+                ["HETZNER ONLINE", "hosting", "Laufende EDV-Kosten"],
+                ["DB Fernverkehr AG", "", "Übernachtungs- und Reisenebenkosten"],
+                ["Hetzner", "hosting", "Laufende EDV-Kosten"],
+            ],
+        )
+
+    def test_suggest_lists_history_and_import_fills_category(self):
+        for day in ("10", "11", "12"):
+            self.add_expense(
+                date=f"2026-01-{day}", vendor="Hetzner Online", category="Laufende EDV-Kosten"
+            )
+        self.add_expense(date="2026-01-13", vendor="hetzner online", category="Telekommunikation")
+        self.add_expense(date="2026-01-14", vendor="Hetzner Online", category="Laufende EDV-Kosten")
+
+        result = self.run_cli(["suggest", "HETZNER ONLINE"], check=True)
+        self.assertIn("80%", result.stdout)
+        self.assertIn("Laufende EDV-Kosten", result.stdout)
+        self.assertIn("Telekommunikation", result.stdout)
+
+        import_file = self.root / "import.csv"
+        import_file.write_text(
+            "type,date,party,amount_eur\n"
+            "expense,2026-02-01,Hetzner Online,-4.90\n"
+            "expense,2026-02-02,Unbekannt,-1.00\n",
+            encoding="utf-8",
+        )
+        result = self.run_cli(
+            ["import", "--file", str(import_file), "--format", "csv", "--suggest"], check=True
+        )
+        self.assertIn("Kategorie-Vorschläge: 1 Partei(en)", result.stdout)
+
+        query = self.run_cli(
+            [
+                "query",
+                "SELECT vendor, c.name FROM expenses e "
+                "LEFT JOIN categories c ON c.id = e.category_id WHERE e.id > 5 ORDER BY e.id",
+            ],
+            check=True,
+        )
+        self.assertEqual(
+            self.parse_csv(query.stdout)[1:],
+            [["Hetzner Online", "Laufende EDV-Kosten"], ["Unbekannt", ""]],
+        )
+
+        # Modell wird beim init aus dem Bestand neu aufgebaut
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM category_suggestions")
+        conn.commit()
+        conn.close()
+        self.run_cli(["init"], check=True)
+        result = self.run_cli(["suggest", "Hetzner Online"], check=True)
+        self.assertIn("83%", result.stdout)
+
     def test_add_expense_with_invoice_date_only(self):
         result = self.run_cli(
             [
@@ -511,6 +612,242 @@ category = "Laufende EDV-Kosten"
         rows = self.list_expenses_csv()
         self.assertEqual(len(rows), 2)
 
+    def test_idempotency_key_replays_add_and_import(self):
+        base = [
+            "add", "expense", "--date", "2026-01-15", "--vendor", "Hetzner",
+            "--amount", "-10.00", "--category", "Arbeitsmittel",
+            "--idempotency-key", "agent-run-1",
+        ]
+        first = self.run_cli(base + ["--notes", "Versuch 1"], check=True)
+        self.assertIn("Ausgabe #1 hinzugefügt", first.stdout)
+        retried = self.run_cli(base + ["--notes", "Versuch 2"], check=True)
+        self.assertIn(
+            "Ausgabe #1 bereits angelegt (Idempotency-Key): Hetzner -10,00 EUR", retried.stdout
+        )
+        self.assertEqual(len(self.list_expenses_csv()), 2)
+
+        import_file = self.root / "agent.jsonl"
+        import_file.write_text(
+            '{"date":"2026-01-16","party":"Neu","amount_eur":-5.00,'
+            '"notes":"Versuch 2","idempotency_key":"agent-run-1"}\n'
+            '{"date":"2026-01-17","party":"Kunde","amount_eur":50.00,'
+            '"idempotency_key":"agent-run-2"}\n',
+            encoding="utf-8",
+        )
+        args = ["import", "--file", str(import_file), "--format", "jsonl"]
+        result = self.run_cli(args, check=True)
+        self.assertIn("Einnahmen angelegt: 1", result.stdout)
+        self.assertIn("Duplikate übersprungen: 1", result.stdout)
+
+        import_file.write_text(
+            '{"date":"2026-01-18","party":"Kunde","amount_eur":50.00,'
+            '"notes":"Retry","idempotency_key":"agent-run-2"}\n',
+            encoding="utf-8",
+        )
+        result = self.run_cli(args + ["--dry-run"], check=True)
+        self.assertIn("Duplikate: 1", result.stdout)
+        result = self.run_cli(args, check=True)
+        self.assertIn("Duplikate übersprungen: 1", result.stdout)
+        self.assertEqual(len(self.list_income_csv()), 2)
+
+    def test_init_migrates_hex_hashes_to_blob(self):
+        self.db_path.unlink()
+        legacy_hash = hashlib.sha256(b"2026-01-15|TestVendor|-10.00|").hexdigest()
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(SCHEMA.replace("hash BLOB", "hash TEXT"))
+        conn.execute(
+            """INSERT INTO expenses (uuid, payment_date, vendor, amount_eur, hash)
+               VALUES ('legacy', '2026-01-15', 'TestVendor', -10.0, ?)""",
+            (legacy_hash,),
+        )
+        conn.commit()
+        conn.close()
+
+        # Vor der Migration keine BLOB-Hashes neben den Hex-Hashes schreiben
+        result = self.add_expense(vendor="Neu")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Spalte expenses.hash noch im Textformat", result.stderr)
+        self.assertIn("Bitte zuerst 'euer init' ausführen.", result.stderr)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0], 1)
+        conn.close()
+
+        self.run_cli(["init"], check=True)
+
+        conn = sqlite3.connect(self.db_path)
+        column_type = next(
+            row[2]
+            for row in conn.execute("PRAGMA table_info(expenses)")
+            if row[1] == "hash"
+        )
+        stored = conn.execute("SELECT hash FROM expenses").fetchone()[0]
+        conn.close()
+        self.assertEqual(column_type, "BLOB")
+        self.assertEqual(stored, bytes.fromhex(legacy_hash[:32]))
+
+        # Neu berechnete Hashes treffen die migrierten Werte
+        duplicate = self.add_expense(category=None)
+        self.assertIn("Warnung: Duplikat erkannt", duplicate.stderr)
+
+    def test_init_adds_generated_booking_date_and_cents_columns(self):
+        self.db_path.unlink()
+        legacy_schema = "\n".join(
+            line for line in SCHEMA.splitlines() if "GENERATED ALWAYS" not in line
+        )
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(legacy_schema)
+        conn.execute(
+            """INSERT INTO expenses (uuid, invoice_date, vendor, amount_eur, hash)
+               VALUES ('legacy', '2026-02-10', 'Alt', -2.0, X'00')"""
+        )
+        # Frühere Version: ungenutzte Spalte booking_year wird von init entfernt
+        conn.executescript(
+            """ALTER TABLE income ADD COLUMN booking_date TEXT
+                   GENERATED ALWAYS AS (COALESCE(payment_date, invoice_date)) VIRTUAL;
+               ALTER TABLE income ADD COLUMN booking_year INTEGER
+                   GENERATED ALWAYS AS (CAST(substr(booking_date, 1, 4) AS INTEGER)) VIRTUAL;"""
+        )
+        conn.commit()
+        conn.close()
+
+        for args in (["list", "expenses", "--year", "2025"], ["export", "--year", "2026"]):
+            result = self.run_cli(args)
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("Spalte expenses.booking_date fehlt", result.stderr)
+            self.assertIn("Bitte zuerst 'euer init' ausführen.", result.stderr)
+            self.assertNotIn("Traceback", result.stderr)
+
+        self.run_cli(["init"], check=True)
+
+        conn = sqlite3.connect(self.db_path)
+        booking = conn.execute(
+            "SELECT booking_date, amount_cents, vat_input_cents FROM expenses"
+        ).fetchone()
+        income_columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(income)")}
+        plan = " ".join(
+            str(row[-1])
+            for row in conn.execute(
+                """EXPLAIN QUERY PLAN SELECT id FROM expenses
+                   WHERE booking_date >= '2026-01-01' AND booking_date < '2027-01-01'"""
+            )
+        )
+        conn.close()
+        self.assertEqual(booking, ("2026-02-10", -200, None))
+        self.assertIn("booking_date", income_columns)
+        self.assertNotIn("booking_year", income_columns)
+        self.assertIn("idx_expenses_booking_date", plan)
+
+        result = self.run_cli(
+            ["list", "expenses", "--year", "2026", "--month", "2", "--format", "csv"],
+            check=True,
+        )
+        self.assertEqual([row[3] for row in self.parse_csv(result.stdout)[1:]], ["Alt"])
+        # Audit-Snapshots enthalten keine generierten Spalten
+        self.run_cli(["delete", "expense", "1", "--force"], check=True)
+        conn = sqlite3.connect(self.db_path)
+        old_data = conn.execute(
+            "SELECT old_data FROM audit_log WHERE action = 'DELETE'"
+        ).fetchone()[0]
+        conn.close()
+        self.assertNotIn("booking_date", old_data)
+        self.assertNotIn("amount_cents", old_data)
+
+    def test_db_analyze_reports_covering_indexes(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE INDEX idx_expenses_payment_date ON expenses(payment_date)")
+        conn.execute(
+            "CREATE INDEX idx_expenses_summary ON expenses(payment_date, category_id, amount_eur)"
+        )
+        conn.commit()
+        conn.close()
+        result = self.run_cli(["db", "analyze"], check=True)
+        self.assertIn(
+            "Abgelöste Indizes noch vorhanden: idx_expenses_payment_date, idx_expenses_summary",
+            result.stdout,
+        )
+
+        # init legt die abdeckenden Indizes an und entfernt den Einzelindex
+        self.run_cli(["init"], check=True)
+        self.add_expense()
+        self.add_income()
+        result = self.run_cli(["db", "analyze"], check=True)
+        self.assertIn("ANALYZE ausgeführt", result.stdout)
+        self.assertRegex(
+            result.stdout,
+            r"OK\s+summary: Ausgaben nach Kategorie\s+Primärschlüssel \(abdeckend\)",
+        )
+        self.assertRegex(
+            result.stdout,
+            r"OK\s+summary: Einnahmen ohne Wertstellung\s+idx_income_dates \(abdeckend\)",
+        )
+        self.assertNotIn("WARN", result.stdout)
+        self.assertNotIn("Hinweis", result.stdout)
+
+    def test_invalid_database_profile_warns_once_and_uses_safe(self):
+        self.write_config('[database]\nprofile = "turbo"\n')
+        result = self.add_expense()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stderr.count("Verwende Profil 'safe'"), 1)
+
+    def test_db_aggregates_checks_and_rebuilds(self):
+        self.add_expense()
+        self.add_income()
+        result = self.run_cli(["db", "aggregates"], check=True)
+        self.assertIn("Summentabelle konsistent.", result.stdout)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE agg_period_category SET amount_cents = amount_cents + 100")
+        conn.commit()
+        conn.close()
+        result = self.run_cli(["db", "aggregates"])
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Summentabelle weicht ab: 2 Schlüssel", result.stdout)
+        self.assertIn("db aggregates --rebuild", result.stdout)
+
+        result = self.run_cli(["db", "aggregates", "--rebuild"], check=True)
+        self.assertIn("Summentabelle neu aufgebaut: 2 Einträge.", result.stdout)
+        self.assertIn("Summentabelle konsistent.", result.stdout)
+
+    def test_import_normalizes_dates_and_init_migrates_legacy_dates(self):
+        import_file = self.root / "import.csv"
+        import_file.write_text(
+            "type,Datum,Rechnungsdatum,party,amount_eur\n"
+            "expense,19.03.2026,2026-03-18T00:00:00,Tool,-5.00\n"
+            "expense,31.02.2026,,Kaputt,-1.00\n",
+            encoding="utf-8",
+        )
+        result = self.run_cli(["import", "--file", str(import_file), "--format", "csv"])
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("payment_date (ungültiges Datum: 31.02.2026)", result.stderr)
+
+        import_file.write_text(
+            "type,Datum,Rechnungsdatum,party,amount_eur\n"
+            "expense,19.03.2026,2026-03-18T00:00:00,Tool,-5.00\n",
+            encoding="utf-8",
+        )
+        self.run_cli(["import", "--file", str(import_file), "--format", "csv"], check=True)
+        result = self.run_cli(
+            ["list", "expenses", "--year", "2026", "--month", "3", "--format", "csv"],
+            check=True,
+        )
+        self.assertEqual(len(self.parse_csv(result.stdout)), 2)
+
+        # Alt-Bestand mit deutschem Datum wird von init umgestellt (inkl. Hash)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """INSERT INTO expenses (uuid, payment_date, vendor, amount_eur, hash)
+               VALUES ('legacy', '02.01.2026', 'Alt', -2.0, X'00')"""
+        )
+        conn.commit()
+        conn.close()
+        self.assertEqual(len(self.list_expenses_csv()), 2)
+
+        result = self.run_cli(["init"], check=True)
+        self.assertIn("1 Datumswert(e) auf YYYY-MM-DD umgestellt", result.stdout)
+        self.assertEqual(len(self.list_expenses_csv()), 3)
+        duplicate = self.add_expense(date="2026-01-02", vendor="Alt", amount="-2.00", category=None)
+        self.assertIn("Warnung: Duplikat erkannt", duplicate.stderr)
+
     def test_update_expense(self):
         self.add_expense()
         result = self.run_cli(
@@ -814,6 +1151,46 @@ account_number = "8400"
         self.assertIn("GESAMT Einnahmen", result.stdout)
         self.assertIn("Umsatzsteuer (Kleinunternehmer)", result.stdout)
 
+    def test_summary_sums_exact_cents(self):
+        for vendor, amount in (("Restaurant A", "-615.15"), ("Restaurant B", "-57.00")):
+            self.add_expense(vendor=vendor, category="Bewirtungsaufwendungen", amount=amount)
+        self.add_expense(vendor="Restaurant C", category="Bewirtungsaufwendungen", amount="-404.40")
+        for idx in range(10):
+            self.add_income(source=f"Kunde {idx}", amount="0.10")
+        result = self.run_cli(["summary", "--year", "2026"], check=True)
+        # 1076,55 × 70 % = 753,585 → kaufmännisch 753,59 (Float ergäbe 753,58)
+        self.assertRegex(result.stdout, r"Abziehbar \(70%, Aufwand\)\s+753\.59 EUR")
+        self.assertRegex(result.stdout, r"Nicht abziehbar \(30%, ELSTER\)\s+322\.96 EUR")
+        self.assertRegex(result.stdout, r"GESAMT Ausgaben\s+-753\.59 EUR")
+        self.assertRegex(result.stdout, r"GESAMT Einnahmen\s+1\.00 EUR")
+        self.assertRegex(result.stdout, r"VERLUST\s+-752\.59 EUR")
+
+    def test_summary_refuses_missing_or_empty_aggregates(self):
+        self.add_expense()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM agg_period_category")
+        conn.commit()
+        conn.close()
+        result = self.run_cli(["summary", "--year", "2026"])
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Summentabelle enthält keine Werte für 2026", result.stderr)
+        self.assertNotIn("GESAMT", result.stdout)
+        # Jahre ohne Buchungen bleiben auswertbar
+        self.run_cli(["summary", "--year", "2025"], check=True)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP TABLE agg_period_category")
+        conn.commit()
+        conn.close()
+        result = self.run_cli(["summary", "--year", "2026"])
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Summentabelle fehlt). Bitte zuerst 'euer init' ausführen.", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+
+        self.run_cli(["init"], check=True)
+        result = self.run_cli(["summary", "--year", "2026"], check=True)
+        self.assertRegex(result.stdout, r"GESAMT Ausgaben\s+-10\.00 EUR")
+
     def test_summary_include_private(self):
         self.add_private_deposit(amount="250.00", description="Einlage")
         result = self.run_cli(
@@ -1212,6 +1589,392 @@ account_number = "4940"
         self.assertEqual(rows[1][4], "(51) Arbeitsmittel")
         self.assertEqual(rows[1][3], "1und1")
 
+    def test_import_from_stdin(self):
+        data = (
+            '{"type":"expense","date":"2026-01-10","party":"Vendor A",'
+            '"category":"Arbeitsmittel","amount_eur":-20.00}\n'
+            '{"type":"income","date":"2026-01-11","party":"Kunde",'
+            '"amount_eur":100.00}\n'
+        )
+        result = self.run_cli(
+            ["import", "--file", "-", "--format", "jsonl"], input=data, check=True
+        )
+        self.assertIn("Zeilen gesamt: 2", result.stdout)
+        self.assertIn("Ausgaben angelegt: 1", result.stdout)
+        self.assertIn("Einnahmen angelegt: 1", result.stdout)
+
+    def test_import_with_workers(self):
+        import_file = self.root / "workers.jsonl"
+        import_file.write_text(
+            '{"type":"expense","date":"2026-01-10","party":"Vendor A","amount_eur":-20.00}\n'
+            '{"type":"expense","date":"2026-01-11","amount_eur":-5.00}\n',
+            encoding="utf-8",
+        )
+        result = self.run_cli(
+            ["import", "--file", str(import_file), "--format", "jsonl", "--workers", "2"]
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Zeile 2: party", result.stderr)
+
+        import_file.write_text(
+            '{"type":"expense","date":"2026-01-10","party":"Vendor A","amount_eur":-20.00}\n'
+            '{"type":"income","date":"2026-01-11","party":"Kunde","amount_eur":100.00}\n',
+            encoding="utf-8",
+        )
+        result = self.run_cli(
+            ["import", "--file", str(import_file), "--format", "jsonl", "--workers", "2"],
+            check=True,
+        )
+        self.assertIn("Ausgaben angelegt: 1", result.stdout)
+        self.assertIn("Einnahmen angelegt: 1", result.stdout)
+
+    def test_import_resume_checkpoints_batches(self):
+        import_file = self.root / "resume.jsonl"
+        import_file.write_text(
+            '{"type":"expense","date":"2026-01-10","party":"Vendor A","amount_eur":-20.00}\n'
+            '{"type":"expense","date":"2026-01-11","party":"Vendor B","amount_eur":-5.00,'
+            '"ledger_account":"gibt-es-nicht"}\n',
+            encoding="utf-8",
+        )
+        args = [
+            "import", "--file", str(import_file), "--format", "jsonl",
+            "--batch-size", "1", "--resume",
+        ]
+        result = self.run_cli(args)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("1 Zeilen sind gespeichert", result.stderr)
+        self.assertEqual(len(self.list_expenses_csv()), 2)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT status, rows_done, last_batch FROM import_journal"
+            ).fetchone()
+        finally:
+            conn.close()
+        self.assertEqual(row, ("running", 1, 1))
+
+        import_file.write_text(
+            '{"type":"expense","date":"2026-01-10","party":"Vendor A","amount_eur":-20.00}\n',
+            encoding="utf-8",
+        )
+        result = self.run_cli(args[:-3] + ["--resume"], check=True)
+        self.assertIn("Duplikate übersprungen: 1", result.stdout)
+        result = self.run_cli(args[:-3] + ["--resume"], check=True)
+        self.assertIn("bereits vollständig importiert", result.stdout)
+
+    def test_import_resume_keeps_learned_number_format(self):
+        # "-1.234" ist allein mehrdeutig; nach "-39,99" gilt das deutsche Format,
+        # auch wenn der Import dazwischen abbricht.
+        import_file = self.root / "resume.csv"
+        import_file.write_text(
+            "type,date,party,amount_eur,ledger_account\n"
+            'expense,10.01.2026,Vendor A,"-39,99",\n'
+            "expense,11.01.2026,Vendor B,-1.234,hosting\n",
+            encoding="utf-8",
+        )
+        args = [
+            "import", "--file", str(import_file), "--format", "csv",
+            "--batch-size", "1", "--resume",
+        ]
+        result = self.run_cli(args)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("1 Zeilen sind gespeichert", result.stderr)
+
+        self.write_config(
+            '[[ledger_accounts]]\nkey = "hosting"\nname = "Hosting"\n'
+            'category = "Laufende EDV-Kosten"\n'
+        )
+        result = self.run_cli(args, check=True)
+        self.assertIn("Fortgesetzt ab Zeile 2", result.stdout)
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT vendor, payment_date, amount_cents FROM expenses ORDER BY id"
+            ).fetchall()
+        self.assertEqual(
+            rows, [("Vendor A", "2026-01-10", -3999), ("Vendor B", "2026-01-11", -123400)]
+        )
+
+    def test_import_compressed_file_and_stdin(self):
+        data = (
+            "type,date,party,amount_eur\n"
+            "expense,2026-01-10,Vendor A,-20.00\n"
+            "income,2026-01-11,Kunde,100.00\n"
+        ).encode("utf-8")
+        import_file = self.root / "bank.csv.gz"
+        import_file.write_bytes(gzip.compress(data))
+        result = self.run_cli(
+            ["import", "--file", str(import_file), "--format", "csv"], check=True
+        )
+        self.assertIn("Ausgaben angelegt: 1", result.stdout)
+
+        result = subprocess.run(
+            CLI + ["--db", str(self.db_path), "import", "--file", "-", "--format", "csv"],
+            input=bz2.compress(data),
+            capture_output=True,
+            cwd=REPO_ROOT,
+            env=self.env,
+        )
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        self.assertIn("Duplikate übersprungen: 2", result.stdout.decode("utf-8"))
+
+    def test_import_bloom_filter_is_persisted_and_reused(self):
+        import_file = self.root / "import.csv"
+        import_file.write_text(
+            "type,date,party,amount_eur\n"
+            "expense,2026-01-10,Vendor A,-20.00\n"
+            "income,2026-01-11,Kunde,100.00\n",
+            encoding="utf-8",
+        )
+        args = ["import", "--file", str(import_file), "--format", "csv", "--bloom"]
+
+        first = self.run_cli(args, check=True)
+        self.assertIn("Bloom-Filter expenses: neu aufgebaut (0 Hashes)", first.stdout)
+        self.assertIn("1 von 1 Prüfungen ohne DB-Abfrage", first.stdout)
+        self.assertTrue(Path(f"{self.db_path}.expenses.bloom").exists())
+
+        second = self.run_cli(args, check=True)
+        self.assertIn("Bloom-Filter expenses: geladen (1 Hashes)", second.stdout)
+        self.assertIn("Duplikate übersprungen: 2", second.stdout)
+        self.assertIn("0 von 1 Prüfungen ohne DB-Abfrage, 0 Fehlalarme", second.stdout)
+
+        self.add_expense()
+        third = self.run_cli(args, check=True)
+        self.assertIn("Bloom-Filter expenses: neu aufgebaut (2 Hashes)", third.stdout)
+
+    def test_import_single_pass_discards_failing_batches(self):
+        import_file = self.root / "single.jsonl"
+        import_file.write_text(
+            '{"type":"expense","date":"2026-01-10","party":"Vendor A","amount_eur":-20.00}\n'
+            '{"type":"expense","date":"2026-01-11","party":"Vendor B","amount_eur":-5.00,'
+            '"ledger_account":"gibt-es-nicht"}\n'
+            '{"type":"expense","date":"2026-01-12","amount_eur":-7.00}\n'
+            '{"type":"income","date":"2026-01-13","party":"Kunde","amount_eur":100.00}\n',
+            encoding="utf-8",
+        )
+        args = [
+            "import", "--file", str(import_file), "--format", "jsonl",
+            "--batch-size", "2", "--single-pass",
+        ]
+
+        result = self.run_cli(args + ["--atomic"])
+        self.assertNotEqual(result.returncode, 0)
+        self.assertEqual(len(self.list_expenses_csv()), 1)
+        self.assertEqual(len(self.list_income_csv()), 1)
+
+        result = self.run_cli(args)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Verworfen: 2 Fehler", result.stdout)
+        self.assertIn("Zeilen 1-2:", result.stderr)
+        self.assertIn("Zeile 3: Pflichtfelder fehlen: party", result.stderr)
+        # Block 1 wurde bis zum Savepoint zurückgerollt, aus Block 2 nur Zeile 3 verworfen
+        self.assertEqual(len(self.list_expenses_csv()), 1)
+        self.assertEqual(len(self.list_income_csv()), 2)
+
+        import_file.write_text(
+            '{"type":"expense","date":"2026-01-10","party":"Vendor A","amount_eur":-20.00}\n'
+            '{"type":"income","date":"2026-01-13","party":"Kunde","amount_eur":100.00}\n',
+            encoding="utf-8",
+        )
+        result = self.run_cli(args, check=True)
+        self.assertIn("Ausgaben angelegt: 1", result.stdout)
+        self.assertIn("Duplikate übersprungen: 1", result.stdout)
+        self.assertEqual(len(self.list_expenses_csv()), 2)
+
+    def test_import_directory(self):
+        import_dir = self.root / "statements"
+        import_dir.mkdir()
+        (import_dir / "2026-01.csv").write_text(
+            "type,date,party,amount_eur\n"
+            "expense,2026-01-10,Vendor A,-20.00\n"
+            "income,2026-01-11,Kunde,100.00\n",
+            encoding="utf-8",
+        )
+        (import_dir / "2026-02.csv.gz").write_bytes(
+            gzip.compress(
+                b"type,date,party,amount_eur\n"
+                b"expense,2026-02-10,Vendor B,-5.00\n"
+                b"expense,2026-01-10,Vendor A,-20.00\n"
+            )
+        )
+        (import_dir / "2026-03.csv").write_text(
+            "type,date,party,amount_eur\nexpense,2026-03-10,,-1.00\n",
+            encoding="utf-8",
+        )
+        (import_dir / "notizen.txt").write_text("kein Import", encoding="utf-8")
+
+        args = ["import", "--dir", str(import_dir), "--format", "csv"]
+        result = self.run_cli(args)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("2026-03.csv: FEHLER – Pflichtfelder fehlen: Zeile 1: party", result.stdout)
+        self.assertEqual(len(self.list_expenses_csv()), 1)
+
+        result = self.run_cli(args + ["--commit-per-file", "--workers", "2"])
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("2026-01.csv: 2 Zeilen, 1 Ausgaben, 1 Einnahmen, 0 Duplikate", result.stdout)
+        self.assertIn("2026-02.csv.gz: 2 Zeilen, 1 Ausgaben, 0 Einnahmen, 1 Duplikate", result.stdout)
+        self.assertIn("Dateien: 2 von 3 importiert", result.stdout)
+        self.assertEqual(len(self.list_expenses_csv()), 3)
+
+        result = self.run_cli(args + ["--glob", "2026-0[12].*"], check=True)
+        self.assertIn("Duplikate übersprungen: 4", result.stdout)
+
+    def test_ingest_watch_once_imports_only_new_or_changed_files(self):
+        inbox = self.root / "inbox"
+        inbox.mkdir()
+        statement = inbox / "bank.csv"
+        statement.write_text(
+            "type,date,party,amount_eur\n"
+            "expense,2026-01-10,Vendor A,-20.00\n"
+            "income,2026-01-11,Kunde,100.00\n",
+            encoding="utf-8",
+        )
+        (inbox / "kaputt.csv").write_text(
+            "type,date,party,amount_eur\nexpense,2026-01-12,,-1.00\n", encoding="utf-8"
+        )
+        (inbox / ".bank2.csv.part").write_text("halb geschrieben", encoding="utf-8")
+        (inbox / "notizen.txt").write_text("kein Import", encoding="utf-8")
+        args = ["ingest", "watch", str(inbox), "--once"]
+
+        result = self.run_cli(args)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("bank.csv: 2 Zeilen, 1 Ausgaben, 1 Einnahmen, 0 Duplikate", result.stdout)
+        self.assertIn("kaputt.csv: FEHLER – Pflichtfelder fehlen: Zeile 1: party", result.stderr)
+        self.assertIn("1 Datei(en) importiert, 1 fehlgeschlagen", result.stdout)
+
+        # Unverändert bzw. nur angefasst → kein erneuter Import
+        result = self.run_cli(args, check=True)
+        self.assertIn("keine neuen oder geänderten Dateien", result.stdout)
+        stat = statement.stat()
+        os.utime(statement, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        result = self.run_cli(args, check=True)
+        self.assertIn("keine neuen oder geänderten Dateien", result.stdout)
+
+        with statement.open("a", encoding="utf-8") as f:
+            f.write("expense,2026-01-13,Vendor B,-5.00\n")
+        result = self.run_cli(args, check=True)
+        self.assertIn("bank.csv: 3 Zeilen, 1 Ausgaben, 0 Einnahmen, 2 Duplikate", result.stdout)
+        self.assertNotIn("kaputt.csv", result.stdout + result.stderr)
+        self.assertEqual(len(self.list_expenses_csv()), 3)
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT path, status FROM ingest_files ORDER BY path"
+            ).fetchall()
+        self.assertEqual(
+            [(Path(path).name, status) for path, status in rows],
+            [("bank.csv", "imported"), ("kaputt.csv", "failed")],
+        )
+
+    def test_ingest_watch_retries_all_files_after_locked_database(self):
+        # Mehr Dateien als Leser-Threads: ein abgebrochener Durchlauf darf keinen
+        # Leser blockiert zurücklassen.
+        self.write_config("[database.profiles.safe]\nbusy_timeout = 0\n")
+        inbox = self.root / "inbox"
+        inbox.mkdir()
+        for month in range(1, 7):
+            (inbox / f"2026-{month:02d}.csv").write_text(
+                "type,date,party,amount_eur\n"
+                + "".join(
+                    f"expense,2026-{month:02d}-01,Vendor {i},-{i}.00\n" for i in range(1, 51)
+                ),
+                encoding="utf-8",
+            )
+        args = ["ingest", "watch", str(inbox), "--once", "--batch-size", "5"]
+
+        lock = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            lock.execute("BEGIN IMMEDIATE")
+            result = subprocess.run(
+                CLI + ["--db", str(self.db_path)] + args,
+                text=True,
+                capture_output=True,
+                cwd=REPO_ROOT,
+                env=self.env,
+                timeout=60,
+            )
+        finally:
+            lock.close()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("2026-01.csv: Datenbank nicht verfügbar", result.stderr)
+        self.assertIn("keine neuen oder geänderten Dateien", result.stdout)
+
+        result = self.run_cli(args, check=True)
+        self.assertIn("Eingang: 6 Datei(en) importiert, 0 fehlgeschlagen", result.stdout)
+        self.assertEqual(len(self.list_expenses_csv()), 1 + 300)
+
+    def test_import_mt940_statement(self):
+        import_file = self.root / "auszug.sta"
+        import_file.write_bytes(
+            (
+                ":20:STARTUMSE\n:25:10020030/1234567890\n"
+                ":61:2601100110D39,99NDDTNONREF\n"
+                ":86:105?00SEPA-LASTSCHRIFT?20Rechnung 4711?32Stadtwerke Mü\nnchen\n"
+                ":61:260112C150,00NTRFNONREF\n:86:Gutschrift Kunde A\n-\n"
+            ).encode("latin-1")
+        )
+        result = self.run_cli(
+            ["import", "--file", str(import_file), "--format", "mt940"], check=True
+        )
+        self.assertIn("Ausgaben angelegt: 1", result.stdout)
+        self.assertIn("Einnahmen angelegt: 1", result.stdout)
+        rows = self.list_expenses_csv()
+        self.assertEqual(rows[1][3], "Stadtwerke München")
+
+    def test_import_dry_run_classifies_rows_read_only(self):
+        import_file = self.root / "preview.jsonl"
+        import_file.write_text(
+            '{"type":"expense","date":"2026-01-15","party":"1und1","amount_eur":-39.99}\n'
+            '{"type":"expense","date":"2026-01-16","party":"Neu","amount_eur":-5.00}\n'
+            '{"type":"expense","date":"2026-01-16","party":"Neu","amount_eur":-5.00}\n'
+            '{"type":"income","date":"2026-01-17","amount_eur":10.00}\n'
+            '{"type":"income","date":"2026-01-18","party":"Kunde","amount_eur":10.00,'
+            '"ledger_account":"gibt-es-nicht"}\n',
+            encoding="utf-8",
+        )
+        self.run_cli(
+            [
+                "add", "expense", "--date", "2026-01-15", "--vendor", "1und1",
+                "--amount", "-39.99", "--category", "Telekommunikation",
+            ],
+            check=True,
+        )
+        report = self.root / "preview.csv"
+        result = self.run_cli(
+            [
+                "import", "--file", str(import_file), "--format", "jsonl",
+                "--dry-run", "--report", str(report),
+            ],
+            check=True,
+        )
+
+        self.assertIn("Zeilen gesamt: 5", result.stdout)
+        self.assertIn("Neu: 1 (Ausgaben: 1, Einnahmen: 0)", result.stdout)
+        self.assertIn("Duplikate: 2", result.stdout)
+        self.assertIn("Ungültig: 2", result.stdout)
+        self.assertIn("Zeile 1: Duplikat (ID 1)", result.stdout)
+        self.assertIn("Zeile 4: ungültig – Pflichtfelder fehlen: party", result.stdout)
+        rows = self.parse_csv(report.read_text(encoding="utf-8"))
+        self.assertEqual(
+            [row[2] for row in rows[1:]],
+            ["duplicate", "new", "duplicate", "invalid", "invalid"],
+        )
+        self.assertEqual(len(self.list_expenses_csv()), 2)
+
+    def test_import_show_mapping(self):
+        import_file = self.root / "mapping.csv"
+        import_file.write_text(
+            "Datum,Lieferant,EUR,Kontonummer\n2026-01-10,1und1,-39.99,4940\n",
+            encoding="utf-8",
+        )
+        result = self.run_cli(
+            ["import", "--file", str(import_file), "--format", "csv", "--show-mapping"],
+            check=True,
+        )
+        self.assertIn("payment_date    ← 'Datum'", result.stdout)
+        self.assertIn("Nicht zugeordnet: 'Kontonummer'", result.stdout)
+        self.assertEqual(len(self.list_expenses_csv()), 1)
+
     def test_import_missing_required_fails(self):
         import_file = self.root / "import_missing.csv"
         import_file.write_text(
@@ -1254,5 +2017,41 @@ account_number = "4940"
         self.assertIn("receipt", incomplete_result.stdout)
         self.assertIn("account", incomplete_result.stdout)
 
+    def test_duplicates_scan_lists_near_duplicates(self):
+        for date, vendor in (
+            ("2026-02-01", "HETZNER ONLINE"),
+            ("2026-02-03", "Hetzner"),
+            ("2026-02-02", "Adobe"),
+        ):
+            self.run_cli(
+                [
+                    "add",
+                    "expense",
+                    "--date",
+                    date,
+                    "--vendor",
+                    vendor,
+                    "--amount",
+                    "-49.90",
+                ],
+                check=True,
+            )
+
+        table_result = self.run_cli(["duplicates", "scan"], check=True)
+        self.assertIn("1 Kandidatenpaar(e) gefunden.", table_result.stdout)
+
+        csv_result = self.run_cli(
+            ["duplicates", "scan", "--format", "csv"], check=True
+        )
+        rows = self.parse_csv(csv_result.stdout)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1:4], ["expense", "1", "2"])
+        self.assertEqual(rows[1][6:8], ["HETZNER ONLINE", "Hetzner"])
+
+        none_result = self.run_cli(
+            ["duplicates", "scan", "--type", "income"], check=True
+        )
+        self.assertIn("Keine Duplikat-Kandidaten gefunden.", none_result.stdout)
+
 if __name__ == "__main__":
     unittest.main()
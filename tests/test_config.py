@@ -1,7 +1,16 @@
+import tempfile
 import tomllib
 import unittest
+from pathlib import Path
 
-from euercli.config import dump_toml, get_ledger_accounts
+from euercli.config import (
+    dump_toml,
+    get_bulk_database_profile,
+    get_category_rules,
+    get_database_profile,
+    get_ledger_accounts,
+)
+from euercli.db import database_profile, get_db_connection, read_database_profile
 from euercli.services.errors import ValidationError
 
 
@@ -60,6 +69,96 @@ class ConfigTestCase(unittest.TestCase):
 
         self.assertEqual(ctx.exception.code, "ledger_account_missing_fields")
 
+    def test_get_category_rules_parses_and_validates_entries(self) -> None:
+        rules = get_category_rules(
+            {
+                "category_rules": [
+                    {"vendor": " Hetzner ", "ledger_account": "hosting", "amount_max": 0},
+                    {"type": "income", "vendor_regex": "^kunde", "category": "Honorare"},
+                ]
+            }
+        )
+        self.assertEqual([rule.type for rule in rules], ["expense", "income"])
+        self.assertEqual(rules[0].vendor, "Hetzner")
+        self.assertEqual(rules[0].amount_max, 0.0)
+        self.assertIsNone(rules[0].category)
+
+        invalid = {
+            "category_rule_missing_target": {"vendor": "x"},
+            "category_rule_missing_condition": {"category": "Telekommunikation"},
+            "invalid_category_rule": {"vendor_regex": "(", "category": "Telekommunikation"},
+        }
+        for code, entry in invalid.items():
+            with self.subTest(code=code):
+                with self.assertRaises(ValidationError) as ctx:
+                    get_category_rules({"category_rules": [entry]})
+                self.assertEqual(ctx.exception.code, code)
+
+    def test_get_database_profile_merges_overrides_and_validates(self) -> None:
+        self.assertEqual(get_database_profile({}).name, "safe")
+        self.assertIsNone(get_bulk_database_profile({}))
+
+        config = {
+            "database": {
+                "profile": "fast",
+                "bulk_profile": "nachts",
+                "profiles": {
+                    "fast": {"cache_size": -8000},
+                    "nachts": {"synchronous": "off", "temp_store": "memory"},
+                },
+            }
+        }
+        fast = get_database_profile(config)
+        self.assertEqual((fast.journal_mode, fast.cache_size), ("WAL", -8000))
+        bulk = get_bulk_database_profile(config)
+        self.assertEqual(
+            (bulk.name, bulk.synchronous, bulk.journal_mode), ("nachts", "OFF", None)
+        )
+
+        invalid = {
+            "unknown_database_profile": {"profile": "turbo"},
+            "invalid_database_profile": {"profiles": {"safe": {"synchronous": "LAZY"}}},
+        }
+        for code, section in invalid.items():
+            with self.subTest(code=code):
+                with self.assertRaises(ValidationError) as ctx:
+                    get_database_profile({"database": section})
+                self.assertEqual(ctx.exception.code, code)
+
+    def test_database_profile_applies_and_bulk_switch_restores(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = {"database": {"profile": "fast"}}
+            conn = get_db_connection(
+                Path(tmp) / "test.db", profile=get_database_profile(config)
+            )
+            try:
+                current = read_database_profile(conn)
+                self.assertEqual(
+                    (current.journal_mode, current.synchronous, current.temp_store),
+                    ("WAL", "NORMAL", "MEMORY"),
+                )
+                with database_profile(conn, get_database_profile(config, "bulk")):
+                    conn.execute("CREATE TABLE t (x)")
+                    conn.commit()
+                    self.assertEqual(read_database_profile(conn).synchronous, "OFF")
+                self.assertEqual(read_database_profile(conn), current)
+            finally:
+                conn.close()
+
+    def test_bulk_profile_keeps_fsync_without_wal(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = get_db_connection(
+                Path(tmp) / "test.db", profile=get_database_profile({})
+            )
+            try:
+                with database_profile(conn, get_database_profile({}, "bulk")):
+                    current = read_database_profile(conn)
+                    self.assertEqual(
+                        (current.journal_mode, current.synchronous), ("DELETE", "NORMAL")
+                    )
+            finally:
+                conn.close()
+
     def test_dump_toml_supports_arrays_of_tables(self) -> None:
         content = dump_toml(
             {
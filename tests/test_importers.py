@@ -0,0 +1,470 @@
+import bz2
+import gzip
+import json
+import lzma
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+from euercli import importers
+from euercli.importers import (
+    ImportCursor,
+    ImportDateNormalizer,
+    ImportFormatError,
+    ImportFormats,
+    compile_header_plan,
+    get_missing_import_fields,
+    get_row_value,
+    iter_camt053_rows,
+    iter_import_files,
+    iter_import_rows,
+    iter_import_rows_from,
+    iter_mt940_rows,
+    iter_normalized_rows,
+    iter_normalized_rows_parallel,
+    normalize_import_date,
+    normalize_import_row,
+)
+from euercli.utils import AmbiguousAmountError, AmountParser
+
+
+class ImportersTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_iter_import_rows_is_lazy_generator(self) -> None:
+        path = self.root / "rows.jsonl"
+        path.write_text(
+            '{"type":"expense","date":"2026-01-10","party":"A","amount_eur":-1}\n'
+            "\n"
+            "{kaputt\n",
+            encoding="utf-8",
+        )
+
+        rows = iter_import_rows(str(path), "jsonl")
+        self.assertIsInstance(rows, types.GeneratorType)
+        first = next(rows)
+        self.assertEqual(first["party"], "A")
+        # Die defekte Zeile wird erst beim Weiterlesen geparst.
+        with self.assertRaises(ValueError):
+            next(rows)
+
+    def test_normalized_rows_keep_line_numbers_and_missing_fields(self) -> None:
+        path = self.root / "rows.csv"
+        path.write_text(
+            "type,date,party,amount_eur\n"
+            "expense,2026-01-10,Vendor A,-20.00\n"
+            ",2026-01-11,,\n",
+            encoding="utf-8",
+        )
+
+        result = [
+            (idx, get_missing_import_fields(normalized))
+            for idx, normalized in iter_normalized_rows(iter_import_rows(str(path), "csv"))
+        ]
+        self.assertEqual(result[0], (1, []))
+        self.assertEqual(result[1], (2, ["type", "amount_eur", "party"]))
+
+    def test_header_plan_matches_get_row_value_semantics(self) -> None:
+        header = ["\ufeffDatum", "Wertstellung", "Lieferant", "EUR", "Kontonummer"]
+        plan = compile_header_plan(header)
+        self.assertEqual(plan.columns["payment_date"], ("\ufeffDatum", "Wertstellung"))
+        self.assertEqual(plan.unmapped, ("Kontonummer",))
+        # BOM bleibt in der Debug-Ausgabe sichtbar.
+        self.assertIn("payment_date    ← '\\ufeffDatum', 'Wertstellung'", plan.describe())
+
+        # Leere erste Spalte fällt wie bisher auf den nächsten Alias zurück.
+        row = {
+            "\ufeffDatum": " ",
+            "Wertstellung": "2026-01-12",
+            "Lieferant": "A",
+            "EUR": "-1,50",
+            "Kontonummer": "4940",
+        }
+        normalized = normalize_import_row(row, plan)
+        self.assertEqual(
+            normalized["payment_date"],
+            get_row_value(row, "payment_date", "date", "Datum", "Wertstellung"),
+        )
+        self.assertEqual(normalized["amount_eur"], -1.5)
+        self.assertEqual(normalized["type"], "expense")
+        self.assertEqual(normalize_import_row(row), normalized)
+
+    def test_import_dates_are_normalized_to_iso(self) -> None:
+        cases = {
+            "19.03.2025": "2025-03-19",
+            "2025-03-19": "2025-03-19",
+            "2025-03-19T00:00:00": "2025-03-19",
+            "2025-03-19 10:15": "2025-03-19",
+            "1.3.25": "2025-03-01",
+            "19.03.2025 10:15": "2025-03-19",
+            "20250319": "2025-03-19",
+            # Ungültige Werte bleiben unverändert
+            "31.02.2025": "31.02.2025",
+            "gestern": "gestern",
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(normalize_import_date(value), expected)
+        self.assertIsNone(normalize_import_date(None))
+
+        # Formatwechsel innerhalb einer Spalte wird weiterhin erkannt
+        dates = ImportDateNormalizer()
+        self.assertEqual(dates.normalize("payment_date", "01.02.2026"), "2026-02-01")
+        self.assertEqual(dates.normalize("payment_date", "2026-02-03"), "2026-02-03")
+        self.assertEqual(dates.normalize("invoice_date", "2026-02-04"), "2026-02-04")
+
+        rows = iter_normalized_rows(
+            [
+                {"type": "expense", "Datum": "19.03.2025", "party": "A", "amount_eur": "-1"},
+                {"type": "expense", "Datum": "32.03.2025", "party": "B", "amount_eur": "-1"},
+            ]
+        )
+        (_, first), (_, second) = rows
+        self.assertEqual((first["date"], first["payment_date"]), ("2025-03-19", "2025-03-19"))
+        self.assertEqual(get_missing_import_fields(first), [])
+        self.assertEqual(
+            get_missing_import_fields(second),
+            ["payment_date (ungültiges Datum: 32.03.2025)"],
+        )
+
+    def test_amount_parser_uses_column_format_and_reports_ambiguity(self) -> None:
+        parser = AmountParser()
+        with self.assertRaises(AmbiguousAmountError):
+            parser.parse("1.234")
+        self.assertEqual(parser.parse("-39,99"), -39.99)
+        self.assertEqual(parser.number_format, "de")
+        self.assertEqual(parser.parse("1.234"), 1234.0)
+        self.assertEqual(parser.parse("-1.234.567,5"), -1234567.5)
+        self.assertEqual(parser.parse("1 234,50"), 1234.5)
+        self.assertIsNone(parser.parse("abc"))
+
+        # Widersprüchliche Spalte: mehrdeutige Werte werden wieder gemeldet
+        self.assertEqual(parser.parse("1,234.56"), 1234.56)
+        self.assertIsNone(parser.number_format)
+        with self.assertRaises(AmbiguousAmountError):
+            parser.parse("1,000")
+
+        # Batch: späterer eindeutiger Wert löst den ersten auf
+        self.assertEqual(AmountParser().parse_many(["1,000", "2.50", None]), [1000.0, 2.5, None])
+        with self.assertRaises(AmbiguousAmountError):
+            AmountParser().parse_many(["1,000", "12"])
+
+        rows = iter_normalized_rows(
+            [
+                {"party": "A", "EUR": "1.500", "vat_output": "0"},
+                {"party": "B", "EUR": "-12,50", "vat_output": "0"},
+                {"party": "C", "EUR": "1.500", "vat_output": "0"},
+            ]
+        )
+        (_, first), (_, second), (_, third) = rows
+        self.assertEqual((first["type"], first["amount_eur"]), (None, "1.500"))
+        self.assertIn(
+            "amount_eur (mehrdeutiger Betrag: 1.500)", get_missing_import_fields(first)
+        )
+        self.assertEqual(second["amount_eur"], -12.5)
+        self.assertEqual((third["type"], third["amount_eur"]), ("income", 1500.0))
+
+    def test_parallel_rows_match_sequential_order_and_numbers(self) -> None:
+        jsonl_path = self.root / "rows.jsonl"
+        jsonl_path.write_text(
+            "".join(
+                f'{{"type":"expense","date":"2026-01-{i % 28 + 1:02d}",'
+                f'"party":"V{i}","amount_eur":-{i}}}\n' + ("\n" if i % 7 == 0 else "")
+                for i in range(1, 60)
+            ),
+            encoding="utf-8",
+        )
+        csv_path = self.root / "rows.csv"
+        csv_path.write_text(
+            "Datum,Lieferant,EUR,Bemerkung\n"
+            + "".join(f'2026-02-01,V{i},"-{i},50","Zeile\n{i}"\n' for i in range(1, 40))
+            + "2026-02-02,Kurz\n",
+            encoding="utf-8",
+        )
+
+        for path, fmt in ((jsonl_path, "jsonl"), (csv_path, "csv")):
+            with self.subTest(fmt=fmt):
+                sequential = list(iter_normalized_rows(iter_import_rows(str(path), fmt)))
+                parallel = list(
+                    iter_normalized_rows_parallel(
+                        str(path), fmt, 2, chunk_rows=5, chunk_bytes=256
+                    )
+                )
+                self.assertEqual(parallel, sequential)
+
+    def test_parallel_amount_format_matches_sequential_across_blocks(self) -> None:
+        # Blöcke mit nur mehrdeutigen Werten folgen dem vorher erkannten Format;
+        # ein mehrdeutiger Wert vor dem ersten eindeutigen bleibt ungültig
+        amounts = ["1.500", "-12,50", "1.234", "-1.234", "2.000", "-3,10", "39.99", "1.000"]
+        path = self.root / "amounts.csv"
+        path.write_text(
+            "Datum,Lieferant,EUR\n"
+            + "".join(f'2026-03-01,V{i},"{amount}"\n' for i, amount in enumerate(amounts)),
+            encoding="utf-8",
+        )
+        sequential = list(iter_normalized_rows(iter_import_rows(str(path), "csv")))
+        self.assertEqual(
+            [(row["type"], row["amount_eur"]) for _, row in sequential],
+            [
+                (None, "1.500"),
+                ("expense", -12.5),
+                ("income", 1234.0),
+                ("expense", -1234.0),
+                ("income", 2000.0),
+                ("expense", -3.1),
+                ("income", 39.99),
+                (None, "1.000"),
+            ],
+        )
+        for chunk_rows in (1, 2, 3):
+            with self.subTest(chunk_rows=chunk_rows):
+                parallel = list(
+                    iter_normalized_rows_parallel(str(path), "csv", 2, chunk_rows=chunk_rows)
+                )
+                self.assertEqual(parallel, sequential)
+
+    def test_parallel_rows_raise_read_errors(self) -> None:
+        path = self.root / "broken.jsonl"
+        path.write_text('{"party":"A"}\n{kaputt\n', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            list(iter_normalized_rows_parallel(str(path), "jsonl", 2, chunk_bytes=4))
+
+    def test_import_rows_from_cursor_resume_after_checkpoint(self) -> None:
+        jsonl_path = self.root / "rows.jsonl"
+        jsonl_path.write_text(
+            '{"party":"A"}\n\n{"party":"B"}\n{"party":"C"}\n', encoding="utf-8"
+        )
+        csv_path = self.root / "rows.csv"
+        csv_path.write_text(
+            '\ufeffparty,notes\nA,x\nB,"zwei\nzeilen"\nC,y\n', encoding="utf-8"
+        )
+
+        for path, fmt in ((jsonl_path, "jsonl"), (csv_path, "csv")):
+            with self.subTest(fmt=fmt):
+                expected = list(iter_import_rows(str(path), fmt))
+                cursor = ImportCursor()
+                rows = iter_import_rows_from(str(path), fmt, cursor)
+                self.assertEqual(next(rows)["party"], "A")
+                self.assertEqual(next(rows)["party"], "B")
+                checkpoint = ImportCursor(cursor.byte_offset, cursor.row_index)
+                rows.close()
+
+                resumed = list(iter_import_rows_from(str(path), fmt, checkpoint))
+                self.assertEqual([row["party"] for row in resumed], ["C"])
+                self.assertEqual(resumed, expected[2:])
+                self.assertEqual(checkpoint.row_index, 3)
+                self.assertEqual(checkpoint.byte_offset, path.stat().st_size)
+
+    def test_import_formats_resume_learned_formats(self) -> None:
+        formats = ImportFormats()
+        rows = [
+            {"type": "expense", "date": "10.01.2026", "party": "A", "amount_eur": "-39,99"},
+            {"type": "expense", "date": "11.01.2026", "party": "B", "amount_eur": "-1.234"},
+        ]
+        list(iter_normalized_rows(rows[:1], amounts=formats.amounts, dates=formats.dates))
+        saved = formats.to_dict()
+        self.assertEqual(saved, {"dates": {"payment_date": "de"}, "amounts": {"amount_eur": ["de"]}})
+
+        restored = ImportFormats.from_dict(saved)
+        [(_, row)] = iter_normalized_rows(
+            rows[1:], start=2, amounts=restored.amounts, dates=restored.dates
+        )
+        self.assertEqual((row["amount_eur"], row["payment_date"]), (-1234.0, "2026-01-11"))
+        # Ohne gespeicherte Formate bleibt der Wert mehrdeutig
+        [(_, row)] = iter_normalized_rows(rows[1:], start=2)
+        self.assertEqual(row["amount_eur"], "-1.234")
+        # Unbekannte Namen (z.B. aus neueren Versionen) werden ignoriert
+        self.assertEqual(
+            ImportFormats.from_dict({"dates": {"date": "x"}, "amounts": {"amount_eur": ["x"]}})
+            .to_dict(),
+            {"dates": {}, "amounts": {}},
+        )
+
+    def test_compressed_sources_are_read_transparently(self) -> None:
+        data = (
+            '{"type":"expense","date":"2026-01-10","party":"A","amount_eur":-1}\n'
+            '{"type":"income","date":"2026-01-11","party":"B","amount_eur":2}\n'
+        ).encode("utf-8")
+        expected = [
+            {"type": "expense", "date": "2026-01-10", "party": "A", "amount_eur": -1},
+            {"type": "income", "date": "2026-01-11", "party": "B", "amount_eur": 2},
+        ]
+        sources = {
+            "rows.jsonl.gz": gzip.compress(data),
+            "rows.jsonl.bz2": bz2.compress(data),
+            "rows.jsonl.xz": lzma.compress(data),
+            # ohne Endung: Erkennung über Magic Bytes
+            "rows_export": gzip.compress(data),
+        }
+        for name, payload in sources.items():
+            with self.subTest(name=name):
+                path = self.root / name
+                path.write_bytes(payload)
+                self.assertEqual(list(iter_import_rows(str(path), "jsonl")), expected)
+
+                cursor = ImportCursor()
+                rows = iter_import_rows_from(str(path), "jsonl", cursor)
+                next(rows)
+                rows.close()
+                resumed = list(iter_import_rows_from(str(path), "jsonl", cursor))
+                self.assertEqual(resumed, expected[1:])
+
+                parallel = [
+                    normalized["raw_data"]
+                    for _, normalized in iter_normalized_rows_parallel(
+                        str(path), "jsonl", 2, chunk_rows=1
+                    )
+                ]
+                self.assertEqual(parallel, expected)
+
+    def test_iter_import_files_keeps_order_and_stops_readers(self) -> None:
+        paths = []
+        for month in range(1, 6):
+            path = self.root / f"2026-{month:02d}.jsonl"
+            path.write_text(
+                "".join(
+                    f'{{"type":"expense","date":"2026-{month:02d}-01","party":"V{i}",'
+                    f'"amount_eur":-{i}}}\n'
+                    for i in range(1, 21)
+                ),
+                encoding="utf-8",
+            )
+            paths.append(str(path))
+
+        seen = []
+        for path, batches in iter_import_files(paths, "jsonl", readers=2, batch_size=3):
+            rows = [row for batch in batches for row in batch]
+            seen.append((path, rows[0][0], rows[-1][0], len(rows)))
+        self.assertEqual(seen, [(path, 1, 20, 20) for path in paths])
+
+        # Vorzeitiger Abbruch darf nicht an blockierten Leser-Threads hängen bleiben.
+        files = iter_import_files(paths, "jsonl", readers=1, batch_size=1, queue_batches=1)
+        _, batches = next(files)
+        next(batches)
+        files.close()
+
+    def test_iter_import_files_forwards_reader_errors(self) -> None:
+        path = self.root / "broken.jsonl"
+        path.write_text('{"party":"A"}\n{kaputt\n', encoding="utf-8")
+        for _, batches in iter_import_files([str(path)], "jsonl", readers=1, batch_size=1):
+            with self.assertRaises(json.JSONDecodeError):
+                list(batches)
+
+        # Unerwartete Fehler gehen nicht verloren und blockieren den Konsumenten nicht.
+        def failing_rows(path: str, fmt: str):
+            raise RuntimeError("Leser kaputt")
+            yield
+
+        original = importers.iter_import_rows
+        importers.iter_import_rows = failing_rows
+        try:
+            for _, batches in iter_import_files([str(path)], "jsonl", readers=1, batch_size=1):
+                with self.assertRaisesRegex(RuntimeError, "Leser kaputt"):
+                    list(batches)
+        finally:
+            importers.iter_import_rows = original
+
+    def test_camt053_entries_stream_as_canonical_rows(self) -> None:
+        path = self.root / "auszug.xml"
+        path.write_text(
+            """<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.08">
+  <BkToCstmrStmt><Stmt>
+    <Acct><Id><IBAN>DE02120300000000202051</IBAN></Id></Acct>
+    <Ntry>
+      <Amt Ccy="EUR">39.99</Amt><CdtDbtInd>DBIT</CdtDbtInd>
+      <Sts><Cd>BOOK</Cd></Sts>
+      <BookgDt><Dt>2026-01-09</Dt></BookgDt><ValDt><Dt>2026-01-10</Dt></ValDt>
+      <NtryDtls><TxDtls>
+        <RltdPties><Cdtr><Pty><Nm>1und1 GmbH</Nm></Pty></Cdtr></RltdPties>
+        <RmtInf><Ustrd>Rechnung 4711</Ustrd><Ustrd>Kunde 42</Ustrd></RmtInf>
+      </TxDtls></NtryDtls>
+    </Ntry>
+    <Ntry>
+      <Amt Ccy="EUR">150.00</Amt><CdtDbtInd>CRDT</CdtDbtInd>
+      <Sts><Cd>BOOK</Cd></Sts>
+      <BookgDt><DtTm>2026-01-12T08:00:00</DtTm></BookgDt>
+      <NtryDtls>
+        <TxDtls><Amt Ccy="EUR">100.00</Amt>
+          <RltdPties><Dbtr><Nm>Kunde A</Nm></Dbtr></RltdPties></TxDtls>
+        <TxDtls><Amt Ccy="EUR">50.00</Amt>
+          <RltdPties><Dbtr><Nm>Kunde B</Nm></Dbtr></RltdPties></TxDtls>
+      </NtryDtls>
+    </Ntry>
+    <Ntry>
+      <Amt Ccy="EUR">1.00</Amt><CdtDbtInd>DBIT</CdtDbtInd>
+      <Sts><Cd>PDNG</Cd></Sts>
+    </Ntry>
+  </Stmt></BkToCstmrStmt>
+</Document>
+""",
+            encoding="utf-8",
+        )
+
+        rows = list(iter_import_rows(str(path), "camt053"))
+        self.assertEqual(
+            [(r["type"], r["payment_date"], r["party"], r["amount_eur"]) for r in rows],
+            [
+                ("expense", "2026-01-10", "1und1 GmbH", -39.99),
+                ("income", "2026-01-12", "Kunde A", 100.0),
+                ("income", "2026-01-12", "Kunde B", 50.0),
+            ],
+        )
+        self.assertEqual(rows[0]["notes"], "Rechnung 4711 Kunde 42")
+        self.assertEqual(rows[0]["account"], "DE02120300000000202051")
+
+        # Die Zeilen entsprechen bereits der Ausgabe von normalize_import_row().
+        for row in rows:
+            normalized = normalize_import_row(row)
+            self.assertEqual(normalized.pop("raw_data"), row)
+            self.assertEqual(normalized, row)
+
+        with open(path, "rb") as f:
+            self.assertEqual(len(list(iter_camt053_rows(f))), 3)
+
+    def test_mt940_statement_lines_with_structured_details(self) -> None:
+        path = self.root / "auszug.sta"
+        path.write_bytes(
+            (
+                ":20:STARTUMSE\r\n"
+                ":25:10020030/1234567890\r\n"
+                ":28C:00001/001\r\n"
+                ":60F:C260101EUR1000,00\r\n"
+                ":61:2601100110DR39,99NDDTNONREF//BANKREF\r\n"
+                ":86:105?00SEPA-LASTSCHRIFT?20Rechnung 4711 ?21Kunde 42?32Stadtwerke Mü\r\n"
+                "nchen?33 GmbH\r\n"
+                ":61:260112C150,NTRFNONREF\r\n"
+                ":86:Gutschrift Kunde A\r\n"
+                ":61:260113RC5,00NTRFNONREF\r\n"
+                ":86:166?00STORNO\r\n"
+                ":62F:C260131EUR1105,01\r\n"
+                "-\r\n"
+            ).encode("latin-1")
+        )
+
+        rows = list(iter_import_rows(str(path), "mt940"))
+        self.assertEqual(
+            [(r["type"], r["payment_date"], r["party"], r["amount_eur"]) for r in rows],
+            [
+                ("expense", "2026-01-10", "Stadtwerke München GmbH", -39.99),
+                ("income", "2026-01-12", "Gutschrift Kunde A", 150.0),
+                ("expense", "2026-01-13", "STORNO", -5.0),
+            ],
+        )
+        self.assertEqual(rows[0]["notes"], "Rechnung 4711 Kunde 42")
+        self.assertEqual(rows[0]["account"], "10020030/1234567890")
+
+        broken = self.root / "kaputt.sta"
+        broken.write_bytes(b":61:KEINE ZEILE\r\n")
+        with open(broken, "rb") as f, self.assertRaises(ImportFormatError):
+            list(iter_mt940_rows(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
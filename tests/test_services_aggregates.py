@@ -0,0 +1,159 @@
+import sqlite3
+import unittest
+import uuid
+
+from euercli.schema import SCHEMA, SEED_CATEGORIES
+from euercli.services.aggregates import (
+    check_period_aggregates,
+    period_aggregates_missing,
+    rebuild_period_aggregates,
+)
+from euercli.services.expenses import (
+    create_expense,
+    create_expenses_bulk,
+    delete_expense,
+    update_expense,
+)
+from euercli.services.income import create_income, delete_income
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    for name, eur_line, cat_type in SEED_CATEGORIES:
+        conn.execute(
+            "INSERT INTO categories (uuid, name, eur_line, type) VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), name, eur_line, cat_type),
+        )
+    conn.commit()
+    return conn
+
+
+def aggregate_rows(conn: sqlite3.Connection) -> list[tuple]:
+    return [
+        tuple(row)
+        for row in conn.execute(
+            """SELECT a.year, a.month, a.type, COALESCE(c.name, '-'), a.amount_cents,
+                      a.vat_input_cents, a.vat_output_cents, a.row_count
+               FROM agg_period_category a LEFT JOIN categories c ON c.id = a.category_id
+               ORDER BY a.year, a.type, a.month, a.category_id"""
+        )
+    ]
+
+
+class PeriodAggregateTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_triggers_maintain_sums_on_insert_update_delete(self) -> None:
+        first = create_expense(
+            self.conn,
+            payment_date="2026-01-05",
+            vendor="Hetzner",
+            amount_eur=-11.90,
+            category_name="Laufende EDV-Kosten",
+            vat=1.90,
+            tax_mode="standard",
+        )
+        create_expense(
+            self.conn,
+            payment_date="2026-01-20",
+            vendor="Hetzner",
+            amount_eur=-0.10,
+            category_name="Laufende EDV-Kosten",
+            tax_mode="standard",
+            skip_vat_auto=True,
+        )
+        create_expense(self.conn, payment_date="2026-02-01", vendor="Ohne", amount_eur=-5.0)
+        # Ohne Wertstellung: nicht in der Summentabelle
+        create_expense(self.conn, invoice_date="2026-02-02", vendor="Offen", amount_eur=-7.0)
+        income = create_income(
+            self.conn,
+            payment_date="2026-01-31",
+            source="Kunde",
+            amount_eur=119.0,
+            category_name="Umsatzsteuerpflichtige Betriebseinnahmen",
+            vat=19.0,
+            tax_mode="standard",
+        )
+
+        self.assertEqual(
+            aggregate_rows(self.conn),
+            [
+                (2026, 1, "expense", "Laufende EDV-Kosten", -1200, 190, 0, 2),
+                (2026, 2, "expense", "-", -500, 0, 0, 1),
+                (
+                    2026, 1, "income", "Umsatzsteuerpflichtige Betriebseinnahmen",
+                    11900, 0, 1900, 1,
+                ),
+            ],
+        )
+
+        # Monat und Kategorie wechseln: alter Schlüssel wird reduziert
+        update_expense(
+            self.conn,
+            record_id=first.id,
+            payment_date="2026-03-01",
+            category_name="Telekommunikation",
+            tax_mode="standard",
+            audit_user="tester",
+        )
+        delete_income(self.conn, record_id=income.id, audit_user="tester")
+        self.assertEqual(
+            aggregate_rows(self.conn),
+            [
+                (2026, 1, "expense", "Laufende EDV-Kosten", -10, 0, 0, 1),
+                (2026, 2, "expense", "-", -500, 0, 0, 1),
+                (2026, 3, "expense", "Telekommunikation", -1190, 190, 0, 1),
+            ],
+        )
+
+        delete_expense(self.conn, record_id=first.id, audit_user="tester")
+        self.assertNotIn(3, [row[1] for row in aggregate_rows(self.conn)])
+        self.assertEqual(check_period_aggregates(self.conn), [])
+
+    def test_check_reports_drift_and_rebuild_repairs_it(self) -> None:
+        create_expenses_bulk(
+            self.conn,
+            [
+                {"payment_date": f"2025-12-{day:02d}", "vendor": "Bulk", "amount_eur": -0.1}
+                for day in range(1, 11)
+            ],
+        )
+        self.assertEqual(aggregate_rows(self.conn), [(2025, 12, "expense", "-", -100, 0, 0, 10)])
+        self.assertEqual(check_period_aggregates(self.conn), [])
+
+        self.conn.execute("UPDATE agg_period_category SET amount_cents = amount_cents - 1")
+        self.conn.execute(
+            """INSERT INTO agg_period_category
+               VALUES (2024, 1, 'income', 0, 500, 0, 0, 1)"""
+        )
+        mismatches = check_period_aggregates(self.conn)
+        self.assertEqual(
+            [(m.year, m.month, m.type, m.amount_cents_diff, m.row_count_diff) for m in mismatches],
+            [(2024, 1, "income", 500, 1), (2025, 12, "expense", -1, 0)],
+        )
+
+        self.assertEqual(rebuild_period_aggregates(self.conn), 1)
+        self.assertEqual(check_period_aggregates(self.conn), [])
+        self.assertEqual(aggregate_rows(self.conn), [(2025, 12, "expense", "-", -100, 0, 0, 10)])
+
+    def test_period_aggregates_missing_only_with_paid_bookings(self) -> None:
+        self.assertFalse(period_aggregates_missing(self.conn, 2026))
+        create_expense(self.conn, invoice_date="2026-02-02", vendor="Offen", amount_eur=-7.0)
+        self.assertFalse(period_aggregates_missing(self.conn, 2026))
+
+        create_expense(self.conn, payment_date="2026-02-03", vendor="Bezahlt", amount_eur=-7.0)
+        self.assertFalse(period_aggregates_missing(self.conn, 2026))
+        self.conn.execute("DELETE FROM agg_period_category")
+        self.assertTrue(period_aggregates_missing(self.conn, 2026))
+        self.assertFalse(period_aggregates_missing(self.conn, 2025))
+
+
+if __name__ == "__main__":
+    unittest.main()
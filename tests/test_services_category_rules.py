@@ -0,0 +1,149 @@
+import sqlite3
+import unittest
+import uuid
+
+from euercli.schema import SCHEMA, SEED_CATEGORIES
+from euercli.services.category_rules import compile_category_rules
+from euercli.services.expenses import create_expense, create_expenses_bulk
+from euercli.services.income import create_income
+from euercli.services.models import CategoryRule, LedgerAccount
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    for name, eur_line, cat_type in SEED_CATEGORIES:
+        conn.execute(
+            "INSERT INTO categories (uuid, name, eur_line, type) VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), name, eur_line, cat_type),
+        )
+    conn.commit()
+    return conn
+
+
+class CategoryRuleMatcherTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.matcher = compile_category_rules(
+            [
+                CategoryRule("expense", category="Reisekosten", vendor="bahn", amount_min=-50),
+                CategoryRule("expense", category="Telekommunikation", vendor="telekom"),
+                CategoryRule("expense", category="Fortbildung", vendor="bahn"),
+                CategoryRule(
+                    "expense",
+                    category="Laufende EDV-Kosten",
+                    vendor_regex=r"^(aws|amazon web services)\b",
+                ),
+                CategoryRule("expense", category="Arbeitsmittel", account="Firmenkarte"),
+                CategoryRule("income", category="Honorare", vendor="kunde"),
+            ]
+        )
+
+    def test_first_matching_rule_in_config_order_wins(self) -> None:
+        self.assertEqual(self.matcher.match("expense", "DB Bahn", -20.0).category, "Reisekosten")
+        # Betragsbereich verfehlt → nächste passende Regel
+        self.assertEqual(self.matcher.match("expense", "DB Bahn", -80.0).category, "Fortbildung")
+        self.assertEqual(
+            self.matcher.match("expense", "Deutsche TELEKOM AG", -39.9).category,
+            "Telekommunikation",
+        )
+
+    def test_regex_account_and_type_conditions(self) -> None:
+        self.assertEqual(
+            self.matcher.match("expense", "AWS EMEA SARL", -3.0).category,
+            "Laufende EDV-Kosten",
+        )
+        self.assertIsNone(self.matcher.match("expense", "Payaws", -3.0))
+        self.assertEqual(
+            self.matcher.match("expense", "Baumarkt", -3.0, " firmenkarte ").category,
+            "Arbeitsmittel",
+        )
+        self.assertIsNone(self.matcher.match("expense", "Baumarkt", -3.0, "Bank"))
+        self.assertIsNone(self.matcher.match("expense", "Kunde GmbH", 100.0))
+        self.assertIsNotNone(self.matcher.match("income", "Kunde GmbH", 100.0))
+
+    def test_overlapping_substrings_are_all_found(self) -> None:
+        matcher = compile_category_rules(
+            [
+                CategoryRule("expense", category="A", vendor="hers", amount_min=0),
+                CategoryRule("expense", category="B", vendor="she"),
+            ]
+        )
+        self.assertEqual(matcher.match("expense", "ushers", -1.0).category, "B")
+
+
+class CategoryRuleServiceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+        self.ledger_accounts = [
+            LedgerAccount(key="hosting", name="Hosting", category="Laufende EDV-Kosten")
+        ]
+        self.matcher = compile_category_rules(
+            [
+                CategoryRule("expense", ledger_account="hosting", vendor="hetzner"),
+                CategoryRule(
+                    "income",
+                    category="Umsatzsteuerpflichtige Betriebseinnahmen",
+                    vendor="kunde",
+                ),
+            ]
+        )
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_rules_fill_missing_category_only(self) -> None:
+        expense = create_expense(
+            self.conn,
+            date="2026-01-15",
+            vendor="Hetzner Online GmbH",
+            amount_eur=-49.9,
+            ledger_accounts=self.ledger_accounts,
+            category_rules=self.matcher,
+            audit_user="tester",
+        )
+        self.assertEqual(expense.category_name, "Laufende EDV-Kosten")
+        self.assertEqual(expense.ledger_account, "hosting")
+
+        explicit = create_expense(
+            self.conn,
+            date="2026-01-16",
+            vendor="Hetzner Online GmbH",
+            amount_eur=-49.9,
+            category_name="Arbeitsmittel",
+            category_rules=self.matcher,
+            audit_user="tester",
+        )
+        self.assertEqual(explicit.category_name, "Arbeitsmittel")
+
+        income = create_income(
+            self.conn,
+            date="2026-01-20",
+            source="Kunde AG",
+            amount_eur=100.0,
+            category_rules=self.matcher,
+            audit_user="tester",
+        )
+        self.assertEqual(income.category_name, "Umsatzsteuerpflichtige Betriebseinnahmen")
+
+    def test_bulk_insert_applies_rules(self) -> None:
+        result = create_expenses_bulk(
+            self.conn,
+            [
+                {"date": "2026-02-01", "vendor": "HETZNER", "amount_eur": -5.0},
+                {"date": "2026-02-01", "vendor": "Unbekannt", "amount_eur": -5.0},
+            ],
+            ledger_accounts=self.ledger_accounts,
+            category_rules=self.matcher,
+            audit_user="tester",
+        )
+        rows = self.conn.execute(
+            "SELECT ledger_account, category_id IS NOT NULL FROM expenses ORDER BY id"
+        ).fetchall()
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual([tuple(row) for row in rows], [("hosting", 1), (None, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import sqlite3
+import unittest
+import uuid
+from types import SimpleNamespace
+
+from euercli.schema import SCHEMA, SEED_CATEGORIES
+from euercli.services.duplicates import (
+    DuplicateAction,
+    find_existing_hashes,
+    find_fuzzy_duplicates,
+    normalize_party,
+    party_similarity,
+    split_duplicates,
+)
+from euercli.services.errors import ValidationError
+from euercli.services.expenses import create_expense
+from euercli.services.income import create_income
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    for name, eur_line, cat_type in SEED_CATEGORIES:
+        conn.execute(
+            "INSERT INTO categories (uuid, name, eur_line, type) VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), name, eur_line, cat_type),
+        )
+    conn.commit()
+    return conn
+
+
+class DuplicateServiceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+        self.existing = create_expense(
+            self.conn,
+            date="2026-01-15",
+            vendor="TestVendor",
+            amount_eur=-10.0,
+            audit_user="tester",
+        )
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_find_existing_hashes_uses_single_join(self) -> None:
+        found = find_existing_hashes(
+            self.conn, "expenses", [self.existing.hash, b"unbekannt", self.existing.hash]
+        )
+        self.assertEqual(found, {self.existing.hash: self.existing.id})
+        leftover = self.conn.execute("SELECT COUNT(*) FROM temp.dedup_hashes").fetchone()[0]
+        self.assertEqual(leftover, 0)
+
+    def test_split_duplicates_flags_db_and_in_block_duplicates(self) -> None:
+        records = [
+            SimpleNamespace(hash=b"neu"),
+            SimpleNamespace(hash=self.existing.hash),
+            SimpleNamespace(hash=b"neu"),
+        ]
+        new_records, flags = split_duplicates(
+            self.conn, "expenses", records, DuplicateAction.SKIP
+        )
+        self.assertEqual([record.hash for record in new_records], [b"neu"])
+        self.assertEqual(flags, [False, True, True])
+
+        with self.assertRaises(ValidationError) as ctx:
+            split_duplicates(self.conn, "expenses", records, DuplicateAction.RAISE)
+        self.assertEqual(ctx.exception.details["existing_id"], self.existing.id)
+
+
+class FuzzyDuplicateTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def add_expense(self, date: str, vendor: str, amount: float, **kwargs) -> int:
+        expense = create_expense(
+            self.conn,
+            date=date,
+            vendor=vendor,
+            amount_eur=amount,
+            audit_user="tester",
+            **kwargs,
+        )
+        return expense.id
+
+    def test_normalize_party_drops_legal_suffixes(self) -> None:
+        self.assertEqual(normalize_party("HETZNER ONLINE GmbH"), ("hetzner",))
+        self.assertEqual(normalize_party("GmbH"), ("gmbh",))
+        self.assertEqual(party_similarity(("hetzner",), ("hetzner", "cloud")), 0.9)
+        self.assertEqual(party_similarity((), ("hetzner",)), 0.0)
+
+    def test_finds_shifted_booking_with_spelling_variant(self) -> None:
+        card = self.add_expense("2026-03-01", "HETZNER ONLINE", -49.9)
+        invoice = self.add_expense("2026-03-03", "Hetzner", -49.9)
+        # gleicher Betrag, aber anderer Anbieter
+        self.add_expense("2026-03-02", "Adobe", -49.9)
+        # gleicher Anbieter, aber außerhalb des Datumsfensters
+        self.add_expense("2026-03-10", "Hetzner", -49.9)
+        # gleicher Anbieter und Datum, anderer Betrag
+        self.add_expense("2026-03-01", "Hetzner", -12.0)
+
+        candidates = find_fuzzy_duplicates(self.conn, "expenses")
+
+        self.assertEqual(len(candidates), 1)
+        candidate = candidates[0]
+        self.assertEqual((candidate.first_id, candidate.second_id), (card, invoice))
+        self.assertEqual(candidate.type, "expense")
+        self.assertEqual(candidate.day_diff, 2)
+        self.assertAlmostEqual(candidate.amount_eur, -49.9)
+
+    def test_candidates_are_ranked_and_window_is_configurable(self) -> None:
+        self.add_expense("2026-05-01", "Figma", -15.0)
+        self.add_expense("2026-05-01", "Figma Inc", -15.0, receipt_name="figma.pdf")
+        self.add_expense("2026-05-05", "Github", -4.0)
+        self.add_expense("2026-05-09", "GitHub", -4.0)
+
+        default_window = find_fuzzy_duplicates(self.conn, "expenses")
+        self.assertEqual([c.first_party for c in default_window], ["Figma"])
+
+        wide_window = find_fuzzy_duplicates(self.conn, "expenses", date_window_days=7)
+        self.assertEqual([c.first_party for c in wide_window], ["Figma", "Github"])
+        self.assertGreater(wide_window[0].score, wide_window[1].score)
+
+        with self.assertRaises(ValidationError):
+            find_fuzzy_duplicates(self.conn, "expenses", date_window_days=-1)
+
+    def test_scans_income_by_source_and_year(self) -> None:
+        for index, date in enumerate(
+            ("2025-12-30", "2025-12-30", "2026-01-02", "2026-01-02")
+        ):
+            create_income(
+                self.conn,
+                date=date,
+                source="Kunde AG",
+                amount_eur=500.0,
+                receipt_name=f"rechnung-{index}.pdf",
+                audit_user="tester",
+            )
+
+        all_years = find_fuzzy_duplicates(self.conn, "income")
+        only_2026 = find_fuzzy_duplicates(self.conn, "income", year=2026)
+
+        self.assertEqual(len(all_years), 6)
+        self.assertEqual(len(only_2026), 1)
+        self.assertEqual(only_2026[0].type, "income")
+
+
+if __name__ == "__main__":
+    unittest.main()
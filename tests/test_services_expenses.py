@@ -7,6 +7,7 @@ from euercli.services.duplicates import DuplicateAction
 from euercli.services.errors import ValidationError
 from euercli.services.expenses import (
     create_expense,
+    create_expenses_bulk,
     delete_expense,
     list_expenses,
     update_expense,
@@ -243,6 +244,31 @@ class ExpenseServiceTestCase(unittest.TestCase):
         rows_other = list_expenses(self.conn, year=2025)
         self.assertEqual(len(rows_other), 0)
 
+    def test_list_expenses_period_bounds_and_month_without_year(self) -> None:
+        for date in ("2025-12-31", "2026-01-01", "2026-12-31", "2027-12-05"):
+            create_expense(
+                self.conn,
+                date=date,
+                vendor=f"Vendor {date}",
+                amount_eur=-1.0,
+                category_name="Arbeitsmittel",
+                tax_mode="small_business",
+                audit_user="tester",
+            )
+
+        rows = list_expenses(self.conn, year=2026)
+        self.assertEqual([r.payment_date for r in rows], ["2026-12-31", "2026-01-01"])
+        rows = list_expenses(self.conn, year=2025, month=12)
+        self.assertEqual([r.payment_date for r in rows], ["2025-12-31"])
+        rows = list_expenses(self.conn, month=12)
+        self.assertEqual(
+            [r.payment_date for r in rows], ["2027-12-05", "2026-12-31", "2025-12-31"]
+        )
+
+        with self.assertRaises(ValidationError) as ctx:
+            list_expenses(self.conn, year=2026, month=13)
+        self.assertEqual(ctx.exception.code, "invalid_month")
+
     def test_create_expense_resolves_ledger_account_category(self) -> None:
         expense = create_expense(
             self.conn,
@@ -294,6 +320,66 @@ class ExpenseServiceTestCase(unittest.TestCase):
 
         self.assertEqual(ctx.exception.code, "ledger_account_category_mismatch")
 
+    def test_create_expenses_bulk_matches_single_create(self) -> None:
+        row = {
+            "date": "2026-02-01",
+            "vendor": "Hoster",
+            "amount_eur": -20.0,
+            "category_name": "arbeitsmittel",
+            "account": "privat",
+            "is_rc": True,
+        }
+        single = create_expense(
+            self.conn, tax_mode="small_business", audit_user="tester", **row
+        )
+        other_conn = make_connection()
+        try:
+            result = create_expenses_bulk(
+                other_conn,
+                [row, dict(row, vendor="Hoster 2"), dict(row)],
+                private_accounts=["privat"],
+                tax_mode="small_business",
+                audit_user="tester",
+                chunk_size=1,
+            )
+            self.assertEqual(result.inserted, 2)
+            self.assertEqual(result.duplicates, 1)
+            self.assertEqual(result.record_ids, [1, 2, None])
+
+            bulk = list_expenses(other_conn, year=2026)
+            first = next(expense for expense in bulk if expense.id == 1)
+            self.assertEqual(first.hash, single.hash)
+            self.assertEqual(first.category_name, "Arbeitsmittel")
+            self.assertEqual(first.vat_output, single.vat_output)
+            self.assertTrue(first.is_private_paid)
+            self.assertEqual(first.private_classification, "account_rule")
+
+            audit_rows = other_conn.execute(
+                "SELECT record_id, record_uuid, action, user FROM audit_log ORDER BY id"
+            ).fetchall()
+            self.assertEqual([row["record_id"] for row in audit_rows], [1, 2])
+            self.assertEqual(audit_rows[0]["record_uuid"], first.uuid)
+            self.assertEqual(audit_rows[0]["user"], "tester")
+        finally:
+            other_conn.close()
+
+    def test_create_expenses_bulk_raise_on_duplicate(self) -> None:
+        create_expense(
+            self.conn,
+            date="2026-02-01",
+            vendor="Hoster",
+            amount_eur=-20.0,
+            audit_user="tester",
+        )
+        with self.assertRaises(ValidationError) as ctx:
+            create_expenses_bulk(
+                self.conn,
+                [{"date": "2026-02-01", "vendor": "Hoster", "amount_eur": -20.0}],
+                on_duplicate=DuplicateAction.RAISE,
+            )
+        self.assertEqual(ctx.exception.code, "duplicate")
+        self.assertEqual(ctx.exception.details["existing_id"], 1)
+
 
 if __name__ == "__main__":
     unittest.main()
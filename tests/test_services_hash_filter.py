@@ -0,0 +1,123 @@
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+from euercli.schema import SCHEMA, SEED_CATEGORIES
+from euercli.services.duplicates import DuplicateAction, split_duplicates
+from euercli.services.expenses import create_expense, create_expenses_bulk
+from euercli.services.hash_filter import (
+    HashBloomFilter,
+    build_hash_bloom_filter,
+    grow_hash_bloom_filter,
+    load_hash_bloom_filter,
+    save_hash_bloom_filter,
+)
+from euercli.utils import compute_hash
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    for name, eur_line, cat_type in SEED_CATEGORIES:
+        conn.execute(
+            "INSERT INTO categories (uuid, name, eur_line, type) VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), name, eur_line, cat_type),
+        )
+    conn.commit()
+    return conn
+
+
+class HashBloomFilterTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "test.db.expenses.bloom"
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self.temp_dir.cleanup()
+
+    def add_expense(self, vendor: str) -> None:
+        create_expense(
+            self.conn,
+            date="2026-01-15",
+            vendor=vendor,
+            amount_eur=-10.0,
+            audit_user="tester",
+        )
+
+    def test_filter_has_no_false_negatives_and_bounded_error_rate(self) -> None:
+        bloom = HashBloomFilter(1000, 0.01)
+        added = [compute_hash("2026-01-01", f"V{i}", -1.0) for i in range(1000)]
+        for digest in added:
+            bloom.add(digest)
+        self.assertTrue(all(digest in bloom for digest in added))
+
+        others = [compute_hash("2026-02-01", f"W{i}", -1.0) for i in range(5000)]
+        false_positives = sum(1 for digest in others if digest in bloom)
+        self.assertLess(false_positives / len(others), 0.03)
+        self.assertAlmostEqual(bloom.expected_error_rate, 0.01, delta=0.005)
+
+    def test_split_duplicates_skips_lookup_for_definitely_new_hashes(self) -> None:
+        self.add_expense("Bestand")
+        bloom = build_hash_bloom_filter(self.conn, "expenses")
+        existing_hash = compute_hash("2026-01-15", "Bestand", -10.0)
+        new_hash = compute_hash("2026-01-15", "Neu", -10.0)
+        records = [
+            SimpleNamespace(hash=existing_hash),
+            SimpleNamespace(hash=new_hash),
+        ]
+
+        new_records, flags = split_duplicates(
+            self.conn, "expenses", records, DuplicateAction.SKIP, bloom
+        )
+
+        self.assertEqual(flags, [True, False])
+        self.assertEqual(bloom.lookups, 2)
+        self.assertEqual(bloom.skipped, 1)
+        self.assertEqual(bloom.false_positives, 0)
+        self.assertIn(new_hash, bloom)
+        self.assertEqual([record.hash for record in new_records], [new_hash])
+
+    def test_saved_filter_is_reused_until_table_changes(self) -> None:
+        self.add_expense("Bestand")
+        bloom = build_hash_bloom_filter(self.conn, "expenses")
+        save_hash_bloom_filter(self.conn, "expenses", bloom, self.path)
+
+        loaded, from_file = load_hash_bloom_filter(self.conn, "expenses", self.path)
+        self.assertTrue(from_file)
+        self.assertEqual(loaded.bits, bloom.bits)
+
+        self.add_expense("Später")
+        rebuilt, from_file = load_hash_bloom_filter(self.conn, "expenses", self.path)
+        self.assertFalse(from_file)
+        self.assertEqual(rebuilt.count, 2)
+
+        self.path.write_bytes(b"kaputt")
+        _, from_file = load_hash_bloom_filter(self.conn, "expenses", self.path)
+        self.assertFalse(from_file)
+
+    def test_bulk_import_grows_full_filter(self) -> None:
+        bloom = HashBloomFilter(5, 0.01)
+        rows = [
+            {"date": "2026-01-15", "vendor": f"V{i}", "amount_eur": -1.0} for i in range(8)
+        ]
+        result = create_expenses_bulk(
+            self.conn, rows, audit_user="tester", bloom_filter=bloom
+        )
+        self.assertEqual(result.inserted, 8)
+
+        grown = grow_hash_bloom_filter(self.conn, "expenses", bloom)
+        self.assertIsNot(grown, bloom)
+        self.assertGreater(grown.capacity, 8)
+        self.assertEqual(grown.lookups, 8)
+        self.assertTrue(all(compute_hash("2026-01-15", f"V{i}", -1.0) in grown for i in range(8)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import sqlite3
+import unittest
+import uuid
+
+from euercli.schema import SCHEMA, SEED_CATEGORIES
+from euercli.services.errors import ValidationError
+from euercli.services.expenses import (
+    create_expense,
+    create_expenses_bulk,
+    delete_expense,
+)
+from euercli.services.idempotency import (
+    find_idempotent_record,
+    purge_expired_idempotency_keys,
+)
+from euercli.services.income import create_income
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    for name, eur_line, cat_type in SEED_CATEGORIES:
+        conn.execute(
+            "INSERT INTO categories (uuid, name, eur_line, type) VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), name, eur_line, cat_type),
+        )
+    conn.commit()
+    return conn
+
+
+class IdempotencyServiceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def count(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_retry_returns_original_without_validation(self) -> None:
+        first = create_expense(
+            self.conn,
+            vendor="Hetzner",
+            amount_eur=-10.0,
+            payment_date="2026-01-05",
+            category_name="Arbeitsmittel",
+            notes="Versuch 1",
+            idempotency_key="agent-42",
+        )
+        # Abweichende Notiz und unbekannte Kategorie: kein Duplikat per Hash, keine Prüfung
+        retried = create_expense(
+            self.conn,
+            vendor="Hetzner",
+            amount_eur=-10.0,
+            payment_date="2026-01-05",
+            category_name="Gibt es nicht",
+            notes="Versuch 2",
+            idempotency_key="agent-42",
+        )
+        self.assertEqual(retried.id, first.id)
+        self.assertEqual(retried.notes, "Versuch 1")
+        self.assertEqual(self.count("expenses"), 1)
+
+        with self.assertRaises(ValidationError) as ctx:
+            create_income(
+                self.conn,
+                source="Kunde",
+                amount_eur=10.0,
+                payment_date="2026-01-05",
+                idempotency_key="agent-42",
+            )
+        self.assertEqual(ctx.exception.code, "idempotency_key_conflict")
+
+        delete_expense(self.conn, record_id=first.id, audit_user="test")
+        self.assertIsNone(find_idempotent_record(self.conn, "expense", "agent-42"))
+
+    def test_bulk_skips_known_and_repeated_keys(self) -> None:
+        create_expense(
+            self.conn,
+            vendor="Alt",
+            amount_eur=-1.0,
+            payment_date="2026-01-01",
+            idempotency_key="k1",
+        )
+        result = create_expenses_bulk(
+            self.conn,
+            [
+                {"vendor": "Alt", "amount_eur": -1.0, "payment_date": "2026-01-02",
+                 "idempotency_key": "k1"},
+                {"vendor": "Neu", "amount_eur": -2.0, "payment_date": "2026-01-02",
+                 "idempotency_key": "k2"},
+                {"vendor": "Neu", "amount_eur": -2.0, "payment_date": "2026-01-03",
+                 "notes": "Wiederholung", "idempotency_key": "k2"},
+                {"vendor": "Ohne Key", "amount_eur": -3.0, "payment_date": "2026-01-02"},
+            ],
+        )
+        self.assertEqual((result.inserted, result.duplicates, result.replayed), (2, 0, 2))
+        original = find_idempotent_record(self.conn, "expense", "k1")
+        new_id = find_idempotent_record(self.conn, "expense", "k2")
+        self.assertEqual(result.record_ids[:3], [original, new_id, new_id])
+        self.assertEqual(self.count("expenses"), 3)
+
+    def test_expired_keys_are_ignored_and_purged(self) -> None:
+        create_expense(
+            self.conn,
+            vendor="Alt",
+            amount_eur=-1.0,
+            payment_date="2026-01-01",
+            idempotency_key="alt",
+        )
+        self.conn.execute("UPDATE idempotency_keys SET created_at = created_at - 3600")
+        self.assertIsNone(find_idempotent_record(self.conn, "expense", "alt", ttl_seconds=60))
+        self.assertEqual(purge_expired_idempotency_keys(self.conn, ttl_seconds=60), 1)
+        self.assertEqual(self.count("idempotency_keys"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import sqlite3
+import unittest
+
+from euercli.schema import SCHEMA
+from euercli.services.import_journal import (
+    checkpoint_import_journal,
+    complete_import_journal,
+    get_import_journal,
+    start_import_journal,
+)
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class ImportJournalServiceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_checkpoints_accumulate_and_restart_resets(self) -> None:
+        journal = start_import_journal(
+            self.conn, fingerprint="abc", fmt="csv", file_name="bank.csv"
+        )
+        journal = checkpoint_import_journal(
+            self.conn, journal, rows_done=500, byte_offset=4096,
+            inserted_expenses=400, inserted_income=90, duplicates=10,
+        )
+        formats = {"dates": {"date": "de"}, "amounts": {"amount_eur": ["de"]}}
+        journal = checkpoint_import_journal(
+            self.conn, journal, rows_done=800, byte_offset=6000, inserted_expenses=300,
+            formats=formats,
+        )
+
+        stored = get_import_journal(self.conn, "abc")
+        self.assertEqual(stored.id, journal.id)
+        self.assertEqual(
+            (stored.rows_done, stored.byte_offset, stored.last_batch),
+            (800, 6000, 2),
+        )
+        self.assertEqual(
+            (stored.inserted_expenses, stored.inserted_income, stored.duplicates),
+            (700, 90, 10),
+        )
+        self.assertEqual(stored.formats, formats)
+
+        complete_import_journal(self.conn, journal)
+        self.assertEqual(get_import_journal(self.conn, "abc").status, "completed")
+
+        restarted = start_import_journal(self.conn, fingerprint="abc", fmt="csv")
+        self.assertEqual(restarted.id, journal.id)
+        self.assertEqual((restarted.status, restarted.rows_done), ("running", 0))
+        self.assertIsNone(restarted.formats)
+        self.assertIsNone(get_import_journal(self.conn, "unbekannt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+
+from euercli.db import get_db_connection
+from euercli.schema import SCHEMA, SEED_CATEGORIES
+from euercli.services.expenses import create_expense
+from euercli.services.import_preview import preview_import
+
+
+class ImportPreviewServiceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "test.db"
+        conn = get_db_connection(self.db_path)
+        conn.executescript(SCHEMA)
+        for name, eur_line, cat_type in SEED_CATEGORIES:
+            conn.execute(
+                "INSERT INTO categories (uuid, name, eur_line, type) VALUES (?, ?, ?, ?)",
+                (str(uuid.uuid4()), name, eur_line, cat_type),
+            )
+        self.existing = create_expense(
+            conn,
+            date="2026-01-15",
+            vendor="TestVendor",
+            amount_eur=-10.0,
+            audit_user="tester",
+        )
+        conn.close()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_preview_classifies_rows_on_read_only_connection(self) -> None:
+        conn = get_db_connection(self.db_path, read_only=True)
+        try:
+            income_row = {"payment_date": "2026-01-16", "source": "Kunde", "amount_eur": 50.0}
+            rows = [
+                (
+                    1,
+                    "expense",
+                    {"payment_date": "2026-01-15", "vendor": "TestVendor", "amount_eur": -10.0},
+                ),
+                (2, "income", income_row),
+                (3, "income", income_row),
+                (4, "expense", {"vendor": "OhneDatum", "amount_eur": -1.0}),
+            ]
+            preview = preview_import(conn, rows)
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM expenses")
+        finally:
+            conn.close()
+
+        self.assertEqual(
+            [(row.row_index, row.status, row.existing_id) for row in preview.rows],
+            [
+                (1, "duplicate", self.existing.id),
+                (2, "new", None),
+                (3, "duplicate", None),
+                (4, "invalid", None),
+            ],
+        )
+        self.assertEqual(
+            (preview.new_expenses, preview.new_income, preview.duplicates, preview.invalid),
+            (0, 1, 2, 1),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
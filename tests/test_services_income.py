@@ -7,6 +7,7 @@ from euercli.services.duplicates import DuplicateAction
 from euercli.services.errors import ValidationError
 from euercli.services.income import (
     create_income,
+    create_income_bulk,
     delete_income,
     list_income,
     update_income,
@@ -277,6 +278,35 @@ class IncomeServiceTestCase(unittest.TestCase):
 
         self.assertEqual(ctx.exception.code, "ledger_account_category_mismatch")
 
+    def test_create_income_bulk_writes_rows_and_audit(self) -> None:
+        rows = [
+            {
+                "date": "2026-03-01",
+                "source": f"Kunde {idx}",
+                "amount_eur": 100.0 + idx,
+                "category_name": "Umsatzsteuerpflichtige Betriebseinnahmen",
+            }
+            for idx in range(5)
+        ]
+        result = create_income_bulk(
+            self.conn,
+            rows + [dict(rows[0])],
+            tax_mode="small_business",
+            audit_user="tester",
+            chunk_size=2,
+        )
+        self.assertEqual(result.inserted, 5)
+        self.assertEqual(result.duplicates, 1)
+        self.assertEqual(result.record_ids[-1], None)
+
+        income = list_income(self.conn, year=2026)
+        self.assertEqual(len(income), 5)
+        self.assertTrue(all(item.vat_output == 0.0 for item in income))
+        audit_count = self.conn.execute(
+            "SELECT COUNT(*) FROM audit_log WHERE table_name = 'income' AND action = 'INSERT'"
+        ).fetchone()[0]
+        self.assertEqual(audit_count, 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import unittest
+
+from euercli.schema import SCHEMA
+from euercli.services.ingest import load_ingest_files, record_ingest_file
+from euercli.services.models import IngestFile
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class IngestServiceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_record_upserts_and_load_filters_by_directory(self) -> None:
+        # Pfade werden mit dem Trenner des Systems gespeichert (unter Windows "\\")
+        def path(*parts: str) -> str:
+            return os.path.join(os.sep, *parts)
+
+        for name in (
+            path("inbox", "a.csv"),
+            path("inbox", "sub", "b.csv"),
+            path("inbox2", "c.csv"),
+            path("in%", "d.csv"),
+        ):
+            record_ingest_file(
+                self.conn,
+                IngestFile(path=name, size=1, mtime_ns=10, fingerprint="f1", status="imported"),
+            )
+        record_ingest_file(
+            self.conn,
+            IngestFile(
+                path=path("inbox", "a.csv"),
+                size=2,
+                mtime_ns=20,
+                fingerprint="f2",
+                status="failed",
+                message="Pflichtfelder fehlen",
+            ),
+        )
+
+        files = load_ingest_files(self.conn, path("inbox") + os.sep)
+        self.assertEqual(sorted(files), [path("inbox", "a.csv"), path("inbox", "sub", "b.csv")])
+        stored = files[path("inbox", "a.csv")]
+        self.assertEqual(
+            (stored.size, stored.mtime_ns, stored.fingerprint, stored.status, stored.message),
+            (2, 20, "f2", "failed", "Pflichtfelder fehlen"),
+        )
+        self.assertEqual(len(load_ingest_files(self.conn)), 4)
+        self.assertEqual(list(load_ingest_files(self.conn, path("in%"))), [path("in%", "d.csv")])
+        self.assertEqual(len(load_ingest_files(self.conn, path("inbox", "sub", ".."))), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import sqlite3
+import unittest
+import uuid
+
+from euercli.schema import SCHEMA, SEED_CATEGORIES
+from euercli.services.expenses import (
+    create_expense,
+    create_expenses_bulk,
+    delete_expense,
+    update_expense,
+)
+from euercli.services.income import create_income
+from euercli.services.models import LedgerAccount
+from euercli.services.suggestions import (
+    get_category_suggestions,
+    load_category_suggester,
+    rebuild_category_suggestions,
+)
+
+
+def make_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    for name, eur_line, cat_type in SEED_CATEGORIES:
+        conn.execute(
+            "INSERT INTO categories (uuid, name, eur_line, type) VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), name, eur_line, cat_type),
+        )
+    conn.commit()
+    return conn
+
+
+def model_rows(conn: sqlite3.Connection) -> list[tuple]:
+    return [
+        tuple(row)
+        for row in conn.execute(
+            """SELECT s.type, s.party_key, c.name, s.ledger_account, s.count
+               FROM category_suggestions s JOIN categories c ON c.id = s.category_id
+               ORDER BY s.type, s.party_key, c.name"""
+        )
+    ]
+
+
+class CategorySuggestionTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = make_connection()
+        self.ledger_accounts = [
+            LedgerAccount(key="hosting", name="Hosting", category="Laufende EDV-Kosten")
+        ]
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def add(self, vendor: str, day: int, **kwargs):
+        return create_expense(
+            self.conn,
+            vendor=vendor,
+            amount_eur=-10.0 - day,
+            payment_date=f"2026-01-{day:02d}",
+            ledger_accounts=self.ledger_accounts,
+            **kwargs,
+        )
+
+    def test_triggers_maintain_counts_on_insert_update_delete(self) -> None:
+        first = self.add("Hetzner Online", 1, ledger_account_key="hosting")
+        self.add(" HETZNER Online", 2, ledger_account_key="hosting")
+        other = self.add("Hetzner Online", 3, category_name="Telekommunikation")
+        self.add("Ohne Kategorie", 4)
+
+        self.assertEqual(
+            model_rows(self.conn),
+            [
+                ("expense", "hetzner online", "Laufende EDV-Kosten", "hosting", 2),
+                ("expense", "hetzner online", "Telekommunikation", "", 1),
+            ],
+        )
+
+        update_expense(
+            self.conn,
+            record_id=other.id,
+            category_name="Laufende EDV-Kosten",
+            ledger_accounts=self.ledger_accounts,
+            ledger_account_key="hosting",
+            tax_mode="small_business",
+            audit_user="test",
+        )
+        delete_expense(self.conn, record_id=first.id, audit_user="test")
+        self.assertEqual(
+            model_rows(self.conn),
+            [("expense", "hetzner online", "Laufende EDV-Kosten", "hosting", 2)],
+        )
+
+        expected = model_rows(self.conn)
+        self.assertEqual(rebuild_category_suggestions(self.conn), 1)
+        self.assertEqual(model_rows(self.conn), expected)
+
+    def test_get_category_suggestions_ranks_by_count(self) -> None:
+        for day in (1, 2, 3):
+            self.add("Hetzner Online", day, category_name="Laufende EDV-Kosten")
+        self.add("Hetzner Online", 4, category_name="Telekommunikation")
+        create_income(
+            self.conn,
+            source="Hetzner Online",
+            amount_eur=100.0,
+            payment_date="2026-01-05",
+            category_name="Umsatzsteuerpflichtige Betriebseinnahmen",
+        )
+
+        suggestions = get_category_suggestions(self.conn, "expense", "HETZNER ONLINE ")
+        self.assertEqual(
+            [(s.category_name, s.count, s.share) for s in suggestions],
+            [("Laufende EDV-Kosten", 3, 0.75), ("Telekommunikation", 1, 0.25)],
+        )
+        self.assertEqual(len(get_category_suggestions(self.conn, "income", "hetzner online")), 1)
+        self.assertEqual(get_category_suggestions(self.conn, "expense", "Unbekannt"), [])
+
+    def test_suggester_thresholds_and_bulk_fill(self) -> None:
+        for day in (1, 2, 3, 4):
+            self.add("Hetzner Online", day, ledger_account_key="hosting")
+        self.add("Telekom", 5, category_name="Telekommunikation")
+        for day in (6, 7):
+            self.add("Mischkonto", day, category_name="Arbeitsmittel")
+            self.add("Mischkonto", day + 2, category_name="Telekommunikation")
+
+        suggester = load_category_suggester(self.conn, ledger_accounts=self.ledger_accounts)
+        # Telekom: nur 1 Buchung; Mischkonto: 50 % Anteil → kein Vorschlag
+        self.assertEqual(len(suggester), 1)
+        self.assertIsNone(suggester.suggest("expense", "Telekom"))
+        self.assertIsNone(suggester.suggest("expense", "Mischkonto"))
+        self.assertEqual(suggester.suggest("expense", "hetzner online").ledger_account, "hosting")
+
+        result = create_expenses_bulk(
+            self.conn,
+            [
+                {"vendor": "Hetzner Online", "amount_eur": -1.0, "payment_date": "2026-02-01"},
+                {"vendor": "Mischkonto", "amount_eur": -1.0, "payment_date": "2026-02-01"},
+                {
+                    "vendor": "Hetzner Online",
+                    "amount_eur": -2.0,
+                    "payment_date": "2026-02-01",
+                    "category_name": "Telekommunikation",
+                },
+            ],
+            ledger_accounts=self.ledger_accounts,
+            category_suggester=suggester,
+        )
+        rows = self.conn.execute(
+            """SELECT e.ledger_account, c.name FROM expenses e
+               LEFT JOIN categories c ON c.id = e.category_id
+               WHERE e.id IN (?, ?, ?) ORDER BY e.id""",
+            result.record_ids,
+        ).fetchall()
+        self.assertEqual(
+            [tuple(row) for row in rows],
+            [("hosting", "Laufende EDV-Kosten"), (None, None), (None, "Telekommunikation")],
+        )
+
+    def test_unknown_ledger_account_falls_back_to_category(self) -> None:
+        for day in (1, 2):
+            self.add("Hetzner Online", day, ledger_account_key="hosting")
+
+        suggester = load_category_suggester(self.conn, ledger_accounts=[])
+        suggestion = suggester.suggest("expense", "Hetzner Online")
+        self.assertIsNone(suggestion.ledger_account)
+        self.assertEqual(suggestion.category_name, "Laufende EDV-Kosten")
+
+
+if __name__ == "__main__":
+    unittest.main()